@@ -6,18 +6,49 @@ These endpoints are read-only and designed for quick demonstrations:
 - top event codes
 - top countries
 - tone statistics
+- top GKG themes (from the `gkg_themes` side table exploded at ingest)
+- batched aggregates (several top-values and tone for one dashboard, computed
+  by a single scan of the date range with GROUPING SETS)
+- heatmap tiles (event counts per grid cell, from grid aggregates written at
+  ingest; rendered tiles cached per lake version, `app.services.heatmap`)
 
 OpenAPI/Swagger notes:
 - Using `response_model` yields strong schemas in /docs and /openapi.json.
 - Parameters are documented via Query constraints and docstrings.
+
+Results are returned as `FastJSONResponse` (orjson, no per-row Pydantic
+validation); `response_model` still documents the payload.
+
+Every endpoint goes through admission control (`deps.admit`): overloaded
+lanes answer 503 + Retry-After immediately. GET endpoints carry an ETag tied
+to the partitions they read (`deps.conditional`): a current `If-None-Match`
+gets a 304 before admission, without running DuckDB.
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 
-from app.schemas import TopValuesResponse, ToneStatsResponse
-from app.services.duckdb_queries import top_values, tone_stats
+from app.api.v1.deps import NOT_MODIFIED_RESPONSE, OVERLOADED_RESPONSE, admit, conditional
+from app.core.responses import FastJSONResponse
+from app.domain.datasets import EVENTS, EVENTS_ROLLUP, GEO_GRID
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.schemas import (
+    BatchAnalyticsRequest,
+    BatchAnalyticsResponse,
+    HeatmapTileResponse,
+    TopValuesResponse,
+    ToneStatsResponse,
+)
+from app.services.duckdb_queries import (
+    TOP_VALUE_FIELDS,
+    AggregateSpec,
+    batch_aggregates,
+    heatmap_tile,
+    top_values,
+    tone_stats,
+)
+from app.services.heatmap import tile_cache
 
 router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 
@@ -25,6 +56,7 @@ router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
 @router.get(
     "/top-event-codes",
     response_model=TopValuesResponse,
+    response_class=FastJSONResponse,
     summary="Top Event Codes",
     description=(
         "Returns the most frequent event codes from ingested GDELT Events batches. "
@@ -32,26 +64,31 @@ router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
     ),
     responses={
         200: {"description": "Top buckets returned successfully."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
     },
+    dependencies=[Depends(conditional(EVENTS, EVENTS_ROLLUP)), Depends(admit("top_values"))],
 )
 def top_event_codes(
     since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
     until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
     limit: int = Query(10, ge=1, le=200, description="Number of buckets to return."),
-) -> dict:
+) -> FastJSONResponse:
+    candidates, fallback = TOP_VALUE_FIELDS["EventCode"]
     rows = top_values(
-        field_candidates=["EventCode", "EventBaseCode", "EventRootCode"],
-        fallback="c27",
+        field_candidates=list(candidates),
+        fallback=fallback,
         since=since,
         until=until,
         limit=limit,
     )
-    return {"field": "EventCode", "rows": rows}
+    return FastJSONResponse({"field": "EventCode", "rows": rows})
 
 
 @router.get(
     "/top-countries",
     response_model=TopValuesResponse,
+    response_class=FastJSONResponse,
     summary="Top Countries",
     description=(
         "Returns the most frequent country codes based on `ActionGeo_CountryCode` when available. "
@@ -59,26 +96,31 @@ def top_event_codes(
     ),
     responses={
         200: {"description": "Top buckets returned successfully."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
     },
+    dependencies=[Depends(conditional(EVENTS, EVENTS_ROLLUP)), Depends(admit("top_values"))],
 )
 def top_countries(
     since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
     until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
     limit: int = Query(10, ge=1, le=200, description="Number of buckets to return."),
-) -> dict:
+) -> FastJSONResponse:
+    candidates, fallback = TOP_VALUE_FIELDS["ActionGeo_CountryCode"]
     rows = top_values(
-        field_candidates=["ActionGeo_CountryCode", "Actor1CountryCode", "Actor2CountryCode"],
-        fallback="c55",
+        field_candidates=list(candidates),
+        fallback=fallback,
         since=since,
         until=until,
         limit=limit,
     )
-    return {"field": "ActionGeo_CountryCode", "rows": rows}
+    return FastJSONResponse({"field": "ActionGeo_CountryCode", "rows": rows})
 
 
 @router.get(
     "/tone",
     response_model=ToneStatsResponse,
+    response_class=FastJSONResponse,
     summary="Tone statistics",
     description=(
         "Computes tone stats from `AvgTone` if the column exists in ingested Parquet schema. "
@@ -86,10 +128,126 @@ def top_countries(
     ),
     responses={
         200: {"description": "Tone statistics computed (or unavailable)."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
     },
+    dependencies=[Depends(conditional(EVENTS, EVENTS_ROLLUP)), Depends(admit("tone"))],
 )
 def tone(
     since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
     until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
-) -> dict:
-    return tone_stats(since=since, until=until)
+) -> FastJSONResponse:
+    return FastJSONResponse(tone_stats(since=since, until=until))
+
+
+@router.get(
+    "/gkg/top-themes",
+    response_model=TopValuesResponse,
+    response_class=FastJSONResponse,
+    summary="Top GKG themes",
+    description=(
+        "Returns the most frequent GKG themes. Themes are exploded at ingest into the narrow "
+        "`gkg_themes` table (one row per article and theme), so this is a plain GROUP BY."
+    ),
+    responses={
+        200: {"description": "Top buckets returned successfully."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
+    },
+    dependencies=[Depends(conditional("gkg_themes")), Depends(admit("top_values"))],
+)
+def top_gkg_themes(
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    limit: int = Query(10, ge=1, le=200, description="Number of buckets to return."),
+) -> FastJSONResponse:
+    rows = top_values(
+        field_candidates=["Theme"],
+        fallback="Theme",
+        since=since,
+        until=until,
+        limit=limit,
+        dataset="gkg_themes",
+    )
+    return FastJSONResponse({"field": "Theme", "rows": rows})
+
+
+@router.post(
+    "/batch",
+    response_model=BatchAnalyticsResponse,
+    response_class=FastJSONResponse,
+    summary="Batched aggregates (one scan)",
+    description=(
+        "Computes several aggregates (`top_values` of an events column, `tone`) over the same "
+        "`since` / `until` partitions in a single DuckDB pass (GROUPING SETS): a dashboard "
+        "reads the data once instead of once per widget. `EventCode` and "
+        "`ActionGeo_CountryCode` fall back like `/top-event-codes` and `/top-countries`."
+    ),
+    responses={
+        200: {"description": "Results returned in request order."},
+        422: {"description": "Validation error (unknown op or column, duplicate name)."},
+        **OVERLOADED_RESPONSE,
+    },
+    dependencies=[Depends(admit("batch"))],
+)
+def batch(
+    body: BatchAnalyticsRequest,
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+) -> FastJSONResponse:
+    specs = []
+    for query in body.queries:
+        if query.op not in ("top_values", "tone"):
+            raise HTTPException(status_code=422, detail=f"{query.name}: unknown op {query.op!r}")
+        if query.op == "top_values" and query.field not in EVENTS_COLUMNS:
+            detail = f"{query.name}: unknown field {query.field!r}"
+            raise HTTPException(status_code=422, detail=detail)
+        field = query.field if query.op == "top_values" else None
+        specs.append(AggregateSpec(query.name, query.op, field, query.limit))
+    if len({spec.name for spec in specs}) != len(specs):
+        raise HTTPException(status_code=422, detail="Aggregate names must be unique.")
+    results = batch_aggregates(specs, since=since, until=until)
+    return FastJSONResponse({"since": since, "until": until, "results": results})
+
+
+@router.get(
+    "/heatmap/{z}/{x}/{y}",
+    response_model=HeatmapTileResponse,
+    summary="Event-density heatmap tile",
+    description=(
+        "Returns event counts per grid cell of the Web Mercator (slippy-map) tile `z/x/y`, "
+        "located by `ActionGeo_Lat` / `ActionGeo_Long`. Cells are read from grid aggregates "
+        "computed per batch at ingest and merged over the `since` / `until` partitions; "
+        "rendered tiles are cached until the lake changes."
+    ),
+    responses={
+        200: {"description": "Tile cells returned (possibly none)."},
+        422: {"description": "Validation error (bad parameters, tile outside zoom `z`)."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
+    },
+    dependencies=[
+        Depends(conditional(GEO_GRID, EVENTS, ranged=True)),
+        Depends(admit("heatmap")),
+    ],
+)
+def heatmap(
+    z: int = Path(..., ge=0, le=24, description="Tile zoom."),
+    x: int = Path(..., ge=0, description="Tile column (0 .. 2^z - 1)."),
+    y: int = Path(..., ge=0, description="Tile row (0 .. 2^z - 1)."),
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    root_code: str | None = Query(
+        default=None, min_length=2, max_length=2, description="EventRootCode (CAMEO).", examples=["14"]
+    ),
+    quad_class: int | None = Query(default=None, ge=1, le=4, description="QuadClass (1..4)."),
+) -> Response:
+    if x >= 1 << z or y >= 1 << z:
+        raise HTTPException(status_code=422, detail=f"Tile {x}/{y} does not exist at zoom {z}.")
+
+    def render() -> bytes:
+        tile = heatmap_tile(z, x, y, since, until, root_code=root_code, quad_class=quad_class)
+        return FastJSONResponse(tile).body
+
+    body = tile_cache.get_or_render((z, x, y, since, until, root_code, quad_class), render)
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,112 @@
+"""app.api.v1.debug
+
+Debug / diagnostics endpoints.
+
+- GET /debug/slow-queries: DuckDB queries slower than `SLOW_QUERY_THRESHOLD_MS`
+  (raw SQL and parameters), with their profile when DuckDB profiling was
+  enabled for them (`DUCKDB_PROFILING=sampled|always`).
+- GET /debug/profile?seconds=N: samples the Python stacks of this API worker
+  for N seconds and returns a flamegraph profile (`app.core.profiling`).
+
+Both require `Authorization: Bearer <DEBUG_PROFILE_TOKEN>`; 404 while the
+token is not configured.
+
+These endpoints read in-process state only (per API worker).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+
+from app.core import profiling
+from app.core.config import settings
+from app.schemas import SlowQueriesResponse
+from app.services.query_profiler import slow_query_log
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+def _check_debug_token(authorization: str | None) -> None:
+    token = settings.debug_profile_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, supplied = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="invalid or missing debug token")
+
+
+@router.get(
+    "/slow-queries",
+    response_model=SlowQueriesResponse,
+    summary="Slow DuckDB queries",
+    description=(
+        "Returns the bounded in-memory slow-query log (newest first): SQL, parameters, "
+        "duration and, for profiled queries, rows/bytes scanned, files read and operator timings. "
+        "Requires `Authorization: Bearer <DEBUG_PROFILE_TOKEN>`."
+    ),
+    responses={
+        200: {"description": "Slow-query log returned successfully."},
+        403: {"description": "Invalid or missing token."},
+        404: {"description": "Debug endpoints are disabled (DEBUG_PROFILE_TOKEN unset)."},
+    },
+)
+def slow_queries(
+    kind: str | None = Query(default=None, description="Only return this query kind."),
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of entries returned."),
+    authorization: str | None = Header(default=None),
+) -> SlowQueriesResponse:
+    _check_debug_token(authorization)
+    records = [r for r in slow_query_log.snapshot() if kind is None or r.kind == kind][:limit]
+    return SlowQueriesResponse(
+        threshold_ms=settings.slow_query_threshold_ms,
+        capacity=slow_query_log.capacity,
+        count=len(records),
+        queries=[r.to_dict() for r in records],
+    )
+
+
+@router.get(
+    "/profile",
+    summary="Sample the API worker",
+    description=(
+        "Samples the Python stacks of every thread of the API worker serving the request "
+        "for `seconds` and returns folded stacks (flamegraph.pl / inferno / speedscope) or a "
+        "speedscope JSON file. Requires `Authorization: Bearer <DEBUG_PROFILE_TOKEN>`."
+    ),
+    response_class=Response,
+    responses={
+        200: {
+            "description": "Profile returned successfully.",
+            "content": {"text/plain": {}, "application/json": {}},
+        },
+        403: {"description": "Invalid or missing token."},
+        404: {"description": "Debug endpoints are disabled (DEBUG_PROFILE_TOKEN unset)."},
+        409: {"description": "A profile is already being taken in this worker."},
+    },
+)
+async def profile(
+    seconds: float = Query(10.0, gt=0, description="Sampling duration."),
+    format: str = Query(
+        "collapsed", pattern="^(collapsed|speedscope)$", description="collapsed | speedscope"
+    ),
+    authorization: str | None = Header(default=None),
+) -> Response:
+    _check_debug_token(authorization)
+    if seconds > settings.debug_profile_max_seconds:
+        detail = f"seconds must be <= {settings.debug_profile_max_seconds:g}"
+        raise HTTPException(status_code=422, detail=detail)
+    try:
+        # Sampled from a thread: the event loop keeps serving (and shows up in the profile).
+        result = await asyncio.to_thread(profiling.sampler.sample, seconds)
+    except profiling.ProfileError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from None
+    headers = {"Cache-Control": "no-store"}
+    if format == "speedscope":
+        name = f"{settings.app_name} api"
+        body = orjson.dumps(result.speedscope(name))
+        return Response(body, media_type="application/json", headers=headers)
+    return Response(result.collapsed(), media_type="text/plain", headers=headers)
@@ -0,0 +1,74 @@
+"""app.api.v1.deps
+
+Shared FastAPI dependencies for v1 routes.
+
+- `admit(kind)`: admission control for DuckDB-backed endpoints. The request's
+  `since` / `until` query params and the query kind give an estimated cost
+  (`duckdb_queries.estimate_cost`), which selects a lane of
+  `app.core.admission`. The slot is held until the endpoint returns.
+- `conditional(*datasets)`: HTTP validators (`app.core.http_cache`). The ETag
+  of the request (path, query string, fingerprint of the partitions read) is
+  computed first; a matching `If-None-Match` answers 304 before admission
+  and before DuckDB runs. List it before `admit` in `dependencies`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Callable
+
+from fastapi import Request
+
+from app.core.admission import get_controller
+from app.core.config import settings
+from app.core.http_cache import NotModified, cache_control, make_etag, matching_tag
+from app.infra.lake_storage import lake_version
+from app.services.duckdb_queries import estimate_cost, partition_fingerprint
+
+# OpenAPI entry shared by admission-controlled routes.
+OVERLOADED_RESPONSE = {503: {"description": "Overloaded: request shed, retry after `Retry-After` seconds."}}
+NOT_MODIFIED_RESPONSE = {304: {"description": "Not modified: `If-None-Match` matches the ETag."}}
+
+
+def admit(kind: str) -> Callable[[Request], AsyncIterator[str | None]]:
+    """Build a dependency admitting a `kind` query (search | top_values | tone)."""
+
+    async def dependency(request: Request) -> AsyncIterator[str | None]:
+        if not settings.admission_enabled:
+            yield None
+            return
+        params = request.query_params
+        cost = estimate_cost(kind, params.get("since"), params.get("until"))
+        async with get_controller().admit(cost) as lane:
+            yield lane
+
+    return dependency
+
+
+def conditional(*datasets: str, ranged: bool = False) -> Callable[[Request], None]:
+    """Build a dependency validating `If-None-Match` against the data of `datasets`.
+
+    `ranged`: the endpoint reads exactly the `since` / `until` partitions
+    (otherwise the `_parquet_glob_for_dates` pruning rules apply). Without
+    datasets, responses depend on the whole lake (validated on its version).
+    """
+
+    def dependency(request: Request) -> None:
+        if not settings.http_cache_enabled:
+            return
+        params = request.query_params
+        if datasets:
+            fingerprint, last_day = partition_fingerprint(
+                datasets, params.get("since"), params.get("until"), ranged=ranged
+            )
+        else:
+            fingerprint, last_day = lake_version(), None
+        query = sorted(params.multi_items())
+        etag = make_etag(request.app.version, request.url.path, query, fingerprint)
+        control = cache_control(last_day)
+        matched = matching_tag(request.headers.get("if-none-match"), etag)
+        if matched is not None:
+            raise NotModified(matched, control)
+        request.state.etag = etag
+        request.state.cache_control = control
+
+    return dependency
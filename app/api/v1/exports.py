@@ -0,0 +1,110 @@
+"""app.api.v1.exports
+
+Bulk export jobs (`app.services.exports`): events matching a filter over a
+date range, written by DuckDB `COPY` to one Parquet or CSV file.
+
+- POST /api/v1/exports                submit (202, runs in the background)
+- GET  /api/v1/exports                list retained jobs
+- GET  /api/v1/exports/{id}           poll the job state
+- GET  /api/v1/exports/{id}/download  the file (Range requests supported)
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from fastapi.responses import FileResponse
+
+from app.api.v1.deps import OVERLOADED_RESPONSE
+from app.schemas import ExportJobResponse, ExportListResponse, ExportRequest
+from app.services.exports import ExportError, ExportJob, ExportSpec, exports
+
+router = APIRouter(prefix="/api/v1/exports", tags=["exports"])
+
+NOT_FOUND = {404: {"description": "Unknown (or expired) export."}}
+MEDIA_TYPES = {"parquet": "application/vnd.apache.parquet", "csv": "text/csv"}
+
+
+def _info(job: ExportJob) -> ExportJobResponse:
+    return ExportJobResponse(
+        id=job.id,
+        status=job.status,
+        format=job.spec.format,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at(),
+        rows=job.rows,
+        bytes=job.bytes,
+        error=job.error,
+        download_url=f"{router.prefix}/{job.id}/download" if job.status == "done" else None,
+    )
+
+
+def _get(job_id: str) -> ExportJob:
+    try:
+        return exports.get(job_id)
+    except ExportError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+
+
+@router.post(
+    "",
+    response_model=ExportJobResponse,
+    status_code=202,
+    summary="Submit a bulk export",
+    description=(
+        "Queues an export of the events matching the filter over [`since`, `until`] and returns "
+        "its id at once. Poll `GET /api/v1/exports/{id}` until `done`, then download the file. "
+        "Rows are written by DuckDB straight from the lake to the file."
+    ),
+    responses={422: {"description": "Invalid export."}, **OVERLOADED_RESPONSE},
+)
+async def submit_export(
+    body: ExportRequest, background_tasks: BackgroundTasks
+) -> ExportJobResponse:
+    # Imported on first export: app.tasks pulls in the ingestion stack.
+    from app.tasks import run_export_now
+
+    spec = ExportSpec(
+        **{**body.model_dump(), "terms": tuple(body.terms), "columns": tuple(body.columns)}
+    )
+    try:
+        job = exports.submit(spec)
+    except ExportError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+    background_tasks.add_task(run_export_now, job.id)
+    return _info(job)
+
+
+@router.get("", response_model=ExportListResponse, summary="List export jobs")
+def list_exports() -> ExportListResponse:
+    return ExportListResponse(jobs=[_info(job) for job in exports.list()])
+
+
+@router.get(
+    "/{job_id}",
+    response_model=ExportJobResponse,
+    summary="Export job state",
+    responses=NOT_FOUND,
+)
+def get_export(job_id: str) -> ExportJobResponse:
+    return _info(_get(job_id))
+
+
+@router.get(
+    "/{job_id}/download",
+    response_class=FileResponse,
+    summary="Download an export",
+    description=(
+        "Streams the exported file. `Range` requests are supported (resume, parallel chunks)."
+    ),
+    responses={**NOT_FOUND, 409: {"description": "Export not finished (or failed)."}},
+)
+def download_export(job_id: str) -> FileResponse:
+    job = _get(job_id)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"export {job.id} is {job.status}")
+    path = exports.file_path(job)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"export {job.id}: file expired")
+    return FileResponse(path, media_type=MEDIA_TYPES[job.spec.format], filename=job.file_name)
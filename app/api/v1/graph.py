@@ -0,0 +1,98 @@
+"""app.api.v1.graph
+
+Actor interaction graph ("who interacts with whom"), from the per-day CSR
+graphs maintained at ingest (`app.services.actor_graph`):
+
+- GET /api/v1/graph/{kind}/neighbors   top partners of an actor
+- GET /api/v1/graph/{kind}/top-edges   most frequent interactions
+- GET /api/v1/graph/{kind}/k-hop       actors reachable within k hops
+
+`kind` is `code` (Actor1Code -> Actor2Code) or `country` (Actor1CountryCode ->
+Actor2CountryCode). Ranges are `dt=` partitions, merged in memory.
+"""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.v1.deps import OVERLOADED_RESPONSE, admit
+from app.core.responses import FastJSONResponse
+from app.schemas import GraphKHopResponse, GraphNeighborsResponse, GraphTopEdgesResponse
+from app.services.actor_graph import GraphError, actor_graph
+
+router = APIRouter(prefix="/api/v1/graph", tags=["graph"])
+
+Kind = Literal["code", "country"]
+RESPONSES = {404: {"description": "Unknown actor."}, **OVERLOADED_RESPONSE}
+
+
+@router.get(
+    "/{kind}/neighbors",
+    response_model=GraphNeighborsResponse,
+    response_class=FastJSONResponse,
+    summary="Top interaction partners of an actor",
+    description=(
+        "Actor2 partners of an Actor1 (`direction=out`) or Actor1 partners of an Actor2 "
+        "(`direction=in`), with event counts and average Goldstein scale."
+    ),
+    responses=RESPONSES,
+    dependencies=[Depends(admit("graph"))],
+)
+def neighbors(
+    kind: Kind,
+    actor: str = Query(..., min_length=2, description="Actor or country code.", examples=["USA"]),
+    direction: Literal["out", "in"] = Query("out", description="out: actor is Actor1; in: Actor2."),
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    limit: int = Query(20, ge=1, le=500, description="Number of partners returned."),
+) -> FastJSONResponse:
+    try:
+        return FastJSONResponse(actor_graph.neighbors(kind, actor, since, until, direction, limit))
+    except GraphError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+
+
+@router.get(
+    "/{kind}/top-edges",
+    response_model=GraphTopEdgesResponse,
+    response_class=FastJSONResponse,
+    summary="Most frequent actor interactions",
+    responses=OVERLOADED_RESPONSE,
+    dependencies=[Depends(admit("graph"))],
+)
+def top_edges(
+    kind: Kind,
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    limit: int = Query(20, ge=1, le=500, description="Number of edges returned."),
+) -> FastJSONResponse:
+    return FastJSONResponse(actor_graph.top_edges(kind, since, until, limit))
+
+
+@router.get(
+    "/{kind}/k-hop",
+    response_model=GraphKHopResponse,
+    response_class=FastJSONResponse,
+    summary="Actors reachable within k hops",
+    description=(
+        "Breadth-first expansion from an actor (Actor1 -> Actor2), following the `fanout` "
+        "most frequent out-edges of each actor reached."
+    ),
+    responses=RESPONSES,
+    dependencies=[Depends(admit("graph"))],
+)
+def k_hop(
+    kind: Kind,
+    actor: str = Query(..., min_length=2, description="Start actor.", examples=["USA"]),
+    k: int = Query(2, ge=1, le=4, description="Maximum hops."),
+    fanout: int = Query(10, ge=1, le=100, description="Out-edges followed per actor."),
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    limit: int = Query(200, ge=1, le=2000, description="Nodes (and edges) returned."),
+) -> FastJSONResponse:
+    try:
+        return FastJSONResponse(actor_graph.k_hop(kind, actor, k, since, until, fanout, limit))
+    except GraphError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
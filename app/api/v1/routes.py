@@ -1,8 +1,15 @@
 """app.api.v1.routes
 
 Core API v1 routes:
-- trigger ingestion (background task in local mode)
-- full-text search (DuckDB over Parquet)
+- trigger ingestion (a job run by the local runner process, see
+  `app.services.ingest_jobs`) and follow its progress
+- full-text search (DuckDB over Parquet), behind admission control, returned
+  through the orjson fast path (`FastJSONResponse`)
+- an event's mentions (events joined to mentions on GlobalEventID)
+- fuzzy / partial actor and location search (trigram index + RapidFuzz,
+  `app.services.actor_index`), mapped back to events
+- a server-sent events stream of newly ingested events matching a filter
+  (`app.services.subscriptions`)
 
 OpenAPI/Swagger notes:
 - Response models are declared with `response_model=...` for strong schemas.
@@ -11,11 +18,29 @@ OpenAPI/Swagger notes:
 
 from __future__ import annotations
 
-from fastapi import APIRouter, BackgroundTasks, Query
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Literal
 
-from app.schemas import IngestTriggerResponse, EventSearchResponse
-from app.tasks import enqueue_ingestion, run_ingestion_now
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.api.v1.deps import NOT_MODIFIED_RESPONSE, OVERLOADED_RESPONSE, admit, conditional
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.domain.datasets import EVENTS, MENTIONS
+from app.schemas import (
+    ActorSearchResponse,
+    EventMentionsResponse,
+    IngestJobResponse,
+    IngestTriggerResponse,
+    EventSearchResponse,
+)
+from app.services.duckdb_queries import event_mentions, search_actors
+from app.services.ingest_jobs import IngestJobError, ingest_jobs
 from app.services.query import search_events
+from app.services.subscriptions import SubscriptionFilter, hub
 
 router = APIRouter(prefix="/api/v1")
 
@@ -26,16 +51,18 @@ router = APIRouter(prefix="/api/v1")
     tags=["ingestion"],
     summary="Trigger ingestion of recent GDELT batches",
     description=(
-        "Queues an ingestion job and starts ingestion in a background task (local mode). "
-        "This keeps the HTTP request fast and non-blocking."
+        "Queues an ingestion job, run by the local job runner process (started on demand), "
+        "and returns its id at once: ingestion never runs in the API workers. A trigger "
+        "identical to a job still queued returns that job. Poll "
+        "`GET /api/v1/ingest/jobs/{id}` for its progress."
     ),
     responses={
         200: {"description": "Ingestion scheduled successfully."},
         422: {"description": "Validation error (bad parameters)."},
+        **OVERLOADED_RESPONSE,
     },
 )
 async def trigger_ingest(
-    background_tasks: BackgroundTasks,
     n_batches: int = Query(
         2,
         ge=1,
@@ -44,14 +71,44 @@ async def trigger_ingest(
         examples=[1, 2],
     ),
 ) -> IngestTriggerResponse:
-    queued = await enqueue_ingestion(n_batches=n_batches)
-    background_tasks.add_task(run_ingestion_now, n_batches)
-    return IngestTriggerResponse(queued=queued)
+    job = await asyncio.to_thread(ingest_jobs.submit, n_batches)
+    await asyncio.to_thread(ingest_jobs.ensure_runner)
+    return IngestTriggerResponse(
+        queued=1,
+        job_id=job.id,
+        status=job.status,
+        triggers=job.triggers,
+        status_url=f"{router.prefix}/ingest/jobs/{job.id}",
+    )
+
+
+@router.get(
+    "/ingest/jobs/{job_id}",
+    response_model=IngestJobResponse,
+    tags=["ingestion"],
+    summary="Ingestion job state and progress",
+    description=(
+        "Status of a job queued by `/ingest/trigger`: batch files picked (one per dataset and "
+        "batch), ingested and failed so far, and each file's result. Jobs are kept "
+        "`INGEST_JOB_RETENTION_HOURS` after they finished."
+    ),
+    responses={404: {"description": "Unknown (or expired) ingestion job."}},
+)
+def ingest_job(job_id: str) -> IngestJobResponse:
+    try:
+        job = ingest_jobs.get(job_id)
+    except IngestJobError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+    data = job.to_json()
+    for key in ("host", "pid"):
+        data.pop(key)
+    return IngestJobResponse(**data)
 
 
 @router.get(
     "/events/search",
     response_model=EventSearchResponse,
+    response_class=FastJSONResponse,
     tags=["events"],
     summary="Full-text search in ingested events",
     description=(
@@ -61,9 +118,12 @@ async def trigger_ingest(
     responses={
         200: {"description": "Search results returned successfully."},
         422: {"description": "Validation error (bad parameters)."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
     },
+    dependencies=[Depends(conditional(EVENTS)), Depends(admit("search"))],
 )
-async def events_search(
+def events_search(
     query: str = Query(
         ...,
         min_length=2,
@@ -82,6 +142,147 @@ async def events_search(
         description="Maximum number of rows returned (1..500).",
         examples=[20, 50],
     ),
-) -> EventSearchResponse:
+) -> FastJSONResponse:
     count, rows = search_events(query=query, since=since, limit=limit)
-    return EventSearchResponse(count=count, rows=rows)
+    return FastJSONResponse({"count": count, "rows": rows})
+
+
+@router.get(
+    "/events/actors/search",
+    response_model=ActorSearchResponse,
+    response_class=FastJSONResponse,
+    tags=["events"],
+    summary="Fuzzy actor / location search",
+    description=(
+        "Matches misspelled or partial names (\"Rajoelna\", \"Madagasc\") against the distinct "
+        "actor names (`kind=actor`), place names (`kind=location`) or both of the lake, through a "
+        "trigram index ranked by RapidFuzz, then returns the events carrying the matched names. "
+        "Only the partitions where those names occur are read."
+    ),
+    responses={
+        200: {"description": "Matched names and their events (either may be empty)."},
+        422: {"description": "Validation error (bad parameters)."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
+    },
+    # Matched names come from the whole lake's name index: validated on the lake version.
+    dependencies=[Depends(conditional()), Depends(admit("actors"))],
+)
+def actors_search(
+    q: str = Query(
+        ...,
+        min_length=3,
+        description="Name or part of a name (min length 3).",
+        examples=["Rajoelna", "Madagasc"],
+    ),
+    kind: Literal["actor", "location", "all"] = Query("all", description="Columns searched."),
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    names: int = Query(10, ge=1, le=50, description="Maximum number of names matched."),
+    min_score: float = Query(70.0, ge=0, le=100, description="Minimum RapidFuzz score (0..100)."),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of event rows returned."),
+) -> FastJSONResponse:
+    result = search_actors(
+        q, kind, since=since, until=until, limit=limit, names_limit=names, min_score=min_score
+    )
+    return FastJSONResponse(result)
+
+
+@router.get(
+    "/events/{event_id}/mentions",
+    response_model=EventMentionsResponse,
+    response_class=FastJSONResponse,
+    tags=["events"],
+    summary="Articles mentioning an event",
+    description=(
+        "Looks the event up in the events partitions and returns the rows of the GDELT "
+        "Mentions dataset sharing its `GlobalEventID`. Mentions keep arriving after the "
+        "event's day: widen `until` to follow them."
+    ),
+    responses={
+        200: {"description": "Event and mentions returned (either may be empty)."},
+        422: {"description": "Validation error (bad parameters)."},
+        **NOT_MODIFIED_RESPONSE,
+        **OVERLOADED_RESPONSE,
+    },
+    dependencies=[Depends(conditional(EVENTS, MENTIONS)), Depends(admit("mentions"))],
+)
+def events_mentions(
+    event_id: int = Path(..., ge=1, description="GlobalEventID.", examples=[1234567890]),
+    since: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    until: str | None = Query(default=None, description="ISO date YYYY-MM-DD (partition dt=...)."),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of mentions returned."),
+) -> FastJSONResponse:
+    return FastJSONResponse(event_mentions(event_id, since=since, until=until, limit=limit))
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+@router.get(
+    "/events/stream",
+    tags=["events"],
+    summary="Push feed of new events matching a filter (server-sent events)",
+    description=(
+        "Opens a `text/event-stream`. Every newly ingested events batch is matched against "
+        "the filter and the matching rows are pushed as an `events` message "
+        "(`{dt, ts, count, rows}`, `rows` capped by `SUBSCRIPTIONS_MAX_ROWS`). Terms match "
+        "like `/events/search` (any term, case-insensitive, any column); `country` matches "
+        "`ActionGeo_CountryCode`, `root_code` matches `EventRootCode`. A `lagged` message "
+        "(`{dropped}`) reports messages lost because the client read too slowly: backfill "
+        "with `/events/search`. Idle streams receive a comment every "
+        "`SUBSCRIPTIONS_KEEPALIVE_SECONDS`."
+    ),
+    responses={
+        200: {"description": "Event stream.", "content": {"text/event-stream": {}}},
+        422: {"description": "Validation error (bad parameters)."},
+        503: {"description": "Too many open streams on this worker, retry after `Retry-After`."},
+    },
+)
+async def events_stream(
+    request: Request,
+    terms: list[str] = Query(
+        default=[],
+        max_length=20,
+        description="Search terms (repeat the parameter); a row matches any of them.",
+        examples=[["protest", "election"]],
+    ),
+    country: str | None = Query(
+        default=None, min_length=2, max_length=3, description="ActionGeo_CountryCode.", examples=["MA"]
+    ),
+    root_code: str | None = Query(
+        default=None, min_length=2, max_length=2, description="EventRootCode (CAMEO).", examples=["14"]
+    ),
+) -> StreamingResponse:
+    flt = SubscriptionFilter(
+        terms=tuple(t for t in terms if len(t.strip()) >= 2),
+        country=country,
+        root_code=root_code,
+    )
+    sub = hub.subscribe(flt)
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            yield _sse(
+                "subscribed",
+                {"id": sub.id, "terms": list(flt.terms), "country": country, "root_code": root_code},
+            )
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), settings.subscriptions_keepalive_seconds)
+                except TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                dropped = sub.take_dropped()
+                if dropped:
+                    yield _sse("lagged", {"dropped": dropped})
+                yield _sse("events", message)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
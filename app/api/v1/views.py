@@ -0,0 +1,122 @@
+"""app.api.v1.views
+
+Continuous views: named aggregations maintained incrementally per ingested
+batch (`app.services.continuous_views`).
+
+- POST   /api/v1/views              create (backfilled from the lake window)
+- GET    /api/v1/views              list
+- GET    /api/v1/views/{name}       read the materialized result (O(result size))
+- DELETE /api/v1/views/{name}       drop
+- GET    /api/v1/views/{name}/check compare with a full recomputation
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from app.core.responses import FastJSONResponse
+from app.schemas import (
+    ViewCheckResponse,
+    ViewCreateRequest,
+    ViewInfo,
+    ViewListResponse,
+    ViewRowsResponse,
+)
+from app.services.continuous_views import ContinuousView, ViewError, ViewSpec, views
+
+router = APIRouter(prefix="/api/v1/views", tags=["views"])
+
+NOT_FOUND = {404: {"description": "Unknown view."}}
+
+
+def _info(view: ContinuousView) -> dict:
+    spec = view.spec
+    window = view.window()
+    return {
+        "name": spec.name,
+        "group_by": spec.group_by,
+        "metric": spec.metric,
+        "value_column": spec.value_column,
+        "window_days": spec.window_days,
+        "window": list(window) if window else None,
+        "batches": sum(len(uris) for uris in view.applied.values()),
+        "keys": len(view.totals),
+    }
+
+
+def _get(name: str) -> ContinuousView:
+    try:
+        return views.get(name)
+    except ViewError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+
+
+@router.post(
+    "",
+    response_model=ViewInfo,
+    status_code=201,
+    summary="Create a continuous view",
+    description=(
+        "Registers a view (GROUP BY `group_by`, `count` or `avg` of `value_column`, over the "
+        "last `window_days` partitions), computes it from the lake, then keeps it up to date "
+        "batch by batch."
+    ),
+    responses={
+        409: {"description": "A view with this name already exists."},
+        422: {"description": "Invalid definition."},
+    },
+)
+def create_view(body: ViewCreateRequest) -> ViewInfo:
+    spec = ViewSpec(**body.model_dump())
+    try:
+        spec.validate()
+        view = views.create(spec)
+    except ViewError as exc:
+        status = 409 if "already exists" in str(exc) else 422
+        raise HTTPException(status_code=status, detail=str(exc)) from None
+    return ViewInfo(**_info(view))
+
+
+@router.get("", response_model=ViewListResponse, summary="List continuous views")
+def list_views() -> ViewListResponse:
+    return ViewListResponse(views=[ViewInfo(**_info(v)) for v in views.list()])
+
+
+@router.get(
+    "/{name}",
+    response_model=ViewRowsResponse,
+    response_class=FastJSONResponse,
+    summary="Read a continuous view",
+    description="Returns the materialized rows (n desc, then key), cached until the next batch.",
+    responses=NOT_FOUND,
+)
+def read_view(
+    name: str,
+    limit: int = Query(100, ge=1, le=10_000, description="Maximum number of rows returned."),
+) -> FastJSONResponse:
+    view = _get(name)
+    return FastJSONResponse({"view": _info(view), "rows": view.rows()[:limit]})
+
+
+@router.delete("/{name}", status_code=204, summary="Drop a continuous view", responses=NOT_FOUND)
+def drop_view(name: str) -> Response:
+    try:
+        views.drop(name)
+    except ViewError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from None
+    return Response(status_code=204)
+
+
+@router.get(
+    "/{name}/check",
+    response_model=ViewCheckResponse,
+    summary="Check a view against a full recomputation",
+    description=(
+        "Recomputes the view's window from the lake batches in one query and lists differing "
+        "keys, batches the view missed and applied batches no longer in the lake."
+    ),
+    responses=NOT_FOUND,
+)
+def check_view(name: str) -> ViewCheckResponse:
+    _get(name)
+    return ViewCheckResponse(**views.check(name))
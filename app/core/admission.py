@@ -0,0 +1,153 @@
+"""app.core.admission
+
+Admission control and load shedding for query endpoints.
+
+Every DuckDB-backed request is classified by estimated cost into a lane:
+- cheap:    small scans (e.g. one-partition analytics); reserved lane, so heavy
+            traffic can never starve dashboards
+- standard: everything in between
+- heavy:    wide scans (full-lake search, multi-week ranges)
+
+Each lane has its own concurrency limit, a bounded wait queue and a queue
+timeout. When a lane is saturated and its queue is full (or a queued request
+waits longer than the timeout), the request is rejected right away with
+`AdmissionRejected`, rendered as 503 + Retry-After by `app.core.errors`,
+instead of piling up and slowing every in-flight query down together.
+
+Limits are per process (one controller per API worker).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.metrics import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+
+LANES: tuple[str, ...] = ("cheap", "standard", "heavy")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed by the admission controller."""
+
+    def __init__(self, lane: str, reason: str, retry_after: int) -> None:
+        super().__init__(f"{lane} lane overloaded ({reason})")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class LaneLimits:
+    """Concurrency and queueing limits of one lane."""
+
+    concurrency: int
+    max_queue: int
+    queue_timeout_s: float
+
+
+class Lane:
+    """A concurrency-limited lane with a bounded, time-limited wait queue."""
+
+    def __init__(self, name: str, limits: LaneLimits) -> None:
+        self.name = name
+        self.limits = limits
+        self._sem = asyncio.Semaphore(limits.concurrency)
+        self.in_flight = 0
+        self.queued = 0
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting at most `queue_timeout_s`; raise AdmissionRejected otherwise."""
+        if self._sem.locked() and self.queued >= self.limits.max_queue:
+            self._reject("queue_full")
+
+        start = time.perf_counter()
+        self.queued += 1
+        ADMISSION_QUEUED.labels(self.name).inc()
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.limits.queue_timeout_s)
+        except TimeoutError:
+            self._reject("queue_timeout")
+        finally:
+            self.queued -= 1
+            ADMISSION_QUEUED.labels(self.name).dec()
+
+        ADMISSION_WAIT.labels(self.name).observe(time.perf_counter() - start)
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.labels(self.name).inc()
+
+    def release(self) -> None:
+        """Give the slot back."""
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.labels(self.name).dec()
+        self._sem.release()
+
+    def _reject(self, reason: str) -> None:
+        ADMISSION_REJECTED.labels(self.name, reason).inc()
+        raise AdmissionRejected(self.name, reason, settings.admission_retry_after_seconds)
+
+
+class AdmissionController:
+    """Route requests to lanes by cost and enforce per-lane limits."""
+
+    def __init__(self, limits: dict[str, LaneLimits], cheap_max_cost: int, heavy_min_cost: int) -> None:
+        self.lanes = {name: Lane(name, limits[name]) for name in LANES}
+        self.cheap_max_cost = cheap_max_cost
+        self.heavy_min_cost = heavy_min_cost
+
+    @classmethod
+    def from_settings(cls) -> AdmissionController:
+        """Build a controller from `ADMISSION_*` settings."""
+        limits = {
+            lane: LaneLimits(
+                concurrency=getattr(settings, f"admission_{lane}_concurrency"),
+                max_queue=getattr(settings, f"admission_{lane}_max_queue"),
+                queue_timeout_s=getattr(settings, f"admission_{lane}_queue_timeout_ms") / 1000,
+            )
+            for lane in LANES
+        }
+        return cls(limits, settings.admission_cheap_max_cost, settings.admission_heavy_min_cost)
+
+    def lane_for(self, cost: int) -> str:
+        """Classify an estimated cost into a lane name."""
+        if cost <= self.cheap_max_cost:
+            return "cheap"
+        if cost >= self.heavy_min_cost:
+            return "heavy"
+        return "standard"
+
+    @asynccontextmanager
+    async def admit(self, cost: int) -> AsyncIterator[str]:
+        """Hold a slot in the lane matching `cost` for the duration of the block."""
+        lane = self.lanes[self.lane_for(cost)]
+        await lane.acquire()
+        try:
+            yield lane.name
+        finally:
+            lane.release()
+
+
+_controller: AdmissionController | None = None
+
+
+def get_controller() -> AdmissionController:
+    """Return the process-wide controller (built lazily from settings)."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController.from_settings()
+    return _controller
+
+
+def reset_controller() -> None:
+    """Drop the current controller so the next request rebuilds it (tests, settings reload)."""
+    global _controller
+    _controller = None
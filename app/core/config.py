@@ -40,22 +40,159 @@ class Settings(BaseSettings):
     redis_host: str = "localhost"
     redis_port: int = 6379
 
-    # Optional: legacy S3/MinIO fields kept for compatibility
-    s3_endpoint: str = "http://localhost:9000"
+    # S3/MinIO (object-storage lake backend, see LAKE_BACKEND)
+    s3_endpoint: str | None = "http://localhost:9000"  # None = AWS
     s3_access_key: str = "minioadmin"
     s3_secret_key: str = "minioadmin"
     s3_bucket: str = "gdelt-lake"
+    s3_prefix: str = ""  # key prefix of the lake inside the bucket, e.g. "prod/"
+    s3_multipart_threshold_mb: int = 16  # batches above this are uploaded in parts
+    s3_multipart_chunk_mb: int = 8
+    s3_upload_concurrency: int = 8  # parts uploaded in parallel
 
     # GDELT ingestion
     gdelt_lastupdate_url: str = "http://data.gdeltproject.org/gdeltv2/lastupdate.txt"
     gdelt_max_download_mb: int = 200  # safety cap
+    gdelt_datasets: list[str] = ["events", "mentions", "gkg"]  # JSON list in env
+    gkg_read_block_mb: int = 16  # GKG is parsed and written in blocks of this size
+
+    # GDELT publication cadence (scheduler)
+    gdelt_publish_interval_minutes: int = 15  # GDELT 2.x publishes on a 15-minute grid
+    gdelt_publish_delay_seconds: int = 60  # typical delay after the slot before files appear
+    gdelt_poll_interval_seconds: int = 15  # conditional GET period inside the poll window
+    gdelt_poll_window_seconds: int = 600  # give up on a slot after this long
+    gdelt_ingest_max_attempts: int = 3  # a failed batch file is retried with the next batches
+
+    # Metrics export for processes without an HTTP server (scheduler, worker, CLI)
+    metrics_pushgateway_url: str | None = None  # e.g. http://pushgateway:9091
+    metrics_textfile_dir: str | None = None  # node_exporter textfile collector dir
+
+    # API worker processes on this host (gunicorn.conf.py exports WEB_CONCURRENCY to its workers)
+    web_concurrency: int = 1
 
     # DuckDB (analytics)
-    duckdb_db_path: str = "./analytics.duckdb"
+    duckdb_db_path: str = "./analytics.duckdb"  # legacy: queries now run on in-memory instances
+
+    # DuckDB resource governor (see app.infra.duckdb_engine); None = DuckDB default
+    duckdb_memory_limit: str | None = "2GB"  # per query-class instance
+    duckdb_threads: int | None = None  # None = all cores, shared out between WEB_CONCURRENCY workers
+    duckdb_temp_directory: str | None = "./.duckdb_tmp"  # spill dir, one subdir per class
+    duckdb_max_temp_directory_size: str | None = None
+    duckdb_class_budgets: dict[str, dict[str, str | int]] = {
+        "search": {"memory_limit": "512MB", "threads": 2},
+        "export": {"memory_limit": "1GB", "threads": 2},
+    }
+    duckdb_track_resources: bool = True  # per-query peak memory / spill metrics (~0.2 ms/query)
+
+    # DuckDB profiling / slow-query log
+    duckdb_profiling: str = "off"  # off | sampled | always
+    duckdb_profiling_sample_rate: float = 0.05  # used when duckdb_profiling=sampled
+    duckdb_profiling_kinds: list[str] = []  # restrict profiling to these query kinds (empty = all)
+    slow_query_threshold_ms: int = 500
+    slow_query_log_size: int = 100  # ring buffer capacity
+
+    # On-demand sampling profiler (see app.core.profiling); dir None = {DATA_LAKE_PATH}/_profiles
+    debug_profile_token: str | None = None  # bearer token of /debug/* (None = endpoints disabled)
+    debug_profile_max_seconds: float = 60.0
+    debug_profile_interval_ms: float = 10.0  # sampling period
+    debug_profile_signal: str = "SIGUSR2"  # scheduler / worker: profile on this signal ("" = off)
+    debug_profile_signal_seconds: float = 30.0
+    debug_profile_dir: str | None = None
+
+    # Share one execution among identical concurrent queries (same lake version)
+    query_singleflight_enabled: bool = True
+
+    # In-memory hot tier of the most recent batches (see app.services.hot_tier)
+    hot_tier_enabled: bool = True
+    hot_tier_hours: int = 24  # keep batches up to this age (relative to the newest one)
+    hot_tier_max_mb: int = 512  # Arrow memory budget, oldest batches evicted first
+    hot_tier_tail_interval_seconds: float = 5.0  # lake version polling (batches from other processes)
+
+    # Push feed of new events matching live subscriptions (see app.services.subscriptions)
+    subscriptions_enabled: bool = True
+    subscriptions_max_active: int = 1000  # per API worker; beyond, new streams get 503
+    subscriptions_queue_size: int = 64  # messages buffered per subscriber before dropping
+    subscriptions_max_rows: int = 500  # matched rows pushed per batch and subscriber
+    subscriptions_poll_interval_seconds: float = 2.0  # lake version polling for new batches
+    subscriptions_keepalive_seconds: float = 15.0  # SSE comment sent on idle streams
+
+    # Fuzzy actor / location search (see app.services.actor_index)
+    actor_search_candidates: int = 500  # names sharing the most trigrams, ranked by RapidFuzz
+
+    # Heatmap tiles from per-batch grid aggregates (see app.services.heatmap)
+    heatmap_levels: list[int] = [4, 8, 12, 16]  # stored grid levels (slippy-map zooms), JSON list in env
+    heatmap_tile_bits: int = 6  # a tile is split into 2^bits x 2^bits cells
+    heatmap_cache_entries: int = 4096  # rendered tiles kept per worker (current lake version only)
+
+    # Actor interaction graph, CSR per day (see app.services.actor_graph); None = {DATA_LAKE_PATH}/_graph
+    graph_enabled: bool = True  # maintained by ingest_one
+    graph_dir: str | None = None
+    graph_cache_ranges: int = 16  # merged date ranges kept per worker
+
+    # Bulk export jobs (see app.services.exports); exports_dir None = {DATA_LAKE_PATH}/_exports
+    exports_dir: str | None = None
+    export_max_concurrent: int = 2  # exports running at once per process (others stay queued)
+    export_max_pending: int = 20  # queued + running jobs; beyond, submissions get 503
+    export_max_rows: int = 10_000_000  # rows written by one export at most
+    export_retention_hours: float = 24.0  # finished jobs and their files are deleted after this
+    export_queue_timeout_hours: float = 6.0  # queued jobs never started are failed after this
+
+    # Local ingestion jobs, run by a process outside the API (see app.services.ingest_jobs);
+    # ingest_jobs_dir None = {DATA_LAKE_PATH}/_ingest_jobs
+    ingest_jobs_dir: str | None = None
+    ingest_max_pending: int = 4  # queued + running jobs; beyond, triggers get 503
+    ingest_job_retention_hours: float = 24.0  # finished jobs are deleted after this
+    ingest_runner_autostart: bool = True  # the API starts the runner process on demand
+    ingest_runner_idle_seconds: float = 60.0  # runner exits when idle this long (<= 0: never)
+    ingest_runner_poll_seconds: float = 1.0
+    ingest_runner_nice: int = 10  # CPU priority decrement of the runner process (0 = unchanged)
+
+    # Lake retention tiers (see app.services.retention): ages in days (UTC); None disables a tier
+    retention_recompress_after_days: int | None = None  # rewrite batches (zstd level, row groups)
+    retention_rollup_after_days: int | None = None  # events: keep per-partition rollups only
+    retention_drop_after_days: int | None = None  # every dataset (and the actor graph)
+    retention_zstd_level: int = 19
+    retention_row_group_rows: int = 4_194_304
+    retention_grace_seconds: float = 3600.0  # retired files stay readable by in-flight queries
+
+    # HTTP validators and compression (see app.core.http_cache)
+    http_cache_enabled: bool = True  # ETag / If-None-Match (304) on analytics and search
+    http_cache_closed_grace_hours: float = 2.0  # day D is closed at midnight UTC of D+1 + grace
+    http_cache_immutable_max_age: int = 31_536_000  # Cache-Control max-age of closed-day responses
+    http_compression_enabled: bool = True  # br / zstd / gzip by Accept-Encoding
+    http_compression_min_bytes: int = 1024  # smaller bodies are sent as is
+
+    # Warm-up before reporting ready on /ready (see app.services.warmup)
+    warmup_enabled: bool = True
+
+    # Continuous views (see app.services.continuous_views); None = {DATA_LAKE_PATH}/_views
+    views_dir: str | None = None
+
+    # Admission control for query endpoints (per cost lane)
+    admission_enabled: bool = True
+    admission_cheap_max_cost: int = 2  # cost <= this -> cheap lane (reserved)
+    admission_heavy_min_cost: int = 30  # cost >= this -> heavy lane
+    admission_cheap_concurrency: int = 8
+    admission_standard_concurrency: int = 4
+    admission_heavy_concurrency: int = 2
+    admission_cheap_max_queue: int = 32  # beyond this, shed immediately
+    admission_standard_max_queue: int = 16
+    admission_heavy_max_queue: int = 4
+    admission_cheap_queue_timeout_ms: int = 1000
+    admission_standard_queue_timeout_ms: int = 2000
+    admission_heavy_queue_timeout_ms: int = 3000
+    admission_retry_after_seconds: int = 2
 
     # Local filesystem Data Lake (Parquet)
     data_lake_path: str = "./data_lake"
 
+    # Lake storage backend (see app.infra.lake_storage): fs | s3
+    lake_backend: str = "fs"
+    lake_cache_dir: str = "./.lake_cache"  # s3: on-disk block cache of Parquet ranges
+    lake_cache_max_mb: int = 2048
+    lake_cache_block_kb: int = 1024
+    lake_version_ttl_seconds: float = 1.0  # s3: how long a read of the lake version is reused
+
     @property
     def postgres_dsn(self) -> str:
         """Async DSN for SQLAlchemy (industrial mode)."""
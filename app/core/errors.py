@@ -0,0 +1,123 @@
+"""app.core.errors
+
+Exception handlers shared by the API.
+
+DuckDB errors raised while serving a request are mapped to JSON responses
+with a machine-readable `error` field instead of an opaque 500:
+- Write races (a Parquet file still being written by an in-process
+  ingestion while a query scans it, an S3 batch recompressed in place by
+  retention while a query reads it, a lock held by another process,
+  concurrent attaches of the same database file) and queries aborted by
+  their class memory limit are transient: 503 + Retry-After so clients can
+  retry. They are recognised by their message: the same exception classes
+  also carry deterministic failures.
+- A scan whose pattern matches no file (no partition in the requested
+  range) is a 404: retrying would fail the same way. Query services check
+  the listing first and return empty results; this is the fallback.
+- Anything else (binder/parser errors...) stays a 500.
+
+Every occurrence is counted in `duckdb_errors_total{type}`.
+
+Requests shed by admission control (`AdmissionRejected`) are returned as 503 +
+Retry-After with `error="overloaded"` and the lane / reason.
+
+A current `If-None-Match` (`NotModified`, see `app.core.http_cache`) becomes an
+empty 304 carrying the matched ETag.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import duckdb
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.core.admission import AdmissionRejected
+from app.core.http_cache import NotModified
+from app.core.metrics import DUCKDB_ERRORS, HTTP_CONDITIONAL
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_DUCKDB_ERRORS: tuple[type[duckdb.Error], ...] = (duckdb.OutOfMemoryException,)
+
+TRANSIENT_DUCKDB_MESSAGES: tuple[str, ...] = (
+    # Partially written Parquet file (InvalidInputException).
+    "No magic bytes found",
+    "too small to be a Parquet file",
+    # S3 object recompressed in place while a query was reading it (lake_storage).
+    "was rewritten while being read",
+    # File lock held by another process (IOException).
+    "Could not set lock",
+    "Conflicting lock",
+    # Raised as BinderException when two threads open the same database file at once.
+    "Unique file handle conflict",
+)
+
+# Raised as IOException when a scanned pattern matches no file.
+NO_DATA_DUCKDB_MESSAGES: tuple[str, ...] = ("No files found",)
+
+
+def is_transient(exc: Exception) -> bool:
+    """True if retrying the same request later is expected to succeed."""
+    if isinstance(exc, TRANSIENT_DUCKDB_ERRORS):
+        return True
+    return any(m in str(exc) for m in TRANSIENT_DUCKDB_MESSAGES)
+
+
+def is_no_data(exc: Exception) -> bool:
+    """True if the query scanned a pattern matching no file."""
+    return any(m in str(exc) for m in NO_DATA_DUCKDB_MESSAGES)
+
+
+async def duckdb_error_handler(request: Request, exc: Exception) -> JSONResponse:
+    """Turn a DuckDB exception into a typed JSON error response."""
+    kind = type(exc).__name__
+    DUCKDB_ERRORS.labels(kind).inc()
+
+    if is_transient(exc):
+        logger.warning("Transient DuckDB error on %s: %s", request.url.path, exc)
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Data lake temporarily unavailable.", "error": kind},
+            headers={"Retry-After": "1"},
+        )
+
+    if is_no_data(exc):
+        logger.info("No data on %s: %s", request.url.path, exc)
+        return JSONResponse(
+            status_code=404,
+            content={"detail": "No data in the requested range.", "error": kind},
+        )
+
+    logger.error("DuckDB error on %s: %s", request.url.path, exc)
+    return JSONResponse(status_code=500, content={"detail": "Query failed.", "error": kind})
+
+
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> JSONResponse:
+    """Render a shed request as a fast 503 the client can retry."""
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Server busy, retry later.",
+            "error": "overloaded",
+            "lane": exc.lane,
+            "reason": exc.reason,
+        },
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    """Answer a matching `If-None-Match` with an empty 304 (the query never ran)."""
+    HTTP_CONDITIONAL.labels("not_modified").inc()
+    return Response(
+        status_code=304, headers={"ETag": exc.etag, "Cache-Control": exc.cache_control}
+    )
+
+
+def register_error_handlers(app: FastAPI) -> None:
+    """Attach the shared exception handlers to the application."""
+    app.add_exception_handler(duckdb.Error, duckdb_error_handler)
+    app.add_exception_handler(AdmissionRejected, admission_rejected_handler)
+    app.add_exception_handler(NotModified, not_modified_handler)
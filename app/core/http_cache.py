@@ -0,0 +1,224 @@
+"""app.core.http_cache
+
+HTTP conditional requests and response compression for query endpoints.
+
+Dashboards poll the same analytics / search URLs every few seconds while the
+lake changes every 15 minutes at most. Two mechanisms avoid redoing (and
+re-sending) identical work:
+
+- Validators: `app.api.v1.deps.conditional` computes a strong `ETag` for a
+  request from its path, query string and the fingerprint of the partitions
+  it reads (`duckdb_queries.partition_fingerprint`) *before* the endpoint
+  runs. A matching `If-None-Match` raises `NotModified`, answered 304 without
+  touching DuckDB. Otherwise the tag is stored on the request state and added
+  to the 200 response by `HttpCacheMiddleware`, with `Cache-Control`:
+  `immutable` when every partition read is a closed day (`cache_control`),
+  `no-cache` (revalidate every time) otherwise.
+- Compression: `HttpCacheMiddleware` encodes JSON / text bodies of at least
+  `HTTP_COMPRESSION_MIN_BYTES` with the best encoding the client accepts
+  (`Accept-Encoding` q-values; br > zstd > gzip on ties). Streaming bodies
+  (SSE, file downloads) and range responses are passed through untouched.
+  An encoded response's ETag carries the encoding as a suffix (`"<tag>-br"`):
+  a strong validator identifies one exact byte sequence. `If-None-Match`
+  accepts the tag with or without suffix.
+
+This is a pure ASGI middleware (no BaseHTTPMiddleware body re-streaming).
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from collections.abc import Awaitable, Callable, MutableMapping
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+from app.core.metrics import HTTP_COMPRESSED, HTTP_CONDITIONAL
+
+try:
+    import brotli
+except ImportError:  # optional: br is simply not offered
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd is simply not offered
+    zstandard = None
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain")
+
+
+def _gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=4)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(body)
+
+
+# Server preference order on equal q-values.
+ENCODERS: dict[str, Callable[[bytes], bytes]] = {
+    name: fn
+    for name, fn, available in (
+        ("br", _brotli, brotli is not None),
+        ("zstd", _zstd, zstandard is not None),
+        ("gzip", _gzip, True),
+    )
+    if available
+}
+
+
+class NotModified(Exception):
+    """The client's cached representation is current (rendered as 304)."""
+
+    def __init__(self, etag: str, cache_control: str) -> None:
+        super().__init__(etag)
+        self.etag = etag
+        self.cache_control = cache_control
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """Best encoding of ENCODERS accepted by an `Accept-Encoding` header, else None."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def make_etag(*parts: object) -> str:
+    """Opaque strong entity tag (unquoted) of the request's identifying parts."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12)
+    return digest.hexdigest()
+
+
+def matching_tag(if_none_match: str | None, etag: str) -> str | None:
+    """The `If-None-Match` entry matching `etag` (any encoding suffix), as sent."""
+    if not if_none_match:
+        return None
+    for tag in (t.strip() for t in if_none_match.split(",")):
+        if tag == "*":
+            return f'"{etag}"'
+        opaque = tag.removeprefix("W/").strip('"')
+        base, _, suffix = opaque.rpartition("-")
+        if opaque == etag or (base == etag and suffix in ENCODERS):
+            return tag
+    return None
+
+
+def day_closed(dt: str, now: datetime | None = None) -> bool:
+    """True once no batch can still land in partition `dt` (UTC day + grace period)."""
+    now = now or datetime.now(timezone.utc)
+    end = datetime.combine(date.fromisoformat(dt), datetime.min.time(), tzinfo=timezone.utc)
+    closes = end + timedelta(days=1, hours=settings.http_cache_closed_grace_hours)
+    return now >= closes
+
+
+def cache_control(last_day: str | None) -> str:
+    """`Cache-Control` for a response reading partitions up to `last_day` (None = open-ended)."""
+    if last_day is not None and day_closed(last_day):
+        return f"public, max-age={settings.http_cache_immutable_max_age}, immutable"
+    return "no-cache"
+
+
+class HttpCacheMiddleware:
+    """Add validators set by `conditional` and compress eligible response bodies."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = None
+        if settings.http_compression_enabled:
+            encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Message | None = None
+        chunks: list[bytes] | None = None  # body being buffered for compression
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, chunks
+            if message["type"] == "http.response.start":
+                start = message  # held until the body is known: headers may change
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            if chunks is None:
+                if not self._compress(start, encoding):
+                    self._headers(scope, start, None)
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                chunks = []
+            # Fixed-length JSON body, possibly sent in several chunks (BaseHTTPMiddleware).
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = ENCODERS[encoding](b"".join(chunks))
+            HTTP_COMPRESSED.labels(encoding).inc()
+            headers = self._headers(scope, start, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            start = None
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compress(start: Message, encoding: str | None) -> bool:
+        """True for a complete 200 JSON / text body worth encoding with `encoding`."""
+        headers = Headers(raw=start["headers"])
+        length = headers.get("content-length")
+        return (
+            encoding is not None
+            and start["status"] == 200
+            and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            and "content-encoding" not in headers
+            and length is not None  # streams (SSE...) have none
+            and int(length) >= settings.http_compression_min_bytes
+        )
+
+    @staticmethod
+    def _headers(scope: Scope, start: Message, encoding: str | None) -> MutableHeaders:
+        """Set Vary and the validators stored by `conditional` on `start` (mutated)."""
+        headers = MutableHeaders(scope=start)
+        if settings.http_compression_enabled and headers.get("content-type", "").startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            headers.add_vary_header("Accept-Encoding")
+        state = scope.get("state") or {}
+        etag = state.get("etag")
+        if etag and start["status"] == 200:
+            headers["ETag"] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+            headers["Cache-Control"] = state["cache_control"]
+            HTTP_CONDITIONAL.labels("modified").inc()
+        return headers
@@ -8,7 +8,8 @@ Goals:
 - Avoid duplicate handlers on reload.
 
 In this repo:
-- `configure_logging()` is called at startup from app.main or worker entrypoints.
+- `configure_logging()` is called at startup: from the app.main lifespan (not at
+  import time) or from the worker / scheduler entrypoints.
 """
 
 from __future__ import annotations
@@ -16,13 +17,13 @@ from __future__ import annotations
 import logging
 import sys
 
-from pythonjsonlogger import jsonlogger
-
 from .config import settings
 
 
 def configure_logging() -> None:
     """Configure root logger with a JSON formatter."""
+    from pythonjsonlogger import jsonlogger
+
     logger = logging.getLogger()
     logger.setLevel(settings.log_level.upper())
 
@@ -1,6 +1,6 @@
 """app.core.metrics
 
-Prometheus metrics for FastAPI.
+Prometheus metrics for FastAPI and the ingestion pipeline.
 
 Exposed endpoint:
 - GET /metrics
@@ -8,6 +8,52 @@ Exposed endpoint:
 Metrics collected:
 - http_requests_total{method, path, status}
 - http_request_latency_seconds{method, path}
+- gdelt_data_freshness_lag_seconds (scheduler: age of the newest ingested batch)
+- gdelt_ingest_stage_duration_seconds{stage}       download | extract | parse | write
+- gdelt_ingest_stage_total{stage, outcome}         outcome: ok | failed
+- gdelt_ingest_batch_bytes{kind}                   downloaded | zip_compressed |
+                                                   csv_uncompressed | parquet_written
+- gdelt_ingest_rows_total
+- gdelt_ingest_rows_per_second (parse + write throughput of the last batch)
+- gdelt_ingest_in_progress (batches currently being ingested by this process)
+- gdelt_ingest_jobs_total{status}                  local ingestion jobs: queued | deduplicated |
+                                                   done | failed
+- duckdb_query_duration_seconds{kind}              search | top_values | tone
+- duckdb_query_rows_scanned{kind}, duckdb_query_bytes_read{kind} (profiled queries only)
+- duckdb_slow_queries_total{kind}
+- duckdb_query_executions_total{kind}, duckdb_query_coalesced_total{kind}
+                                                   single-flight leaders vs. coalesced waiters
+- duckdb_memory_bytes{query_class}, duckdb_temp_storage_bytes{query_class}
+                                                   current usage of each budgeted instance
+- duckdb_query_peak_memory_bytes{query_class}      per-query peak buffer memory
+- duckdb_query_spills_total{query_class}, duckdb_query_spill_bytes{query_class}
+- duckdb_memory_limit_exceeded_total{query_class}  queries aborted by their memory_limit
+- hot_tier_bytes, hot_tier_batches                 in-memory hot tier content
+- hot_tier_evictions_total{reason}                 age | bytes | removed
+- duckdb_query_files_total{tier}                   batch files a query read from: hot | cold
+- lake_range_requests_total, lake_range_bytes_total  ranged GETs to the object-storage lake
+- lake_cache_requests_total{result}, lake_cache_bytes  local block cache: hit | miss
+- lake_upload_seconds                              batch uploads to the object-storage lake
+- subscriptions_active                             open push-feed streams (this worker)
+- subscription_messages_total{outcome}             sent | dropped (slow consumer)
+- subscription_match_seconds                       matching one batch against all subscriptions
+- duckdb_errors_total{type}                        DuckDB exceptions surfaced by the API
+- heatmap_tile_cache_total{result}                 rendered heatmap tiles: hit | miss
+- export_jobs_total{status}, export_jobs_running   bulk export jobs: queued | done | failed
+- export_file_bytes{format}                        size of exported files (parquet | csv)
+- lake_retention_files_total{action}, lake_retention_bytes_total{action}
+                                                   recompress | rollup | drop | purge
+- http_conditional_responses_total{result}         ETag-validated responses: modified | not_modified
+- http_compressed_responses_total{encoding}        compressed bodies: br | zstd | gzip
+- app_ready                                        1 once the worker's warm-up has finished
+- app_warmup_seconds{step}                         duckdb | lake | queries (app.services.warmup)
+- admission_in_flight{lane}, admission_queued{lane} cheap | standard | heavy
+- admission_wait_seconds{lane}                     queue wait of admitted requests
+- admission_rejected_total{lane, reason}           reason: queue_full | queue_timeout
+
+Processes without an HTTP server (scheduler, Arq worker, one-shot CLI) call
+`export_process_metrics(job)`, which pushes to a Pushgateway and/or writes a
+node_exporter textfile depending on settings.
 
 Cardinality note:
 - Using raw path as a label may create high-cardinality metrics if you have dynamic paths.
@@ -16,10 +62,28 @@ Cardinality note:
 
 from __future__ import annotations
 
+import logging
+import socket
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
 
 from fastapi import Request, Response
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+    write_to_textfile,
+)
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 REQ_COUNT = Counter(
     "http_requests_total",
@@ -33,6 +97,299 @@ REQ_LAT = Histogram(
     ["method", "path"],
 )
 
+FRESHNESS_LAG = Gauge(
+    "gdelt_data_freshness_lag_seconds",
+    "Seconds between now and the timestamp of the newest ingested GDELT batch",
+)
+
+INGEST_STAGE_SECONDS = Histogram(
+    "gdelt_ingest_stage_duration_seconds",
+    "Duration of one ingestion stage for one batch",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+INGEST_STAGE_TOTAL = Counter(
+    "gdelt_ingest_stage_total",
+    "Ingestion stage executions by outcome",
+    ["stage", "outcome"],
+)
+
+INGEST_BATCH_BYTES = Histogram(
+    "gdelt_ingest_batch_bytes",
+    "Per-batch sizes along the pipeline",
+    ["kind"],
+    buckets=(1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9),
+)
+
+INGEST_ROWS = Counter(
+    "gdelt_ingest_rows_total",
+    "Rows parsed from GDELT CSV exports",
+)
+
+INGEST_ROWS_PER_SECOND = Gauge(
+    "gdelt_ingest_rows_per_second",
+    "Parse + write throughput of the last ingested batch",
+)
+
+INGEST_IN_PROGRESS = Gauge(
+    "gdelt_ingest_in_progress",
+    "Batches currently being ingested by this process",
+)
+
+INGEST_JOBS = Counter(
+    "gdelt_ingest_jobs_total",
+    "Local ingestion jobs, by status reached (queued, deduplicated, done, failed)",
+    ["status"],
+)
+
+QUERY_LATENCY = Histogram(
+    "duckdb_query_duration_seconds",
+    "DuckDB query execution time (execute + fetch)",
+    ["kind"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+QUERY_ROWS_SCANNED = Histogram(
+    "duckdb_query_rows_scanned",
+    "Rows scanned by profiled DuckDB queries",
+    ["kind"],
+    buckets=(1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+)
+
+QUERY_BYTES_READ = Histogram(
+    "duckdb_query_bytes_read",
+    "Bytes read by profiled DuckDB queries",
+    ["kind"],
+    buckets=(1e5, 1e6, 1e7, 1e8, 1e9, 1e10),
+)
+
+SLOW_QUERIES = Counter(
+    "duckdb_slow_queries_total",
+    "DuckDB queries slower than SLOW_QUERY_THRESHOLD_MS",
+    ["kind"],
+)
+
+QUERY_EXECUTIONS = Counter(
+    "duckdb_query_executions_total",
+    "Query executions started by a single-flight leader",
+    ["kind"],
+)
+
+QUERY_COALESCED = Counter(
+    "duckdb_query_coalesced_total",
+    "Calls served by an identical in-flight execution instead of a new scan",
+    ["kind"],
+)
+
+DUCKDB_MEMORY_BYTES = Gauge(
+    "duckdb_memory_bytes",
+    "Memory currently used by the DuckDB instance of a query class",
+    ["query_class"],
+)
+
+DUCKDB_TEMP_BYTES = Gauge(
+    "duckdb_temp_storage_bytes",
+    "Temporary (spill) storage currently used by the DuckDB instance of a query class",
+    ["query_class"],
+)
+
+QUERY_PEAK_MEMORY = Histogram(
+    "duckdb_query_peak_memory_bytes",
+    "Peak buffer memory of the DuckDB instance during a query",
+    ["query_class"],
+    buckets=(1e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9, 2e9, 4e9, 8e9),
+)
+
+QUERY_SPILLS = Counter(
+    "duckdb_query_spills_total",
+    "Queries that spilled to the temp directory",
+    ["query_class"],
+)
+
+QUERY_SPILL_BYTES = Histogram(
+    "duckdb_query_spill_bytes",
+    "Peak temp directory size of queries that spilled",
+    ["query_class"],
+    buckets=(1e6, 1e7, 1e8, 1e9, 1e10, 1e11),
+)
+
+QUERY_MEMORY_LIMIT_EXCEEDED = Counter(
+    "duckdb_memory_limit_exceeded_total",
+    "Queries aborted because their class exceeded its DuckDB memory_limit",
+    ["query_class"],
+)
+
+HOT_TIER_BYTES = Gauge(
+    "hot_tier_bytes",
+    "Arrow memory held by the hot tier",
+)
+
+HOT_TIER_BATCHES = Gauge(
+    "hot_tier_batches",
+    "Batches held by the hot tier",
+)
+
+HOT_TIER_EVICTIONS = Counter(
+    "hot_tier_evictions_total",
+    "Batches dropped from the hot tier",
+    ["reason"],
+)
+
+QUERY_FILES = Counter(
+    "duckdb_query_files_total",
+    "Batch files read by queries, per storage tier",
+    ["tier"],
+)
+
+LAKE_RANGE_REQUESTS = Counter(
+    "lake_range_requests_total",
+    "Ranged GET requests sent to the object-storage lake",
+)
+
+LAKE_RANGE_BYTES = Counter(
+    "lake_range_bytes_total",
+    "Bytes fetched from the object-storage lake by ranged GETs",
+)
+
+LAKE_CACHE_REQUESTS = Counter(
+    "lake_cache_requests_total",
+    "Block lookups in the local lake cache",
+    ["result"],
+)
+
+LAKE_CACHE_BYTES = Gauge(
+    "lake_cache_bytes",
+    "Bytes held by the local lake block cache",
+)
+
+LAKE_UPLOAD_SECONDS = Histogram(
+    "lake_upload_seconds",
+    "Duration of batch uploads to the object-storage lake (multipart, parallel)",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+SUBSCRIPTIONS_ACTIVE = Gauge(
+    "subscriptions_active",
+    "Open push-feed subscriptions on this worker",
+)
+
+SUBSCRIPTION_MESSAGES = Counter(
+    "subscription_messages_total",
+    "Push-feed messages per outcome (dropped: subscriber queue full)",
+    ["outcome"],
+)
+
+SUBSCRIPTION_MATCH_SECONDS = Histogram(
+    "subscription_match_seconds",
+    "Duration of matching one batch against every active subscription",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+HEATMAP_TILE_CACHE = Counter(
+    "heatmap_tile_cache_total",
+    "Heatmap tile lookups in the rendered-tile cache",
+    ["result"],
+)
+
+EXPORT_JOBS = Counter(
+    "export_jobs_total",
+    "Bulk export jobs, by status reached (queued, done, failed)",
+    ["status"],
+)
+
+EXPORT_RUNNING = Gauge(
+    "export_jobs_running",
+    "Bulk export jobs currently running in this process",
+)
+
+EXPORT_BYTES = Histogram(
+    "export_file_bytes",
+    "Size of the files written by bulk export jobs",
+    ["format"],
+    buckets=(1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10),
+)
+
+RETENTION_FILES = Counter(
+    "lake_retention_files_total",
+    "Batch files handled by retention runs (recompress, rollup, drop, purge)",
+    ["action"],
+)
+
+RETENTION_BYTES = Counter(
+    "lake_retention_bytes_total",
+    "Bytes of the batch files handled by retention runs, before the action",
+    ["action"],
+)
+
+HTTP_CONDITIONAL = Counter(
+    "http_conditional_responses_total",
+    "Responses of ETag-validated endpoints: full (modified) or 304 (not_modified)",
+    ["result"],
+)
+
+HTTP_COMPRESSED = Counter(
+    "http_compressed_responses_total",
+    "Response bodies compressed by content negotiation",
+    ["encoding"],
+)
+
+APP_READY = Gauge(
+    "app_ready",
+    "1 once this worker finished its warm-up and reports ready",
+)
+
+WARMUP_SECONDS = Gauge(
+    "app_warmup_seconds",
+    "Duration of each warm-up step of this worker",
+    ["step"],
+)
+
+DUCKDB_ERRORS = Counter(
+    "duckdb_errors_total",
+    "DuckDB exceptions raised while serving requests",
+    ["type"],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight",
+    "Admitted requests currently executing, per cost lane",
+    ["lane"],
+)
+
+ADMISSION_QUEUED = Gauge(
+    "admission_queued",
+    "Requests waiting for a slot, per cost lane",
+    ["lane"],
+)
+
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds",
+    "Time admitted requests spent queued",
+    ["lane"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total",
+    "Requests shed with 503 by the admission controller",
+    ["lane", "reason"],
+)
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """Time one ingestion stage and count its outcome (failed if it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        INGEST_STAGE_TOTAL.labels(stage, "failed").inc()
+        raise
+    finally:
+        INGEST_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+    INGEST_STAGE_TOTAL.labels(stage, "ok").inc()
+
 
 async def metrics_middleware(request: Request, call_next):
     """Measure request duration and increment Prometheus counters."""
@@ -50,3 +407,33 @@ async def metrics_middleware(request: Request, call_next):
 def metrics_endpoint() -> Response:
     """Return Prometheus scrape payload."""
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def export_process_metrics(job: str) -> None:
+    """Export this process' registry for processes without a /metrics endpoint.
+
+    - Pushgateway: when `METRICS_PUSHGATEWAY_URL` is set (grouped by job + host).
+    - Textfile: when `METRICS_TEXTFILE_DIR` is set, writes `{dir}/{job}.prom`
+      atomically for node_exporter's textfile collector.
+
+    Export errors are logged, never raised: metrics must not break ingestion.
+    """
+    if settings.metrics_pushgateway_url:
+        try:
+            push_to_gateway(
+                settings.metrics_pushgateway_url,
+                job=job,
+                registry=REGISTRY,
+                grouping_key={"instance": socket.gethostname()},
+                timeout=5,
+            )
+        except Exception as exc:
+            logger.warning("Pushgateway export failed: %s", exc)
+
+    if settings.metrics_textfile_dir:
+        try:
+            out = Path(settings.metrics_textfile_dir)
+            out.mkdir(parents=True, exist_ok=True)
+            write_to_textfile(str(out / f"{job}.prom"), REGISTRY)
+        except Exception as exc:
+            logger.warning("Textfile metrics export failed: %s", exc)
@@ -0,0 +1,31 @@
+"""app.core.processes
+
+Liveness of the process running a job.
+
+Export jobs (`app.services.exports`) and local ingestion jobs
+(`app.services.ingest_jobs`) record the host and pid of the process that
+claimed them, so that any process sharing their directory can tell a
+`running` job whose process died from one still in progress.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+
+
+def process_alive(host: str | None, pid: int | None) -> bool:
+    """False only when the job ran on this host and its process is gone.
+
+    A job of another host (or without a pid) is assumed alive: its process
+    cannot be checked from here.
+    """
+    if host != socket.gethostname() or pid is None:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
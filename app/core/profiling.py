@@ -0,0 +1,208 @@
+"""app.core.profiling
+
+On-demand sampling profiler for live processes (API, scheduler, Arq worker).
+
+When latency regresses in production, a deterministic profiler (`cProfile`)
+is too slow to leave on and needs the code path to be wrapped up front. This
+sampler instead reads every thread's Python stack (`sys._current_frames()`)
+every `DEBUG_PROFILE_INTERVAL_MS` from a background thread, for a bounded
+time, and counts identical stacks:
+
+- Nothing runs while no profile is requested: zero overhead when off.
+- While sampling, the cost is one stack walk per thread per tick (~1-2% of
+  one core at 100 Hz); the process keeps serving.
+- One profile at a time per process (`ProfileError` otherwise).
+- Output formats, both accepted by flamegraph tools:
+  * `collapsed`: Brendan Gregg's folded stacks, one `thread;root;...;leaf N`
+    line per distinct stack (flamegraph.pl, inferno, speedscope import);
+  * `speedscope`: speedscope.app JSON, one sampled profile per thread.
+
+Triggers:
+- API: `GET /debug/profile?seconds=N` (`app.api.v1.debug`), protected by
+  `DEBUG_PROFILE_TOKEN` (disabled while unset). Profiles the worker process
+  that serves the request.
+- Processes without an HTTP server (scheduler, Arq worker):
+  `install_signal_handler(process)` profiles for
+  `DEBUG_PROFILE_SIGNAL_SECONDS` on `DEBUG_PROFILE_SIGNAL` (default SIGUSR2,
+  `kill -USR2 <pid>`) and writes both formats under `DEBUG_PROFILE_DIR`
+  (default `{DATA_LAKE_PATH}/_profiles`).
+
+Frames are labelled `qualname (file:line)`, `file` relative to site-packages
+or the working directory; `line` is the function's first line, so samples
+of one function merge whatever line was executing.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any
+
+import orjson
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (label, file, first line) of one code object.
+Frame = tuple[str, str, int]
+
+
+class ProfileError(RuntimeError):
+    """A profile is already being taken in this process."""
+
+
+def _short(path: str) -> str:
+    """`path` relative to site-packages or the working directory when under them."""
+    marker = "site-packages" + os.sep
+    if marker in path:
+        return path.rsplit(marker, 1)[1]
+    cwd = os.getcwd() + os.sep
+    return path.removeprefix(cwd)
+
+
+@dataclass
+class Profile:
+    """Stack sample counts of one sampling run."""
+
+    interval: float  # seconds between ticks
+    duration: float  # seconds actually sampled
+    ticks: int
+    samples: Counter[tuple[str, tuple[Frame, ...]]]  # (thread, stack root -> leaf) -> count
+
+    def collapsed(self) -> str:
+        """Folded stacks: `thread;frame;...;frame count` lines, heaviest first."""
+        lines = []
+        for (thread, stack), n in self.samples.most_common():
+            labels = [thread, *(f"{name} ({file}:{line})" for name, file, line in stack)]
+            lines.append(";".join(label.replace(";", ":") for label in labels) + f" {n}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """speedscope.app file: shared frames, one sampled profile per thread."""
+        frames: dict[Frame, int] = {}
+        threads: dict[str, tuple[list[list[int]], list[float]]] = {}
+        for (thread, stack), n in self.samples.most_common():
+            samples, weights = threads.setdefault(thread, ([], []))
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(n * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": settings.app_name,
+            "shared": {"frames": [{"name": n, "file": f, "line": line} for n, f, line in frames]},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+                for thread, (samples, weights) in threads.items()
+            ],
+        }
+
+
+class StackSampler:
+    """Samples the Python stacks of every thread of this process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._labels: dict[CodeType, Frame] = {}
+
+    def _frame(self, code: CodeType) -> Frame:
+        frame = self._labels.get(code)
+        if frame is None:
+            name = getattr(code, "co_qualname", code.co_name)  # 3.11+
+            frame = self._labels[code] = (name, _short(code.co_filename), code.co_firstlineno)
+        return frame
+
+    def _stack(self, frame: FrameType | None) -> tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._frame(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def sample(self, seconds: float, interval: float | None = None) -> Profile:
+        """Sample for `seconds` (blocking: call it from a thread); raise ProfileError if busy."""
+        interval = interval or settings.debug_profile_interval_ms / 1000
+        if not self._lock.acquire(blocking=False):
+            raise ProfileError("a profile is already being taken in this process")
+        try:
+            me = threading.get_ident()
+            samples: Counter[tuple[str, tuple[Frame, ...]]] = Counter()
+            ticks = 0
+            start = time.perf_counter()
+            deadline = start + seconds
+            tick = start
+            while tick < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != me:
+                        samples[(names.get(ident, f"thread-{ident}"), self._stack(frame))] += 1
+                ticks += 1
+                tick += interval
+                time.sleep(max(0.0, tick - time.perf_counter()))
+            return Profile(interval, time.perf_counter() - start, ticks, samples)
+        finally:
+            self._labels.clear()  # do not pin code objects between profiles
+            self._lock.release()
+
+
+sampler = StackSampler()
+
+
+def write_profile(profile: Profile, process: str) -> list[Path]:
+    """Write `profile` in both formats under `DEBUG_PROFILE_DIR`; return the files."""
+    directory = Path(settings.debug_profile_dir or Path(settings.data_lake_path) / "_profiles")
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"{process}-{os.getpid()}-{datetime.now(UTC):%Y%m%dT%H%M%S}"
+    collapsed = directory / f"{stem}.collapsed.txt"
+    collapsed.write_text(profile.collapsed())
+    speedscope = directory / f"{stem}.speedscope.json"
+    speedscope.write_bytes(orjson.dumps(profile.speedscope(f"{process} pid {os.getpid()}")))
+    return [collapsed, speedscope]
+
+
+def _profile_to_files(process: str) -> None:
+    try:
+        profile = sampler.sample(settings.debug_profile_signal_seconds)
+    except ProfileError as exc:
+        logger.warning("Profile request ignored: %s", exc)
+        return
+    paths = write_profile(profile, process)
+    logger.info("Profile of %s written: %s", process, ", ".join(str(p) for p in paths))
+
+
+def install_signal_handler(process: str) -> bool:
+    """Profile this process to files on `DEBUG_PROFILE_SIGNAL`; False if unavailable.
+
+    Must be called from the main thread. The handler only starts the
+    sampling thread, so the process is not paused.
+    """
+    signum = getattr(signal, settings.debug_profile_signal or "-", None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(received: int, frame: FrameType | None) -> None:
+        _ = received, frame
+        name = f"profile-{process}"
+        threading.Thread(target=_profile_to_files, args=(process,), name=name, daemon=True).start()
+
+    signal.signal(signum, handler)
+    logger.info("Profiling on signal %s (pid %s)", settings.debug_profile_signal, os.getpid())
+    return True
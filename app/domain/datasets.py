@@ -0,0 +1,45 @@
+"""app.domain.datasets
+
+GDELT 2.x datasets published every 15 minutes in `lastupdate.txt`.
+
+Each dataset is recognized by its file name suffix and lands in its own lake
+root (`{dataset}/dt=.../batch_ts=....parquet`). GKG is exploded into extra
+side tables at ingest (see `app.domain.gdelt_gkg_schema`), each stored as its
+own dataset.
+"""
+
+from __future__ import annotations
+
+from app.domain.gdelt_gkg_schema import GKG_LIST_TABLES, GKG_LOCATIONS_TABLE
+
+EVENTS = "events"
+MENTIONS = "mentions"
+GKG = "gkg"
+# Distinct actor / location names of each events batch (see app.services.actor_index).
+ACTOR_NAMES = "actor_names"
+# Event counts per map grid cell of each events batch (see app.services.heatmap).
+GEO_GRID = "geo_grid"
+# Top-values / tone partial aggregates of rolled-up events partitions (see app.services.retention).
+EVENTS_ROLLUP = "events_rollup"
+
+# Dataset -> file name suffix in lastupdate.txt.
+DATASET_SUFFIXES: dict[str, str] = {
+    EVENTS: ".export.CSV.zip",
+    MENTIONS: ".mentions.CSV.zip",
+    GKG: ".gkg.csv.zip",
+}
+
+# Lake datasets written by a GKG batch (main table first).
+GKG_TABLES: list[str] = [GKG, *GKG_LIST_TABLES, GKG_LOCATIONS_TABLE]
+
+# Every dataset of the lake (ingested, side tables, rollups).
+LAKE_DATASETS: list[str] = [EVENTS, MENTIONS, *GKG_TABLES, ACTOR_NAMES, GEO_GRID, EVENTS_ROLLUP]
+
+
+def dataset_for_url(url: str) -> str | None:
+    """Dataset of a GDELT file URL, None for files we do not ingest."""
+    name = url.rsplit("/", 1)[-1]
+    for dataset, suffix in DATASET_SUFFIXES.items():
+        if name.endswith(suffix):
+            return dataset
+    return None
@@ -7,6 +7,9 @@ If an ingested file matches this column count, we rename the Parquet columns
 to these meaningful names. Otherwise we fall back to generic columns c1..cN.
 
 This strategy keeps ingestion robust even if a batch differs unexpectedly.
+
+`EVENTS_STRING_COLUMNS` lists code columns that look numeric but must stay
+strings (CAMEO codes such as EventCode "010" keep their leading zeros).
 """
 
 from __future__ import annotations
@@ -74,3 +77,7 @@ EVENTS_COLUMNS: list[str] = [
     "DATEADDED",
     "SOURCEURL",
 ]
+
+EVENTS_STRING_COLUMNS: frozenset[str] = frozenset(
+    c for c in EVENTS_COLUMNS if c.endswith(("Code", "FeatureID"))
+)
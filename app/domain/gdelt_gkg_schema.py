@@ -0,0 +1,89 @@
+"""app.domain.gdelt_gkg_schema
+
+GDELT 2.1 Global Knowledge Graph (GKG) schema.
+
+GDELT GKG `*.gkg.csv.zip` is tab-delimited, has no header, and holds one row
+per article. Several fields are nested lists packed into one string
+(`;`-separated entries, `#`- or `,`-separated sub-fields). Splitting them at
+read time would cost every query a string split over the whole scan, so they
+are exploded once, at ingest, into narrow side tables keyed by `GKGRecordID`:
+
+- `GKG_LIST_TABLES`: one row per (record, entry) for the V1 `Themes`,
+  `Persons` and `Organizations` lists.
+- `gkg_locations`: one row per V1 `Locations` entry, its `#`-separated
+  sub-fields as typed columns (`GKG_LOCATION_FIELDS`).
+
+The exploded V1 fields are dropped from the main `gkg` table; the V1.5 `Tone`
+string is replaced by its numeric components (`GKG_TONE_FIELDS`). Enhanced
+(V2) fields with character offsets are kept verbatim.
+"""
+
+from __future__ import annotations
+
+GKG_COLUMNS: list[str] = [
+    "GKGRecordID",
+    "Date",
+    "SourceCollectionIdentifier",
+    "SourceCommonName",
+    "DocumentIdentifier",
+    "Counts",
+    "V21Counts",
+    "Themes",
+    "EnhancedThemes",
+    "Locations",
+    "EnhancedLocations",
+    "Persons",
+    "EnhancedPersons",
+    "Organizations",
+    "EnhancedOrganizations",
+    "Tone",
+    "EnhancedDates",
+    "GCAM",
+    "SharingImage",
+    "RelatedImages",
+    "SocialImageEmbeds",
+    "SocialVideoEmbeds",
+    "Quotations",
+    "AllNames",
+    "Amounts",
+    "TranslationInfo",
+    "ExtrasXML",
+]
+
+# Every other column is read as a string.
+GKG_COLUMN_TYPES: dict[str, str] = {"Date": "int64", "SourceCollectionIdentifier": "int32"}
+
+# Side table -> (source list column, entry column name).
+GKG_LIST_TABLES: dict[str, tuple[str, str]] = {
+    "gkg_themes": ("Themes", "Theme"),
+    "gkg_persons": ("Persons", "Person"),
+    "gkg_organizations": ("Organizations", "Organization"),
+}
+
+GKG_LOCATIONS_TABLE = "gkg_locations"
+
+# `Type#FullName#CountryCode#ADM1Code#Lat#Long#FeatureID` -> (column, type alias).
+GKG_LOCATION_FIELDS: list[tuple[str, str]] = [
+    ("LocationType", "int32"),
+    ("FullName", "string"),
+    ("CountryCode", "string"),
+    ("ADM1Code", "string"),
+    ("Lat", "double"),
+    ("Long", "double"),
+    ("FeatureID", "string"),
+]
+
+# Comma-separated components of the V1.5 `Tone` field.
+GKG_TONE_FIELDS: list[str] = [
+    "Tone",
+    "PositiveScore",
+    "NegativeScore",
+    "Polarity",
+    "ActivityRefDensity",
+    "SelfGroupRefDensity",
+    "WordCount",
+]
+
+GKG_EXPLODED_COLUMNS: frozenset[str] = frozenset(
+    [src for src, _ in GKG_LIST_TABLES.values()] + ["Locations"]
+)
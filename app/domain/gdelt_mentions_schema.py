@@ -0,0 +1,53 @@
+"""app.domain.gdelt_mentions_schema
+
+GDELT 2.x Mentions schema.
+
+GDELT Mentions `*.mentions.CSV.zip` is tab-delimited, has no header, and holds
+one row per article mentioning an event, linked to the Events export through
+`GlobalEventID`. Like events, a file matching this column count gets these
+names; otherwise generic columns c1..cN are kept.
+
+`MENTIONS_COLUMN_TYPES` pins every column's Arrow type (by alias), so all
+batches share one schema whatever a given 15-minute file happens to contain
+(an all-empty `MentionDocTranslationInfo` would otherwise be inferred as null).
+"""
+
+from __future__ import annotations
+
+MENTIONS_COLUMNS: list[str] = [
+    "GlobalEventID",
+    "EventTimeDate",
+    "MentionTimeDate",
+    "MentionType",
+    "MentionSourceName",
+    "MentionIdentifier",
+    "SentenceID",
+    "Actor1CharOffset",
+    "Actor2CharOffset",
+    "ActionCharOffset",
+    "InRawText",
+    "Confidence",
+    "MentionDocLen",
+    "MentionDocTone",
+    "MentionDocTranslationInfo",
+    "Extras",
+]
+
+MENTIONS_COLUMN_TYPES: dict[str, str] = {
+    "GlobalEventID": "int64",
+    "EventTimeDate": "int64",
+    "MentionTimeDate": "int64",
+    "MentionType": "int32",
+    "MentionSourceName": "string",
+    "MentionIdentifier": "string",
+    "SentenceID": "int32",
+    "Actor1CharOffset": "int32",
+    "Actor2CharOffset": "int32",
+    "ActionCharOffset": "int32",
+    "InRawText": "int32",
+    "Confidence": "int32",
+    "MentionDocLen": "int32",
+    "MentionDocTone": "double",
+    "MentionDocTranslationInfo": "string",
+    "Extras": "string",
+}
@@ -1,8 +1,179 @@
+"""app.infra.duckdb_engine
+
+DuckDB resource governor.
+
+DuckDB's `memory_limit`, `threads` and `temp_directory` are database-instance
+settings, so each query class gets its own in-memory DuckDB instance, created
+once per process with its budget, and every query runs on a fresh cursor of
+that instance:
+
+- `search`    (wide full-row scans): small budget by default
+- `analytics` (top values, tone): global budget
+- `default`   (anything else)
+
+Budgets = global `DUCKDB_MEMORY_LIMIT` / `DUCKDB_THREADS` / `DUCKDB_TEMP_DIRECTORY`
+/ `DUCKDB_MAX_TEMP_DIRECTORY_SIZE`, overridden per class by `DUCKDB_CLASS_BUDGETS`
+(JSON, e.g. `{"search": {"memory_limit": "512MB", "threads": 2}}`). Worst-case
+process memory is therefore the sum of the class limits, whatever the load;
+operators that do not fit spill to `{temp_directory}/{class}`.
+
+Observability (see `app.core.metrics`):
+- duckdb_memory_bytes{query_class}, duckdb_temp_storage_bytes{query_class}
+  (current usage, read from `duckdb_memory()` at scrape time)
+- per-query peak memory, spills and memory-limit violations are recorded by
+  `app.services.query_profiler.run_query`.
+
+Queries read Parquet directly from the filesystem lake; no state is persisted
+in these instances.
+
+Multi-process serving (gunicorn, `WEB_CONCURRENCY` workers): instances are
+in-memory and per process, so workers never contend for a DuckDB database
+file (the legacy `DUCKDB_DB_PATH` is not opened). Shared lake state (version,
+catalog) is published by writers as atomically renamed files
+(`app.infra.fs_lake`). So that workers do not oversubscribe the CPU or step on
+each other's spill files:
+- without an explicit `threads`, each instance gets `cpu_count // WEB_CONCURRENCY`;
+- with several workers, spill directories are per process
+  (`{temp_directory}/pid{pid}/{class}`).
+Memory limits are per instance: size `DUCKDB_MEMORY_LIMIT` for
+`WEB_CONCURRENCY` workers.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
 import duckdb
+
 from app.core.config import settings
+from app.core.metrics import DUCKDB_MEMORY_BYTES, DUCKDB_TEMP_BYTES
+
+logger = logging.getLogger(__name__)
+
+QUERY_CLASSES: dict[str, str] = {
+    "search": "search",
+    "top_values": "analytics",
+    "tone": "analytics",
+    "mentions": "analytics",
+    "views": "analytics",
+    "actors": "search",
+    "heatmap": "analytics",
+    "graph": "analytics",
+    "batch": "analytics",
+    "export": "export",
+    "retention": "export",
+}
+
+# Lightweight per-query profiling kept on for every cursor (DuckDB >= 1.5):
+# only the peak buffer memory / temp directory size are collected. Profiled
+# queries (`app.services.query_profiler.run_query`) switch to the full metric
+# set and restore this one afterwards.
+_RESOURCE_PROFILING = '{"SYSTEM_PEAK_BUFFER_MEMORY": "true", "SYSTEM_PEAK_TEMP_DIR_SIZE": "true"}'
+
+
+def query_class_for(kind: str) -> str:
+    """Map a query kind (search, top_values, tone...) to its resource class."""
+    return QUERY_CLASSES.get(kind, "default")
+
+
+@dataclass(frozen=True)
+class ResourceBudget:
+    """DuckDB instance settings for one query class (None = DuckDB default)."""
+
+    memory_limit: str | None = None
+    threads: int | None = None
+    temp_directory: str | None = None
+    max_temp_directory_size: str | None = None
+
+    def config(self) -> dict[str, str]:
+        """Return the `duckdb.connect(config=...)` mapping."""
+        values = {
+            "memory_limit": self.memory_limit,
+            "threads": self.threads,
+            "temp_directory": self.temp_directory,
+            "max_temp_directory_size": self.max_temp_directory_size,
+        }
+        return {k: str(v) for k, v in values.items() if v is not None}
+
+
+def budget_for(query_class: str) -> ResourceBudget:
+    """Global settings overridden by `duckdb_class_budgets[query_class]`."""
+    override = settings.duckdb_class_budgets.get(query_class, {})
+    temp_root = override.get("temp_directory", settings.duckdb_temp_directory)
+    threads = override.get("threads", settings.duckdb_threads)
+    if settings.web_concurrency > 1:
+        if threads is None:
+            threads = max(1, (os.cpu_count() or 1) // settings.web_concurrency)
+        if temp_root:
+            # DuckDB owns (and clears) its temp directory: one per process.
+            temp_root = str(Path(temp_root) / f"pid{os.getpid()}")
+    return ResourceBudget(
+        memory_limit=override.get("memory_limit", settings.duckdb_memory_limit),
+        threads=int(threads) if threads is not None else None,
+        temp_directory=str(Path(temp_root) / query_class) if temp_root else None,
+        max_temp_directory_size=override.get(
+            "max_temp_directory_size", settings.duckdb_max_temp_directory_size
+        ),
+    )
+
+
+class DuckDBEngine:
+    """One budgeted DuckDB instance per query class, handing out cursors."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._instances: dict[str, duckdb.DuckDBPyConnection] = {}
+
+    def _instance(self, query_class: str) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            con = self._instances.get(query_class)
+            if con is None:
+                budget = budget_for(query_class)
+                if budget.temp_directory:
+                    Path(budget.temp_directory).mkdir(parents=True, exist_ok=True)
+                con = duckdb.connect(":memory:", config=budget.config())
+                self._instances[query_class] = con
+                DUCKDB_MEMORY_BYTES.labels(query_class).set_function(
+                    lambda c=con: _usage(c)[0]
+                )
+                DUCKDB_TEMP_BYTES.labels(query_class).set_function(lambda c=con: _usage(c)[1])
+                logger.info("DuckDB instance for %s queries: %s", query_class, budget.config())
+            return con
+
+    def connect(self, query_class: str = "default") -> duckdb.DuckDBPyConnection:
+        """Return a new cursor on the instance of `query_class` (one per query)."""
+        cur = self._instance(query_class).cursor()
+        if settings.duckdb_track_resources and hasattr(cur, "get_profiling_information"):
+            cur.execute("SET enable_profiling = 'no_output'")
+            cur.execute(f"SET custom_profiling_settings = '{_RESOURCE_PROFILING}'")
+        return cur
+
+    def close(self) -> None:
+        """Close every instance (the next `connect` re-creates them from settings)."""
+        with self._lock:
+            for con in self._instances.values():
+                con.close()
+            self._instances.clear()
+
+
+def _usage(con: duckdb.DuckDBPyConnection) -> tuple[float, float]:
+    """(memory bytes, temp storage bytes) currently used by an instance."""
+    try:
+        row = con.cursor().execute(
+            "SELECT sum(memory_usage_bytes), sum(temporary_storage_bytes) FROM duckdb_memory()"
+        ).fetchone()
+    except duckdb.Error:
+        return 0.0, 0.0
+    return float(row[0] or 0), float(row[1] or 0)
+
+
+engine = DuckDBEngine()
 
 
-def connect():
-    # Local DuckDB file used for caching metadata; queries read Parquet directly from filesystem.
-    # In prod, you can point DuckDB to S3 via httpfs extension (or query engine like Trino).
-    return duckdb.connect(settings.duckdb_db_path)
+def connect(query_class: str = "default") -> duckdb.DuckDBPyConnection:
+    """Cursor on the budgeted DuckDB instance of `query_class`."""
+    return engine.connect(query_class)
@@ -2,10 +2,11 @@ from __future__ import annotations
 
 """app.infra.fs_lake
 
-Filesystem-based Data Lake helper.
+Filesystem-based Data Lake helper (the `fs` backend of `app.infra.lake_storage`).
 
 Layout:
-  {DATA_LAKE_PATH}/events/dt=YYYY-MM-DD/batch_ts=YYYYMMDDHHMMSS.parquet
+  {DATA_LAKE_PATH}/{dataset}/dt=YYYY-MM-DD/batch_ts=YYYYMMDDHHMMSS.parquet
+  (dataset: events, mentions, gkg and the GKG side tables; see app.domain.datasets)
 
 Why:
 - Mimics the common cloud layout (S3 partitions) while staying 100% local.
@@ -14,12 +15,46 @@ Why:
 Good practices:
 - Keep filesystem paths centralized in one place.
 - Ensure directories exist before writing.
+
+Lake version:
+- `{DATA_LAKE_PATH}/_version` holds an opaque token rewritten (atomically) by
+  every writer after it adds data. Readers key in-flight/cached query results
+  on it, so results never outlive the data they were computed from, across
+  processes (API, scheduler, worker).
+
+Catalog (multi-process serving):
+- `{DATA_LAKE_PATH}/_catalog.json` lists every batch file of the lake, tagged
+  with the version it was built for. `bump_lake_version()` rebuilds it and
+  publishes it with an atomic rename just before the version itself, under an
+  exclusive lock (`_catalog.lock`, POSIX `flock`) so concurrent writers
+  (scheduler, API background ingestion) cannot publish a catalog missing
+  another writer's file. API workers load it once per version instead of
+  globbing the lake on every query; a missing or stale catalog (version
+  mismatch) falls back to globbing.
+
+Retired files (retention, see `app.services.retention`):
+- `{DATA_LAKE_PATH}/_retired.json` maps batch files (relative to the lake
+  root) to the time they were retired. Retired files leave the catalog
+  published by the next `bump_lake_version()` but stay on disk, so queries
+  still reading the previous version's listing can finish;
+  `purge_retired_files()` deletes them once their grace period is over.
 """
 
+import contextlib
+import os
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
+import orjson
+
 from app.core.config import settings
 
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer deployments only
+    fcntl = None  # type: ignore[assignment]
+
 
 def lake_root() -> Path:
     """Return the root directory of the local Data Lake."""
@@ -31,9 +66,157 @@ def ensure_lake_dirs() -> None:
     lake_root().mkdir(parents=True, exist_ok=True)
 
 
-def parquet_path(dt: str, ts: str) -> Path:
+def parquet_path(dt: str, ts: str, dataset: str = "events") -> Path:
     """Build the output Parquet path for a given partition date and batch timestamp."""
     root = lake_root()
-    p = root / "events" / f"dt={dt}" / f"batch_ts={ts}.parquet"
+    p = root / dataset / f"dt={dt}" / f"batch_ts={ts}.parquet"
     p.parent.mkdir(parents=True, exist_ok=True)
     return p
+
+
+def _version_file() -> Path:
+    return lake_root() / "_version"
+
+
+def lake_version() -> str:
+    """Return the current lake version token ("0" for a lake never written to)."""
+    try:
+        return _version_file().read_text().strip() or "0"
+    except FileNotFoundError:
+        return "0"
+
+
+def _catalog_file() -> Path:
+    return lake_root() / "_catalog.json"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+@contextlib.contextmanager
+def _writers_lock() -> Iterator[None]:
+    """Serialize catalog + version publication across writer processes."""
+    if fcntl is None:
+        yield
+        return
+    with (lake_root() / "_catalog.lock").open("a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _retired_file() -> Path:
+    return lake_root() / "_retired.json"
+
+
+def read_retired() -> dict[str, float]:
+    """{`{dataset}/dt=.../batch_ts=....parquet`: retirement time (epoch seconds)}."""
+    try:
+        return orjson.loads(_retired_file().read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+
+def retire_batch_files(paths: list[str]) -> None:
+    """Tombstone batch files (relative to the lake root); they leave the next catalog."""
+    ensure_lake_dirs()
+    with _writers_lock():
+        retired = read_retired()
+        now = time.time()
+        for path in paths:
+            retired.setdefault(path, now)
+        _write_atomic(_retired_file(), orjson.dumps(retired))
+
+
+def purge_retired_files(grace_seconds: float) -> list[str]:
+    """Delete the files retired more than `grace_seconds` ago; return their paths."""
+    root = lake_root()
+    with _writers_lock():
+        retired = read_retired()
+        cutoff = time.time() - grace_seconds
+        purged = sorted(path for path, at in retired.items() if at <= cutoff)
+        for path in purged:
+            file = root / path
+            file.unlink(missing_ok=True)
+            with contextlib.suppress(OSError):
+                file.parent.rmdir()  # the partition, once empty
+            del retired[path]
+        if purged:
+            _write_atomic(_retired_file(), orjson.dumps(retired))
+    return purged
+
+
+def list_batch_files() -> dict[str, list[str]]:
+    """{dataset: sorted `dt=.../batch_ts=....parquet` paths relative to the dataset root}.
+
+    Retired files (`read_retired()`) are left out.
+    """
+    catalog: dict[str, list[str]] = {}
+    root = lake_root()
+    if not root.exists():
+        return catalog
+    retired = read_retired()
+    for dataset in os.scandir(root):
+        if not dataset.is_dir() or dataset.name.startswith(("_", ".")):
+            continue  # _views, ...
+        files = []
+        for part in os.scandir(dataset.path):
+            if not part.is_dir() or not part.name.startswith("dt="):
+                continue
+            for f in os.scandir(part.path):
+                if (
+                    f.name.startswith("batch_ts=")
+                    and f.name.endswith(".parquet")
+                    and f"{dataset.name}/{part.name}/{f.name}" not in retired
+                ):
+                    files.append(f"{part.name}/{f.name}")
+        catalog[dataset.name] = sorted(files)
+    return catalog
+
+
+def bump_lake_version() -> str:
+    """Publish the catalog and a new lake version after data was added; return the version."""
+    ensure_lake_dirs()
+    with _writers_lock():
+        version = str(time.time_ns())
+        catalog = {"version": version, "datasets": list_batch_files()}
+        _write_atomic(_catalog_file(), orjson.dumps(catalog))
+        _write_atomic(_version_file(), version.encode())
+    return version
+
+
+def read_catalog(version: str) -> dict[str, list[str]] | None:
+    """The published catalog if it was built for `version`, else None (glob instead)."""
+    try:
+        catalog = orjson.loads(_catalog_file().read_bytes())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return None
+    if catalog.get("version") != version:
+        return None
+    return catalog["datasets"]
+
+
+def partition_dates() -> list[str]:
+    """Return the `dt=...` partition dates present in the lake (sorted)."""
+    events = lake_root() / "events"
+    if not events.exists():
+        return []
+    return sorted(p.name.split("=", 1)[1] for p in events.glob("dt=*") if p.is_dir())
+
+
+def latest_batch_ts() -> str | None:
+    """Return the newest `batch_ts=...` found in the lake (YYYYMMDDHHMMSS), if any."""
+    events = lake_root() / "events"
+    if not events.exists():
+        return None
+    stamps = [
+        p.stem.split("=", 1)[1]
+        for p in events.glob("dt=*/batch_ts=*.parquet")
+        if p.stem.split("=", 1)[1].isdigit()
+    ]
+    return max(stamps, default=None)
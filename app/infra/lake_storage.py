@@ -0,0 +1,703 @@
+"""app.infra.lake_storage
+
+Pluggable storage for the lake.
+
+Backends (`LAKE_BACKEND`), same layout `{dataset}/dt=YYYY-MM-DD/batch_ts=YYYYMMDDHHMMSS.parquet`
+(dataset: events, mentions, gkg and the GKG side tables):
+- `fs` (default): local filesystem under `DATA_LAKE_PATH` (`app.infra.fs_lake`).
+  Batches are written to a temp file next to their final path then renamed,
+  so readers never see a partially written Parquet file. Listings come from
+  the catalog published with each lake version (one file read per version
+  and process, shared by every API worker) instead of a glob per query.
+- `s3`: S3-compatible object storage (AWS, MinIO) under `S3_BUCKET`/`S3_PREFIX`.
+  Batches are uploaded with parallel multipart uploads (`S3_MULTIPART_*`,
+  `S3_UPLOAD_CONCURRENCY`). DuckDB scans them as a pyarrow dataset whose file
+  system issues ranged GETs through a local on-disk block cache
+  (`app.infra.block_cache`): only footers and the column chunks a query needs
+  are fetched, and repeat queries read them from local disk. API nodes need no
+  shared disk. Uploads are atomic, but retention rewrites batches in place
+  (same key) before the lake version is bumped: every read of a file pins
+  the object version (ETag) it opened, so it never mixes blocks of two
+  versions (see `S3LakeStorage.open_info`).
+
+Both backends expose the same operations: `write_batch` / `put_file`,
+`batches`, `partition_dates`, `latest_batch_ts`, `version` / `bump_version`
+(lake version, see `app.infra.fs_lake`), `dataset_root` / `events_root`,
+`files(pattern)`, `scan(con, pattern)` (DuckDB FROM expression),
+`read_table` / `read_metadata` / `file_size`, and `retire` / `purge_retired`
+(retention: retired batches leave the listing of the next lake version, and
+are deleted after a grace period so in-flight queries can finish).
+Dataset-aware operations default to `events`; partition dates and the latest
+batch timestamp are those of events.
+
+Module-level helpers (`lake_version()`, `bump_lake_version()`, ...) dispatch to
+the configured backend; `get_lake_storage()` returns it.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import glob
+import io
+import itertools
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import orjson
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.core.metrics import LAKE_RANGE_BYTES, LAKE_RANGE_REQUESTS, LAKE_UPLOAD_SECONDS
+from app.infra import fs_lake
+from app.infra.block_cache import BlockCache
+
+logger = logging.getLogger(__name__)
+
+# Writes `table` to a local Parquet file and returns its size in bytes.
+ParquetWriter = Callable[[pa.Table, Path], int]
+
+
+@dataclass(frozen=True)
+class BatchRef:
+    """One batch file of the lake."""
+
+    uri: str
+    dt: str
+    ts: str
+
+
+def _sql_str(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _parse_batch(uri: str) -> BatchRef | None:
+    """BatchRef from `.../dt=<dt>/batch_ts=<ts>.parquet`, None for other objects."""
+    parts = uri.rsplit("/", 2)
+    if len(parts) != 3 or not parts[1].startswith("dt=") or not parts[2].startswith("batch_ts="):
+        return None
+    ts = parts[2][len("batch_ts=") :].removesuffix(".parquet")
+    if not parts[2].endswith(".parquet") or not ts.isdigit():
+        return None
+    return BatchRef(uri=uri, dt=parts[1][3:], ts=ts)
+
+
+class LakeStorage(ABC):
+    """Where batches are written to and read from."""
+
+    name: str
+
+    @abstractmethod
+    def dataset_root(self, dataset: str) -> str:
+        """Root of a dataset, as a DuckDB-style path or URI (forward slashes)."""
+
+    def events_root(self) -> str:
+        """Root of the events dataset."""
+        return self.dataset_root("events")
+
+    @abstractmethod
+    def write_batch(
+        self, dt: str, ts: str, table: pa.Table, writer: ParquetWriter, dataset: str = "events"
+    ) -> tuple[str, int]:
+        """Store one batch; return (uri, bytes written). Readers never see partial data."""
+
+    @abstractmethod
+    def put_file(self, dataset: str, dt: str, ts: str, local: Path) -> tuple[str, int]:
+        """Store an already written local Parquet file as one batch (the file is consumed)."""
+
+    def batches(self, dataset: str = "events") -> list[BatchRef]:
+        """Every batch of a dataset."""
+        pattern = f"{self.dataset_root(dataset)}/dt=*/batch_ts=*.parquet"
+        refs = (_parse_batch(f) for f in self.files(pattern))
+        return [r for r in refs if r is not None]
+
+    @abstractmethod
+    def version(self) -> str:
+        """Current lake version token ("0" for a lake never written to)."""
+
+    @abstractmethod
+    def bump_version(self) -> str:
+        """Publish a new lake version after data was added; return it."""
+
+    @abstractmethod
+    def files(self, pattern: str) -> list[str]:
+        """Batch URIs matching a glob `pattern` rooted at a `dataset_root()` (sorted)."""
+
+    @abstractmethod
+    def scan(self, con: duckdb.DuckDBPyConnection, pattern: str, files: list[str] | None = None) -> str:
+        """Return a DuckDB FROM expression reading `files` (default: all files of `pattern`)."""
+
+    @abstractmethod
+    def read_table(self, uri: str) -> pa.Table:
+        """Read one batch into memory."""
+
+    @abstractmethod
+    def read_metadata(self, uri: str) -> pq.FileMetaData:
+        """Parquet footer of one batch."""
+
+    @abstractmethod
+    def file_size(self, uri: str) -> int:
+        """Size of one batch file in bytes."""
+
+    @abstractmethod
+    def retire(self, uris: list[str]) -> None:
+        """Remove batches from the listing published by the next `bump_version()`.
+
+        The files stay readable (queries listed them under the previous
+        version) until `purge_retired` deletes them.
+        """
+
+    @abstractmethod
+    def purge_retired(self, grace_seconds: float) -> list[str]:
+        """Delete the batches retired more than `grace_seconds` ago; return their URIs."""
+
+    def partition_dates(self) -> list[str]:
+        """`dt=...` partition dates present in the lake (sorted)."""
+        return sorted({b.dt for b in self.batches()})
+
+    def latest_batch_ts(self) -> str | None:
+        """Newest `batch_ts=...` of the lake (YYYYMMDDHHMMSS), if any."""
+        return max((b.ts for b in self.batches()), default=None)
+
+
+class FilesystemLakeStorage(LakeStorage):
+    """Local filesystem lake (`DATA_LAKE_PATH`)."""
+
+    name = "fs"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cached_catalog: tuple[str, dict[str, list[str]]] | None = None  # (version, catalog)
+
+    def dataset_root(self, dataset: str) -> str:
+        return str(fs_lake.lake_root() / dataset).replace("\\", "/")
+
+    def write_batch(
+        self, dt: str, ts: str, table: pa.Table, writer: ParquetWriter, dataset: str = "events"
+    ) -> tuple[str, int]:
+        out = fs_lake.parquet_path(dt, ts, dataset)
+        # Not matched by the `*.parquet` globs of readers until renamed.
+        tmp = out.with_name(f"{out.name}.tmp{os.getpid()}")
+        try:
+            written = writer(table, tmp)
+            os.replace(tmp, out)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return str(out), written
+
+    def put_file(self, dataset: str, dt: str, ts: str, local: Path) -> tuple[str, int]:
+        out = fs_lake.parquet_path(dt, ts, dataset)
+        tmp = out.with_name(f"{out.name}.tmp{os.getpid()}")
+        try:
+            # A rename when on the same file system, else a copy to the temp name.
+            shutil.move(local, tmp)
+            os.replace(tmp, out)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return str(out), out.stat().st_size
+
+    def version(self) -> str:
+        return fs_lake.lake_version()
+
+    def bump_version(self) -> str:
+        return fs_lake.bump_lake_version()
+
+    def files(self, pattern: str) -> list[str]:
+        catalog = self._catalog()
+        root = str(fs_lake.lake_root()).replace("\\", "/") + "/"
+        if catalog is None or not pattern.startswith(root):
+            retired = fs_lake.read_retired()
+            found = (f.replace("\\", "/") for f in glob.glob(pattern))
+            return sorted(f for f in found if f.removeprefix(root) not in retired)
+        dataset, _, rest = pattern[len(root) :].partition("/")
+        return [
+            f"{root}{dataset}/{f}" for f in catalog.get(dataset, []) if fnmatch.fnmatchcase(f, rest)
+        ]
+
+    def _catalog(self) -> dict[str, list[str]] | None:
+        """The published catalog of the current version (read once per version), if any."""
+        version = self.version()
+        with self._lock:
+            if self._cached_catalog is not None and self._cached_catalog[0] == version:
+                return self._cached_catalog[1]
+        catalog = fs_lake.read_catalog(version)
+        if catalog is not None:
+            with self._lock:
+                self._cached_catalog = (version, catalog)
+        return catalog
+
+    def scan(self, con: duckdb.DuckDBPyConnection, pattern: str, files: list[str] | None = None) -> str:
+        # The listing, not a DuckDB glob: retired files are still on disk.
+        files = self.files(pattern) if files is None else files
+        if not files:
+            # DuckDB raises its usual "No files found" on an empty lake.
+            return f"read_parquet({_sql_str(pattern)})"
+        return f"read_parquet([{', '.join(_sql_str(f) for f in files)}])"
+
+    def read_table(self, uri: str) -> pa.Table:
+        return pq.read_table(uri)
+
+    def read_metadata(self, uri: str) -> pq.FileMetaData:
+        return pq.read_metadata(uri)
+
+    def file_size(self, uri: str) -> int:
+        return os.path.getsize(uri)
+
+    def _relative(self, uri: str) -> str:
+        root = str(fs_lake.lake_root()).replace("\\", "/") + "/"
+        return uri.removeprefix(root)
+
+    def retire(self, uris: list[str]) -> None:
+        fs_lake.retire_batch_files([self._relative(uri) for uri in uris])
+
+    def purge_retired(self, grace_seconds: float) -> list[str]:
+        root = str(fs_lake.lake_root()).replace("\\", "/")
+        return [f"{root}/{path}" for path in fs_lake.purge_retired_files(grace_seconds)]
+
+    def partition_dates(self) -> list[str]:
+        if self._catalog() is None:
+            return fs_lake.partition_dates()
+        return super().partition_dates()
+
+    def latest_batch_ts(self) -> str | None:
+        if self._catalog() is None:
+            return fs_lake.latest_batch_ts()
+        return super().latest_batch_ts()
+
+
+@dataclass(frozen=True)
+class _ObjectInfo:
+    size: int
+    etag: str
+
+
+class ObjectRewrittenError(OSError):
+    """An S3 object was rewritten while a reader was reading the previous version."""
+
+
+class S3LakeStorage(LakeStorage):
+    """Object-storage lake: multipart uploads, ranged reads through a local block cache."""
+
+    name = "s3"
+
+    def __init__(self) -> None:
+        from app.infra.s3 import s3_client
+
+        self.bucket = settings.s3_bucket
+        self.prefix = settings.s3_prefix
+        self._client = s3_client()
+        self._lock = threading.Lock()
+        self._bucket_ready = False
+        self._version: tuple[float, str] | None = None  # (monotonic read time, token)
+        self._listing: tuple[str, dict[str, _ObjectInfo]] | None = None  # (version, objects)
+        # Objects found rewritten since the current listing: key -> current info.
+        self._rewritten: dict[str, _ObjectInfo] = {}
+        self.cache = BlockCache(
+            settings.lake_cache_dir,
+            block_size=settings.lake_cache_block_kb * 1024,
+            max_bytes=settings.lake_cache_max_mb * 1024 * 1024,
+        )
+        self.filesystem = pafs.PyFileSystem(_CachedRangeHandler(self))
+        self._scan_ids = itertools.count()
+
+    # -- keys / URIs -----------------------------------------------------------
+
+    def _uri(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def _key(self, uri_or_path: str) -> str:
+        """Object key from an `s3://bucket/key` URI or a `bucket/key` pyarrow path."""
+        path = uri_or_path.removeprefix("s3://")
+        return path.split("/", 1)[1]
+
+    def dataset_root(self, dataset: str) -> str:
+        return self._uri(f"{self.prefix}{dataset}")
+
+    # -- writes ----------------------------------------------------------------
+
+    def _ensure_bucket(self) -> None:
+        if not self._bucket_ready:
+            from app.infra.s3 import ensure_bucket
+
+            ensure_bucket()
+            self._bucket_ready = True
+
+    def _transfer_config(self) -> Any:
+        from boto3.s3.transfer import TransferConfig
+
+        mb = 1024 * 1024
+        return TransferConfig(
+            multipart_threshold=settings.s3_multipart_threshold_mb * mb,
+            multipart_chunksize=settings.s3_multipart_chunk_mb * mb,
+            max_concurrency=settings.s3_upload_concurrency,
+            use_threads=settings.s3_upload_concurrency > 1,
+        )
+
+    def write_batch(
+        self, dt: str, ts: str, table: pa.Table, writer: ParquetWriter, dataset: str = "events"
+    ) -> tuple[str, int]:
+        with tempfile.TemporaryDirectory() as tmp:
+            local = Path(tmp) / "batch.parquet"
+            writer(table, local)
+            return self.put_file(dataset, dt, ts, local)
+
+    def put_file(self, dataset: str, dt: str, ts: str, local: Path) -> tuple[str, int]:
+        self._ensure_bucket()
+        key = f"{self.prefix}{dataset}/dt={dt}/batch_ts={ts}.parquet"
+        written = local.stat().st_size
+        start = time.perf_counter()
+        # S3 objects appear atomically once the (multipart) upload completes.
+        self._client.upload_file(str(local), self.bucket, key, Config=self._transfer_config())
+        LAKE_UPLOAD_SECONDS.observe(time.perf_counter() - start)
+        local.unlink(missing_ok=True)
+        return self._uri(key), written
+
+    # -- lake version ----------------------------------------------------------
+
+    def version(self) -> str:
+        now = time.monotonic()
+        with self._lock:
+            if self._version and now - self._version[0] < settings.lake_version_ttl_seconds:
+                return self._version[1]
+        try:
+            body = self._client.get_object(Bucket=self.bucket, Key=f"{self.prefix}_version")["Body"]
+            token = body.read().decode().strip() or "0"
+        except self._client.exceptions.NoSuchKey:
+            token = "0"
+        except self._client.exceptions.NoSuchBucket:
+            token = "0"
+        with self._lock:
+            self._version = (now, token)
+        return token
+
+    def bump_version(self) -> str:
+        self._ensure_bucket()
+        token = str(time.time_ns())
+        self._client.put_object(Bucket=self.bucket, Key=f"{self.prefix}_version", Body=token.encode())
+        with self._lock:
+            self._version = (time.monotonic(), token)
+        return token
+
+    # -- listing ---------------------------------------------------------------
+
+    def _objects(self) -> dict[str, _ObjectInfo]:
+        """{uri: info} of the lake's objects (all datasets), listed once per lake version."""
+        version = self.version()
+        with self._lock:
+            if self._listing is not None and self._listing[0] == version:
+                return self._listing[1]
+        objects: dict[str, _ObjectInfo] = {}
+        retired = self._read_retired()
+        try:
+            pages = self._client.get_paginator("list_objects_v2").paginate(
+                Bucket=self.bucket, Prefix=self.prefix
+            )
+            for page in pages:
+                for obj in page.get("Contents", []):
+                    if not obj["Key"].endswith(".parquet") or obj["Key"] in retired:
+                        continue  # _version, retired batches
+                    objects[self._uri(obj["Key"])] = _ObjectInfo(obj["Size"], obj["ETag"].strip('"'))
+        except self._client.exceptions.NoSuchBucket:
+            pass
+        with self._lock:
+            self._listing = (version, objects)
+            self._rewritten.clear()
+        return objects
+
+    def object_info(self, key: str) -> _ObjectInfo:
+        """Size and ETag of an object (from the listing, else a HEAD request)."""
+        info = self._objects().get(self._uri(key))
+        with self._lock:
+            info = self._rewritten.get(key, info)
+        if info is not None:
+            return info
+        return self._head(key)
+
+    def _head(self, key: str) -> _ObjectInfo:
+        head = self._client.head_object(Bucket=self.bucket, Key=key)
+        return _ObjectInfo(head["ContentLength"], head["ETag"].strip('"'))
+
+    def open_info(self, key: str) -> _ObjectInfo:
+        """Size and ETag of the object version a new reader of `key` reads.
+
+        Retention recompresses batches in place, so until the next lake
+        version an object may no longer match its listed ETag. Unless its
+        last block (the footer) is cached, it is fetched first: if the
+        object was rewritten, its current size and ETag are read (HEAD) and
+        used for this reader and the next ones.
+        """
+        info = self.object_info(key)
+        if info.size == 0 or self.cache.has(key, info.etag, (info.size - 1) // self.cache.block_size):
+            return info
+        try:
+            self.read_range(key, info, info.size - 1, info.size)
+        except ObjectRewrittenError:
+            return self.object_info(key)
+        return info
+
+    def files(self, pattern: str) -> list[str]:
+        return sorted(uri for uri in self._objects() if fnmatch.fnmatchcase(uri, pattern))
+
+    # -- reads -----------------------------------------------------------------
+
+    def read_range(self, key: str, info: _ObjectInfo, start: int, end: int) -> bytes:
+        """Bytes [start, end) of an object, block by block through the local cache.
+
+        Contiguous missing blocks are fetched with a single ranged GET.
+        """
+        if end <= start:
+            return b""
+        bs = self.cache.block_size
+        first, last = start // bs, (end - 1) // bs
+        blocks: dict[int, bytes] = {}
+        missing: list[int] = []
+        for i in range(first, last + 1):
+            block = self.cache.get(key, info.etag, i)
+            if block is None:
+                missing.append(i)
+            else:
+                blocks[i] = block
+
+        runs: list[list[int]] = []
+        for i in missing:
+            if runs and runs[-1][-1] == i - 1:
+                runs[-1].append(i)
+            else:
+                runs.append([i])
+        for run in runs:
+            lo, hi = run[0] * bs, min((run[-1] + 1) * bs, info.size) - 1
+            # If-Match: an object rewritten since it was listed (retention) fails the
+            # read instead of mixing blocks of two versions.
+            try:
+                data = self._client.get_object(
+                    Bucket=self.bucket, Key=key, Range=f"bytes={lo}-{hi}", IfMatch=f'"{info.etag}"'
+                )["Body"].read()
+            except self._client.exceptions.ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") != "PreconditionFailed":
+                    raise
+                current = self._head(key)
+                with self._lock:
+                    self._rewritten[key] = current
+                raise ObjectRewrittenError(
+                    f"lake object {key} was rewritten while being read, retry"
+                ) from None
+            LAKE_RANGE_REQUESTS.inc()
+            LAKE_RANGE_BYTES.inc(len(data))
+            for j, i in enumerate(run):
+                blocks[i] = data[j * bs : (j + 1) * bs]
+                self.cache.put(key, info.etag, i, blocks[i])
+
+        buf = b"".join(blocks[i] for i in range(first, last + 1))
+        offset = start - first * bs
+        return buf[offset : offset + (end - start)]
+
+    def _paths(self, uris: list[str]) -> list[str]:
+        return [uri.removeprefix("s3://") for uri in uris]
+
+    def scan(self, con: duckdb.DuckDBPyConnection, pattern: str, files: list[str] | None = None) -> str:
+        files = self.files(pattern) if files is None else files
+        if not files:
+            raise duckdb.IOException(f'No files found that match the pattern "{pattern}"')
+        # Imported here: pyarrow.dataset pulls in pandas (~0.2 s), only S3 scans need it.
+        import pyarrow.dataset as ds
+
+        paths = self._paths(files)
+        # Like read_parquet: the first file's schema applies to the whole scan.
+        schema = pq.read_schema(paths[0], filesystem=self.filesystem)
+        dataset = ds.FileSystemDataset.from_paths(
+            paths, schema=schema, format=ds.ParquetFileFormat(), filesystem=self.filesystem
+        )
+        # Unique per scan: one cursor may read several datasets (e.g. events + mentions).
+        name = f"lake_scan_{next(self._scan_ids)}"
+        con.register(name, dataset)
+        return name
+
+    def read_table(self, uri: str) -> pa.Table:
+        return pq.read_table(self._paths([uri])[0], filesystem=self.filesystem)
+
+    def read_metadata(self, uri: str) -> pq.FileMetaData:
+        return pq.read_metadata(self._paths([uri])[0], filesystem=self.filesystem)
+
+    def file_size(self, uri: str) -> int:
+        return self.object_info(self._key(uri)).size
+
+    # -- retention -------------------------------------------------------------
+
+    def _read_retired(self) -> dict[str, float]:
+        """{key: retirement time} of the retired batches (`{prefix}_retired.json`)."""
+        try:
+            body = self._client.get_object(Bucket=self.bucket, Key=f"{self.prefix}_retired.json")
+        except (self._client.exceptions.NoSuchKey, self._client.exceptions.NoSuchBucket):
+            return {}
+        return orjson.loads(body["Body"].read())
+
+    def _write_retired(self, retired: dict[str, float]) -> None:
+        key = f"{self.prefix}_retired.json"
+        self._client.put_object(Bucket=self.bucket, Key=key, Body=orjson.dumps(retired))
+
+    def retire(self, uris: list[str]) -> None:
+        # Read-modify-write without a lock: one retention runner per lake.
+        self._ensure_bucket()
+        retired = self._read_retired()
+        now = time.time()
+        for uri in uris:
+            retired.setdefault(self._key(uri), now)
+        self._write_retired(retired)
+
+    def purge_retired(self, grace_seconds: float) -> list[str]:
+        retired = self._read_retired()
+        cutoff = time.time() - grace_seconds
+        purged = sorted(key for key, at in retired.items() if at <= cutoff)
+        for start in range(0, len(purged), 1000):  # DeleteObjects takes up to 1000 keys
+            objects = [{"Key": key} for key in purged[start : start + 1000]]
+            self._client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+            )
+        for key in purged:
+            del retired[key]
+        if purged:
+            self._write_retired(retired)
+        return [self._uri(key) for key in purged]
+
+
+class _RangeReader(io.RawIOBase):
+    """Seekable read-only file over one object, reading through `S3LakeStorage.read_range`."""
+
+    def __init__(self, storage: S3LakeStorage, key: str, info: _ObjectInfo) -> None:
+        self._storage = storage
+        self._key = key
+        self._info = info
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def size(self) -> int:
+        return self._info.size
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._info.size}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._info.size if size is None or size < 0 else min(self._info.size, self._pos + size)
+        data = self._storage.read_range(self._key, self._info, self._pos, end)
+        self._pos += len(data)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+
+class _CachedRangeHandler(pafs.FileSystemHandler):
+    """Read-only pyarrow file system over the S3 lake (paths are `bucket/key`)."""
+
+    def __init__(self, storage: S3LakeStorage) -> None:
+        self._storage = storage
+
+    def get_type_name(self) -> str:
+        return "gdelt-s3-cached"
+
+    def equals(self, other: Any) -> bool:
+        return other is self
+
+    def normalize_path(self, path: str) -> str:
+        return path
+
+    def get_file_info(self, paths: list[str]) -> list[pafs.FileInfo]:
+        infos = []
+        for path in paths:
+            info = self._storage.object_info(self._storage._key(path))
+            infos.append(pafs.FileInfo(path, pafs.FileType.File, size=info.size))
+        return infos
+
+    def open_input_file(self, path: str) -> pa.NativeFile:
+        key = self._storage._key(path)
+        return pa.PythonFile(_RangeReader(self._storage, key, self._storage.open_info(key)), mode="r")
+
+    def open_input_stream(self, path: str) -> pa.NativeFile:
+        return self.open_input_file(path)
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError("The lake read path is read-only; write with write_batch().")
+
+    get_file_info_selector = _read_only
+    create_dir = _read_only
+    delete_dir = _read_only
+    delete_dir_contents = _read_only
+    delete_root_dir_contents = _read_only
+    delete_file = _read_only
+    move = _read_only
+    copy_file = _read_only
+    open_output_stream = _read_only
+    open_append_stream = _read_only
+
+
+_BACKENDS: dict[str, Callable[[], LakeStorage]] = {
+    "fs": FilesystemLakeStorage,
+    "s3": S3LakeStorage,
+}
+
+_storage: LakeStorage | None = None
+_storage_lock = threading.Lock()
+
+
+def get_lake_storage() -> LakeStorage:
+    """The storage of the configured `LAKE_BACKEND` (created on first use)."""
+    global _storage
+    with _storage_lock:
+        if _storage is None or _storage.name != settings.lake_backend:
+            try:
+                factory = _BACKENDS[settings.lake_backend]
+            except KeyError:
+                raise ValueError(f"Unknown LAKE_BACKEND {settings.lake_backend!r} (fs | s3)") from None
+            _storage = factory()
+            logger.info("Lake storage backend: %s", _storage.name)
+        return _storage
+
+
+def reset_lake_storage() -> None:
+    """Drop the storage instance (tests / settings reload)."""
+    global _storage
+    with _storage_lock:
+        _storage = None
+
+
+def lake_version() -> str:
+    """Current lake version of the configured backend."""
+    return get_lake_storage().version()
+
+
+def bump_lake_version() -> str:
+    """Publish a new lake version on the configured backend."""
+    return get_lake_storage().bump_version()
+
+
+def partition_dates() -> list[str]:
+    """Partition dates of the configured backend."""
+    return get_lake_storage().partition_dates()
+
+
+def latest_batch_ts() -> str | None:
+    """Newest batch timestamp of the configured backend."""
+    return get_lake_storage().latest_batch_ts()
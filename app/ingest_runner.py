@@ -0,0 +1,60 @@
+"""app.ingest_runner
+
+Local-mode ingestion job runner (see `app.services.ingest_jobs`).
+
+Runs the ingestion jobs queued by `POST /api/v1/ingest/trigger` in its own
+process, so the CSV -> Parquet conversion never competes with the API
+workers for CPU. API workers start it on demand; it exits after
+`INGEST_RUNNER_IDLE_SECONDS` without jobs.
+
+Run:
+  poetry run python -m app.ingest_runner
+
+To keep it under a process supervisor instead, set
+`INGEST_RUNNER_AUTOSTART=false` for the API and `INGEST_RUNNER_IDLE_SECONDS=0`
+for the runner.
+
+Notes:
+- One runner per jobs directory: a second one exits at once.
+- Continuous views are fed each batch as it is written (like in the API,
+  `app.services.continuous_views`): their state is shared through `VIEWS_DIR`,
+  so API reads stay O(result size) instead of catching up from the lake.
+- Metrics are pushed / written to a textfile after each job
+  (see `app.core.metrics.export_process_metrics`).
+- `kill -USR2 <pid>` writes a sampling profile (see `app.core.profiling`).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.profiling import install_signal_handler
+from app.services.continuous_views import views
+from app.services.ingest_jobs import ingest_jobs
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    """Run queued ingestion jobs until idle; return an exit code."""
+    configure_logging()
+    install_signal_handler("ingest_runner")
+    if settings.ingest_runner_nice and hasattr(os, "nice"):
+        os.nice(settings.ingest_runner_nice)
+    logger.info(
+        "Ingestion runner started (pid %s, jobs in %s)", os.getpid(), ingest_jobs.directory()
+    )
+    views.attach()
+    try:
+        ran = ingest_jobs.serve()
+    finally:
+        views.detach()
+    logger.info("Ingestion runner exiting after %s jobs", ran)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
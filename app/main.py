@@ -12,28 +12,83 @@ This project is designed as a POC that can evolve into an industrial backend:
 - filesystem Data Lake in Parquet partitions
 - analytics using DuckDB
 - observability: JSON logs + Prometheus metrics
+
+Startup: importing this module stays cheap (heavy dependencies such as the
+ingestion stack or pyarrow.dataset are imported on first use, logging is
+configured by the lifespan). The lifespan then warms the worker up in the
+background (`app.services.warmup`): `GET /health` is liveness, `GET /ready`
+answers 503 until the warm-up has finished.
 """
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.errors import register_error_handlers
+from app.core.http_cache import HttpCacheMiddleware
 from app.core.logging import configure_logging
 from app.core.metrics import metrics_middleware, metrics_endpoint
 from app.api.v1.routes import router as v1_router
 from app.api.v1.analytics import router as analytics_router
-
-configure_logging()
+from app.api.v1.debug import router as debug_router
+from app.api.v1.exports import router as exports_router
+from app.api.v1.graph import router as graph_router
+from app.api.v1.views import router as views_router
+from app.services.continuous_views import views
+from app.services.hot_tier import hot_tier
+from app.services.subscriptions import hub
+from app.services.warmup import readiness, warm_up
 
 TAGS_METADATA = [
-    {"name": "system", "description": "System endpoints (health, metrics)."},
+    {"name": "system", "description": "System endpoints (health, readiness, metrics)."},
     {"name": "ingestion", "description": "Ingestion endpoints (GDELT batches)."},
     {"name": "events", "description": "Event search endpoints (DuckDB over Parquet)."},
     {"name": "analytics", "description": "Analytics endpoints (aggregations)."},
+    {"name": "views", "description": "Continuous views (incrementally maintained aggregations)."},
+    {"name": "graph", "description": "Actor interaction graph (who interacts with whom)."},
+    {"name": "exports", "description": "Bulk export jobs (Parquet / CSV files)."},
+    {"name": "debug", "description": "Diagnostics endpoints (slow-query log, sampling profiler)."},
 ]
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Attach the hot tier, the subscription feed and the continuous views; run the tail loops.
+
+    The warm-up runs as a background task, so the server accepts connections
+    (liveness) while it is warming up.
+    """
+    configure_logging()
+    tails: list[asyncio.Task[None]] = []
+    views.attach()
+    if settings.hot_tier_enabled:
+        await asyncio.to_thread(hot_tier.attach)
+        tails.append(asyncio.create_task(hot_tier.tail_loop()))
+    if settings.subscriptions_enabled:
+        await asyncio.to_thread(hub.attach)
+        tails.append(asyncio.create_task(hub.tail_loop()))
+    tails.append(asyncio.create_task(warm_up()))
+    try:
+        yield
+    finally:
+        for tail in tails:
+            tail.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await tail
+        if settings.hot_tier_enabled:
+            hot_tier.detach()
+        if settings.subscriptions_enabled:
+            hub.detach()
+        views.detach()
+
+
 def create_app() -> FastAPI:
     app = FastAPI(
         title=settings.app_name,
@@ -46,10 +101,13 @@ def create_app() -> FastAPI:
         openapi_tags=TAGS_METADATA,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=lifespan,
     )
 
     # Middlewares
     app.middleware("http")(metrics_middleware)
+    app.add_middleware(HttpCacheMiddleware)  # outermost: validators + compression
+    register_error_handlers(app)
 
     # System routes
     @app.get("/health", tags=["system"], summary="Healthcheck")
@@ -57,6 +115,17 @@ def create_app() -> FastAPI:
         """Simple healthcheck endpoint."""
         return {"status": "ok", "env": settings.app_env}
 
+    @app.get(
+        "/ready",
+        tags=["system"],
+        summary="Readiness",
+        responses={503: {"description": "Warm-up still running."}},
+    )
+    async def ready():
+        """Readiness: 200 once the warm-up has finished (per-step timings), 503 before."""
+        snapshot = readiness.snapshot()
+        return JSONResponse(snapshot, status_code=200 if snapshot["status"] == "ready" else 503)
+
     @app.get("/metrics", tags=["system"], summary="Prometheus metrics")
     def metrics():
         """Prometheus scrape endpoint."""
@@ -65,6 +134,10 @@ def create_app() -> FastAPI:
     # API routers
     app.include_router(v1_router)
     app.include_router(analytics_router)
+    app.include_router(views_router)
+    app.include_router(graph_router)
+    app.include_router(exports_router)
+    app.include_router(debug_router)
     return app
 
 
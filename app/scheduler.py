@@ -0,0 +1,227 @@
+"""app.scheduler
+
+GDELT-cadence aware ingestion scheduler.
+
+GDELT 2.x publishes a new batch on a fixed 15-minute UTC grid
+(`...0000`, `...1500`, `...3000`, `...4500`). Sleeping a fixed interval after
+each run drifts against that grid, so freshness lag ends up anywhere between
+0 and 15+ minutes. This scheduler instead:
+
+- wakes up shortly after each expected publication slot,
+- polls `lastupdate.txt` with conditional requests (ETag / Last-Modified),
+  which cost a 304 and no body while nothing changed,
+- triggers ingestion as soon as a newer export batch is listed,
+- never runs two ingestions at once: a batch discovered while a long run is
+  still in progress is queued (with any batch already queued, once per
+  file) and ingested right after,
+- re-queues the files whose ingestion failed (a run that raised fails all
+  its files) with the next discovered batch: `lastupdate.txt` only lists the
+  newest one, so a failed batch is never listed again. A file is given up
+  after `GDELT_INGEST_MAX_ATTEMPTS` failed attempts.
+
+Exposed metric:
+- gdelt_data_freshness_lag_seconds (computed at scrape time)
+
+The scheduler has no HTTP server: its registry (freshness lag + per-stage
+ingestion metrics) is exported via `export_process_metrics("scheduler")`
+after every poll window and every ingestion run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+from app.core.metrics import FRESHNESS_LAG, export_process_metrics
+from app.infra.lake_storage import latest_batch_ts
+from app.services.gdelt import (
+    GdeltFile,
+    LastUpdateValidators,
+    fetch_lastupdate_conditional,
+    pick_recent,
+)
+from app.tasks import run_ingestion_for
+
+logger = logging.getLogger(__name__)
+
+FetchFn = Callable[
+    [LastUpdateValidators | None, httpx.AsyncClient | None],
+    Awaitable[tuple[list[GdeltFile] | None, LastUpdateValidators]],
+]
+IngestFn = Callable[[list[GdeltFile]], Awaitable[dict[str, Any]]]
+
+
+def slot_floor(now: datetime, interval_minutes: int) -> datetime:
+    """Return the start of the publication slot containing `now` (UTC grid)."""
+    now = now.astimezone(UTC)
+    minutes = (now.hour * 60 + now.minute) // interval_minutes * interval_minutes
+    return now.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+def next_poll_start(now: datetime, interval_minutes: int, delay_seconds: int) -> datetime:
+    """Return when polling should start for the next expected publication.
+
+    The batch stamped with slot `S` is usually listed `delay_seconds` after `S`.
+    """
+    start = slot_floor(now, interval_minutes) + timedelta(seconds=delay_seconds)
+    if start <= now:
+        start += timedelta(minutes=interval_minutes)
+    return start
+
+
+def ts_to_datetime(ts: str) -> datetime:
+    """Parse a GDELT batch timestamp (YYYYMMDDHHMMSS) as an aware UTC datetime."""
+    return datetime.strptime(ts, "%Y%m%d%H%M%S").replace(tzinfo=UTC)
+
+
+def freshness_lag_seconds(latest_ts: str | None, now: datetime) -> float:
+    """Seconds between `now` and the newest ingested batch (0 if nothing ingested yet)."""
+    if not latest_ts or not latest_ts.isdigit():
+        return 0.0
+    return max(0.0, (now - ts_to_datetime(latest_ts)).total_seconds())
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC)
+
+
+class CadenceScheduler:
+    """Poll lastupdate.txt around the GDELT publication grid and ingest new batches."""
+
+    def __init__(
+        self,
+        n_batches: int = 1,
+        interval_minutes: int | None = None,
+        fetch: FetchFn = fetch_lastupdate_conditional,
+        ingest: IngestFn = run_ingestion_for,
+        clock: Callable[[], datetime] = _utcnow,
+    ) -> None:
+        self.n_batches = n_batches
+        self.interval_minutes = interval_minutes or settings.gdelt_publish_interval_minutes
+        self._fetch = fetch
+        self._ingest = ingest
+        self._clock = clock
+
+        self._validators: LastUpdateValidators | None = None
+        self.last_seen_ts: str | None = latest_batch_ts()
+        self.last_ingested_ts: str | None = self.last_seen_ts
+
+        self._running: asyncio.Task[None] | None = None
+        self._pending: list[GdeltFile] | None = None
+        # Failed files to retry with the next batch: url -> (file, failed attempts).
+        self._retry: dict[str, tuple[GdeltFile, int]] = {}
+
+        FRESHNESS_LAG.set_function(
+            lambda: freshness_lag_seconds(self.last_ingested_ts, self._clock())
+        )
+
+    @property
+    def ingest_running(self) -> bool:
+        """True while an ingestion run is in progress."""
+        return self._running is not None and not self._running.done()
+
+    async def poll_once(self, client: httpx.AsyncClient | None = None) -> bool:
+        """Poll lastupdate.txt once; trigger ingestion when a newer batch is listed.
+
+        Returns:
+            True if a new batch was discovered.
+        """
+        files, self._validators = await self._fetch(self._validators, client)
+        if files is None:
+            return False
+
+        fresh = [
+            f
+            for f in pick_recent(files, self.n_batches)
+            if f.ts != "unknown" and (self.last_seen_ts is None or f.ts > self.last_seen_ts)
+        ]
+        if not fresh:
+            return False
+
+        self.last_seen_ts = max(f.ts for f in fresh)
+        retry = [f for f, _ in self._retry.values() if f.url not in {g.url for g in fresh}]
+        self.trigger([*fresh, *retry])
+        return True
+
+    def trigger(self, picked: list[GdeltFile]) -> None:
+        """Start ingestion for `picked`, or queue it if a run is already in progress.
+
+        Files queued by successive triggers during one run are merged (by url).
+        """
+        if self.ingest_running:
+            logger.warning(
+                "Ingestion still running; queueing batch %s", max(f.ts for f in picked)
+            )
+            pending = {f.url: f for f in self._pending or []}
+            pending.update((f.url, f) for f in picked)
+            self._pending = list(pending.values())
+            return
+        self._running = asyncio.create_task(self._ingest_loop(picked))
+
+    async def _ingest_loop(self, picked: list[GdeltFile] | None) -> None:
+        """Ingest `picked`, then whatever got queued meanwhile (runs never overlap)."""
+        while picked:
+            ok: list[dict[str, Any]] = []
+            try:
+                res = await self._ingest(picked)
+                ok = [x for x in res.get("ingested", []) if x.get("status") == "ok"]
+                stamps = [x["ts"] for x in ok if x.get("ts", "unknown").isdigit()]
+                if stamps:
+                    self.last_ingested_ts = max([*stamps, self.last_ingested_ts or ""])
+                logger.info("Scheduled ingestion done (ok=%s/%s)", len(ok), len(picked))
+            except Exception:
+                # Never stop the scheduler on a transient failure.
+                logger.exception("Scheduled ingestion failed")
+            self._requeue_failed(picked, {x.get("url") for x in ok})
+            await asyncio.to_thread(export_process_metrics, "scheduler")
+            picked, self._pending = self._pending, None
+
+    def _requeue_failed(self, picked: list[GdeltFile], ok_urls: set[str | None]) -> None:
+        """Keep the files of `picked` not ingested for a retry, up to the attempt limit."""
+        for f in picked:
+            _, failures = self._retry.pop(f.url, (f, 0))
+            if f.url in ok_urls:
+                continue
+            failures += 1
+            if failures >= settings.gdelt_ingest_max_attempts:
+                logger.error("Giving up on %s after %s failed attempts", f.url, failures)
+                continue
+            self._retry[f.url] = (f, failures)
+
+    async def poll_window(self, client: httpx.AsyncClient | None = None) -> bool:
+        """Poll repeatedly until a new batch appears or the poll window expires."""
+        deadline = self._clock() + timedelta(seconds=settings.gdelt_poll_window_seconds)
+        while self._clock() < deadline:
+            try:
+                if await self.poll_once(client):
+                    return True
+            except Exception as exc:
+                # httpx errors surface as tenacity.RetryError once retries are exhausted.
+                logger.warning("lastupdate poll failed: %s", exc)
+            await asyncio.sleep(settings.gdelt_poll_interval_seconds)
+        logger.warning("No new GDELT batch within the poll window")
+        return False
+
+    async def run_forever(self) -> None:
+        """Main loop: catch up once, then poll around every publication slot."""
+        async with httpx.AsyncClient(timeout=30) as client:
+            try:
+                await self.poll_once(client)
+            except Exception as exc:
+                # Same as poll_window: a failed poll must not stop the scheduler.
+                logger.warning("Initial lastupdate poll failed: %s", exc)
+
+            while True:
+                now = self._clock()
+                start = next_poll_start(
+                    now, self.interval_minutes, settings.gdelt_publish_delay_seconds
+                )
+                await asyncio.sleep((start - now).total_seconds())
+                await self.poll_window(client)
+                await asyncio.to_thread(export_process_metrics, "scheduler")
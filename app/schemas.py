@@ -21,7 +21,7 @@ class IngestTriggerResponse(BaseModel):
     """Response model for ingestion trigger endpoints.
 
     The `queued` value stays stable across deployment modes:
-    - Local mode (BackgroundTasks): returns 1 (one logical job)
+    - Local mode (job runner process): returns 1 (one logical job)
     - Worker/queue mode (Redis/Arq): returns number of jobs queued
     """
 
@@ -30,6 +30,46 @@ class IngestTriggerResponse(BaseModel):
         description="Number of jobs queued (contract kept stable across modes).",
         examples=[1],
     )
+    job_id: str | None = Field(
+        None,
+        description="Local mode: the ingestion job (an identical queued job is reused).",
+        examples=["9b1de0c4a7f84d2e8c3a5f6b7d8e9f01"],
+    )
+    status: str | None = Field(None, description="Job status when answered.", examples=["queued"])
+    triggers: int | None = Field(
+        None, description="Triggers absorbed by this job so far.", examples=[1]
+    )
+    status_url: str | None = Field(
+        None,
+        description="Where to poll the job.",
+        examples=["/api/v1/ingest/jobs/9b1de0c4a7f84d2e8c3a5f6b7d8e9f01"],
+    )
+
+
+class IngestJobResponse(BaseModel):
+    """State and progress of a local ingestion job."""
+
+    id: str = Field(..., examples=["9b1de0c4a7f84d2e8c3a5f6b7d8e9f01"])
+    status: str = Field(
+        ..., description="`queued`, `running`, `done` or `failed`.", examples=["running"]
+    )
+    n_batches: int = Field(..., description="Most recent batches requested.", examples=[2])
+    triggers: int = Field(..., description="Identical triggers absorbed.", examples=[1])
+    created_at: float = Field(..., description="Unix time.", examples=[1770681600.0])
+    started_at: float | None = Field(None, examples=[1770681600.4])
+    finished_at: float | None = Field(None, examples=[None])
+    total: int | None = Field(
+        None,
+        description="Batch files picked, one per dataset and batch (known once started).",
+        examples=[2],
+    )
+    done: int = Field(0, description="Files ingested so far.", examples=[1])
+    failed: int = Field(0, description="Files failed so far.", examples=[0])
+    results: list[dict] = Field(
+        default_factory=list,
+        description="Per-file results so far (`status` ok | failed, path, rows or error).",
+    )
+    error: str | None = Field(None, description="Why the job failed as a whole.", examples=[None])
 
 
 class EventSearchResponse(BaseModel):
@@ -50,6 +90,50 @@ class EventSearchResponse(BaseModel):
     )
 
 
+class ActorNameMatch(BaseModel):
+    """One actor / location name matched by the fuzzy search."""
+
+    name: str = Field(..., description="Indexed name (first spelling seen).", examples=["ANDRY RAJOELINA"])
+    score: float = Field(..., description="RapidFuzz WRatio score (0..100).", examples=[94.1])
+    n: int = Field(..., description="Event rows carrying the name in the lake.", examples=[312])
+    fields: list[str] = Field(
+        default_factory=list,
+        description="Event columns the name occurs in.",
+        examples=[["Actor1Name", "Actor2Name"]],
+    )
+
+
+class ActorSearchResponse(BaseModel):
+    """Response model for the fuzzy actor / location search."""
+
+    query: str = Field(..., description="Search term as sent.", examples=["Rajoelna"])
+    kind: str = Field(..., description="actor | location | all.", examples=["actor"])
+    matches: list[ActorNameMatch] = Field(default_factory=list, description="Matched names, best first.")
+    count: int = Field(..., description="Number of event rows returned in `rows`.", examples=[50])
+    rows: list[dict] = Field(
+        default_factory=list,
+        description="Events carrying a matched name (newest GlobalEventID first).",
+        examples=[[{"GlobalEventID": 1234567890, "Actor1Name": "ANDRY RAJOELINA"}]],
+    )
+
+
+class EventMentionsResponse(BaseModel):
+    """Response model for an event and the articles mentioning it."""
+
+    event_id: int = Field(..., description="GlobalEventID looked up.", examples=[1234567890])
+    event: dict | None = Field(
+        None,
+        description="The event row (None when not found in the requested partitions).",
+        examples=[{"GlobalEventID": 1234567890, "EventCode": "014"}],
+    )
+    count: int = Field(..., description="Number of mentions returned in `mentions`.", examples=[3])
+    mentions: list[dict] = Field(
+        default_factory=list,
+        description="Mentions rows (GDELT Mentions columns), ordered by mention time.",
+        examples=[[{"GlobalEventID": 1234567890, "MentionSourceName": "bbc.co.uk"}]],
+    )
+
+
 class TopValueRow(BaseModel):
     """One bucket in a top-values aggregation."""
 
@@ -111,3 +195,311 @@ class ToneStatsResponse(BaseModel):
         description="Maximum tone.",
         examples=[8.1],
     )
+
+
+class BatchAggregate(BaseModel):
+    """One aggregate of a batched analytics request."""
+
+    name: str = Field(..., description="Key of this aggregate in the response.", examples=["codes"])
+    op: str = Field(..., description="`top_values` or `tone`.", examples=["top_values", "tone"])
+    field: str | None = Field(
+        None,
+        description="Events column to group by (`top_values` only).",
+        examples=["EventCode", "ActionGeo_CountryCode"],
+    )
+    limit: int = Field(10, ge=1, le=200, description="Number of buckets (`top_values`).")
+
+
+class BatchAnalyticsRequest(BaseModel):
+    """Aggregates computed together over the request's date range."""
+
+    queries: list[BatchAggregate] = Field(
+        ...,
+        min_length=1,
+        max_length=20,
+        examples=[
+            [
+                {"name": "codes", "op": "top_values", "field": "EventCode"},
+                {"name": "countries", "op": "top_values", "field": "ActionGeo_CountryCode"},
+                {"name": "tone", "op": "tone"},
+            ]
+        ],
+    )
+
+
+class BatchAggregateResult(BaseModel):
+    """Result of one aggregate: `rows` for top_values, tone statistics for tone."""
+
+    name: str = Field(..., examples=["codes"])
+    op: str = Field(..., examples=["top_values"])
+    field: str | None = Field(None, examples=["EventCode"])
+    rows: list[TopValueRow] | None = Field(None, description="Top buckets ordered by count desc.")
+    available: bool | None = Field(None, description="tone: False without AvgTone.")
+    n: int | None = Field(None, examples=[100000])
+    avg_tone: float | None = Field(None, examples=[-0.12])
+    min_tone: float | None = Field(None, examples=[-9.5])
+    max_tone: float | None = Field(None, examples=[8.1])
+
+
+class BatchAnalyticsResponse(BaseModel):
+    """Results of a batched analytics request, in request order."""
+
+    since: str | None = Field(None, examples=["2026-02-10"])
+    until: str | None = Field(None, examples=[None])
+    results: list[BatchAggregateResult] = Field(default_factory=list)
+
+
+class HeatmapTileResponse(BaseModel):
+    """Event counts per grid cell of one slippy-map tile."""
+
+    z: int = Field(..., description="Tile zoom.", examples=[3])
+    x: int = Field(..., description="Tile column.", examples=[4])
+    y: int = Field(..., description="Tile row.", examples=[4])
+    cell_zoom: int = Field(
+        ...,
+        description="Zoom of the cells (a cell is a tile of this zoom); below `z` when over-zoomed.",
+        examples=[9],
+    )
+    cells_per_side: int = Field(..., description="Cells per tile side.", examples=[64])
+    total: int = Field(..., description="Events in the tile.", examples=[1234])
+    cells: list[list[int]] = Field(
+        default_factory=list,
+        description="Non-empty cells as [column, row, n], from the tile's top-left corner.",
+        examples=[[[12, 30, 57], [13, 30, 4]]],
+    )
+
+
+class GraphEdge(BaseModel):
+    """Interactions from one actor (Actor1) to another (Actor2) over the range."""
+
+    source: str = Field(..., description="Actor1 code / country.", examples=["USA"])
+    target: str = Field(..., description="Actor2 code / country.", examples=["CHN"])
+    n: int = Field(..., description="Events.", examples=[1234])
+    avg_goldstein: float | None = Field(
+        None, description="Average GoldsteinScale of the events (None if unknown).", examples=[1.8]
+    )
+
+
+class GraphNeighborsResponse(BaseModel):
+    """Top partners of one actor."""
+
+    kind: str = Field(..., description="code | country.", examples=["country"])
+    actor: str = Field(..., description="Actor queried.", examples=["USA"])
+    direction: str = Field(..., description="out (actor is Actor1) | in (actor is Actor2).")
+    edges: list[GraphEdge] = Field(default_factory=list, description="Edges, most events first.")
+
+
+class GraphTopEdgesResponse(BaseModel):
+    """Most frequent interactions of the range."""
+
+    kind: str = Field(..., description="code | country.", examples=["country"])
+    edges: list[GraphEdge] = Field(default_factory=list, description="Edges, most events first.")
+
+
+class GraphHopNode(BaseModel):
+    """An actor reached from the start actor."""
+
+    actor: str = Field(..., examples=["RUS"])
+    hop: int = Field(..., description="Hops from the start actor.", examples=[2])
+    n: int = Field(..., description="Events on the edges that reached it.", examples=[42])
+
+
+class GraphKHopResponse(BaseModel):
+    """Actors reachable within k hops (top `fanout` out-edges per actor)."""
+
+    kind: str = Field(..., description="code | country.", examples=["country"])
+    actor: str = Field(..., description="Start actor.", examples=["USA"])
+    k: int = Field(..., description="Maximum hops.", examples=[2])
+    nodes: list[GraphHopNode] = Field(default_factory=list, description="By hop, then events.")
+    edges: list[GraphEdge] = Field(default_factory=list, description="Edges followed.")
+
+
+class SlowQueryOperator(BaseModel):
+    """One operator from a profiled DuckDB plan."""
+
+    name: str = Field(..., description="DuckDB operator name.", examples=["HASH_GROUP_BY"])
+    seconds: float = Field(..., description="Time spent in the operator.", examples=[0.42])
+    cardinality: int = Field(..., description="Rows produced by the operator.", examples=[250])
+    rows_scanned: int = Field(..., description="Rows scanned by the operator.", examples=[0])
+
+
+class SlowQueryProfile(BaseModel):
+    """Summary of DuckDB's JSON profiling output (only for profiled queries)."""
+
+    rows_returned: int | None = Field(None, description="Rows returned to the client.")
+    rows_scanned: int | None = Field(None, description="Rows scanned across all operators.")
+    bytes_read: int | None = Field(None, description="Bytes read from storage.")
+    files_scanned: int | None = Field(None, description="Parquet files read.")
+    peak_memory_bytes: int | None = Field(None, description="Peak DuckDB buffer memory.")
+    temp_dir_peak_bytes: int | None = Field(None, description="Peak spill (temp directory) size.")
+    operators: list[SlowQueryOperator] = Field(
+        default_factory=list,
+        description="Most expensive operators, slowest first.",
+    )
+
+
+class SlowQuery(BaseModel):
+    """One query slower than the configured threshold."""
+
+    kind: str = Field(..., description="Query family.", examples=["top_values"])
+    sql: str = Field(..., description="SQL text (whitespace collapsed).")
+    params: list = Field(default_factory=list, description="Bound parameters.")
+    started_at: str = Field(..., description="UTC ISO timestamp.")
+    duration_ms: float = Field(..., description="Execute + fetch duration.", examples=[1840.5])
+    profile: SlowQueryProfile | None = Field(
+        None,
+        description="DuckDB profile, present only when profiling applied to the query.",
+    )
+
+
+class SlowQueriesResponse(BaseModel):
+    """Content of the in-memory slow-query ring buffer (newest first)."""
+
+    threshold_ms: int = Field(..., description="Slow-query threshold.", examples=[500])
+    capacity: int = Field(..., description="Ring buffer capacity.", examples=[100])
+    count: int = Field(..., description="Number of entries returned.", examples=[3])
+    queries: list[SlowQuery] = Field(default_factory=list)
+
+
+class ViewCreateRequest(BaseModel):
+    """Definition of a continuous view (GROUP BY one events column over a window)."""
+
+    name: str = Field(
+        ...,
+        description="View name (lowercase, digits, '_' or '-').",
+        examples=["top-countries-today"],
+    )
+    group_by: str = Field(
+        ..., description="Events column to group by.", examples=["ActionGeo_CountryCode"]
+    )
+    metric: str = Field(
+        "count", description="`count` of rows or `avg` of `value_column`.", examples=["count", "avg"]
+    )
+    value_column: str | None = Field(
+        None, description="Numeric events column for `avg`.", examples=["AvgTone"]
+    )
+    window_days: int = Field(
+        1, ge=1, le=366, description="Partitions kept, newest first (1 = today).", examples=[1, 7]
+    )
+
+
+class ViewInfo(BaseModel):
+    """A continuous view: definition and current window."""
+
+    name: str = Field(..., examples=["top-countries-today"])
+    group_by: str = Field(..., examples=["ActionGeo_CountryCode"])
+    metric: str = Field(..., examples=["count"])
+    value_column: str | None = Field(None, examples=[None])
+    window_days: int = Field(..., examples=[1])
+    window: list[str] | None = Field(
+        None,
+        description="[first, last] partition covered.",
+        examples=[["2026-02-10", "2026-02-10"]],
+    )
+    batches: int = Field(..., description="Batches applied in the window.", examples=[96])
+    keys: int = Field(..., description="Distinct keys in the result.", examples=[212])
+
+
+class ViewListResponse(BaseModel):
+    """Registered continuous views."""
+
+    views: list[ViewInfo] = Field(default_factory=list)
+
+
+class ViewRow(BaseModel):
+    """One result row of a view."""
+
+    key: str = Field(..., examples=["US"])
+    n: int = Field(..., description="Rows in the window.", examples=[1523])
+    avg: float | None = Field(
+        None, description="Average of `value_column` (avg views only).", examples=[-1.8]
+    )
+
+
+class ViewRowsResponse(BaseModel):
+    """Materialized result of a view."""
+
+    view: ViewInfo
+    rows: list[ViewRow] = Field(default_factory=list)
+
+
+class ViewCheckResponse(BaseModel):
+    """A view compared with a full recomputation of its window."""
+
+    name: str = Field(..., examples=["top-countries-today"])
+    consistent: bool = Field(
+        ...,
+        description="True when every key matches and the view applied exactly the lake's batches.",
+        examples=[True],
+    )
+    keys: int = Field(..., description="Keys in the recomputed result.", examples=[212])
+    batches: int = Field(..., description="Lake batches of the window recomputed.", examples=[96])
+    mismatches: list[dict] = Field(default_factory=list, description="Differing keys (first 100).")
+    unapplied: list[str] = Field(
+        default_factory=list, description="Lake batches of the window the view missed (first 100)."
+    )
+    retired: list[str] = Field(
+        default_factory=list,
+        description="Batches applied but no longer in the lake, not recomputed (first 100).",
+    )
+
+
+class ExportRequest(BaseModel):
+    """Bulk export: events matching a filter over a date range, to one file."""
+
+    terms: list[str] = Field(
+        default_factory=list,
+        description="Rows containing any of these terms (case-insensitive, any column).",
+        examples=[["protest"]],
+    )
+    country: str | None = Field(None, description="ActionGeo_CountryCode.", examples=["FR"])
+    root_code: str | None = Field(None, description="EventRootCode (CAMEO).", examples=["14"])
+    since: str | None = Field(
+        None, description="First partition (YYYY-MM-DD).", examples=["2026-02-01"]
+    )
+    until: str | None = Field(
+        None, description="Last partition (YYYY-MM-DD).", examples=["2026-02-10"]
+    )
+    columns: list[str] = Field(
+        default_factory=list,
+        description="Events columns to write (empty = all).",
+        examples=[["GlobalEventID", "SQLDATE", "EventRootCode", "ActionGeo_CountryCode"]],
+    )
+    format: str = Field(
+        "parquet", description="`parquet` (zstd) or `csv`.", examples=["parquet", "csv"]
+    )
+    max_rows: int | None = Field(
+        None, ge=1, description="Row cap (at most EXPORT_MAX_ROWS).", examples=[1_000_000]
+    )
+
+
+class ExportJobResponse(BaseModel):
+    """State of a bulk export job."""
+
+    id: str = Field(..., examples=["3f2a9c0e5b7d4e8f9a1b2c3d4e5f6a7b"])
+    status: str = Field(
+        ..., description="`queued`, `running`, `done` or `failed`.", examples=["done"]
+    )
+    format: str = Field(..., examples=["parquet"])
+    created_at: float = Field(..., description="Unix time.", examples=[1770681600.0])
+    started_at: float | None = Field(None, examples=[1770681600.2])
+    finished_at: float | None = Field(None, examples=[1770681604.9])
+    expires_at: float | None = Field(
+        None,
+        description="When the job and its file are deleted (finished jobs).",
+        examples=[1770768004.9],
+    )
+    rows: int | None = Field(None, description="Rows written.", examples=[412339])
+    bytes: int | None = Field(None, description="File size.", examples=[18734112])
+    error: str | None = Field(None, examples=[None])
+    download_url: str | None = Field(
+        None,
+        description="Where to download the file (done jobs; supports Range requests).",
+        examples=["/api/v1/exports/3f2a9c0e5b7d4e8f9a1b2c3d4e5f6a7b/download"],
+    )
+
+
+class ExportListResponse(BaseModel):
+    """Export jobs still retained, newest first."""
+
+    jobs: list[ExportJobResponse] = Field(default_factory=list)
@@ -0,0 +1,523 @@
+"""app.services.actor_graph
+
+Actor interaction graph: who interacts with whom (Actor1 -> Actor2), per day.
+
+"Top Actor2 partners of an actor" used to be a GROUP BY over the raw events
+of the range on every request. The graph is maintained at ingest instead:
+
+- Two graphs (`KINDS`): actor codes (`Actor1Code` -> `Actor2Code`) and actor
+  countries (`Actor1CountryCode` -> `Actor2CountryCode`). Actors are encoded
+  as integers (append-only dictionary `nodes.json`, ids never change).
+- Each `dt` partition has one directed graph in CSR form (`Csr`): `indptr`
+  (per source), `indices` (targets, ascending), and per edge the event count
+  `n`, the sum of `GoldsteinScale` and the number of events carrying one
+  (average Goldstein = gsum / gn). Arrays are `.npy` files, memory-mapped.
+- Maintenance: `ingest_one` adds each events batch to its day (one GROUP BY of
+  the in-memory batch, then a vectorized NumPy merge with the day's CSR).
+  `sync()` adds the lake's events batches not applied yet (batches ingested by
+  another host, or before this feature). A day is rewritten into a fresh
+  directory and published by the manifest (`manifest.json`: day -> directory
+  and applied batches), written atomically under an exclusive `flock`, so
+  concurrent writers never double-count a batch and readers never see a
+  partial day. The directory a day replaces is retired (listed in the
+  manifest) and deleted `RETENTION_GRACE_SECONDS` later, like the lake's
+  retired files: another process still reading the previous manifest can
+  load it meanwhile (and a reader that missed it re-reads the manifest).
+- Queries over a date range merge the days' CSRs (concatenate, `np.unique`
+  on `source * nodes + target`, `np.bincount`), cached per range and manifest.
+- Retention (`app.services.retention`): a day outlives the events batches it
+  was built from once their partition is rolled up (the graph is itself a
+  rollup); `drop_days` removes it when the partition is dropped.
+
+Layout: `GRAPH_DIR` (default `{DATA_LAKE_PATH}/_graph`)/{kind}/
+`nodes.json`, `manifest.json`, `dt=YYYY-MM-DD.<token>/{indptr,indices,n,gsum,gn}.npy`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+
+from app.core.config import settings
+from app.domain.datasets import EVENTS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import get_lake_storage, lake_version
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer deployments only
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+KINDS: dict[str, tuple[str, str]] = {
+    "code": ("Actor1Code", "Actor2Code"),
+    "country": ("Actor1CountryCode", "Actor2CountryCode"),
+}
+ARRAYS = ("indptr", "indices", "n", "gsum", "gn")
+
+
+class GraphError(ValueError):
+    """Unknown actor."""
+
+
+def graph_dir() -> Path:
+    return Path(settings.graph_dir or Path(settings.data_lake_path) / "_graph")
+
+
+def edges_sql(con: duckdb.DuckDBPyConnection, source: str, kind: str) -> str | None:
+    """GROUP BY (src, dst, n, gsum, gn) over an events FROM expression; None if no actor column."""
+    a1, a2 = KINDS[kind]
+    cols = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+    if not {a1, a2} <= cols:
+        return None
+    tone = "try_cast(GoldsteinScale AS DOUBLE)" if "GoldsteinScale" in cols else "NULL::DOUBLE"
+    return f"""
+    SELECT CAST({a1} AS VARCHAR) AS src, CAST({a2} AS VARCHAR) AS dst,
+           COUNT(*) AS n, COALESCE(SUM({tone}), 0) AS gsum, COUNT({tone}) AS gn
+    FROM {source}
+    WHERE length(CAST({a1} AS VARCHAR)) > 0 AND length(CAST({a2} AS VARCHAR)) > 0
+    GROUP BY ALL
+    """
+
+
+@dataclass
+class Csr:
+    """Directed weighted graph in compressed sparse row form."""
+
+    indptr: np.ndarray  # int64, nodes + 1
+    indices: np.ndarray  # int32 targets, ascending within a row
+    n: np.ndarray  # int64 events per edge
+    gsum: np.ndarray  # float64 sum of GoldsteinScale
+    gn: np.ndarray  # int64 events with a GoldsteinScale
+
+    @property
+    def nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    def sources(self) -> np.ndarray:
+        """Source id of every edge (COO row)."""
+        return np.repeat(np.arange(self.nodes, dtype=np.int64), np.diff(self.indptr))
+
+    def row(self, node: int) -> slice:
+        if node >= self.nodes:
+            return slice(0, 0)
+        return slice(int(self.indptr[node]), int(self.indptr[node + 1]))
+
+    @classmethod
+    def from_edges(
+        cls,
+        src: np.ndarray,
+        dst: np.ndarray,
+        n: np.ndarray,
+        gsum: np.ndarray,
+        gn: np.ndarray,
+        nodes: int,
+    ) -> Csr:
+        """CSR of COO edges over `nodes` ids; duplicate edges are summed."""
+        key = src.astype(np.int64) * nodes + dst
+        uniq, inverse = np.unique(key, return_inverse=True)
+        sources = uniq // nodes
+        return cls(
+            indptr=np.searchsorted(sources, np.arange(nodes + 1)).astype(np.int64),
+            indices=(uniq % nodes).astype(np.int32),
+            n=np.bincount(inverse, weights=n, minlength=len(uniq)).astype(np.int64),
+            gsum=np.bincount(inverse, weights=gsum, minlength=len(uniq)),
+            gn=np.bincount(inverse, weights=gn, minlength=len(uniq)).astype(np.int64),
+        )
+
+    @classmethod
+    def merge(cls, graphs: list[Csr], nodes: int) -> Csr:
+        """Sum of several graphs (e.g. the days of a range), over `nodes` ids."""
+        return cls.from_edges(
+            np.concatenate([g.sources() for g in graphs]),
+            np.concatenate([g.indices for g in graphs]),
+            np.concatenate([g.n for g in graphs]),
+            np.concatenate([g.gsum for g in graphs]),
+            np.concatenate([g.gn for g in graphs]),
+            nodes,
+        )
+
+    def save(self, directory: Path) -> None:
+        directory.mkdir(parents=True)
+        for name in ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: Path) -> Csr:
+        return cls(**{name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAYS})
+
+
+def _empty(nodes: int) -> Csr:
+    return Csr(
+        indptr=np.zeros(nodes + 1, np.int64),
+        indices=np.zeros(0, np.int32),
+        n=np.zeros(0, np.int64),
+        gsum=np.zeros(0, np.float64),
+        gn=np.zeros(0, np.int64),
+    )
+
+
+@dataclass
+class KindState:
+    """What the manifest of one graph published (as last read by this process)."""
+
+    days: dict[str, dict[str, Any]] = field(default_factory=dict)  # dt -> {"dir", "batches"}
+    retired: dict[str, float] = field(default_factory=dict)  # superseded dir -> retired at
+    labels: list[str] = field(default_factory=list)
+    ids: dict[str, int] = field(default_factory=dict)
+    mtime_ns: int | None = None
+
+    def applied(self) -> set[str]:
+        return {uri for day in self.days.values() for uri in day["batches"]}
+
+
+class ActorGraph:
+    """Per-day actor interaction graphs on disk, and range queries over them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._states: dict[str, KindState] = {}
+        self._days: dict[tuple[str, str], Csr] = {}  # (kind, dir) -> memory-mapped day
+        self._merged: OrderedDict[tuple, Csr] = OrderedDict()
+        self._synced_version: str | None = None
+
+    # -- storage ---------------------------------------------------------------
+
+    @staticmethod
+    def _root(kind: str) -> Path:
+        return graph_dir() / kind
+
+    @contextlib.contextmanager
+    def _writers_lock(self) -> Iterator[None]:
+        """Serialize day rewrites across processes (ingest, API sync)."""
+        graph_dir().mkdir(parents=True, exist_ok=True)
+        with self._lock, (graph_dir() / "_graph.lock").open("a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _state(self, kind: str, fresh: bool = False) -> KindState:
+        """The published state of `kind`, re-read when its manifest changed (always if `fresh`)."""
+        manifest = self._root(kind) / "manifest.json"
+        try:
+            mtime_ns = manifest.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        state = self._states.get(kind)
+        if state is not None and state.mtime_ns == mtime_ns and not fresh:
+            return state
+        state = KindState(mtime_ns=mtime_ns)
+        if mtime_ns is not None:
+            published = json.loads(manifest.read_text())
+            state.days = published["days"]
+            state.retired = published.get("retired", {})
+            state.labels = json.loads((self._root(kind) / "nodes.json").read_text())
+            state.ids = {label: i for i, label in enumerate(state.labels)}
+        self._states[kind] = state
+        current = {(kind, day["dir"]) for day in state.days.values()}
+        for key in [k for k in self._days if k[0] == kind and k not in current]:
+            del self._days[key]
+        return state
+
+    def _day(self, kind: str, directory: str) -> Csr:
+        key = (kind, directory)
+        day = self._days.get(key)
+        if day is None:
+            day = self._days[key] = Csr.load(self._root(kind) / directory)
+        return day
+
+    def _publish(self, kind: str, state: KindState, superseded: list[str]) -> None:
+        """Publish `state`, retiring the `superseded` day directories (caller holds the lock).
+
+        Directories retired more than `RETENTION_GRACE_SECONDS` ago are deleted
+        once the manifest no longer lists them.
+        """
+        root = self._root(kind)
+        now = time.time()
+        cutoff = now - settings.retention_grace_seconds
+        retired = {d: at for d, at in state.retired.items() if at > cutoff}
+        retired.update(dict.fromkeys(superseded, now))
+        manifest = {"days": state.days, "retired": retired}
+        for name, data in (("nodes.json", state.labels), ("manifest.json", manifest)):
+            tmp = root / f"{name}.tmp{os.getpid()}"
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, root / name)
+        for directory in state.retired.keys() - retired.keys():
+            shutil.rmtree(root / directory, ignore_errors=True)
+
+    # -- maintenance -----------------------------------------------------------
+
+    def _apply(self, kind: str, dt: str, uris: list[str], edges: list[tuple]) -> None:
+        """Add the edges of batches `uris` to day `dt` (caller holds the writers lock)."""
+        state = self._state(kind, fresh=True)
+        labels = list(state.labels)
+        ids = dict(state.ids)
+
+        def encode(label: str) -> int:
+            i = ids.get(label)
+            if i is None:
+                i = ids[label] = len(labels)
+                labels.append(label)
+            return i
+
+        day = state.days.get(dt)
+        graphs = [self._day(kind, day["dir"])] if day else []
+        if edges:
+            src, dst, n, gsum, gn = zip(*edges)
+            graphs.append(
+                Csr.from_edges(
+                    np.fromiter((encode(s) for s in src), np.int64, len(src)),
+                    np.fromiter((encode(d) for d in dst), np.int64, len(dst)),
+                    np.asarray(n, np.int64),
+                    np.asarray(gsum, np.float64),
+                    np.asarray(gn, np.int64),
+                    len(labels),
+                )
+            )
+        merged = Csr.merge(graphs, len(labels)) if graphs else _empty(len(labels))
+        directory = f"dt={dt}.{time.time_ns()}"
+        merged.save(self._root(kind) / directory)
+
+        days = dict(state.days)
+        days[dt] = {"dir": directory, "batches": [*(day["batches"] if day else []), *uris]}
+        self._publish(
+            kind,
+            KindState(days=days, labels=labels, retired=state.retired),
+            [day["dir"]] if day else [],
+        )
+
+    def add_batch(self, dt: str, uri: str, table: pa.Table) -> None:
+        """Add one in-memory events batch to every graph (ingest)."""
+        con = connect(query_class_for("graph"))
+        con.register("graph_batch", table)
+        with self._writers_lock():
+            for kind in KINDS:
+                if uri in self._state(kind, fresh=True).applied():
+                    continue
+                sql = edges_sql(con, "graph_batch", kind)
+                edges = con.execute(sql).fetchall() if sql else []
+                self._apply(kind, dt, [uri], edges)
+
+    def sync(self, force: bool = False) -> int:
+        """Add the lake's events batches missing from the graphs; return how many were added."""
+        version = lake_version()
+        with self._lock:
+            if not force and version == self._synced_version:
+                return 0
+        storage = get_lake_storage()
+        batches = storage.batches(EVENTS)
+        added: set[str] = set()
+        with self._writers_lock():
+            for kind in KINDS:
+                applied = self._state(kind, fresh=True).applied()
+                missing: dict[str, list[str]] = {}
+                for b in batches:
+                    if b.uri not in applied:
+                        missing.setdefault(b.dt, []).append(b.uri)
+                for dt, uris in sorted(missing.items()):
+                    con = connect(query_class_for("graph"))
+                    source = storage.scan(con, "", sorted(uris))
+                    sql = edges_sql(con, source, kind)
+                    self._apply(kind, dt, sorted(uris), con.execute(sql).fetchall() if sql else [])
+                    added.update(uris)
+            self._synced_version = version
+        if added:
+            logger.info("Actor graph: %s batch(es) added from the lake", len(added))
+        return len(added)
+
+    def drop_days(self, before: str, dry_run: bool = False) -> list[str]:
+        """Remove the days older than `before` from every graph (retention); return them."""
+        dropped: set[str] = set()
+        with self._writers_lock():
+            for kind in KINDS:
+                state = self._state(kind, fresh=True)
+                old = [dt for dt in state.days if dt < before]
+                dropped.update(old)
+                if dry_run or not old:
+                    continue
+                days = {dt: day for dt, day in state.days.items() if dt >= before}
+                self._publish(
+                    kind,
+                    KindState(days=days, labels=state.labels, retired=state.retired),
+                    [state.days[dt]["dir"] for dt in old],
+                )
+        return sorted(dropped)
+
+    # -- queries ---------------------------------------------------------------
+
+    def _range(self, kind: str, since: str | None, until: str | None) -> tuple[Csr, KindState]:
+        """Graph of the days within [since, until], and the state it was built from."""
+        self.sync()
+        with self._lock:
+            for fresh in (False, True):
+                state = self._state(kind, fresh=fresh)
+                dirs = tuple(
+                    day["dir"]
+                    for dt, day in sorted(state.days.items())
+                    if (not since or dt >= since) and (not until or dt <= until)
+                )
+                key = (kind, dirs, len(state.labels))
+                graph = self._merged.get(key)
+                if graph is not None:
+                    self._merged.move_to_end(key)
+                    return graph, state
+                try:
+                    days = [self._day(kind, d) for d in dirs]
+                    break
+                except FileNotFoundError:
+                    # Retired past the grace period since this process read the manifest.
+                    if fresh:
+                        raise
+        if not days:
+            graph = _empty(len(state.labels))
+        elif len(days) == 1:
+            graph = days[0]
+        else:
+            graph = Csr.merge(days, len(state.labels))
+        with self._lock:
+            self._merged[key] = graph
+            while len(self._merged) > settings.graph_cache_ranges:
+                self._merged.popitem(last=False)
+        return graph, state
+
+    @staticmethod
+    def _node(state: KindState, actor: str) -> int:
+        i = state.ids.get(actor.strip().upper())
+        if i is None:
+            raise GraphError(f"unknown actor {actor!r}")
+        return i
+
+    @staticmethod
+    def _edges(
+        state: KindState, src: np.ndarray, dst: np.ndarray, graph: Csr, idx: np.ndarray
+    ) -> list[dict]:
+        out = []
+        for s, d, i in zip(src.tolist(), dst.tolist(), idx.tolist()):
+            gn = int(graph.gn[i])
+            out.append(
+                {
+                    "source": state.labels[s],
+                    "target": state.labels[d],
+                    "n": int(graph.n[i]),
+                    "avg_goldstein": float(graph.gsum[i]) / gn if gn else None,
+                }
+            )
+        return out
+
+    @staticmethod
+    def _top(weights: np.ndarray, limit: int) -> np.ndarray:
+        """Indices of the `limit` largest weights, largest first (ties: lowest index)."""
+        order = np.argsort(-weights, kind="stable")
+        return order[:limit]
+
+    def neighbors(
+        self,
+        kind: str,
+        actor: str,
+        since: str | None,
+        until: str | None,
+        direction: str = "out",
+        limit: int = 20,
+    ) -> dict:
+        """Top partners of `actor`: targets (`out`, Actor1 -> Actor2) or sources (`in`)."""
+        graph, state = self._range(kind, since, until)
+        node = self._node(state, actor)
+        if direction == "out":
+            row = graph.row(node)
+            idx = np.arange(row.start, row.stop)
+        else:
+            idx = np.flatnonzero(graph.indices == node)
+        idx = idx[self._top(graph.n[idx], limit)]
+        src = np.searchsorted(graph.indptr, idx, side="right") - 1
+        edges = self._edges(state, src, graph.indices[idx], graph, idx)
+        return {"kind": kind, "actor": state.labels[node], "direction": direction, "edges": edges}
+
+    def top_edges(self, kind: str, since: str | None, until: str | None, limit: int = 20) -> dict:
+        """Most frequent interactions of the range."""
+        graph, state = self._range(kind, since, until)
+        idx = self._top(graph.n, limit)
+        src = np.searchsorted(graph.indptr, idx, side="right") - 1
+        return {"kind": kind, "edges": self._edges(state, src, graph.indices[idx], graph, idx)}
+
+    def k_hop(
+        self,
+        kind: str,
+        actor: str,
+        k: int,
+        since: str | None,
+        until: str | None,
+        fanout: int = 10,
+        limit: int = 200,
+    ) -> dict:
+        """Actors reachable in at most `k` hops, following each actor's top `fanout` out-edges.
+
+        Breadth-first and vectorized per hop: the frontier's out-edges are
+        gathered from `indptr`, ranked by count within each source, and the
+        targets not reached yet form the next frontier. A node's `n` is the
+        event count of the edges that reached it.
+        """
+        graph, state = self._range(kind, since, until)
+        start = self._node(state, actor)
+        hops = np.full(len(state.labels), -1, np.int64)
+        weight = np.zeros(len(state.labels), np.int64)
+        hops[start] = 0
+        frontier = np.array([start], np.int64)
+        edges: list[dict] = []
+        for hop in range(1, k + 1):
+            frontier = frontier[frontier < graph.nodes]
+            starts, stops = graph.indptr[frontier], graph.indptr[frontier + 1]
+            sizes = stops - starts
+            if not sizes.sum():
+                break
+            src = np.repeat(frontier, sizes)
+            idx = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+            # Top `fanout` edges of each source: sort by (source, -n), rank within source.
+            order = np.lexsort((-graph.n[idx], src))
+            src, idx = src[order], idx[order]
+            first = np.searchsorted(src, src, side="left")
+            keep = np.arange(len(src)) - first < fanout
+            src, idx = src[keep], idx[keep]
+            dst = graph.indices[idx].astype(np.int64)
+            edges.extend(self._edges(state, src, dst, graph, idx))
+            reaching = hops[dst] < 0
+            np.add.at(weight, dst[reaching], graph.n[idx][reaching])
+            new = np.unique(dst[reaching])
+            hops[new] = hop
+            frontier = new
+            if not len(frontier):
+                break
+        reached = np.flatnonzero(hops > 0)
+        order = np.lexsort((-weight[reached], hops[reached]))[:limit]
+        nodes = [
+            {"actor": state.labels[i], "hop": int(hops[i]), "n": int(weight[i])}
+            for i in reached[order].tolist()
+        ]
+        return {
+            "kind": kind,
+            "actor": state.labels[start],
+            "k": k,
+            "nodes": nodes,
+            "edges": edges[:limit],
+        }
+
+
+actor_graph = ActorGraph()
@@ -0,0 +1,253 @@
+"""app.services.actor_index
+
+Fuzzy / partial actor and location name search ("Madagasc", "Rajoelna").
+
+A LIKE over every column of every event row cannot match misspellings and
+scans the whole lake. Names are a tiny dictionary compared to event rows, so
+they are indexed separately:
+
+- At ingest, each events batch gets a side table (`actor_names` dataset, same
+  `dt=` / `batch_ts=` layout): its distinct non-empty `Actor1Name`,
+  `Actor2Name`, `Actor1Geo_FullName`, `Actor2Geo_FullName`,
+  `ActionGeo_FullName` values with the column they came from and their row
+  count (`actor_names_table`).
+- Each API worker keeps an in-memory trigram index over the distinct names of
+  the whole lake (`ActorIndex`), extended once per lake version with the
+  dictionaries of new batches only. Batches ingested before this feature (no
+  side table) are indexed from their events file once. If a batch disappears
+  from the lake, the index is rebuilt.
+- A lookup takes the names sharing the most trigrams with the query
+  (`ACTOR_SEARCH_CANDIDATES`), ranks them with RapidFuzz (`WRatio` over
+  normalized names: case and punctuation insensitive) and keeps those scoring
+  at least `min_score`.
+- Matches are mapped back to events with one DuckDB query restricted to the
+  `dt=` partitions where the matched names occur (kept per name by the index)
+  and to the columns they occur in.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+import duckdb
+import pyarrow as pa
+
+from app.core.config import settings
+from app.domain.datasets import ACTOR_NAMES, EVENTS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import BatchRef, get_lake_storage, lake_version
+
+logger = logging.getLogger(__name__)
+
+ACTOR_FIELDS = ("Actor1Name", "Actor2Name")
+LOCATION_FIELDS = ("Actor1Geo_FullName", "Actor2Geo_FullName", "ActionGeo_FullName")
+NAME_FIELDS = ACTOR_FIELDS + LOCATION_FIELDS
+KINDS: dict[str, tuple[str, ...]] = {
+    "actor": ACTOR_FIELDS,
+    "location": LOCATION_FIELDS,
+    "all": NAME_FIELDS,
+}
+
+_FIELD_BITS = {name: 1 << i for i, name in enumerate(NAME_FIELDS)}
+
+
+def _mask(fields: tuple[str, ...]) -> int:
+    return sum(_FIELD_BITS[f] for f in fields)
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, alphanumerics and single spaces (what trigrams and scores compare)."""
+    return " ".join("".join(c if c.isalnum() else " " for c in text.lower()).split())
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def actor_names_table(con: duckdb.DuckDBPyConnection, source: str) -> pa.Table:
+    """Distinct names of an events FROM expression: (name, field, n), empty if no name column."""
+    cols = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+    parts = [
+        f"SELECT CAST({f} AS VARCHAR) AS name, '{f}' AS field FROM {source}"
+        for f in NAME_FIELDS
+        if f in cols
+    ]
+    if not parts:
+        return pa.table(
+            {
+                "name": pa.array([], pa.string()),
+                "field": pa.array([], pa.string()),
+                "n": pa.array([], pa.int64()),
+            }
+        )
+    sql = f"""
+    SELECT name, field, COUNT(*) AS n
+    FROM ({" UNION ALL ".join(parts)})
+    WHERE name IS NOT NULL AND length(name) > 0
+    GROUP BY ALL
+    ORDER BY field, name
+    """
+    return con.execute(sql).fetch_arrow_table()
+
+
+def batch_actor_names(table: pa.Table) -> pa.Table:
+    """Distinct names of one in-memory events batch (ingest)."""
+    con = connect(query_class_for("actors"))
+    con.register("events_batch", table)
+    return actor_names_table(con, "events_batch")
+
+
+@dataclass
+class ActorMatch:
+    """One indexed name ranked for a query."""
+
+    name: str
+    score: float
+    n: int
+    fields: list[str] = field(default_factory=list)
+
+
+class ActorIndex:
+    """Trigram index over the distinct actor / location names of the lake."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.names: list[str] = []  # original spelling (first seen)
+        self._normalized: list[str] = []
+        self._spellings: list[set[str]] = []  # raw values as stored in events
+        self._ids: dict[str, int] = {}  # normalized -> id
+        self._masks: list[int] = []  # fields the name occurs in
+        self._counts: list[int] = []  # event rows carrying the name
+        self._dts: list[set[str]] = []  # partitions the name occurs in
+        self._postings: dict[str, array] = {}
+        self._indexed: set[str] = set()  # events batch URIs
+        self._version: str | None = None
+
+    # -- building --------------------------------------------------------------
+
+    def _add(self, name: str, field_name: str, n: int, dt: str) -> None:
+        key = _normalize(name)
+        if not key:
+            return
+        i = self._ids.get(key)
+        if i is None:
+            i = len(self.names)
+            self._ids[key] = i
+            self.names.append(name)
+            self._normalized.append(key)
+            self._spellings.append(set())
+            self._masks.append(0)
+            self._counts.append(0)
+            self._dts.append(set())
+            for gram in _trigrams(key):
+                self._postings.setdefault(gram, array("I")).append(i)
+        self._spellings[i].add(name)
+        self._masks[i] |= _FIELD_BITS.get(field_name, 0)
+        self._counts[i] += n
+        self._dts[i].add(dt)
+
+    def _batch_names(self, batch: BatchRef, dictionaries: dict[tuple[str, str], str]) -> pa.Table:
+        storage = get_lake_storage()
+        uri = dictionaries.get((batch.dt, batch.ts))
+        if uri is not None:
+            return storage.read_table(uri)
+        # Batch ingested before the side table existed: read its name columns once.
+        con = connect(query_class_for("actors"))
+        return actor_names_table(con, storage.scan(con, batch.uri, [batch.uri]))
+
+    def sync(self) -> int:
+        """Index the batches added since the last call; return how many were indexed."""
+        version = lake_version()
+        with self._lock:
+            if version == self._version:
+                return 0
+            storage = get_lake_storage()
+            batches = storage.batches(EVENTS)
+            uris = {b.uri for b in batches}
+            if not self._indexed <= uris:
+                logger.info("Actor index: batches removed from the lake, rebuilding")
+                self._clear()
+            dictionaries = {(b.dt, b.ts): b.uri for b in storage.batches(ACTOR_NAMES)}
+            added = 0
+            for batch in batches:
+                if batch.uri in self._indexed:
+                    continue
+                names = self._batch_names(batch, dictionaries)
+                for name, field_name, n in zip(
+                    names.column("name").to_pylist(),
+                    names.column("field").to_pylist(),
+                    names.column("n").to_pylist(),
+                ):
+                    self._add(name, field_name, n, batch.dt)
+                self._indexed.add(batch.uri)
+                added += 1
+            self._version = version
+        if added:
+            logger.info("Actor index: %s batch(es) added, %s names", added, len(self.names))
+        return added
+
+    # -- lookup ----------------------------------------------------------------
+
+    def lookup(
+        self, query: str, kind: str = "all", limit: int = 10, min_score: float = 70.0
+    ) -> list[ActorMatch]:
+        """Names closest to `query` (best first), among those occurring in `kind` columns."""
+        from rapidfuzz import fuzz, process  # ~80 ms import: first lookup only
+
+        key = _normalize(query)
+        if not key:
+            return []
+        wanted = _mask(KINDS[kind])
+        with self._lock:
+            shared: Counter[int] = Counter()
+            for gram in _trigrams(key):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    shared.update(posting)
+            best = heapq.nlargest(
+                settings.actor_search_candidates,
+                (i for i in shared if self._masks[i] & wanted),
+                key=shared.__getitem__,
+            )
+            choices = {i: self._normalized[i] for i in best}
+            ranked = process.extract(
+                key, choices, scorer=fuzz.WRatio, processor=None, limit=limit, score_cutoff=min_score
+            )
+            return [
+                ActorMatch(
+                    name=self.names[i],
+                    score=round(score, 2),
+                    n=self._counts[i],
+                    fields=[f for f in KINDS[kind] if self._masks[i] & _FIELD_BITS[f]],
+                )
+                for _, score, i in sorted(ranked, key=lambda r: (-r[1], -self._counts[r[2]], r[2]))
+            ]
+
+    def resolve(self, names: list[str]) -> tuple[list[str], set[str]]:
+        """(raw spellings stored in events, `dt=` partitions) of indexed `names`."""
+        with self._lock:
+            spellings: set[str] = set()
+            dts: set[str] = set()
+            for name in names:
+                i = self._ids.get(_normalize(name))
+                if i is not None:
+                    spellings |= self._spellings[i]
+                    dts |= self._dts[i]
+            return sorted(spellings), dts
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"names": len(self.names), "trigrams": len(self._postings), "batches": len(self._indexed)}
+
+
+actor_index = ActorIndex()
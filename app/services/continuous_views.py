@@ -0,0 +1,403 @@
+"""app.services.continuous_views
+
+Continuous queries: named aggregation views maintained incrementally per batch.
+
+Dashboards run the same aggregations all day (top countries today, tone per
+event root code over 7 days). A continuous view keeps their result
+materialized instead of rescanning the lake:
+
+- Definition (`ViewSpec`): GROUP BY one events column, `count` of rows or
+  `avg` of a numeric column, over the last `window_days` partitions.
+- State: per `dt` partition and key, the partial aggregates (rows, non-null
+  values, sum), plus their running totals. Every aggregate is decomposable, so
+  a new batch only adds its delta (one GROUP BY over that batch), and a
+  partition leaving the window is retracted by subtracting its partials.
+- Window: anchored on the newest partition applied (data time, not wall clock),
+  so `window_days=1` is "today's partition".
+- Reads are O(result size): the sorted rows are cached until the next update.
+- Persistence: one JSON file per view under `VIEWS_DIR` (default
+  `{DATA_LAKE_PATH}/_views`), written atomically, holding the definition,
+  the partials and the batches applied. Views survive restarts.
+- Sources of batches: the ingestion batch listener (the batch is already in
+  memory) and `sync()`, which applies any batch of the window not applied yet
+  (batches ingested by other processes, or while the API was down). Since the
+  applied batches are stored with the state, a view is never double-counted
+  and a concurrent writer's lost update is re-applied on the next sync.
+- `check()` recomputes the window from the lake batches and compares, and
+  lists the batches only one side has (missed by the view, or no longer in
+  the lake).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa
+
+from app.core.config import settings
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import get_lake_storage, lake_version, partition_dates
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("count", "avg")
+_NAME = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+# key -> [rows, non-null values, sum of values]
+Partials = dict[str, list[float]]
+
+
+class ViewError(ValueError):
+    """Invalid view definition or unknown view."""
+
+
+@dataclass(frozen=True)
+class ViewSpec:
+    """What a continuous view computes."""
+
+    name: str
+    group_by: str
+    metric: str = "count"
+    value_column: str | None = None
+    window_days: int = 1
+
+    def validate(self) -> None:
+        """Raise ViewError if the definition cannot be maintained."""
+        if not _NAME.match(self.name):
+            raise ViewError("name: lowercase letters, digits, '_' or '-' (max 64)")
+        if self.group_by not in EVENTS_COLUMNS:
+            raise ViewError(f"group_by: unknown events column {self.group_by!r}")
+        if self.metric not in METRICS:
+            raise ViewError(f"metric: one of {', '.join(METRICS)}")
+        if self.metric == "avg" and self.value_column not in EVENTS_COLUMNS:
+            raise ViewError(f"value_column: unknown events column {self.value_column!r}")
+        if not 1 <= self.window_days <= 366:
+            raise ViewError("window_days: 1..366")
+
+    def columns(self) -> set[str]:
+        """Events columns the view reads."""
+        return {self.group_by} | (
+            {self.value_column} if self.metric == "avg" and self.value_column else set()
+        )
+
+    def delta_sql(self, source: str) -> str:
+        """GROUP BY returning (key, rows, non-null values, sum) over `source`."""
+        value = (
+            f"try_cast({self.value_column} AS DOUBLE)" if self.metric == "avg" else "NULL::DOUBLE"
+        )
+        return f"""
+        SELECT CAST({self.group_by} AS VARCHAR) AS key,
+               COUNT(*) AS n, COUNT({value}) AS nv, COALESCE(SUM({value}), 0) AS s
+        FROM {source}
+        WHERE {self.group_by} IS NOT NULL AND length(CAST({self.group_by} AS VARCHAR)) > 0
+        GROUP BY ALL
+        """
+
+
+@dataclass
+class ContinuousView:
+    """Incrementally maintained state of one view."""
+
+    spec: ViewSpec
+    partials: dict[str, Partials] = field(default_factory=dict)  # dt -> key -> partials
+    applied: dict[str, list[str]] = field(default_factory=dict)  # dt -> batch URIs
+    totals: Partials = field(default_factory=dict)
+    _rows: list[dict] | None = field(default=None, repr=False)
+
+    def window(self) -> tuple[str, str] | None:
+        """(first, last) partition of the window, None before any batch."""
+        if not self.partials:
+            return None
+        last = max(self.partials)
+        try:
+            first = (
+                date.fromisoformat(last) - timedelta(days=self.spec.window_days - 1)
+            ).isoformat()
+        except ValueError:
+            first = last
+        return first, last
+
+    def in_window(self, dt: str) -> bool:
+        w = self.window()
+        return w is None or dt >= w[0]
+
+    def is_applied(self, dt: str, uri: str) -> bool:
+        return uri in self.applied.get(dt, ())
+
+    def apply(self, dt: str, uri: str, delta: Partials) -> None:
+        """Add one batch's delta to partition `dt`, then retract expired partitions."""
+        part = self.partials.setdefault(dt, {})
+        for key, values in delta.items():
+            for target in (part, self.totals):
+                acc = target.setdefault(key, [0, 0, 0.0])
+                for i, v in enumerate(values):
+                    acc[i] += v
+        self.applied.setdefault(dt, []).append(uri)
+        self._retract_expired()
+        self._rows = None
+
+    def _retract_expired(self) -> None:
+        first, _ = self.window() or ("", "")
+        for dt in [d for d in self.partials if d < first]:
+            for key, values in self.partials.pop(dt).items():
+                acc = self.totals[key]
+                for i, v in enumerate(values):
+                    acc[i] -= v
+                if acc[0] <= 0:
+                    del self.totals[key]
+            self.applied.pop(dt, None)
+
+    def rows(self) -> list[dict]:
+        """Result rows (cached until the next update): n desc, then key."""
+        if self._rows is None:
+            out = []
+            for key, (n, nv, s) in self.totals.items():
+                row: dict[str, Any] = {"key": key, "n": int(n)}
+                if self.spec.metric == "avg":
+                    row["avg"] = s / nv if nv else None
+                out.append(row)
+            out.sort(key=lambda r: (-r["n"], r["key"]))
+            self._rows = out
+        return self._rows
+
+    # -- persistence -----------------------------------------------------------
+
+    def to_json(self) -> dict:
+        return {"spec": asdict(self.spec), "partials": self.partials, "applied": self.applied}
+
+    @classmethod
+    def from_json(cls, data: dict) -> ContinuousView:
+        view = cls(
+            spec=ViewSpec(**data["spec"]), partials=data["partials"], applied=data["applied"]
+        )
+        for part in view.partials.values():
+            for key, values in part.items():
+                acc = view.totals.setdefault(key, [0, 0, 0.0])
+                for i, v in enumerate(values):
+                    acc[i] += v
+        return view
+
+
+def _close(a: float | None, b: float | None) -> bool:
+    if a is None or b is None:
+        return a is b
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def _delta_from_rows(rows: list[tuple]) -> Partials:
+    return {key: [n, nv, s] for key, n, nv, s in rows}
+
+
+class ViewManager:
+    """Registry of the continuous views of this process, persisted on disk."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._views: dict[str, ContinuousView] = {}
+        self._mtimes: dict[str, float] = {}
+        self._synced_version: str | None = None
+
+    # -- storage ---------------------------------------------------------------
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.views_dir or Path(settings.data_lake_path) / "_views")
+
+    def _path(self, name: str) -> Path:
+        return self.directory() / f"{name}.json"
+
+    def _save(self, view: ContinuousView) -> None:
+        path = self._path(view.spec.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(view.to_json()))
+        os.replace(tmp, path)
+        self._mtimes[view.spec.name] = path.stat().st_mtime
+
+    def _load_changed(self) -> None:
+        """(Re)load views whose file changed (other processes, restarts); forget deleted ones."""
+        on_disk = (
+            {p.stem: p for p in self.directory().glob("*.json")}
+            if self.directory().exists()
+            else {}
+        )
+        for name in [n for n in self._views if n not in on_disk]:
+            del self._views[name]
+            self._mtimes.pop(name, None)
+        for name, path in on_disk.items():
+            mtime = path.stat().st_mtime
+            if self._mtimes.get(name) == mtime and name in self._views:
+                continue
+            try:
+                self._views[name] = ContinuousView.from_json(json.loads(path.read_text()))
+                self._mtimes[name] = mtime
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Continuous view %s: cannot load %s (%s)", name, path, exc)
+
+    # -- batches ---------------------------------------------------------------
+
+    def _window_batches(self, view: ContinuousView, dates: list[str]) -> list[tuple[str, str]]:
+        """(dt, uri) of lake batches in the view's window (as it would be with the newest dt)."""
+        if not dates:
+            return []
+        newest = max([dates[-1], *view.partials])
+        try:
+            first = (
+                date.fromisoformat(newest) - timedelta(days=view.spec.window_days - 1)
+            ).isoformat()
+        except ValueError:
+            first = newest
+        storage = get_lake_storage()
+        return [(b.dt, b.uri) for b in storage.batches() if first <= b.dt <= newest]
+
+    def _apply_from_lake(self, view: ContinuousView, batches: list[tuple[str, str]]) -> bool:
+        """Apply the not-yet-applied lake batches: one GROUP BY per partition."""
+        missing: dict[str, list[str]] = {}
+        for dt, uri in batches:
+            if not view.is_applied(dt, uri):
+                missing.setdefault(dt, []).append(uri)
+        if not missing:
+            return False
+        con = connect(query_class_for("views"))
+        storage = get_lake_storage()
+        for dt in sorted(missing):
+            source = storage.scan(con, "", sorted(missing[dt]))
+            delta = _delta_from_rows(con.execute(view.spec.delta_sql(source)).fetchall())
+            # The partition's delta is recorded once, with all its batches.
+            for k, uri in enumerate(sorted(missing[dt])):
+                view.apply(dt, uri, delta if k == 0 else {})
+        return True
+
+    def sync(self, force: bool = False) -> None:
+        """Bring every view up to date with the lake (cheap when the lake version is unchanged)."""
+        version = lake_version()
+        with self._lock:
+            self._load_changed()
+            if not force and version == self._synced_version:
+                return
+            dates = partition_dates()
+            for view in self._views.values():
+                if self._apply_from_lake(view, self._window_batches(view, dates)):
+                    self._save(view)
+            self._synced_version = version
+
+    def on_batch(self, dt: str, ts: str, uri: str, table: pa.Table) -> None:
+        """Ingestion batch listener: apply the in-memory batch's delta to every view."""
+        with self._lock:
+            self._load_changed()
+            if not self._views:
+                return
+            con = connect(query_class_for("views"))
+            con.register("view_batch", table)
+            for view in self._views.values():
+                if view.is_applied(dt, uri) or not view.in_window(dt):
+                    continue
+                if not view.spec.columns() <= set(table.column_names):
+                    continue
+                view.apply(
+                    dt,
+                    uri,
+                    _delta_from_rows(con.execute(view.spec.delta_sql("view_batch")).fetchall()),
+                )
+                self._save(view)
+
+    def attach(self) -> None:
+        from app.services.ingest import add_batch_listener
+
+        add_batch_listener(self.on_batch)
+
+    def detach(self) -> None:
+        from app.services.ingest import remove_batch_listener
+
+        remove_batch_listener(self.on_batch)
+
+    # -- API -------------------------------------------------------------------
+
+    def create(self, spec: ViewSpec) -> ContinuousView:
+        """Register a view and backfill it from the lake window."""
+        spec.validate()
+        with self._lock:
+            self._load_changed()
+            if spec.name in self._views:
+                raise ViewError(f"view {spec.name!r} already exists")
+            view = ContinuousView(spec=spec)
+            self._apply_from_lake(view, self._window_batches(view, partition_dates()))
+            self._views[spec.name] = view
+            self._save(view)
+            return view
+
+    def list(self) -> list[ContinuousView]:
+        self.sync()
+        with self._lock:
+            return sorted(self._views.values(), key=lambda v: v.spec.name)
+
+    def get(self, name: str) -> ContinuousView:
+        self.sync()
+        with self._lock:
+            try:
+                return self._views[name]
+            except KeyError:
+                raise ViewError(f"unknown view {name!r}") from None
+
+    def drop(self, name: str) -> None:
+        with self._lock:
+            self._load_changed()
+            if name not in self._views:
+                raise ViewError(f"unknown view {name!r}")
+            del self._views[name]
+            self._mtimes.pop(name, None)
+            self._path(name).unlink(missing_ok=True)
+
+    def check(self, name: str) -> dict:
+        """Compare the view with a full recomputation of its window from the lake (one query).
+
+        The recomputation reads the window's batches as the lake lists them, so
+        a batch the view missed shows up. Batches only one side has are
+        reported: `unapplied` (in the lake, not in the view) and `retired`
+        (applied, no longer listed: retired or purged by retention, not read).
+        """
+        view = self.get(name)
+        with self._lock:
+            applied = {(dt, uri) for dt, uris in view.applied.items() for uri in uris}
+            lake = set(self._window_batches(view, partition_dates()))
+            actual = {r["key"]: r for r in view.rows()}
+        files = sorted(uri for _, uri in lake)
+        unapplied = sorted(uri for _, uri in lake - applied)
+        retired = sorted(uri for _, uri in applied - lake)
+        recomputed: dict[str, dict] = {}
+        if files:
+            con = connect(query_class_for("views"))
+            source = get_lake_storage().scan(con, "", files)
+            for key, n, nv, total in con.execute(view.spec.delta_sql(source)).fetchall():
+                row: dict[str, Any] = {"key": key, "n": n}
+                if view.spec.metric == "avg":
+                    row["avg"] = total / nv if nv else None
+                recomputed[key] = row
+
+        mismatches = []
+        for key in sorted(actual.keys() | recomputed.keys()):
+            a, b = actual.get(key), recomputed.get(key)
+            if a is None or b is None or a["n"] != b["n"] or not _close(a.get("avg"), b.get("avg")):
+                mismatches.append({"key": key, "view": a, "recomputed": b})
+        return {
+            "name": name,
+            "consistent": not (mismatches or unapplied or retired),
+            "keys": len(recomputed),
+            "batches": len(files),
+            "mismatches": mismatches[:100],
+            "unapplied": unapplied[:100],
+            "retired": retired[:100],
+        }
+
+
+views = ViewManager()
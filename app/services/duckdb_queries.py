@@ -5,25 +5,61 @@ from __future__ import annotations
 DuckDB query helpers used by the API layer.
 
 Key points:
-- Reads Parquet from filesystem Data Lake (partitioned by dt=YYYY-MM-DD).
-- Normalizes Windows paths into POSIX-style paths for DuckDB.
+- Reads Parquet from the Data Lake (partitioned by dt=YYYY-MM-DD), on the local
+  filesystem or object storage (`app.infra.lake_storage`).
+- Runs each query on a cursor of its class' budgeted DuckDB instance
+  (`app.infra.duckdb_engine`: memory limit, threads, spill directory).
+- Paths/URIs come from the lake storage in POSIX style (forward slashes, as DuckDB prefers).
 - Provides:
   * full-text search (LIKE over concatenated columns)
   * top-values aggregations (GROUP BY)
   * tone statistics (AvgTone) when available
+  * batched dashboard aggregates: several top-values and tone over one
+    date range, computed by a single scan (GROUPING SETS)
+  * an event's mentions (events <-> mentions by GlobalEventID)
+  * fuzzy actor / location search (names from `app.services.actor_index`,
+    events read from the partitions where they occur only)
+  * heatmap tiles (per-batch grid aggregates from `app.services.heatmap`
+    merged over the date range)
+- Every dataset (events, mentions, GKG side tables) is pruned by the same
+  `dt=` partitions; GKG lists are pre-exploded at ingest, so e.g. top themes
+  is a plain GROUP BY over `gkg_themes` (no string split at read time).
 
 Good practices:
 - Keep SQL inside triple-quoted strings.
 - Parametrize values (avoid string concatenation for user inputs).
+- `estimate_cost` mirrors the partition pruning below so admission control
+  can classify a request before it runs; `partition_fingerprint` mirrors it
+  to derive HTTP validators (ETag) without running the query.
+- Run user-facing queries through `query_profiler.run_query` (latency metrics,
+  opt-in profiling, slow-query log).
+- Results are built straight from DuckDB tuples (no pandas on the request path).
+- Identical concurrent calls share one execution (`singleflight`), keyed by
+  what the query reads plus the lake version.
+- Events partitions rolled up by retention (`app.services.retention`) only
+  have rollups left: top-values, tone and batched aggregates add their
+  stored counts / tone partials to the raw partitions read (`_rollup_scan`).
+- Batches held by the in-memory hot tier (`app.services.hot_tier`) are read
+  from Arrow instead of Parquet; `_source` combines both tiers (UNION ALL BY
+  NAME), each batch being read from exactly one of them.
 """
 
+import hashlib
 from dataclasses import dataclass
 from typing import Sequence
 
 import duckdb
 
 from app.core.config import settings
-from app.infra.fs_lake import lake_root, ensure_lake_dirs
+from app.domain.datasets import EVENTS, EVENTS_ROLLUP, GEO_GRID, MENTIONS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.fs_lake import ensure_lake_dirs
+from app.infra.lake_storage import get_lake_storage, lake_version, partition_dates
+from app.services.actor_index import KINDS, actor_index
+from app.services.heatmap import grid_cells_sql, has_geo_columns, tile_geometry
+from app.services.hot_tier import hot_tier
+from app.services.query_profiler import run_query
+from app.services.singleflight import singleflight
 
 
 @dataclass(frozen=True)
@@ -41,20 +77,10 @@ class ColumnSet:
         return fallback
 
 
-def connect() -> duckdb.DuckDBPyConnection:
-    """Create a DuckDB connection (file-based)."""
-    return duckdb.connect(settings.duckdb_db_path)
-
-
-def _normalize_path_for_duckdb(path: str) -> str:
-    """DuckDB path handling prefers forward slashes on Windows."""
-    return path.replace("\\", "/")
-
-
-def _parquet_glob_for_dates(since: str | None, until: str | None) -> str:
+def _parquet_glob_for_dates(since: str | None, until: str | None, dataset: str = EVENTS) -> str:
     """Return a parquet glob path with best-effort partition pruning.
 
-    Layout: data_lake/events/dt=YYYY-MM-DD/*.parquet
+    Layout: data_lake/{dataset}/dt=YYYY-MM-DD/*.parquet
 
     Strategy (POC):
     - if since==until: scan exactly that partition
@@ -63,24 +89,162 @@ def _parquet_glob_for_dates(since: str | None, until: str | None) -> str:
 
     Production version would implement a catalog + true pruning for ranges.
     """
-    root = lake_root()
-    base = root / "events"
+    base = get_lake_storage().dataset_root(dataset)
 
     if since and until and since == until:
-        return _normalize_path_for_duckdb(str(base / f"dt={since}" / "*.parquet"))
+        return f"{base}/dt={since}/*.parquet"
     if since and not until:
-        return _normalize_path_for_duckdb(str(base / f"dt={since}" / "*.parquet"))
+        return f"{base}/dt={since}/*.parquet"
+
+    return f"{base}/dt=*/*.parquet"
+
+
+# Relative cost of one partition scan per query kind: search reads and
+# concatenates every column of every row, aggregations read one or two columns.
+# Mentions scan two datasets (the event, then its mentions).
+# Actor search reads only the partitions where the matched names occur.
+# Heatmap tiles and the actor graph read small pre-aggregated tables / arrays.
+QUERY_COST_WEIGHTS: dict[str, int] = {
+    "search": 4,
+    "top_values": 1,
+    "tone": 1,
+    "mentions": 2,
+    "actors": 1,
+    "heatmap": 1,
+    "graph": 1,
+    "batch": 2,
+}
+
+# Logical top-values fields with their fallbacks on older / unnamed schemas
+# (the /analytics/top-* endpoints and the batch API share them).
+TOP_VALUE_FIELDS: dict[str, tuple[tuple[str, ...], str]] = {
+    "EventCode": (("EventCode", "EventBaseCode", "EventRootCode"), "c27"),
+    "ActionGeo_CountryCode": (
+        ("ActionGeo_CountryCode", "Actor1CountryCode", "Actor2CountryCode"),
+        "c55",
+    ),
+}
+
+
+def estimate_cost(kind: str, since: str | None, until: str | None) -> int:
+    """Estimate a query's cost as (partitions scanned) x (per-kind weight).
+
+    Uses the same pruning rules as `_parquet_glob_for_dates`: a single partition
+    when `since` alone (or `since == until`) is given, the whole lake otherwise.
+    """
+    if since and (not until or since == until):
+        partitions = 1
+    else:
+        partitions = len(partition_dates())
+    return partitions * QUERY_COST_WEIGHTS.get(kind, 1)
+
+
+def scanned_days(
+    since: str | None, until: str | None, ranged: bool = False
+) -> tuple[str | None, str | None]:
+    """[first, last] partitions a query reads (None = unbounded on that side).
+
+    Follows `_parquet_glob_for_dates` (a single partition when `since` alone or
+    `since == until` is given, the whole lake otherwise), or the plain
+    `since` / `until` range for queries filtering batches by date (`ranged`).
+    """
+    if ranged:
+        return since, until
+    if since and (not until or since == until):
+        return since, since
+    return None, None
+
+
+def partition_fingerprint(
+    datasets: Sequence[str], since: str | None, until: str | None, ranged: bool = False
+) -> tuple[str, str | None]:
+    """Version of the data a query reads, and the last day it reads (None = open-ended).
+
+    Unbounded ranges follow the lake version (any new batch may be read). A
+    bounded range is identified by its batch files in `datasets`: batches
+    landing in other partitions leave it unchanged.
+    """
+    first, last = scanned_days(since, until, ranged)
+    if last is None:
+        return lake_version(), None
+    storage = get_lake_storage()
+    if first == last:
+        globs = [_parquet_glob_for_dates(last, None, ds) for ds in datasets]
+        uris = [uri for glob in globs for uri in storage.files(glob)]
+    else:
+        uris = [
+            b.uri
+            for ds in datasets
+            for b in storage.batches(ds)
+            if (first is None or b.dt >= first) and b.dt <= last
+        ]
+    return hashlib.blake2b("\n".join(uris).encode(), digest_size=12).hexdigest(), last
+
+
+def _records(cur: duckdb.DuckDBPyConnection) -> list[dict]:
+    """Fetch all rows of the pending result as dicts keyed by column name."""
+    cols = [d[0] for d in cur.description]
+    return [dict(zip(cols, row)) for row in cur.fetchall()]
+
+
+def _source(con: duckdb.DuckDBPyConnection, parquet_glob: str, files: list[str] | None = None) -> str:
+    """Return the FROM expression reading `parquet_glob`, hot batches from memory.
+
+    Without any hot batch among the matched files this is the storage's plain
+    scan of the pattern. Otherwise the hot batches are registered on `con`
+    (cursor-local) as one Arrow table and only the remaining files are read
+    from the lake. `files` restricts the scan to an explicit subset of the
+    pattern's files (already pruned by the caller).
+    """
+    storage = get_lake_storage()
+    if not settings.hot_tier_enabled:
+        return storage.scan(con, parquet_glob, files)
+    hot, cold = hot_tier.split(storage.files(parquet_glob) if files is None else files)
+    if hot is None:
+        return storage.scan(con, parquet_glob, files)
+
+    con.register("hot_events", hot)
+    parts = ["SELECT * FROM hot_events"]
+    if cold:
+        parts.append(f"SELECT * FROM {storage.scan(con, parquet_glob, cold)}")
+    return "(" + " UNION ALL BY NAME ".join(parts) + ")"
+
+
+def _rollup_scan(
+    con: duckdb.DuckDBPyConnection, since: str | None, until: str | None
+) -> str | None:
+    """FROM expression over the events rollups of the partitions read, None if there are none.
+
+    Rolled-up partitions (`app.services.retention`) have no raw events left:
+    their `events_rollup` files hold the per-key counts and tone partials.
+    """
+    storage = get_lake_storage()
+    pattern = _parquet_glob_for_dates(since, until, EVENTS_ROLLUP)
+    files = storage.files(pattern)
+    return storage.scan(con, pattern, files) if files else None
 
-    return _normalize_path_for_duckdb(str(base / "dt=*" / "*.parquet"))
 
+def _rollup_columns(con: duckdb.DuckDBPyConnection, rollup: str) -> set[str]:
+    """Events columns counted by rollups (`AvgTone` when they hold tone partials)."""
+    sql = f"""
+    SELECT DISTINCT CASE WHEN field <> '*' THEN field WHEN tone_n IS NOT NULL THEN 'AvgTone' END
+    FROM {rollup}
+    """
+    return {row[0] for row in con.execute(sql).fetchall() if row[0] is not None}
+
+
+def _raw_source(con: duckdb.DuckDBPyConnection, parquet_glob: str) -> str | None:
+    """`_source` of `parquet_glob`, None when it matches no file (every partition rolled up)."""
+    if not get_lake_storage().files(parquet_glob):
+        return None
+    return _source(con, parquet_glob)
 
-def _detect_columns(con: duckdb.DuckDBPyConnection, parquet_glob: str) -> ColumnSet:
+
+def _detect_columns(con: duckdb.DuckDBPyConnection, source: str) -> ColumnSet:
     """Detect columns with DESCRIBE without scanning the whole dataset."""
     try:
-        df = con.execute(
-            f"DESCRIBE SELECT * FROM read_parquet('{parquet_glob}') LIMIT 1"
-        ).fetch_df()
-        cols = set(df["column_name"].tolist())
+        described = con.execute(f"DESCRIBE SELECT * FROM {source} LIMIT 1").fetchall()
+        cols = {row[0] for row in described}
         has_named = "GlobalEventID" in cols and "EventCode" in cols
         return ColumnSet(has_named_schema=has_named, cols=cols)
     except Exception:
@@ -91,7 +255,8 @@ def search_fulltext(query: str, since: str | None, until: str | None, limit: int
     """Full-text LIKE search over all columns.
 
     Implementation detail:
-    - DuckDB `concat_ws(' ', *)` concatenates all columns into one string.
+    - DuckDB `concat_ws(' ', *COLUMNS(*))` concatenates all columns into one string
+      (a bare `*` is rejected by the binder inside a function call).
     - We then apply a case-insensitive LIKE.
 
     Args:
@@ -100,24 +265,27 @@ def search_fulltext(query: str, since: str | None, until: str | None, limit: int
         limit: maximum number of rows
 
     Returns:
-        (count, rows) where rows is a list of dicts.
+        (count, rows) where rows is a list of dicts; (0, []) when no partition
+        of the range holds a file.
     """
     ensure_lake_dirs()
     parquet_glob = _parquet_glob_for_dates(since, until)
-    con = connect()
 
-    sql = f"""
-    WITH t AS (SELECT * FROM read_parquet('{parquet_glob}'))
-    SELECT *, concat_ws(' ', *) AS _all
-    FROM t
-    WHERE lower(concat_ws(' ', *)) LIKE '%' || lower(?) || '%'
-    LIMIT ?
-    """
+    def execute() -> tuple[int, list[dict]]:
+        if not get_lake_storage().files(parquet_glob):
+            return 0, []
+        con = connect(query_class_for("search"))
+        sql = f"""
+        SELECT *
+        FROM {_source(con, parquet_glob)}
+        WHERE lower(concat_ws(' ', *COLUMNS(*))) LIKE '%' || lower(?) || '%'
+        LIMIT ?
+        """
+        rows = run_query(con, "search", sql, [query, limit], _records)
+        return len(rows), rows
 
-    df = con.execute(sql, [query, limit]).fetch_df()
-    count = len(df)
-    rows = df.drop(columns=["_all"], errors="ignore").to_dict(orient="records")
-    return count, rows
+    key = (parquet_glob, query.lower(), limit, lake_version())
+    return singleflight.do("search", key, execute)
 
 
 def top_values(
@@ -126,65 +294,464 @@ def top_values(
     since: str | None,
     until: str | None,
     limit: int,
+    dataset: str = EVENTS,
 ) -> list[dict]:
-    """Generic GROUP BY COUNT over a selected field.
+    """Generic GROUP BY COUNT over a selected field of `dataset`.
 
     - If named schema exists, we prefer semantic columns like EventCode.
     - Otherwise we fall back to a generic column name like c27.
+    - Keys are cast to VARCHAR (older lakes may hold numeric-typed code columns).
+    - Ties are ordered by key, so results do not depend on scan order (hot vs cold tier).
+    - Empty keys are filtered with `length(...) > 0`: DuckDB pushes `<> ''` down
+      into Arrow scans (hot tier), where it is ~5x slower than evaluating it itself.
+    - Events partitions rolled up by retention add their stored key counts.
+    - No partition of the range holding a file yields no rows.
 
     Returns:
         List[{"key": <value>, "n": <count>}, ...]
     """
     ensure_lake_dirs()
-    parquet_glob = _parquet_glob_for_dates(since, until)
-    con = connect()
+    parquet_glob = _parquet_glob_for_dates(since, until, dataset)
+
+    def execute() -> list[dict]:
+        con = connect(query_class_for("top_values"))
+        rollup = _rollup_scan(con, since, until) if dataset == EVENTS else None
+        if rollup is None:
+            source = _raw_source(con, parquet_glob)
+            if source is None:
+                return []
+            cols = _detect_columns(con, source)
+            field = cols.pick(field_candidates, fallback)
+            sql = f"""
+            WITH t AS (SELECT * FROM {source})
+            SELECT CAST({field} AS VARCHAR) AS key, COUNT(*) AS n
+            FROM t
+            WHERE {field} IS NOT NULL AND length(CAST({field} AS VARCHAR)) > 0
+            GROUP BY 1
+            ORDER BY n DESC, key
+            LIMIT ?
+            """
+            return run_query(con, "top_values", sql, [limit], _records)
+
+        source = _raw_source(con, parquet_glob)
+        raw = _detect_columns(con, source).cols if source else set()
+        cols = ColumnSet(False, raw | _rollup_columns(con, rollup))
+        field = cols.pick(field_candidates, fallback)
+        parts = [f"SELECT key, n FROM {rollup} WHERE field = ?"]
+        if field in raw:
+            parts.append(f"""
+            SELECT CAST({field} AS VARCHAR) AS key, COUNT(*) AS n
+            FROM {source}
+            WHERE {field} IS NOT NULL AND length(CAST({field} AS VARCHAR)) > 0
+            GROUP BY 1
+            """)
+        sql = f"""
+        SELECT key, CAST(SUM(n) AS BIGINT) AS n
+        FROM ({" UNION ALL ".join(parts)})
+        GROUP BY 1
+        ORDER BY n DESC, key
+        LIMIT ?
+        """
+        return run_query(con, "top_values", sql, [field, limit], _records)
+
+    key = (parquet_glob, tuple(field_candidates), fallback, limit, lake_version())
+    return singleflight.do("top_values", key, execute)
 
-    cols = _detect_columns(con, parquet_glob)
-    field = cols.pick(field_candidates, fallback)
 
-    sql = f"""
-    WITH t AS (SELECT * FROM read_parquet('{parquet_glob}'))
-    SELECT {field} AS key, COUNT(*) AS n
-    FROM t
-    WHERE {field} IS NOT NULL AND {field} <> ''
-    GROUP BY 1
-    ORDER BY n DESC
-    LIMIT ?
+def tone_stats(since: str | None, until: str | None) -> dict:
+    """Compute tone statistics from AvgTone when available.
+
+    Events partitions rolled up by retention add their stored tone partials
+    (count, sum, min, max).
     """
+    ensure_lake_dirs()
+    parquet_glob = _parquet_glob_for_dates(since, until)
 
-    df = con.execute(sql, [limit]).fetch_df()
-    return df.to_dict(orient="records")
+    def execute() -> dict:
+        con = connect(query_class_for("tone"))
+        rollup = _rollup_scan(con, since, until)
+        source = _source(con, parquet_glob) if rollup is None else _raw_source(con, parquet_glob)
+        raw = _detect_columns(con, source).cols if source else set()
+        rolled = rollup is not None and "AvgTone" in _rollup_columns(con, rollup)
+        if "AvgTone" not in raw and not rolled:
+            return {"available": False}
+
+        if rollup is None:
+            sql = f"""
+            WITH t AS (
+              SELECT try_cast(AvgTone AS DOUBLE) AS tone
+              FROM {source}
+            )
+            SELECT
+              COUNT(*) AS n,
+              AVG(tone) AS avg_tone,
+              MIN(tone) AS min_tone,
+              MAX(tone) AS max_tone
+            FROM t
+            WHERE tone IS NOT NULL
+            """
+        else:
+            parts = [
+                f"""
+                SELECT tone_n, tone_sum, tone_min, tone_max FROM {rollup}
+                WHERE field = '*' AND tone_n IS NOT NULL
+                """
+            ]
+            if "AvgTone" in raw:
+                parts.append(f"""
+                SELECT COUNT(tone), SUM(tone), MIN(tone), MAX(tone)
+                FROM (SELECT try_cast(AvgTone AS DOUBLE) AS tone FROM {source})
+                """)
+            sql = f"""
+            SELECT
+              SUM(tone_n) AS n,
+              SUM(tone_sum) / NULLIF(SUM(tone_n), 0) AS avg_tone,
+              MIN(tone_min) AS min_tone,
+              MAX(tone_max) AS max_tone
+            FROM ({" UNION ALL ".join(parts)})
+            """
+
+        row = run_query(con, "tone", sql, None, lambda c: c.fetchone())
+        return {
+            "available": True,
+            "n": int(row[0]) if row and row[0] is not None else 0,
+            "avg_tone": float(row[1]) if row and row[1] is not None else None,
+            "min_tone": float(row[2]) if row and row[2] is not None else None,
+            "max_tone": float(row[3]) if row and row[3] is not None else None,
+        }
+
+    return singleflight.do("tone", (parquet_glob, lake_version()), execute)
+
+
+def _weighted_rows(
+    source: str | None, raw: set[str], rollup: str, keys: list[str], tone: bool
+) -> str:
+    """Rows of `batch_aggregates` over raw events and rollups: k0.., weight `w`, tone partials.
+
+    A raw event is one row of weight 1. A rollup row of column `keys[i]` sets
+    only `k{i}` (weight: its count), its `*` row carries the tone partials;
+    other rollup rows fall in the NULL key of every set and are dropped.
+    """
+    tone_cols = ["tone_n", "tone_sum", "tone_min", "tone_max"] if tone else []
+    rolled = [f"CASE WHEN field = '{c}' THEN key END AS k{i}" for i, c in enumerate(keys)]
+    parts = [f"SELECT {', '.join([*rolled, 'n AS w', *tone_cols])} FROM {rollup}"]
+    if source is not None:
+        projection = [
+            f"NULLIF(CAST({c} AS VARCHAR), '') AS k{i}" if c in raw else f"NULL::VARCHAR AS k{i}"
+            for i, c in enumerate(keys)
+        ]
+        projection.append("1 AS w")
+        if tone:
+            value = "try_cast(AvgTone AS DOUBLE)" if "AvgTone" in raw else "NULL::DOUBLE"
+            projection.append(f"CAST({value} IS NOT NULL AS BIGINT) AS tone_n")
+            projection += [f"{value} AS {c}" for c in tone_cols[1:]]
+        parts.append(f"SELECT {', '.join(projection)} FROM {source}")
+    return " UNION ALL ".join(parts)
 
 
-def tone_stats(since: str | None, until: str | None) -> dict:
-    """Compute tone statistics from AvgTone when available."""
+@dataclass(frozen=True)
+class AggregateSpec:
+    """One aggregate of a batch: `top_values` of an events field, or `tone`."""
+
+    name: str
+    op: str  # top_values | tone
+    field: str | None = None
+    limit: int = 10
+
+
+def batch_aggregates(
+    specs: Sequence[AggregateSpec], since: str | None, until: str | None
+) -> list[dict]:
+    """Compute several dashboard aggregates over one date range in a single scan.
+
+    Every `top_values` field becomes one grouping set and `tone` the grand
+    total `()`, so DuckDB reads the range's files once for all of them:
+
+        GROUP BY GROUPING SETS ((k0), (k1), ())
+
+    `GROUPING(k0, k1, ...)` tells the sets apart; each set keeps its own top
+    rows (QUALIFY row_number() per set). Empty keys become NULL and are
+    dropped like in `top_values`; `tone` matches `tone_stats`. Specs on the
+    same field share a grouping set. Rolled-up partitions contribute their
+    stored counts (`_weighted_rows`).
+
+    Returns:
+        One result per spec, in order: `{"name", "op", "field", "rows"}` for
+        top_values, `{"name", "op", **tone_stats}` for tone.
+    """
     ensure_lake_dirs()
     parquet_glob = _parquet_glob_for_dates(since, until)
-    con = connect()
 
-    cols = _detect_columns(con, parquet_glob)
-    if "AvgTone" not in cols.cols:
-        return {"available": False}
+    def execute() -> list[dict]:
+        con = connect(query_class_for("batch"))
+        rollup = _rollup_scan(con, since, until)
+        source = _source(con, parquet_glob) if rollup is None else _raw_source(con, parquet_glob)
+        cols = _detect_columns(con, source) if source else ColumnSet(False, set())
+        raw = cols.cols
+        if rollup is not None:
+            cols = ColumnSet(False, raw | _rollup_columns(con, rollup))
+
+        # Logical field -> physical column (None when absent from the scanned files).
+        resolved: dict[str, str | None] = {}
+        for spec in specs:
+            if spec.op == "top_values" and spec.field not in resolved:
+                candidates, fallback = TOP_VALUE_FIELDS.get(spec.field, ((spec.field,), spec.field))
+                column = cols.pick(candidates, fallback)
+                resolved[spec.field] = column if column in cols.cols else None
+        keys = list(dict.fromkeys(c for c in resolved.values() if c is not None))
+        want_tone = any(spec.op == "tone" for spec in specs) and "AvgTone" in cols.cols
+
+        tops: dict[str, list[dict]] = {column: [] for column in keys}
+        tone: dict = {"available": False}
+        if keys or want_tone:
+            if rollup is None:
+                projection = [
+                    f"NULLIF(CAST({c} AS VARCHAR), '') AS k{i}" for i, c in enumerate(keys)
+                ]
+                measures = ["COUNT(*) AS n"]
+                if want_tone:
+                    projection.append("try_cast(AvgTone AS DOUBLE) AS tone")
+                    measures += ["COUNT(tone)", "AVG(tone)", "MIN(tone)", "MAX(tone)"]
+                rows_sql = f"SELECT {', '.join(projection)} FROM {source}"
+            else:
+                rows_sql = _weighted_rows(source, raw, rollup, keys, want_tone)
+                measures = ["SUM(w) AS n"]
+                if want_tone:
+                    measures += [
+                        "SUM(tone_n)",
+                        "SUM(tone_sum) / NULLIF(SUM(tone_n), 0)",
+                        "MIN(tone_min)",
+                        "MAX(tone_max)",
+                    ]
+            key_refs = [f"k{i}" for i in range(len(keys))]
+            sets = [f"({k})" for k in key_refs] + (["()"] if want_tone else [])
+            total = (1 << len(keys)) - 1  # GROUPING() of the grand total set
+            gid = f"GROUPING({', '.join(key_refs)})" if keys else "0"
+            key_expr = f"coalesce({', '.join(key_refs)})" if keys else "NULL"
+            limit = max((s.limit for s in specs if s.op == "top_values"), default=1)
+            sql = f"""
+            WITH t AS ({rows_sql})
+            SELECT {gid} AS gid, {key_expr} AS key, {", ".join(measures)}
+            FROM t
+            GROUP BY GROUPING SETS ({", ".join(sets)})
+            HAVING key IS NOT NULL OR gid = {total}
+            QUALIFY gid = {total} OR row_number() OVER (PARTITION BY gid ORDER BY n DESC, key) <= ?
+            """
+            rows = run_query(con, "batch", sql, [limit], lambda c: c.fetchall())
+            for row in sorted(rows, key=lambda r: (r[0], -r[2], r[1] or "")):
+                if row[0] == total and want_tone:
+                    tone = {
+                        "available": True,
+                        "n": int(row[3]),
+                        "avg_tone": None if row[4] is None else float(row[4]),
+                        "min_tone": None if row[5] is None else float(row[5]),
+                        "max_tone": None if row[6] is None else float(row[6]),
+                    }
+                elif row[1] is not None:
+                    # Set of key i: every GROUPING bit is set but k_i's (bit m-1-i).
+                    i = len(keys) - (total ^ row[0]).bit_length()
+                    tops[keys[i]].append({"key": row[1], "n": int(row[2])})
+
+        results: list[dict] = []
+        for spec in specs:
+            if spec.op == "tone":
+                results.append({"name": spec.name, "op": spec.op, **tone})
+            else:
+                column = resolved[spec.field]
+                rows = tops[column][: spec.limit] if column is not None else []
+                results.append(
+                    {"name": spec.name, "op": spec.op, "field": spec.field, "rows": rows}
+                )
+        return results
+
+    key = (parquet_glob, tuple(specs), lake_version())
+    return singleflight.do("batch", key, execute)
+
+
+def event_mentions(event_id: int, since: str | None, until: str | None, limit: int) -> dict:
+    """Return an event and the articles mentioning it (joined on GlobalEventID).
+
+    The event is looked up in the events partitions, its mentions in the
+    mentions partitions of the same `since` / `until` range (GDELT keeps
+    reporting mentions of an event after the day it was first seen). A dataset
+    with no file in range simply yields no event / no mentions.
 
-    sql = f"""
-    WITH t AS (
-      SELECT try_cast(AvgTone AS DOUBLE) AS tone
-      FROM read_parquet('{parquet_glob}')
-    )
-    SELECT
-      COUNT(*) AS n,
-      AVG(tone) AS avg_tone,
-      MIN(tone) AS min_tone,
-      MAX(tone) AS max_tone
-    FROM t
-    WHERE tone IS NOT NULL
+    Returns:
+        {"event_id", "event": dict | None, "count", "mentions": [dict, ...]}
     """
+    ensure_lake_dirs()
+    events_glob = _parquet_glob_for_dates(since, until)
+    mentions_glob = _parquet_glob_for_dates(since, until, MENTIONS)
+
+    def execute() -> dict:
+        con = connect(query_class_for("mentions"))
+        storage = get_lake_storage()
+
+        event = None
+        if storage.files(events_glob):
+            source = _source(con, events_glob)
+            key = _detect_columns(con, source).pick(["GlobalEventID"], "c1")
+            sql = f"SELECT * FROM {source} WHERE {key} = ? LIMIT 1"
+            rows = run_query(con, "mentions", sql, [event_id], _records)
+            event = rows[0] if rows else None
+
+        mentions: list[dict] = []
+        if storage.files(mentions_glob):
+            source = _source(con, mentions_glob)
+            key = _detect_columns(con, source).pick(["GlobalEventID"], "c1")
+            sql = f"""
+            SELECT *
+            FROM {source}
+            WHERE {key} = ?
+            ORDER BY ALL
+            LIMIT ?
+            """
+            mentions = run_query(con, "mentions", sql, [event_id, limit], _records)
+
+        return {"event_id": event_id, "event": event, "count": len(mentions), "mentions": mentions}
+
+    key = (events_glob, mentions_glob, event_id, limit, lake_version())
+    return singleflight.do("mentions", key, execute)
+
+
+def search_actors(
+    query: str,
+    kind: str,
+    since: str | None,
+    until: str | None,
+    limit: int,
+    names_limit: int = 10,
+    min_score: float = 70.0,
+) -> dict:
+    """Fuzzy actor / location name search, then the events carrying the matched names.
+
+    Names are ranked by the in-memory trigram index + RapidFuzz; events are read
+    with one query over the `dt=` partitions (within `since` / `until`) where the
+    matched names occur, filtered on the `kind` columns, newest event ids first.
+
+    Returns:
+        {"query", "kind", "matches": [{"name", "score", "n", "fields"}], "count", "rows"}
+    """
+    ensure_lake_dirs()
+    actor_index.sync()
+    matches = actor_index.lookup(query, kind, limit=names_limit, min_score=min_score)
+    spellings, dts = actor_index.resolve([m.name for m in matches])
+    dts = {dt for dt in dts if (not since or dt >= since) and (not until or dt <= until)}
+    out = {
+        "query": query,
+        "kind": kind,
+        "matches": [
+            {"name": m.name, "score": m.score, "n": m.n, "fields": m.fields} for m in matches
+        ],
+        "count": 0,
+        "rows": [],
+    }
+    if not spellings or not dts:
+        return out
+    storage = get_lake_storage()
+    files = [b.uri for b in storage.batches(EVENTS) if b.dt in dts]
+    if not files:
+        return out
+
+    def execute() -> list[dict]:
+        con = connect(query_class_for("actors"))
+        source = _source(con, _parquet_glob_for_dates(None, None), files)
+        cols = _detect_columns(con, source).cols
+        fields = [f for f in KINDS[kind] if f in cols]
+        if not fields:
+            return []
+        names = ", ".join("?" * len(spellings))
+        where = " OR ".join(f"{f} IN ({names})" for f in fields)
+        order = "GlobalEventID DESC" if "GlobalEventID" in cols else "ALL"
+        sql = f"""
+        SELECT *
+        FROM {source}
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT ?
+        """
+        return run_query(con, "actors", sql, [*spellings * len(fields), limit], _records)
+
+    key = (tuple(spellings), kind, tuple(sorted(dts)), limit, lake_version())
+    rows = singleflight.do("actors", key, execute)
+    out["count"] = len(rows)
+    out["rows"] = rows
+    return out
+
+
+def heatmap_tile(
+    z: int,
+    x: int,
+    y: int,
+    since: str | None,
+    until: str | None,
+    root_code: str | None = None,
+    quad_class: int | None = None,
+) -> dict:
+    """Event counts per grid cell of map tile z/x/y, merged over the `dt=` range.
+
+    Cells come from the `geo_grid` side tables of the batches in range (rolled
+    up from the stored level with a shift); batches without one are binned
+    from their events file. `root_code` / `quad_class` filter on
+    `EventRootCode` / `QuadClass`.
 
-    row = con.execute(sql).fetchone()
-    return {
-        "available": True,
-        "n": int(row[0]) if row and row[0] is not None else 0,
-        "avg_tone": float(row[1]) if row and row[1] is not None else None,
-        "min_tone": float(row[2]) if row and row[2] is not None else None,
-        "max_tone": float(row[3]) if row and row[3] is not None else None,
+    Returns:
+        {"z", "x", "y", "cell_zoom", "cells_per_side", "total",
+         "cells": [[column, row, n], ...]} (column / row inside the tile, from its top-left)
+    """
+    ensure_lake_dirs()
+    geo = tile_geometry(z, x, y)
+    storage = get_lake_storage()
+
+    def in_range(dt: str) -> bool:
+        return (not since or dt >= since) and (not until or dt <= until)
+
+    grids = {(b.dt, b.ts): b.uri for b in storage.batches(GEO_GRID) if in_range(b.dt)}
+    legacy = [b.uri for b in storage.batches(EVENTS) if in_range(b.dt) and (b.dt, b.ts) not in grids]
+    out = {
+        "z": z,
+        "x": x,
+        "y": y,
+        "cell_zoom": geo.cell_zoom,
+        "cells_per_side": geo.per_side,
+        "total": 0,
+        "cells": [],
     }
+    if not grids and not legacy:
+        return out
+
+    def execute() -> list[tuple]:
+        con = connect(query_class_for("heatmap"))
+        parts = []
+        if grids:
+            pattern = _parquet_glob_for_dates(None, None, GEO_GRID)
+            parts.append(f"SELECT * FROM {storage.scan(con, pattern, sorted(grids.values()))}")
+        if legacy:
+            source = _source(con, _parquet_glob_for_dates(None, None), legacy)
+            if has_geo_columns(con, source):
+                parts.append(f"SELECT * FROM ({grid_cells_sql(source, [geo.level])})")
+        if not parts:
+            return []
+        where = ["level = ?", "x BETWEEN ? AND ?", "y BETWEEN ? AND ?"]
+        params: list = [geo.level, *geo.x_range, *geo.y_range]
+        if root_code is not None:
+            where.append("root = ?")
+            params.append(root_code)
+        if quad_class is not None:
+            where.append("quad = ?")
+            params.append(quad_class)
+        sql = f"""
+        SELECT (x >> ?) - ? AS cx, (y >> ?) - ? AS cy, CAST(SUM(n) AS BIGINT) AS n
+        FROM ({" UNION ALL BY NAME ".join(parts)})
+        WHERE {" AND ".join(where)}
+        GROUP BY 1, 2
+        ORDER BY 2, 1
+        """
+        shifts = [geo.shift, geo.origin[0], geo.shift, geo.origin[1]]
+        return run_query(con, "heatmap", sql, [*shifts, *params], lambda c: c.fetchall())
+
+    key = (z, x, y, root_code, quad_class, tuple(sorted(grids)), tuple(legacy), lake_version())
+    cells = singleflight.do("heatmap", key, execute)
+    out["cells"] = [[cx, cy, n] for cx, cy, n in cells]
+    out["total"] = sum(n for _, _, n in cells)
+    return out
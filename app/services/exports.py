@@ -0,0 +1,343 @@
+"""app.services.exports
+
+Bulk export jobs: a filter and a date range written to one Parquet or CSV file.
+
+Clients needing hundreds of thousands of rows used to page through
+`/events/search` (500 rows a request, all through Python and JSON). An export
+job instead:
+
+- is submitted (`submit`): the spec is validated and the job recorded as
+  `queued`; the API answers at once with its id;
+- runs in the background (`run`): the local mode runs it in-process after the
+  response (like ingestion, see `app.tasks`), the Arq worker runs the
+  `export_events` job (`app.worker`). DuckDB executes
+  `COPY (SELECT ... ) TO '<file>' (FORMAT parquet | csv)` on the `export`
+  query class: rows stream from the lake's Parquet to the output file without
+  ever reaching Python. The file is written under a temporary name and renamed
+  once complete;
+- is polled (`get`) and downloaded with HTTP range requests (resumable,
+  parallel chunks), from any API worker: job state and files live on disk
+  under `EXPORTS_DIR` (default `{DATA_LAKE_PATH}/_exports`), one JSON file
+  per job, written atomically.
+
+Limits:
+- `EXPORT_MAX_CONCURRENT` exports run at once per process (others wait, still
+  `queued`), on the exports' own threads (`run_async`): waiting jobs hold no
+  thread of the event loop's default executor, which every `asyncio.to_thread`
+  of the process shares; `EXPORT_MAX_PENDING` queued + running jobs at most,
+  beyond which submissions are shed (503 + Retry-After);
+- `EXPORT_MAX_ROWS` caps the rows of one export;
+- finished jobs (and their files) are deleted `EXPORT_RETENTION_HOURS` after
+  they finished (`purge_expired`, run on every submission and listing);
+  a job whose process died is marked failed, be it `running` or still
+  `queued` (its background task died with the process that submitted it), as
+  is a job `queued` for more than `EXPORT_QUEUE_TIMEOUT_HOURS` (the process of
+  another host cannot be checked): orphans never hold pending slots for good.
+
+Filter semantics are the push feed's (`SubscriptionFilter`): any of `terms`
+(case-insensitive, any column), `ActionGeo_CountryCode`, `EventRootCode`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.core.admission import AdmissionRejected
+from app.core.config import settings
+from app.core.metrics import EXPORT_BYTES, EXPORT_JOBS, EXPORT_RUNNING
+from app.core.processes import process_alive
+from app.domain.datasets import EVENTS
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import get_lake_storage
+from app.services.query_profiler import run_query
+
+logger = logging.getLogger(__name__)
+
+FORMATS: dict[str, tuple[str, str]] = {
+    # format -> (COPY options, file extension)
+    "parquet": ("FORMAT parquet, COMPRESSION zstd", ".parquet"),
+    "csv": ("FORMAT csv, HEADER", ".csv"),
+}
+PENDING = ("queued", "running")
+
+
+class ExportError(ValueError):
+    """Invalid export spec or unknown job."""
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    """What an export writes."""
+
+    terms: tuple[str, ...] = ()
+    country: str | None = None
+    root_code: str | None = None
+    since: str | None = None
+    until: str | None = None
+    columns: tuple[str, ...] = ()  # empty = every column
+    format: str = "parquet"
+    max_rows: int | None = None
+
+    def validate(self) -> None:
+        """Raise ExportError if the spec cannot be exported."""
+        if self.format not in FORMATS:
+            raise ExportError(f"format: one of {', '.join(FORMATS)}")
+        unknown = [c for c in self.columns if c not in EVENTS_COLUMNS]
+        if unknown:
+            raise ExportError(f"columns: unknown events columns {unknown}")
+        if self.since and self.until and self.since > self.until:
+            raise ExportError("since must not be after until")
+
+    def row_limit(self) -> int:
+        return min(self.max_rows or settings.export_max_rows, settings.export_max_rows)
+
+    def select_sql(self, source: str, cols: set[str]) -> tuple[str, list[Any]]:
+        """SELECT over `source` (detected columns `cols`) and its bound parameters."""
+        where: list[str] = []
+        params: list[Any] = []
+        if self.terms:
+            like = "lower(concat_ws(' ', *COLUMNS(*))) LIKE '%' || lower(?) || '%'"
+            where.append("(" + " OR ".join([like] * len(self.terms)) + ")")
+            params.extend(self.terms)
+        equals = (("ActionGeo_CountryCode", self.country), ("EventRootCode", self.root_code))
+        for column, value in equals:
+            if value is None:
+                continue
+            if column not in cols:
+                where.append("FALSE")
+                continue
+            where.append(f"CAST({column} AS VARCHAR) = ?")
+            params.append(value)
+        projection = ", ".join(c for c in self.columns if c in cols) if self.columns else "*"
+        sql = f"""
+        SELECT {projection}
+        FROM {source}
+        WHERE {" AND ".join(where) or "TRUE"}
+        LIMIT ?
+        """
+        return sql, [*params, self.row_limit()]
+
+
+@dataclass
+class ExportJob:
+    """State of one export job (persisted as JSON)."""
+
+    id: str
+    spec: ExportSpec
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    rows: int | None = None
+    bytes: int | None = None
+    error: str | None = None
+    host: str | None = None  # process submitting, then running it: host and pid
+    pid: int | None = None
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.id}{FORMATS[self.spec.format][1]}"
+
+    def expires_at(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return self.finished_at + settings.export_retention_hours * 3600
+
+    def to_json(self) -> dict:
+        data = asdict(self)
+        data["spec"]["terms"] = list(self.spec.terms)
+        data["spec"]["columns"] = list(self.spec.columns)
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> ExportJob:
+        spec = dict(data["spec"])
+        spec["terms"] = tuple(spec.get("terms", ()))
+        spec["columns"] = tuple(spec.get("columns", ()))
+        return cls(**{**data, "spec": ExportSpec(**spec)})
+
+
+class ExportManager:
+    """Export jobs of the lake, shared by every process through `EXPORTS_DIR`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._slots: threading.BoundedSemaphore | None = None
+        self._executor: ThreadPoolExecutor | None = None
+
+    # -- storage ---------------------------------------------------------------
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.exports_dir or Path(settings.data_lake_path) / "_exports")
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory() / f"{job_id}.json"
+
+    def file_path(self, job: ExportJob) -> Path:
+        return self.directory() / job.file_name
+
+    def _save(self, job: ExportJob) -> None:
+        path = self._path(job.id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(job.to_json()))
+        os.replace(tmp, path)
+
+    def _jobs(self) -> list[ExportJob]:
+        if not self.directory().exists():
+            return []
+        jobs = []
+        for path in self.directory().glob("*.json"):
+            try:
+                jobs.append(ExportJob.from_json(json.loads(path.read_text())))
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Export job %s: cannot load %s (%s)", path.stem, path, exc)
+        return jobs
+
+    def get(self, job_id: str) -> ExportJob:
+        try:
+            return ExportJob.from_json(json.loads(self._path(job_id).read_text()))
+        except (FileNotFoundError, ValueError):
+            raise ExportError(f"unknown export {job_id!r}") from None
+
+    def list(self) -> list[ExportJob]:
+        self.purge_expired()
+        return sorted(self._jobs(), key=lambda j: j.created_at, reverse=True)
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def purge_expired(self) -> int:
+        """Delete expired finished jobs and their files; fail orphaned pending jobs."""
+        now = time.time()
+        queue_timeout = settings.export_queue_timeout_hours * 3600
+        purged = 0
+        for job in self._jobs():
+            error = None
+            if job.status in PENDING and not process_alive(job.host, job.pid):
+                error = "interrupted"
+            elif job.status == "queued" and job.created_at + queue_timeout <= now:
+                error = "timed out in queue"
+            if error is not None:
+                job.status, job.error, job.finished_at = "failed", error, now
+                self._save(job)
+                EXPORT_JOBS.labels("failed").inc()
+            expires = job.expires_at()
+            if expires is not None and expires <= now:
+                self.file_path(job).unlink(missing_ok=True)
+                self._path(job.id).unlink(missing_ok=True)
+                purged += 1
+        return purged
+
+    def submit(self, spec: ExportSpec) -> ExportJob:
+        """Validate and record a queued job.
+
+        Raises:
+            ExportError: invalid spec.
+            AdmissionRejected: `EXPORT_MAX_PENDING` jobs are already queued or running.
+        """
+        spec.validate()
+        self.purge_expired()
+        with self._lock:
+            pending = sum(1 for job in self._jobs() if job.status in PENDING)
+            if pending >= settings.export_max_pending:
+                raise AdmissionRejected("exports", "max_pending", retry_after=30)
+            job = ExportJob(
+                id=uuid.uuid4().hex, spec=spec, host=socket.gethostname(), pid=os.getpid()
+            )
+            self._save(job)
+        EXPORT_JOBS.labels("queued").inc()
+        return job
+
+    def _semaphore(self) -> threading.BoundedSemaphore:
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(settings.export_max_concurrent)
+            return self._slots
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.export_max_concurrent, thread_name_prefix="export"
+                )
+            return self._executor
+
+    async def run_async(self, job_id: str) -> ExportJob:
+        """`run` off the event loop, on the exports' threads (queued jobs wait without one)."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool(), self.run, job_id)
+
+    def run(self, job_id: str) -> ExportJob:
+        """Run a queued job to completion (blocking; waits for a free slot)."""
+        with self._semaphore():
+            job = self.get(job_id)
+            if job.status != "queued":
+                return job
+            job.status, job.started_at = "running", time.time()
+            job.host, job.pid = socket.gethostname(), os.getpid()
+            self._save(job)
+            EXPORT_RUNNING.inc()
+            try:
+                job.rows = self._copy(job)
+                job.bytes = self.file_path(job).stat().st_size
+                job.status = "done"
+                EXPORT_BYTES.labels(job.spec.format).observe(job.bytes)
+            except Exception as exc:
+                logger.exception("Export %s failed", job.id)
+                job.status, job.error = "failed", str(exc)
+            finally:
+                EXPORT_RUNNING.dec()
+            job.finished_at = time.time()
+            self._save(job)
+            EXPORT_JOBS.labels(job.status).inc()
+            logger.info("Export %s %s: %s rows, %s bytes", job.id, job.status, job.rows, job.bytes)
+            return job
+
+    def _copy(self, job: ExportJob) -> int:
+        """COPY the job's rows to its file; return the row count."""
+        spec = job.spec
+        storage = get_lake_storage()
+        files = [
+            b.uri
+            for b in storage.batches(EVENTS)
+            if (not spec.since or b.dt >= spec.since) and (not spec.until or b.dt <= spec.until)
+        ]
+        out = self.file_path(job)
+        tmp = out.with_name(f".{out.name}.tmp")
+        con = connect(query_class_for("export"))
+        if files:
+            source = storage.scan(con, "", files)
+            cols = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+            select, params = spec.select_sql(source, cols)
+        else:
+            # Empty range: a valid, empty file with the events columns.
+            names = spec.columns or tuple(EVENTS_COLUMNS)
+            select = "SELECT " + ", ".join(f"NULL::VARCHAR AS {c}" for c in names) + " LIMIT 0"
+            params = []
+        options = FORMATS[spec.format][0]
+        sql = f"COPY ({select}) TO {_quote(str(tmp))} ({options})"
+        try:
+            rows = run_query(con, "export", sql, params, lambda c: c.fetchone()[0])
+            os.replace(tmp, out)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return int(rows)
+
+
+exports = ExportManager()
@@ -10,22 +10,28 @@ downloadable batches (URLs).
 The `lastupdate.txt` format typically contains lines like:
   <size> <md5> <url>
 
-We focus on "Events" exports (files ending with `.export.CSV.zip`), because
-they are frequent and massive, and ideal for Big Data ingestion demos.
+Each 15-minute slot lists three files: the Events export (`.export.CSV.zip`),
+its Mentions (`.mentions.CSV.zip`) and the GKG (`.gkg.csv.zip`). `pick_recent`
+keeps those of the datasets enabled by `GDELT_DATASETS` (see
+`app.domain.datasets`).
 
 Reliability:
 - Network calls are retried using tenacity.
 - Default URL uses HTTP to avoid SSL/certificate issues in some environments.
+
+Cheap polling:
+- `fetch_lastupdate_conditional` sends `If-None-Match` / `If-Modified-Since`
+  so an unchanged `lastupdate.txt` costs a 304 with an empty body.
 """
 
 import logging
 from dataclasses import dataclass
-from typing import Iterable
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.core.config import settings
+from app.domain.datasets import DATASET_SUFFIXES, dataset_for_url
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +45,28 @@ class GdeltFile:
     url: str
     ts: str  # extracted timestamp like YYYYMMDDHHMMSS, or "unknown"
 
+    @property
+    def dataset(self) -> str | None:
+        """events | mentions | gkg, None for files we do not ingest."""
+        return dataset_for_url(self.url)
+
+
+@dataclass(frozen=True)
+class LastUpdateValidators:
+    """HTTP cache validators returned by the last successful lastupdate.txt fetch."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def as_headers(self) -> dict[str, str]:
+        """Build conditional request headers from the stored validators."""
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
 
 def _parse_ts_from_url(url: str) -> str:
     """Extract timestamp from a GDELT filename, if possible."""
@@ -87,8 +115,63 @@ async def fetch_lastupdate() -> list[GdeltFile]:
     return files
 
 
-def pick_recent(files: list[GdeltFile], n: int) -> list[GdeltFile]:
-    """Pick N most recent *Events export* batches from the parsed list."""
-    exports = [f for f in files if f.url.endswith(".export.CSV.zip")]
-    # lastupdate is typically ordered newest-first; keep it simple:
-    return exports[:n]
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=8))
+async def fetch_lastupdate_conditional(
+    validators: LastUpdateValidators | None = None,
+    client: httpx.AsyncClient | None = None,
+) -> tuple[list[GdeltFile] | None, LastUpdateValidators]:
+    """Fetch lastupdate.txt only if it changed since the previous fetch.
+
+    Args:
+        validators: ETag / Last-Modified from the previous response (None on first call).
+        client: Optional shared client (keeps the connection alive between polls).
+
+    Returns:
+        (files, validators). `files` is None when the server answered 304 Not Modified;
+        validators are the ones to send on the next poll.
+
+    Raises:
+        httpx.HTTPError if network request fails after retries.
+    """
+    previous = validators or LastUpdateValidators()
+    headers = previous.as_headers()
+
+    if client is None:
+        async with httpx.AsyncClient(timeout=30) as own_client:
+            r = await own_client.get(settings.gdelt_lastupdate_url, headers=headers)
+    else:
+        r = await client.get(settings.gdelt_lastupdate_url, headers=headers)
+
+    if r.status_code == 304:
+        return None, previous
+    r.raise_for_status()
+
+    fresh = LastUpdateValidators(
+        etag=r.headers.get("ETag"),
+        last_modified=r.headers.get("Last-Modified"),
+    )
+    return _parse_lastupdate_text(r.text), fresh
+
+
+def pick_recent(
+    files: list[GdeltFile], n: int, datasets: list[str] | None = None
+) -> list[GdeltFile]:
+    """Pick the files of the N most recent batches, for the enabled datasets.
+
+    A batch is one timestamp (15-minute slot); its files are returned events
+    first, then mentions, then GKG, so events land first.
+
+    Args:
+        files: parsed lastupdate.txt entries.
+        n: number of batches (distinct timestamps) to keep.
+        datasets: datasets to keep (default: `settings.gdelt_datasets`).
+    """
+    wanted = set(settings.gdelt_datasets if datasets is None else datasets)
+    order = {d: i for i, d in enumerate(DATASET_SUFFIXES)}
+    kept = [f for f in files if f.dataset in wanted]
+    # lastupdate is typically ordered newest-first; keep the first N timestamps.
+    stamps = list(dict.fromkeys(f.ts for f in kept))[:n]
+    rank = {ts: i for i, ts in enumerate(stamps)}
+    return sorted(
+        (f for f in kept if f.ts in rank), key=lambda f: (rank[f.ts], order[f.dataset])
+    )
@@ -0,0 +1,157 @@
+"""app.services.gkg
+
+Streaming GKG conversion: CSV -> main table + exploded side tables (Parquet).
+
+GKG files are an order of magnitude larger than events exports, so they are
+never loaded whole: `pyarrow.csv.open_csv` yields record batches of
+`GKG_READ_BLOCK_MB`, each one is exploded (`explode_gkg`) and appended to one
+Parquet writer per output table. Peak memory is a few blocks, whatever the
+file size.
+
+Exploding runs on Arrow compute kernels (split / flatten / take), never on
+Python rows:
+- V1 `Themes`, `Persons`, `Organizations` -> `gkg_themes`, `gkg_persons`,
+  `gkg_organizations` (GKGRecordID, entry), empty entries dropped.
+- V1 `Locations` -> `gkg_locations` with typed `#` sub-fields.
+- V1.5 `Tone` -> numeric columns of the main `gkg` table.
+
+Rows with an unexpected number of fields are skipped and counted (logged).
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.domain.datasets import GKG
+from app.domain.gdelt_gkg_schema import (
+    GKG_COLUMN_TYPES,
+    GKG_COLUMNS,
+    GKG_EXPLODED_COLUMNS,
+    GKG_LIST_TABLES,
+    GKG_LOCATION_FIELDS,
+    GKG_LOCATIONS_TABLE,
+    GKG_TONE_FIELDS,
+)
+
+logger = logging.getLogger(__name__)
+
+_NUMBER = r"^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$"
+
+
+def _fields(values: pa.Array, sep: str, n: int) -> list[pa.Array]:
+    """The first `n` `sep`-separated fields of each string (missing / empty ones null)."""
+    # Padding guarantees n fields, so list_element never goes out of bounds.
+    padded = pc.binary_join_element_wise(values, sep * (n - 1), "")
+    parts = pc.split_pattern(padded, sep)
+    out = []
+    for i in range(n):
+        field = pc.list_element(parts, i)
+        out.append(pc.if_else(pc.equal(field, ""), pa.scalar(None, pa.string()), field))
+    return out
+
+
+def _typed(values: pa.Array, alias: str) -> pa.Array:
+    """Cast string values to `alias`; malformed numbers become null instead of failing the batch."""
+    if alias == "string":
+        return values
+    valid = pc.match_substring_regex(values, _NUMBER)
+    clean = pc.if_else(valid, values, pa.scalar(None, pa.string()))
+    if alias.startswith("int"):
+        clean = pc.cast(clean, pa.float64())
+    return pc.cast(clean, pa.type_for_alias(alias), safe=False)
+
+
+def _explode_list(ids: pa.Array, values: pa.Array, sep: str = ";") -> tuple[pa.Array, pa.Array]:
+    """(parent record ids, entries) of `sep`-separated lists, empty entries dropped."""
+    lists = pc.split_pattern(values, sep)
+    flat = pc.list_flatten(lists)
+    parents = pc.list_parent_indices(lists)
+    keep = pc.greater(pc.utf8_length(flat), 0)
+    return pc.take(ids, pc.filter(parents, keep)), pc.filter(flat, keep)
+
+
+def explode_gkg(batch: pa.RecordBatch | pa.Table) -> dict[str, pa.Table]:
+    """Split a GKG batch into the main `gkg` table and its exploded side tables."""
+    table = pa.Table.from_batches([batch]) if isinstance(batch, pa.RecordBatch) else batch
+    ids = table.column("GKGRecordID").combine_chunks()
+
+    main: dict[str, pa.Array] = {}
+    for name in table.column_names:
+        if name in GKG_EXPLODED_COLUMNS:
+            continue
+        if name == "Tone":
+            tone = _fields(table.column(name).combine_chunks(), ",", len(GKG_TONE_FIELDS))
+            for field, values in zip(GKG_TONE_FIELDS, tone):
+                main[field] = _typed(values, "double")
+            continue
+        main[name] = table.column(name).combine_chunks()
+    out = {GKG: pa.table(main)}
+
+    for side, (source, entry) in GKG_LIST_TABLES.items():
+        parents, entries = _explode_list(ids, table.column(source).combine_chunks())
+        out[side] = pa.table({"GKGRecordID": parents, entry: entries})
+
+    parents, entries = _explode_list(ids, table.column("Locations").combine_chunks())
+    parts = _fields(entries, "#", len(GKG_LOCATION_FIELDS))
+    locations = {"GKGRecordID": parents}
+    for (name, alias), values in zip(GKG_LOCATION_FIELDS, parts):
+        locations[name] = _typed(values, alias)
+    out[GKG_LOCATIONS_TABLE] = pa.table(locations)
+    return out
+
+
+def _open_gkg_csv(csv_path: Path, skipped: list[int]) -> pacsv.CSVStreamingReader:
+    def on_invalid(row: pacsv.InvalidRow) -> str:
+        skipped[0] += 1
+        return "skip"
+
+    column_types = {
+        name: pa.type_for_alias(GKG_COLUMN_TYPES.get(name, "string")) for name in GKG_COLUMNS
+    }
+    return pacsv.open_csv(
+        str(csv_path),
+        read_options=pacsv.ReadOptions(
+            column_names=GKG_COLUMNS, block_size=settings.gkg_read_block_mb * 1024 * 1024
+        ),
+        # Quotations and names contain raw quote characters: no quoting in GKG.
+        parse_options=pacsv.ParseOptions(
+            delimiter="\t", quote_char=False, newlines_in_values=False, invalid_row_handler=on_invalid
+        ),
+        convert_options=pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+
+
+def convert_gkg(csv_path: Path, out_dir: Path) -> dict[str, tuple[Path, int]]:
+    """Stream a GKG CSV into one local Parquet file per output table.
+
+    Returns:
+        {table: (parquet path, rows)} for `gkg` and every side table.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    skipped = [0]
+    writers: dict[str, pq.ParquetWriter] = {}
+    rows: dict[str, int] = {}
+    try:
+        for batch in _open_gkg_csv(csv_path, skipped):
+            for name, table in explode_gkg(batch).items():
+                writer = writers.get(name)
+                if writer is None:
+                    path = out_dir / f"{name}.parquet"
+                    writer = writers[name] = pq.ParquetWriter(str(path), table.schema, compression="zstd")
+                    rows[name] = 0
+                if table.num_rows:
+                    writer.write_table(table)
+                    rows[name] += table.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+    if skipped[0]:
+        logger.warning("GKG %s: skipped %s malformed row(s)", csv_path.name, skipped[0])
+    return {name: (out_dir / f"{name}.parquet", n) for name, n in rows.items()}
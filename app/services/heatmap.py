@@ -0,0 +1,172 @@
+"""app.services.heatmap
+
+Event-density heatmap tiles (`/analytics/heatmap/{z}/{x}/{y}`) from
+precomputed multi-resolution grid aggregates.
+
+Binning `ActionGeo_Lat` / `ActionGeo_Long` of raw events on every pan or zoom
+reads the coordinates of every row in range. Instead:
+
+- At ingest, each events batch gets a side table (`geo_grid` dataset, same
+  `dt=` / `batch_ts=` layout) holding its event counts per Web Mercator grid
+  cell at each level of `HEATMAP_LEVELS` (a level-`L` cell is a slippy-map
+  tile of zoom `L`), per `EventRootCode` and `QuadClass` (`grid_cells_table`).
+- A tile `z/x/y` is split into `2^HEATMAP_TILE_BITS` cells per side, i.e.
+  cells of zoom `z + HEATMAP_TILE_BITS` (capped at the finest level). They are
+  rolled up from the finest stored level covering them with a bit shift, and
+  the batches of the date range are merged by a single GROUP BY
+  (`tile_geometry` gives the cell ranges; the query lives in
+  `app.services.duckdb_queries.heatmap_tile`). Beyond the finest level, the
+  tile gets one cell: the enclosing finest cell.
+- Batches ingested before this feature (no side table) are binned from their
+  events file at query time, at the one level needed.
+- Rendered tiles (JSON bytes) are cached per lake version (`TileCache`): a new
+  batch invalidates them all, the next request re-renders from the aggregates.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+import duckdb
+import pyarrow as pa
+
+from app.core.config import settings
+from app.core.metrics import HEATMAP_TILE_CACHE
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import lake_version
+
+# Web Mercator latitude bounds (the square world of slippy-map tiles).
+MAX_LATITUDE = 85.0511287798
+
+
+def levels() -> list[int]:
+    """Stored grid levels, coarsest first."""
+    return sorted(set(settings.heatmap_levels))
+
+
+def grid_cells_sql(source: str, grid_levels: list[int]) -> str:
+    """SELECT of (level, x, y, root, quad, n) cell counts of an events FROM expression."""
+    values = ", ".join(f"({int(level)})" for level in grid_levels)
+    return f"""
+    WITH p AS (
+      SELECT
+        try_cast(ActionGeo_Lat AS DOUBLE) AS lat,
+        try_cast(ActionGeo_Long AS DOUBLE) AS lon,
+        CAST(EventRootCode AS VARCHAR) AS root,
+        try_cast(QuadClass AS TINYINT) AS quad
+      FROM {source}
+    ), g AS (
+      SELECT
+        (lon + 180) / 360 AS fx,
+        (1 - ln(tan(radians(lat)) + 1 / cos(radians(lat))) / pi()) / 2 AS fy,
+        root,
+        quad
+      FROM p
+      WHERE lat BETWEEN -{MAX_LATITUDE} AND {MAX_LATITUDE} AND lon BETWEEN -180 AND 180
+    )
+    SELECT
+      CAST(l.level AS TINYINT) AS level,
+      CAST(least(floor(fx * pow(2, l.level)), pow(2, l.level) - 1) AS INTEGER) AS x,
+      CAST(least(floor(fy * pow(2, l.level)), pow(2, l.level) - 1) AS INTEGER) AS y,
+      root,
+      quad,
+      COUNT(*) AS n
+    FROM g, (VALUES {values}) AS l(level)
+    GROUP BY ALL
+    """
+
+
+def has_geo_columns(con: duckdb.DuckDBPyConnection, source: str) -> bool:
+    cols = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+    return {"ActionGeo_Lat", "ActionGeo_Long", "EventRootCode", "QuadClass"} <= cols
+
+
+def grid_cells_table(table: pa.Table) -> pa.Table | None:
+    """Grid cell counts of one in-memory events batch (ingest); None without geo columns."""
+    con = connect(query_class_for("heatmap"))
+    con.register("events_batch", table)
+    if not has_geo_columns(con, "events_batch"):
+        return None
+    # Sorted so that Parquet row-group statistics prune on (level, x) at read time.
+    sql = f"SELECT * FROM ({grid_cells_sql('events_batch', levels())}) ORDER BY level, x, y"
+    return con.execute(sql).fetch_arrow_table()
+
+
+@dataclass(frozen=True)
+class TileGeometry:
+    """Where the cells of tile z/x/y are, at the stored level they are read from."""
+
+    cell_zoom: int  # zoom of the returned cells (< z beyond the finest level)
+    per_side: int  # cells per tile side
+    level: int  # stored level read
+    x_range: tuple[int, int]  # inclusive, in level units
+    y_range: tuple[int, int]
+    shift: int  # level -> cell_zoom roll-up
+    origin: tuple[int, int]  # tile's first cell, in cell_zoom units
+
+
+def tile_geometry(z: int, x: int, y: int) -> TileGeometry:
+    """Cells of tile z/x/y (coordinates must be valid for zoom z)."""
+    stored = levels()
+    finest = stored[-1]
+    cell_zoom = min(z + settings.heatmap_tile_bits, finest)
+    if cell_zoom < z:
+        # Over-zoomed: the whole tile lies in one finest-level cell.
+        px, py = x >> (z - finest), y >> (z - finest)
+        return TileGeometry(cell_zoom, 1, finest, (px, px), (py, py), 0, (px, py))
+    level = min(lv for lv in stored if lv >= cell_zoom)
+    span = level - z
+    return TileGeometry(
+        cell_zoom=cell_zoom,
+        per_side=1 << (cell_zoom - z),
+        level=level,
+        x_range=(x << span, ((x + 1) << span) - 1),
+        y_range=(y << span, ((y + 1) << span) - 1),
+        shift=level - cell_zoom,
+        origin=(x << (cell_zoom - z), y << (cell_zoom - z)),
+    )
+
+
+class TileCache:
+    """LRU of rendered tiles, valid for one lake version."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._tiles: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._version: str | None = None
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """The cached tile for `key` at the current lake version, else `render()` it."""
+        version = lake_version()
+        with self._lock:
+            if version != self._version:
+                self._tiles.clear()
+                self._version = version
+            body = self._tiles.get(key)
+            if body is not None:
+                self._tiles.move_to_end(key)
+        if body is not None:
+            HEATMAP_TILE_CACHE.labels("hit").inc()
+            return body
+        HEATMAP_TILE_CACHE.labels("miss").inc()
+        body = render()
+        with self._lock:
+            if version == self._version and settings.heatmap_cache_entries > 0:
+                self._tiles[key] = body
+                while len(self._tiles) > settings.heatmap_cache_entries:
+                    self._tiles.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+            self._version = None
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+tile_cache = TileCache()
@@ -0,0 +1,259 @@
+"""app.services.hot_tier
+
+In-process hot tier: the most recent batches of events kept as Arrow tables.
+
+Most traffic targets the last hours, yet every query used to re-read and
+decompress those Parquet files. The hot tier keeps them in memory:
+
+- Filled by `ingest_one` as batches land (batch listener registered by
+  `attach()`), and by a tail loader (`tail_loop`) that follows the lake version
+  so batches written by other processes (scheduler, Arq worker) are picked up too.
+- Evicted by age (batches older than `HOT_TIER_HOURS` before the newest batch
+  held) and by byte budget (`HOT_TIER_MAX_MB`, oldest first), and when their
+  Parquet file disappears from the lake.
+- Keyed by the batch's Parquet path or URI (any lake backend): `split(files)` partitions a query's file
+  list into one hot Arrow table and cold files, so a batch is read from exactly
+  one tier and results are identical to a pure-Parquet scan.
+
+Layout: the batches of one `dt` partition are combined into a single contiguous
+table (rebuilt when the partition's batches change) and each batch holds a
+zero-copy slice of it. DuckDB scans one large Arrow chunk several times faster
+than ~100 small per-batch chunks, and memory stays ~1x the data held.
+
+Metrics: hot_tier_bytes, hot_tier_batches, hot_tier_evictions_total{reason},
+duckdb_query_files_total{tier}.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pyarrow as pa
+
+from app.core.config import settings
+from app.core.metrics import HOT_TIER_BATCHES, HOT_TIER_BYTES, HOT_TIER_EVICTIONS, QUERY_FILES
+from app.infra.lake_storage import get_lake_storage, lake_version
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HotBatch:
+    """One batch held in memory."""
+
+    path: str
+    dt: str
+    ts: str
+    table: pa.Table
+    nbytes: int
+
+
+def _key(path: str | Path) -> str:
+    path = str(path)
+    if "://" in path:
+        return path
+    # Lake paths are already absolute (lake_root() is resolved): normalize without syscalls.
+    return os.path.abspath(path)
+
+
+def _ts_datetime(ts: str) -> datetime | None:
+    try:
+        return datetime.strptime(ts, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+
+
+def _lake_batches() -> dict[str, tuple[str, str]]:
+    """{batch key: (dt, ts)} of every batch of the lake."""
+    return {_key(b.uri): (b.dt, b.ts) for b in get_lake_storage().batches()}
+
+
+class HotTier:
+    """Recent batches as Arrow tables, bounded by age and bytes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._batches: dict[str, HotBatch] = {}
+        # dt -> (batch paths in table order, combined table); dropped when the partition changes.
+        self._partitions: dict[str, tuple[tuple[str, ...], pa.Table]] = {}
+        self._seen_version: str | None = None
+
+    # -- filling ---------------------------------------------------------------
+
+    def add(self, path: str | Path, dt: str, ts: str, table: pa.Table) -> None:
+        """Hold `table` (the content of Parquet file `path`) and enforce the budgets."""
+        if not settings.hot_tier_enabled:
+            return
+        key = _key(path)
+        with self._lock:
+            self._batches[key] = HotBatch(key, dt, ts, table, table.nbytes)
+            self._partitions.pop(dt, None)
+            self._evict_locked()
+
+    def on_batch(self, dt: str, ts: str, uri: str, table: pa.Table) -> None:
+        """Ingestion batch listener (see `app.services.ingest.add_batch_listener`)."""
+        self.add(uri, dt, ts, table)
+
+    def refresh_from_lake(self) -> int:
+        """Load recent batches present in the lake but not held yet; drop vanished ones.
+
+        Returns:
+            Number of batches loaded.
+        """
+        files = _lake_batches()
+        with self._lock:
+            for key in [k for k in self._batches if k not in files]:
+                self._drop_locked(self._batches[key], "removed")
+            held = set(self._batches)
+            self._update_gauges_locked()
+
+        cutoff = self._cutoff(max((ts for _, ts in files.values()), default=None))
+        loaded = 0
+        for key, (dt, ts) in sorted(files.items(), key=lambda kv: kv[1][1], reverse=True):
+            if key in held or (cutoff is not None and ts < cutoff):
+                continue
+            try:
+                table = get_lake_storage().read_table(key)
+            except Exception as exc:
+                # Transient storage error; the batch is retried on the next refresh.
+                logger.warning("Hot tier: skipping %s (%s)", key, exc)
+                continue
+            self.add(key, dt, ts, table)
+            loaded += 1
+        return loaded
+
+    def attach(self) -> None:
+        """Receive batches written by this process and preload recent ones from the lake."""
+        from app.services.ingest import add_batch_listener
+
+        add_batch_listener(self.on_batch)
+        self._seen_version = lake_version()
+        loaded = self.refresh_from_lake()
+        logger.info("Hot tier attached: %s batch(es) preloaded", loaded)
+
+    def detach(self) -> None:
+        """Stop receiving batches and drop everything held."""
+        from app.services.ingest import remove_batch_listener
+
+        remove_batch_listener(self.on_batch)
+        self.clear()
+
+    async def tail_loop(self) -> None:
+        """Follow the lake version and load new batches (multi-process setups)."""
+        while True:
+            try:
+                version = lake_version()
+                if version != self._seen_version:
+                    loaded = await asyncio.to_thread(self.refresh_from_lake)
+                    self._seen_version = version
+                    if loaded:
+                        logger.info("Hot tier: loaded %s batch(es)", loaded)
+            except Exception:
+                logger.exception("Hot tier tail loader failed")
+            await asyncio.sleep(settings.hot_tier_tail_interval_seconds)
+
+    # -- eviction --------------------------------------------------------------
+
+    @staticmethod
+    def _cutoff(newest_ts: str | None) -> str | None:
+        newest = _ts_datetime(newest_ts) if newest_ts else None
+        if newest is None:
+            return None
+        return (newest - timedelta(hours=settings.hot_tier_hours)).strftime("%Y%m%d%H%M%S")
+
+    def _drop_locked(self, batch: HotBatch, reason: str) -> None:
+        del self._batches[batch.path]
+        self._partitions.pop(batch.dt, None)
+        HOT_TIER_EVICTIONS.labels(reason).inc()
+
+    def _evict_locked(self) -> None:
+        cutoff = self._cutoff(max((b.ts for b in self._batches.values()), default=None))
+        oldest_first = sorted(self._batches.values(), key=lambda b: b.ts)
+        for b in oldest_first:
+            if cutoff is not None and b.ts < cutoff:
+                self._drop_locked(b, "age")
+
+        budget = settings.hot_tier_max_mb * 1024 * 1024
+        total = sum(b.nbytes for b in self._batches.values())
+        for b in sorted(self._batches.values(), key=lambda b: b.ts):
+            if total <= budget:
+                break
+            total -= b.nbytes
+            self._drop_locked(b, "bytes")
+        self._update_gauges_locked()
+
+    def _update_gauges_locked(self) -> None:
+        HOT_TIER_BYTES.set(sum(b.nbytes for b in self._batches.values()))
+        HOT_TIER_BATCHES.set(len(self._batches))
+
+    def clear(self) -> None:
+        """Drop everything."""
+        with self._lock:
+            self._batches.clear()
+            self._partitions.clear()
+            self._seen_version = None
+            self._update_gauges_locked()
+
+    # -- querying --------------------------------------------------------------
+
+    def _partition_locked(self, dt: str) -> tuple[tuple[str, ...], pa.Table]:
+        """Combined table of partition `dt`; its batches are re-pointed to slices of it."""
+        cached = self._partitions.get(dt)
+        if cached is not None:
+            return cached
+        batches = sorted((b for b in self._batches.values() if b.dt == dt), key=lambda b: b.ts)
+        combined = pa.concat_tables(
+            [b.table for b in batches], promote_options="permissive"
+        ).combine_chunks()
+        offset = 0
+        for b in batches:
+            n = b.table.num_rows
+            b.table = combined.slice(offset, n)
+            offset += n
+        entry = (tuple(b.path for b in batches), combined)
+        self._partitions[dt] = entry
+        return entry
+
+    def split(self, files: list[str]) -> tuple[pa.Table | None, list[str]]:
+        """Partition `files` into (one Arrow table of the hot ones, cold file paths)."""
+        with self._lock:
+            hot: dict[str, list[str]] = {}
+            cold: list[str] = []
+            for f in files:
+                b = self._batches.get(_key(f))
+                if b is None:
+                    cold.append(f)
+                else:
+                    hot.setdefault(b.dt, []).append(b.path)
+            QUERY_FILES.labels("hot").inc(sum(len(v) for v in hot.values()))
+            QUERY_FILES.labels("cold").inc(len(cold))
+            if not hot:
+                return None, cold
+
+            tables: list[pa.Table] = []
+            for dt in sorted(hot):
+                paths, combined = self._partition_locked(dt)
+                if set(hot[dt]) == set(paths):
+                    tables.append(combined)
+                else:
+                    wanted = sorted(hot[dt], key=lambda k: self._batches[k].ts)
+                    tables.extend(self._batches[k].table for k in wanted)
+
+        return pa.concat_tables(tables, promote_options="permissive"), cold
+
+    def stats(self) -> dict[str, int]:
+        """Batches and bytes currently held."""
+        with self._lock:
+            return {
+                "batches": len(self._batches),
+                "bytes": sum(b.nbytes for b in self._batches.values()),
+            }
+
+
+hot_tier = HotTier()
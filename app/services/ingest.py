@@ -2,34 +2,103 @@ from __future__ import annotations
 
 """app.services.ingest
 
-Ingestion pipeline for a single GDELT batch:
+Ingestion pipeline for a single GDELT file (events, mentions or GKG):
 - stream download zip to a temp file (memory efficient)
 - extract CSV file (stream copy)
-- convert CSV -> Parquet using PyArrow
-- write Parquet to filesystem Data Lake (partitioned)
+- convert CSV -> Parquet using PyArrow, with the dataset's schema
+  (`app.domain`); GKG is streamed block by block and exploded into side tables
+  (`app.services.gkg`); an events batch also gets its distinct actor / location
+  names (`actor_names` side table, `app.services.actor_index`) and its event
+  counts per map grid cell (`geo_grid` side table, `app.services.heatmap`)
+- write Parquet to the lake under the dataset's root (partitioned; local
+  filesystem or object storage, see `app.infra.lake_storage`), then bump the
+  lake version
+- add each events batch to the actor interaction graph of its day
+  (`app.services.actor_graph`; a failure is logged, the API catches up from the lake)
 
 Good practices:
 - Safety cap on download size (gdelt_max_download_mb)
 - Avoid loading entire zip in memory
 - Use compression (ZSTD) to reduce disk footprint
+- httpx and the GKG converter are imported on first use: API workers import
+  this module for the batch listeners only, and should not pay for them at boot
+
+Batch listeners:
+- Callables registered with `add_batch_listener(fn)` are called as
+  `fn(dt, ts, uri, table)` once an events batch is written and the lake version
+  bumped (e.g. the in-memory hot tier). A failing listener is logged, never fails ingestion.
+
+Observability:
+- Each stage (download, extract, parse, write) is timed and counted by outcome
+  via `app.core.metrics.track_stage`, with per-batch byte sizes and row counts.
 """
 
+import logging
 import tempfile
+import time
+from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import httpx
+import pyarrow as pa
 import pyarrow.csv as pacsv
 import pyarrow.parquet as pq
 
 from app.core.config import settings
-from app.domain.gdelt_events_schema import EVENTS_COLUMNS
-from app.infra.fs_lake import ensure_lake_dirs, parquet_path
-from .gdelt import GdeltFile
+from app.core.metrics import (
+    INGEST_BATCH_BYTES,
+    INGEST_IN_PROGRESS,
+    INGEST_ROWS,
+    INGEST_ROWS_PER_SECOND,
+    track_stage,
+)
+from app.domain.datasets import ACTOR_NAMES, EVENTS, GEO_GRID, GKG, MENTIONS
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS, EVENTS_STRING_COLUMNS
+from app.domain.gdelt_mentions_schema import MENTIONS_COLUMN_TYPES, MENTIONS_COLUMNS
+from app.infra.lake_storage import get_lake_storage
+from app.services.actor_graph import actor_graph
+from app.services.actor_index import batch_actor_names
+from app.services.heatmap import grid_cells_table
+
+if TYPE_CHECKING:
+    from .gdelt import GdeltFile
+
+logger = logging.getLogger(__name__)
+
+BatchListener = Callable[[str, str, str, pa.Table], None]
+
+_batch_listeners: list[BatchListener] = []
+
+
+def add_batch_listener(fn: BatchListener) -> None:
+    """Call `fn(dt, ts, uri, table)` after every events batch written by this process."""
+    if fn not in _batch_listeners:
+        _batch_listeners.append(fn)
+
 
+def remove_batch_listener(fn: BatchListener) -> None:
+    """Unregister a listener added with `add_batch_listener` (no-op if absent)."""
+    if fn in _batch_listeners:
+        _batch_listeners.remove(fn)
+
+
+def _notify_batch(dt: str, ts: str, uri: str, table: pa.Table) -> None:
+    for fn in list(_batch_listeners):
+        try:
+            fn(dt, ts, uri, table)
+        except Exception:
+            logger.exception("Batch listener %r failed for %s", fn, uri)
+
+
+async def _download_to_file(url: str, dest: Path) -> int:
+    """Stream-download a URL into a local file (memory-efficient).
+
+    Returns:
+        Number of bytes downloaded.
+    """
+    import httpx  # only ingesting processes pay for it, not API workers importing listeners
 
-async def _download_to_file(url: str, dest: Path) -> None:
-    """Stream-download a URL into a local file (memory-efficient)."""
     max_bytes = settings.gdelt_max_download_mb * 1024 * 1024
     downloaded = 0
 
@@ -42,17 +111,23 @@ async def _download_to_file(url: str, dest: Path) -> None:
                     if downloaded > max_bytes:
                         raise RuntimeError(f"Download exceeds limit ({settings.gdelt_max_download_mb} MB).")
                     f.write(chunk)
+    return downloaded
 
 
-def _extract_single_member(zip_path: Path, out_dir: Path) -> Path:
-    """Extract the first (and usually only) member of a zip to out_dir."""
+def _extract_single_member(zip_path: Path, out_dir: Path) -> tuple[Path, int, int]:
+    """Extract the first (and usually only) member of a zip to out_dir.
+
+    Returns:
+        (extracted path, compressed size, uncompressed size) of the member.
+    """
     import zipfile
 
     with zipfile.ZipFile(zip_path) as zf:
-        names = zf.namelist()
-        if not names:
+        infos = zf.infolist()
+        if not infos:
             raise RuntimeError("Empty zip")
-        name = names[0]
+        info = infos[0]
+        name = info.filename
         out = out_dir / name
         out.parent.mkdir(parents=True, exist_ok=True)
 
@@ -63,14 +138,29 @@ def _extract_single_member(zip_path: Path, out_dir: Path) -> Path:
                 if not buf:
                     break
                 dst.write(buf)
-        return out
+        return out, info.compress_size, info.file_size
+
 
+def _read_dataset_csv(csv_path: Path, columns: list[str], column_types: dict[str, str]) -> pa.Table:
+    """Read a TAB-delimited CSV export into an Arrow table with stable column names.
 
-def _write_events_parquet(csv_path: Path, out_parquet: Path) -> None:
-    """Read a TAB-delimited CSV export and write it to Parquet (ZSTD)."""
+    Args:
+        columns: the dataset's column names (applied when the file width matches).
+        column_types: Arrow type aliases pinned per column name (others inferred).
+    """
     parse_opts = pacsv.ParseOptions(delimiter="\t", newlines_in_values=False)
     read_opts = pacsv.ReadOptions(autogenerate_column_names=True)
-    convert_opts = pacsv.ConvertOptions(strings_can_be_null=True)
+
+    types: dict[str, pa.DataType] = {}
+    with csv_path.open("rb") as f:
+        width = f.readline().count(b"\t") + 1
+    if width == len(columns):
+        types = {
+            f"f{i}": pa.type_for_alias(column_types[name])
+            for i, name in enumerate(columns)
+            if name in column_types
+        }
+    convert_opts = pacsv.ConvertOptions(strings_can_be_null=True, column_types=types)
 
     table = pacsv.read_csv(
         str(csv_path),
@@ -80,42 +170,127 @@ def _write_events_parquet(csv_path: Path, out_parquet: Path) -> None:
     )
 
     # If the width matches known schema, rename columns to meaningful names.
-    if table.num_columns == len(EVENTS_COLUMNS):
-        table = table.rename_columns(EVENTS_COLUMNS)
+    if table.num_columns == len(columns):
+        table = table.rename_columns(columns)
     else:
         # Stable generic naming
         cols = [f"c{i+1}" for i in range(table.num_columns)]
         table = table.rename_columns(cols)
+    return table
+
+
+def _read_events_csv(csv_path: Path) -> pa.Table:
+    """Read an events export; CAMEO / geo code columns stay strings ("010" keeps its zero)."""
+    return _read_dataset_csv(csv_path, EVENTS_COLUMNS, {c: "string" for c in EVENTS_STRING_COLUMNS})
+
+
+def _read_mentions_csv(csv_path: Path) -> pa.Table:
+    """Read a mentions export with its pinned column types."""
+    return _read_dataset_csv(csv_path, MENTIONS_COLUMNS, MENTIONS_COLUMN_TYPES)
 
+
+def _write_events_parquet(table: pa.Table, out_parquet: Path) -> int:
+    """Write an events table to Parquet (ZSTD) and return the file size in bytes."""
     pq.write_table(table, str(out_parquet), compression="zstd")
+    return out_parquet.stat().st_size
 
 
 async def ingest_one(gf: GdeltFile) -> dict:
-    """Download one batch and write to LOCAL filesystem as Parquet.
+    """Download one GDELT file and write it to the lake as Parquet.
 
     Args:
-        gf: The GDELT batch file to ingest.
+        gf: The GDELT batch file to ingest (events, mentions or GKG).
 
     Returns:
         Dict containing:
-        - path: local parquet path
+        - path: parquet path (filesystem lake) or s3:// URI (object-storage lake)
+          of the dataset's main table
         - dt: partition date (YYYY-MM-DD)
         - ts: batch timestamp (YYYYMMDDHHMMSS)
         - url: source url
+        - dataset: events | mentions | gkg
+        - rows: number of rows written (main table)
+        - tables: {lake dataset: rows} of every table written (GKG side tables included)
     """
-    ensure_lake_dirs()
+    storage = get_lake_storage()
+    dataset = gf.dataset or EVENTS
 
     dt = "unknown"
     if gf.ts != "unknown":
         dt = datetime.strptime(gf.ts, "%Y%m%d%H%M%S").date().isoformat()
 
-    out = parquet_path(dt=dt, ts=gf.ts)
-
-    with tempfile.TemporaryDirectory() as tmp:
+    with INGEST_IN_PROGRESS.track_inprogress(), tempfile.TemporaryDirectory() as tmp:
         tmpdir = Path(tmp)
         zip_file = tmpdir / f"gdelt_{gf.ts}.zip"
-        await _download_to_file(gf.url, zip_file)
-        csv_file = _extract_single_member(zip_file, tmpdir)
-        _write_events_parquet(csv_file, out)
 
-    return {"path": str(out), "dt": dt, "ts": gf.ts, "url": gf.url}
+        with track_stage("download"):
+            downloaded = await _download_to_file(gf.url, zip_file)
+        INGEST_BATCH_BYTES.labels("downloaded").observe(downloaded)
+
+        with track_stage("extract"):
+            csv_file, compressed, uncompressed = _extract_single_member(zip_file, tmpdir)
+        INGEST_BATCH_BYTES.labels("zip_compressed").observe(compressed)
+        INGEST_BATCH_BYTES.labels("csv_uncompressed").observe(uncompressed)
+
+        convert_start = time.perf_counter()
+        table: pa.Table | None = None
+        if dataset == GKG:
+            # Streamed: parsed, exploded and written locally block by block.
+            from .gkg import convert_gkg
+
+            with track_stage("parse"):
+                converted = convert_gkg(csv_file, tmpdir / "gkg")
+            rows = converted[GKG][1] if GKG in converted else 0
+        else:
+            with track_stage("parse"):
+                table = _read_mentions_csv(csv_file) if dataset == MENTIONS else _read_events_csv(csv_file)
+            rows = table.num_rows
+        INGEST_ROWS.inc(rows)
+
+        uris: dict[str, str] = {}
+        side_rows: dict[str, int] = {}
+        with track_stage("write"):
+            if table is not None:
+                out, written = storage.write_batch(dt, gf.ts, table, _write_events_parquet, dataset)
+                uris[dataset] = out
+                INGEST_BATCH_BYTES.labels("parquet_written").observe(written)
+                if dataset == EVENTS:
+                    # Distinct actor / location names (fuzzy search dictionary) and
+                    # counts per map grid cell (heatmap tiles).
+                    for side, side_table in (
+                        (ACTOR_NAMES, batch_actor_names(table)),
+                        (GEO_GRID, grid_cells_table(table)),
+                    ):
+                        if side_table is not None and side_table.num_rows:
+                            uris[side], _ = storage.write_batch(
+                                dt, gf.ts, side_table, _write_events_parquet, side
+                            )
+                            side_rows[side] = side_table.num_rows
+            else:
+                for name, (local, _) in converted.items():
+                    uris[name], written = storage.put_file(name, dt, gf.ts, local)
+                    INGEST_BATCH_BYTES.labels("parquet_written").observe(written)
+        storage.bump_version()
+        if dataset == EVENTS and table is not None:
+            if settings.graph_enabled:
+                try:
+                    actor_graph.add_batch(dt, uris[dataset], table)
+                except Exception:
+                    logger.exception("Actor graph update failed for %s", uris[dataset])
+            _notify_batch(dt, gf.ts, uris[dataset], table)
+
+        convert_seconds = time.perf_counter() - convert_start
+        if convert_seconds > 0:
+            INGEST_ROWS_PER_SECOND.set(rows / convert_seconds)
+
+    tables = {dataset: rows} if table is not None else {name: n for name, (_, n) in converted.items()}
+    tables.update(side_rows)
+    return {
+        "path": uris.get(dataset),
+        "dt": dt,
+        "ts": gf.ts,
+        "url": gf.url,
+        "dataset": dataset,
+        "rows": rows,
+        "tables": tables,
+    }
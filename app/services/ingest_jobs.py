@@ -0,0 +1,317 @@
+"""app.services.ingest_jobs
+
+Local-mode ingestion jobs, run by a runner process outside the API.
+
+`POST /api/v1/ingest/trigger` used to run the ingestion in a FastAPI
+background task inside the API worker: the CSV -> Parquet conversion then
+competed with request handling, repeated triggers piled up without bound and
+nothing reported their state. A trigger now:
+
+- is submitted (`submit`): recorded as a `queued` job under `INGEST_JOBS_DIR`
+  (default `{DATA_LAKE_PATH}/_ingest_jobs`), one JSON file per job written
+  atomically (like export jobs, `app.services.exports`), so every API worker
+  and the runner share them;
+- is deduplicated: a trigger identical to a job still `queued` (same
+  `n_batches`) returns that job (`triggers` counts them) instead of queuing a
+  second run of the same batches; once running, a job no longer absorbs
+  triggers (newer batches may have been published since it listed them);
+- is bounded: `INGEST_MAX_PENDING` queued + running jobs at most, beyond
+  which triggers are shed (503 + Retry-After);
+- runs in the runner process (`python -m app.ingest_runner`, `serve`): one
+  job at a time in submission order, at a lower CPU priority
+  (`INGEST_RUNNER_NICE`). API workers start it on demand (`ensure_runner`,
+  `INGEST_RUNNER_AUTOSTART`); a lock file keeps one runner per jobs
+  directory, and it exits after `INGEST_RUNNER_IDLE_SECONDS` without jobs.
+  API workers pick the new batches up through the lake version like batches
+  of the scheduler (hot tier and push feed tail loops); the runner feeds
+  continuous views itself, batch by batch, through their shared state files;
+- reports its progress (`get`): batch files picked (`total`, one per
+  dataset and batch), ingested (`done`) and failed so far, with each file's
+  result. A job whose files all ran is `done` even if some failed; it is
+  `failed` when the batches could not be listed (or its runner died).
+
+Finished jobs are deleted `INGEST_JOB_RETENTION_HOURS` after they finished;
+a `running` job whose process died is marked failed.
+
+Submissions and claims are serialized by a lock file (fcntl). Without fcntl
+(Windows), run a single runner yourself (`INGEST_RUNNER_AUTOSTART=false`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from app.core.admission import AdmissionRejected
+from app.core.config import settings
+from app.core.metrics import INGEST_JOBS, export_process_metrics
+from app.core.processes import process_alive
+
+try:
+    import fcntl
+except ImportError:  # Windows: see the module docstring
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+PENDING = ("queued", "running")
+
+
+class IngestJobError(ValueError):
+    """Unknown ingestion job."""
+
+
+@dataclass
+class IngestJob:
+    """State of one ingestion job (persisted as JSON)."""
+
+    id: str
+    n_batches: int
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    triggers: int = 1  # identical triggers absorbed while queued
+    total: int | None = None  # batch files picked from lastupdate.txt (one per dataset)
+    done: int = 0
+    failed: int = 0
+    results: list[dict[str, Any]] = field(default_factory=list)
+    error: str | None = None
+    host: str | None = None  # process running it: host and pid
+    pid: int | None = None
+
+    def expires_at(self) -> float | None:
+        if self.finished_at is None:
+            return None
+        return self.finished_at + settings.ingest_job_retention_hours * 3600
+
+    def to_json(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_json(cls, data: dict) -> IngestJob:
+        return cls(**data)
+
+
+class IngestJobManager:
+    """Ingestion jobs, shared by API workers and the runner through `INGEST_JOBS_DIR`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._runner: subprocess.Popen | None = None  # runner started by this process
+
+    # -- storage ---------------------------------------------------------------
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(settings.ingest_jobs_dir or Path(settings.data_lake_path) / "_ingest_jobs")
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory() / f"{job_id}.json"
+
+    def _save(self, job: IngestJob) -> None:
+        path = self._path(job.id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(job.to_json()))
+        os.replace(tmp, path)
+
+    def _jobs(self) -> list[IngestJob]:
+        if not self.directory().exists():
+            return []
+        jobs = []
+        for path in self.directory().glob("*.json"):
+            try:
+                jobs.append(IngestJob.from_json(json.loads(path.read_text())))
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Ingest job %s: cannot load %s (%s)", path.stem, path, exc)
+        return jobs
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Serialize submissions and claims, in this process and across processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.directory().mkdir(parents=True, exist_ok=True)
+            with (self.directory() / "_jobs.lock").open("a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get(self, job_id: str) -> IngestJob:
+        self.purge_expired()
+        try:
+            return IngestJob.from_json(json.loads(self._path(job_id).read_text()))
+        except (FileNotFoundError, ValueError):
+            raise IngestJobError(f"unknown ingestion job {job_id!r}") from None
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def purge_expired(self) -> int:
+        """Delete expired finished jobs; fail running jobs whose process died."""
+        now = time.time()
+        purged = 0
+        for job in self._jobs():
+            if job.status == "running" and not process_alive(job.host, job.pid):
+                job.status, job.error, job.finished_at = "failed", "interrupted", now
+                self._save(job)
+                INGEST_JOBS.labels("failed").inc()
+            expires = job.expires_at()
+            if expires is not None and expires <= now:
+                self._path(job.id).unlink(missing_ok=True)
+                purged += 1
+        return purged
+
+    def submit(self, n_batches: int) -> IngestJob:
+        """Record a queued job, or return the identical job already queued.
+
+        Raises:
+            AdmissionRejected: `INGEST_MAX_PENDING` jobs are already queued or running.
+        """
+        self.purge_expired()
+        with self._locked():
+            jobs = self._jobs()
+            for job in jobs:
+                if job.status == "queued" and job.n_batches == n_batches:
+                    job.triggers += 1
+                    self._save(job)
+                    INGEST_JOBS.labels("deduplicated").inc()
+                    return job
+            if sum(1 for job in jobs if job.status in PENDING) >= settings.ingest_max_pending:
+                raise AdmissionRejected("ingest", "max_pending", retry_after=60)
+            job = IngestJob(id=uuid.uuid4().hex, n_batches=n_batches)
+            self._save(job)
+        INGEST_JOBS.labels("queued").inc()
+        return job
+
+    def claim(self) -> IngestJob | None:
+        """Mark the oldest queued job as running in this process; None if none is queued."""
+        with self._locked():
+            queued = [job for job in self._jobs() if job.status == "queued"]
+            if not queued:
+                return None
+            job = min(queued, key=lambda j: j.created_at)
+            job.status, job.started_at = "running", time.time()
+            job.host, job.pid = socket.gethostname(), os.getpid()
+            self._save(job)
+            return job
+
+    async def run(self, job: IngestJob) -> IngestJob:
+        """Ingest a claimed job's batches, saving progress after each batch."""
+        # The ingestion stack (httpx, tenacity, pyarrow CSV) only loads in the runner.
+        from app.services.gdelt import fetch_lastupdate, pick_recent
+        from app.tasks import run_ingestion_for
+
+        def progress(result: dict[str, Any]) -> None:
+            job.results.append(result)
+            if result["status"] == "ok":
+                job.done += 1
+            else:
+                job.failed += 1
+            self._save(job)
+
+        try:
+            picked = pick_recent(await fetch_lastupdate(), job.n_batches)
+            job.total = len(picked)
+            self._save(job)
+            await run_ingestion_for(picked, on_result=progress)
+            job.status = "done"
+        except Exception as exc:
+            logger.exception("Ingestion job %s failed", job.id)
+            job.status, job.error = "failed", str(exc)
+        job.finished_at = time.time()
+        self._save(job)
+        INGEST_JOBS.labels(job.status).inc()
+        logger.info(
+            "Ingestion job %s %s: %s/%s batches ok", job.id, job.status, job.done, job.total
+        )
+        return job
+
+    # -- runner process --------------------------------------------------------
+
+    def _runner_lock(self) -> Path:
+        return self.directory() / "_runner.lock"
+
+    def runner_alive(self) -> bool:
+        """True if a runner process holds the runner lock (False without fcntl)."""
+        if fcntl is None or not self._runner_lock().exists():
+            return False
+        with self._runner_lock().open("a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(f, fcntl.LOCK_UN)
+            return False
+
+    def ensure_runner(self) -> bool:
+        """Start the runner process unless one is running; True if one was started."""
+        if self._runner is not None and self._runner.poll() is not None:
+            self._runner = None  # reaped
+        if not settings.ingest_runner_autostart or self.runner_alive():
+            return False
+        # Own session: it finishes its jobs if the API worker restarts.
+        self._runner = subprocess.Popen(
+            [sys.executable, "-m", "app.ingest_runner"],
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        logger.info("Ingestion runner process started")
+        return True
+
+    def serve(self) -> int:
+        """Runner main loop: run queued jobs until idle; return the number of jobs run.
+
+        Returns 0 at once if another runner holds the runner lock.
+        """
+        self.directory().mkdir(parents=True, exist_ok=True)
+        with self._runner_lock().open("a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    logger.info("Another ingestion runner is active, exiting")
+                    return 0
+            return asyncio.run(self._serve(lock))
+
+    async def _serve(self, lock: Any) -> int:
+        ran = 0
+        idle_since = time.monotonic()
+        while True:
+            job = self.claim()
+            if job is not None:
+                await self.run(job)
+                export_process_metrics("ingest_runner")
+                ran += 1
+                idle_since = time.monotonic()
+                continue
+            idle = settings.ingest_runner_idle_seconds
+            if idle > 0 and time.monotonic() - idle_since >= idle:
+                with self._locked():
+                    # Submissions hold the same lock: a job queued before this check is
+                    # run, one queued after it sees no runner and starts a new one.
+                    if not any(j.status == "queued" for j in self._jobs()):
+                        if fcntl is not None:
+                            fcntl.flock(lock, fcntl.LOCK_UN)
+                        return ran
+            await asyncio.sleep(settings.ingest_runner_poll_seconds)
+
+
+ingest_jobs = IngestJobManager()
@@ -0,0 +1,360 @@
+"""app.services.query_profiler
+
+Opt-in DuckDB profiling and slow-query log.
+
+Every query issued through `run_query` is timed into
+`duckdb_query_duration_seconds{kind}`. When profiling applies to the query
+(`DUCKDB_PROFILING=always`, or `sampled` with `DUCKDB_PROFILING_SAMPLE_RATE`,
+optionally restricted by `DUCKDB_PROFILING_KINDS`), DuckDB's JSON profile is
+captured for that single query and summarized:
+- rows returned / rows scanned / bytes read
+- number of Parquet files read
+- the most expensive operators (name, time, cardinality)
+
+Queries slower than `SLOW_QUERY_THRESHOLD_MS` are kept in a bounded
+in-memory ring buffer exposed by `GET /debug/slow-queries`.
+
+Resource usage (peak buffer memory, spill size) is recorded per query class
+for every query: from the detailed profile when there is one, else from the
+lightweight profiling enabled on governor cursors (`app.infra.duckdb_engine`).
+Queries aborted by their class `memory_limit` are counted as violations.
+
+Profiling is enabled on the query's own connection only, and the connection's
+previous profiling settings (none, or the governor's resource metrics) are
+restored right after, even when the query fails, so unprofiled queries pay
+nothing. DuckDB releases without `get_profiling_information()` (the pinned
+1.4.x) write the JSON profile to a per-query temp file instead.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import Any, TypeVar
+
+import duckdb
+
+from app.core.config import settings
+from app.core.metrics import (
+    QUERY_BYTES_READ,
+    QUERY_LATENCY,
+    QUERY_MEMORY_LIMIT_EXCEEDED,
+    QUERY_PEAK_MEMORY,
+    QUERY_ROWS_SCANNED,
+    QUERY_SPILL_BYTES,
+    QUERY_SPILLS,
+    SLOW_QUERIES,
+)
+from app.infra.duckdb_engine import query_class_for
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TOP_OPERATORS = 10
+
+
+@dataclass(frozen=True)
+class OperatorTiming:
+    """One operator of a profiled query plan."""
+
+    name: str
+    seconds: float
+    cardinality: int
+    rows_scanned: int
+
+
+@dataclass(frozen=True)
+class QueryProfile:
+    """Summary of DuckDB's JSON profiling output for one query."""
+
+    rows_returned: int | None = None
+    rows_scanned: int | None = None
+    bytes_read: int | None = None
+    files_scanned: int | None = None
+    peak_memory_bytes: int | None = None
+    temp_dir_peak_bytes: int | None = None
+    operators: list[OperatorTiming] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class SlowQueryRecord:
+    """One entry of the slow-query ring buffer."""
+
+    kind: str
+    sql: str
+    params: list[Any]
+    started_at: str
+    duration_ms: float
+    profile: QueryProfile | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-friendly representation (used by the debug endpoint)."""
+        return asdict(self)
+
+
+class SlowQueryLog:
+    """Thread-safe bounded ring buffer of slow queries (oldest entries dropped)."""
+
+    def __init__(self, maxlen: int) -> None:
+        self._items: deque[SlowQueryRecord] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, record: SlowQueryRecord) -> None:
+        """Append a record, evicting the oldest one when full."""
+        with self._lock:
+            self._items.append(record)
+
+    def snapshot(self) -> list[SlowQueryRecord]:
+        """Return records newest-first."""
+        with self._lock:
+            return list(reversed(self._items))
+
+    def clear(self) -> None:
+        """Drop all records."""
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of records kept."""
+        return self._items.maxlen or 0
+
+
+slow_query_log = SlowQueryLog(maxlen=settings.slow_query_log_size)
+
+
+def should_profile(kind: str) -> bool:
+    """Decide whether this query gets DuckDB profiling (mode + sampling + kind filter)."""
+    mode = settings.duckdb_profiling.lower()
+    if mode == "off":
+        return False
+    if settings.duckdb_profiling_kinds and kind not in settings.duckdb_profiling_kinds:
+        return False
+    if mode == "sampled":
+        return random.random() < settings.duckdb_profiling_sample_rate
+    return mode == "always"
+
+
+def _walk(node: dict[str, Any]) -> list[dict[str, Any]]:
+    """Flatten a profiling tree (depth-first) into a list of operator nodes."""
+    out: list[dict[str, Any]] = []
+    stack = list(node.get("children", []))
+    while stack:
+        n = stack.pop()
+        out.append(n)
+        stack.extend(n.get("children", []))
+    return out
+
+
+def parse_profile(raw: str) -> QueryProfile | None:
+    """Summarize DuckDB's JSON profile. Returns None if profiling info is unavailable."""
+    try:
+        root = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(root, dict) or "result" in root:
+        # {"result": "disabled"} / {"result": "error"}
+        return None
+
+    operators = _walk(root)
+    files = 0
+    for op in operators:
+        info = op.get("extra_info") or {}
+        if isinstance(info, dict) and "Total Files Read" in info:
+            try:
+                files += int(info["Total Files Read"])
+            except (TypeError, ValueError):
+                pass
+
+    rows_scanned = root.get("cumulative_rows_scanned")
+    if rows_scanned is None:
+        rows_scanned = sum(int(op.get("operator_rows_scanned") or 0) for op in operators)
+
+    timings = sorted(
+        (
+            OperatorTiming(
+                name=str(op.get("operator_name") or op.get("operator_type") or "?").strip(),
+                seconds=float(op.get("operator_timing") or 0.0),
+                cardinality=int(op.get("operator_cardinality") or 0),
+                rows_scanned=int(op.get("operator_rows_scanned") or 0),
+            )
+            for op in operators
+        ),
+        key=lambda o: o.seconds,
+        reverse=True,
+    )[:_TOP_OPERATORS]
+
+    return QueryProfile(
+        rows_returned=root.get("rows_returned"),
+        rows_scanned=rows_scanned,
+        bytes_read=root.get("total_bytes_read"),
+        files_scanned=files,
+        peak_memory_bytes=root.get("system_peak_buffer_memory"),
+        temp_dir_peak_bytes=root.get("system_peak_temp_dir_size"),
+        operators=timings,
+    )
+
+
+def _resource_usage(con: duckdb.DuckDBPyConnection) -> tuple[int | None, int | None]:
+    """(peak memory, peak temp dir size) from lightweight profiling, if enabled on `con`."""
+    if not hasattr(con, "get_profiling_information"):
+        return None, None
+    try:
+        root = json.loads(con.get_profiling_information(format="json"))
+    except (duckdb.Error, ValueError):
+        return None, None
+    if not isinstance(root, dict):
+        return None, None
+    return root.get("system_peak_buffer_memory"), root.get("system_peak_temp_dir_size")
+
+
+def _record_resources(query_class: str, peak_memory: int | None, temp_peak: int | None) -> None:
+    if peak_memory:
+        QUERY_PEAK_MEMORY.labels(query_class).observe(peak_memory)
+    if temp_peak:
+        QUERY_SPILLS.labels(query_class).inc()
+        QUERY_SPILL_BYTES.labels(query_class).observe(temp_peak)
+
+
+# Restored in this order: setting custom_profiling_settings switches profiling on.
+_PROFILING_SETTINGS = (
+    "profiling_mode",
+    "profiling_output",
+    "custom_profiling_settings",
+    "enable_profiling",
+)
+
+
+def _profiling_baseline(con: duckdb.DuckDBPyConnection) -> dict[str, Any]:
+    """Current profiling settings of `con` (None = default), to restore after a profile."""
+    baseline: dict[str, Any] = {}
+    for name in _PROFILING_SETTINGS:
+        try:
+            baseline[name] = con.execute(f"SELECT current_setting('{name}')").fetchone()[0]
+        except duckdb.Error:
+            continue  # setting unknown to this DuckDB release
+    return baseline
+
+
+def _enable_profiling(con: duckdb.DuckDBPyConnection) -> str | None:
+    """Turn on detailed JSON profiling; return the output file when one is needed.
+
+    Governor cursors collect only the resource metrics (`app.infra.duckdb_engine`):
+    the full metric set is restored for the profiled query.
+    """
+    out: str | None = None
+    if hasattr(con, "get_profiling_information"):
+        con.execute("SET enable_profiling = 'no_output'")
+        con.execute("RESET custom_profiling_settings")
+    else:
+        fd, out = tempfile.mkstemp(prefix="duckdb_profile_", suffix=".json")
+        os.close(fd)
+        con.execute("SET enable_profiling = 'json'")
+        con.execute(f"SET profiling_output = '{out.replace(os.sep, '/')}'")
+    con.execute("SET profiling_mode = 'detailed'")
+    return out
+
+
+def _restore_profiling(con: duckdb.DuckDBPyConnection, baseline: dict[str, Any]) -> None:
+    """Put back the profiling settings `con` had before `_enable_profiling`."""
+    try:
+        for name, value in baseline.items():
+            if value is None:
+                con.execute(f"RESET {name}")
+            else:
+                con.execute(f"SET {name} = '{str(value).replace(chr(39), chr(39) * 2)}'")
+    except duckdb.Error as exc:  # e.g. connection invalidated by a fatal error
+        logger.warning("Could not restore DuckDB profiling settings: %s", exc)
+
+
+def _read_profile(con: duckdb.DuckDBPyConnection, out: str | None) -> str:
+    """Return the JSON profile of the last query."""
+    if out is None:
+        return con.get_profiling_information(format="json")
+    with open(out, encoding="utf-8") as f:
+        return f.read()
+
+
+def run_query(
+    con: duckdb.DuckDBPyConnection,
+    kind: str,
+    sql: str,
+    params: Sequence[Any] | None,
+    fetch: Callable[[duckdb.DuckDBPyConnection], T],
+) -> T:
+    """Execute `sql` on `con`, fetch with `fetch`, and record latency / profile.
+
+    Args:
+        con: Connection dedicated to this query.
+        kind: Low-cardinality query family label (search, top_values, tone, ...).
+        sql: SQL text (parameters bound separately).
+        params: Bound parameters, also kept in the slow-query log.
+        fetch: Materializes the result, e.g. `lambda c: c.fetchall()`.
+    """
+    profiled = should_profile(kind)
+    baseline = _profiling_baseline(con) if profiled else {}
+    profile_out = _enable_profiling(con) if profiled else None
+
+    started_at = datetime.now(UTC).isoformat()
+    start = time.perf_counter()
+    profile: QueryProfile | None = None
+    try:
+        try:
+            result = fetch(con.execute(sql, list(params or [])))
+        except BaseException as exc:
+            if isinstance(exc, duckdb.OutOfMemoryException):
+                QUERY_MEMORY_LIMIT_EXCEEDED.labels(query_class_for(kind)).inc()
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            QUERY_LATENCY.labels(kind).observe(duration)
+        if profiled:
+            try:
+                # DuckDB completes the profile once the result is exhausted
+                # (`fetchone()` leaves it open).
+                con.fetchall()
+                profile = parse_profile(_read_profile(con, profile_out))
+            except (duckdb.Error, OSError) as exc:
+                logger.warning("Could not read DuckDB profile: %s", exc)
+    finally:
+        # Also after a failed query: later queries on this cursor must not stay profiled.
+        if profiled:
+            _restore_profiling(con, baseline)
+        if profile_out is not None:
+            os.unlink(profile_out)
+
+    if profile is not None:
+        if profile.rows_scanned is not None:
+            QUERY_ROWS_SCANNED.labels(kind).observe(profile.rows_scanned)
+        if profile.bytes_read is not None:
+            QUERY_BYTES_READ.labels(kind).observe(profile.bytes_read)
+        _record_resources(query_class_for(kind), profile.peak_memory_bytes, profile.temp_dir_peak_bytes)
+    else:
+        _record_resources(query_class_for(kind), *_resource_usage(con))
+
+    duration_ms = duration * 1000
+    if duration_ms >= settings.slow_query_threshold_ms:
+        SLOW_QUERIES.labels(kind).inc()
+        slow_query_log.add(
+            SlowQueryRecord(
+                kind=kind,
+                sql=" ".join(sql.split()),
+                params=list(params or []),
+                started_at=started_at,
+                duration_ms=round(duration_ms, 3),
+                profile=profile,
+            )
+        )
+        logger.warning("Slow DuckDB query (kind=%s, %.0f ms)", kind, duration_ms)
+
+    return result
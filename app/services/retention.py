@@ -0,0 +1,409 @@
+"""app.services.retention
+
+Retention tiers for the lake: recompress, roll up, then drop old partitions.
+
+The lake used to grow forever, and every unpruned query (the whole-lake glob
+of `_parquet_glob_for_dates`) listed and opened more files each week. A
+retention run applies three age-based tiers (partition date `dt` against the
+current UTC day; a tier is disabled while its setting is unset):
+
+- recompress (`RETENTION_RECOMPRESS_AFTER_DAYS`): every batch file of every
+  dataset is rewritten with `RETENTION_ZSTD_LEVEL` and row groups of up to
+  `RETENTION_ROW_GROUP_ROWS` rows, in place (same URI). Rows are unchanged,
+  so the per-batch bookkeeping keyed on batch URIs (actor graph manifest,
+  continuous views, hot tier, HTTP validators) stays valid. Rewritten files
+  carry a footer tag (`gdelt_retention`) and are skipped by later runs.
+- roll up (`RETENTION_ROLLUP_AFTER_DAYS`): the raw events of a partition are
+  replaced by one `events_rollup` file: per top-values column
+  (`duckdb_queries.TOP_VALUE_FIELDS`), the count of each key, plus a `*` row
+  with the tone partials (count, sum, min, max). `top_values`, `tone_stats`
+  and `batch_aggregates` add them to the raw partitions they read, so their
+  results do not change. The batches' `geo_grid` side tables (heatmap) are
+  built first where missing, and the actor graph keeps its days (it is a
+  rollup itself). Searches, mentions and actor search no longer find the
+  partition's events.
+- drop (`RETENTION_DROP_AFTER_DAYS`): every dataset's batches of the
+  partition, and its actor graph day, are removed.
+
+Atomicity: a run writes its new files, then retires the old ones
+(`LakeStorage.retire`) and publishes everything with one lake version bump.
+Queries started before it keep reading the previous listing, whose files
+stay on disk for `RETENTION_GRACE_SECONDS` (`purge_retired`, run at the end
+of every run) so they can finish; queries started after it read the new one.
+Recompressed files replace the old ones at once: renamed into place on the
+filesystem; on S3 every reader pins the object version (ETag) it opened
+(`S3LakeStorage.open_info`), and the rare read the rewrite interrupts
+(footer cached, other blocks not) fails as a retryable 503.
+One run at a time per lake (process lock + `flock` on `_retention.lock`).
+
+Each run returns a report (`RetentionReport`) of the files and bytes each
+action touches; `dry_run=True` only computes it. Run it with
+`python run_retention.py [--dry-run]` (cron, Kubernetes CronJob...).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, date, datetime, timedelta
+from itertools import groupby, pairwise
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.core.config import settings
+from app.core.metrics import RETENTION_BYTES, RETENTION_FILES
+from app.domain.datasets import ACTOR_NAMES, EVENTS, EVENTS_ROLLUP, GEO_GRID, LAKE_DATASETS
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.fs_lake import ensure_lake_dirs, lake_root
+from app.infra.lake_storage import BatchRef, LakeStorage, get_lake_storage
+from app.services.actor_graph import actor_graph
+from app.services.duckdb_queries import TOP_VALUE_FIELDS
+from app.services.heatmap import grid_cells_table
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-runner deployments only
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("drop", "rollup", "recompress")
+# Footer key-value metadata marking a file rewritten by the recompress tier.
+RETENTION_TAG = b"gdelt_retention"
+# Events columns counted by rollups: every top-values column and its fallbacks.
+ROLLUP_COLUMNS: tuple[str, ...] = tuple(
+    dict.fromkeys(c for cands, fallback in TOP_VALUE_FIELDS.values() for c in (*cands, fallback))
+)
+
+
+class RetentionError(ValueError):
+    """Invalid retention policy, or a run already in progress."""
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Tier ages in days (None = tier disabled) and the recompression settings."""
+
+    recompress_after_days: int | None = None
+    rollup_after_days: int | None = None
+    drop_after_days: int | None = None
+    zstd_level: int = 19
+    row_group_rows: int = 4_194_304
+
+    @classmethod
+    def from_settings(cls) -> RetentionPolicy:
+        return cls(
+            recompress_after_days=settings.retention_recompress_after_days,
+            rollup_after_days=settings.retention_rollup_after_days,
+            drop_after_days=settings.retention_drop_after_days,
+            zstd_level=settings.retention_zstd_level,
+            row_group_rows=settings.retention_row_group_rows,
+        )
+
+    def validate(self) -> None:
+        """Raise RetentionError unless the enabled tiers are ordered recompress <= rollup <= drop."""
+        ages = [
+            (name, days)
+            for name, days in (
+                ("recompress", self.recompress_after_days),
+                ("rollup", self.rollup_after_days),
+                ("drop", self.drop_after_days),
+            )
+            if days is not None
+        ]
+        for name, days in ages:
+            if days < 0:
+                raise RetentionError(f"{name}_after_days must be >= 0")
+        for (first, a), (then, b) in pairwise(ages):
+            if a > b:
+                raise RetentionError(f"{first}_after_days must not exceed {then}_after_days")
+        if not 1 <= self.zstd_level <= 22:
+            raise RetentionError("zstd_level must be within 1..22")
+        if self.row_group_rows < 1:
+            raise RetentionError("row_group_rows must be >= 1")
+
+    def tag(self) -> bytes:
+        """Footer tag of the files written with these settings."""
+        return f"zstd={self.zstd_level};row_group_rows={self.row_group_rows}".encode()
+
+    @staticmethod
+    def cutoff(days: int | None, today: date) -> str | None:
+        """First partition date kept by a tier (older ones are affected), None if disabled."""
+        return None if days is None else (today - timedelta(days=days)).isoformat()
+
+
+@dataclass
+class RetentionAction:
+    """One tier applied to the batches of one dataset partition."""
+
+    action: str  # drop | rollup | recompress
+    dataset: str
+    dt: str
+    files: int
+    bytes: int  # size of the affected files
+    bytes_after: int | None = None  # size of the files written in their place (runs only)
+
+
+@dataclass
+class RetentionReport:
+    """What a retention run did (or, dry run, would do)."""
+
+    dry_run: bool
+    today: str
+    actions: list[RetentionAction] = field(default_factory=list)
+    graph_days_dropped: list[str] = field(default_factory=list)
+    purged_files: int = 0  # files retired by earlier runs, deleted after the grace period
+
+    def totals(self) -> dict[str, dict[str, int]]:
+        out = {action: {"files": 0, "bytes": 0, "bytes_after": 0} for action in ACTIONS}
+        for a in self.actions:
+            out[a.action]["files"] += a.files
+            out[a.action]["bytes"] += a.bytes
+            out[a.action]["bytes_after"] += a.bytes_after or 0
+        return out
+
+    def to_json(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "today": self.today,
+            "totals": self.totals(),
+            "actions": [asdict(a) for a in self.actions],
+            "graph_days_dropped": self.graph_days_dropped,
+            "purged_files": self.purged_files,
+        }
+
+
+def _partitions(refs: list[BatchRef], before: str) -> Iterator[tuple[str, list[BatchRef]]]:
+    """(dt, batches) of the partitions older than `before`, oldest first."""
+    old = sorted((r for r in refs if r.dt < before), key=lambda r: (r.dt, r.ts))
+    for dt, group in groupby(old, key=lambda r: r.dt):
+        yield dt, list(group)
+
+
+def rollup_sql(source: str, columns: list[str], tone: bool) -> str:
+    """Rollup rows (field, key, n, tone_n, tone_sum, tone_min, tone_max) of an events FROM.
+
+    One GROUPING SETS pass: a set per column (key counts, empty keys dropped
+    like `top_values`) and the grand total `()` (field `*`, tone partials;
+    NULL tone columns when the events have no `AvgTone`).
+    """
+    keys = [f"k{i}" for i in range(len(columns))]
+    projection = [f"NULLIF(CAST({c} AS VARCHAR), '') AS {k}" for c, k in zip(columns, keys)]
+    projection.append("try_cast(AvgTone AS DOUBLE) AS tone" if tone else "NULL::DOUBLE AS tone")
+    total = (1 << len(columns)) - 1
+    gid = f"GROUPING({', '.join(keys)})" if keys else "0"
+    # In the set of column i, every GROUPING bit is set but k_i's (bit m-1-i).
+    fields = " ".join(
+        f"WHEN {total ^ (1 << (len(columns) - 1 - i))} THEN {_quote(c)}"
+        for i, c in enumerate(columns)
+    )
+    field_expr = f"CASE {gid} {fields} ELSE '*' END" if columns else "'*'"
+    key_expr = f"coalesce({', '.join(keys)})" if keys else "NULL::VARCHAR"
+    tone_n = "COUNT(tone)" if tone else "NULL::BIGINT"
+    sets = [f"({k})" for k in keys] + ["()"]
+
+    def on_total(expr: str) -> str:
+        return f"CASE WHEN {gid} = {total} THEN {expr} END"
+
+    return f"""
+    WITH t AS (SELECT {", ".join(projection)} FROM {source})
+    SELECT {field_expr} AS field, {key_expr} AS key, COUNT(*) AS n,
+           {on_total(tone_n)} AS tone_n, {on_total("SUM(tone)")} AS tone_sum,
+           {on_total("MIN(tone)")} AS tone_min, {on_total("MAX(tone)")} AS tone_max
+    FROM t
+    GROUP BY GROUPING SETS ({", ".join(sets)})
+    HAVING key IS NOT NULL OR {gid} = {total}
+    ORDER BY field, n DESC, key
+    """
+
+
+class RetentionManager:
+    """Applies a `RetentionPolicy` to the configured lake."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        """One run at a time: in this process, and across processes sharing the lake root."""
+        if not self._lock.acquire(blocking=False):
+            raise RetentionError("a retention run is already in progress")
+        try:
+            if fcntl is None:
+                yield
+                return
+            ensure_lake_dirs()
+            with (lake_root() / "_retention.lock").open("a") as f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise RetentionError("a retention run is already in progress") from None
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
+
+    def run(
+        self,
+        dry_run: bool = False,
+        today: date | None = None,
+        policy: RetentionPolicy | None = None,
+    ) -> RetentionReport:
+        """Apply the tiers (default policy: settings); `dry_run` only reports."""
+        policy = policy or RetentionPolicy.from_settings()
+        policy.validate()
+        today = today or datetime.now(UTC).date()
+        with self._exclusive():
+            report = self._run(get_lake_storage(), policy, today, dry_run)
+        if not dry_run:
+            for action, total in report.totals().items():
+                RETENTION_FILES.labels(action).inc(total["files"])
+                RETENTION_BYTES.labels(action).inc(total["bytes"])
+        logger.info("Retention%s: %s", " (dry run)" if dry_run else "", report.totals())
+        return report
+
+    def _run(
+        self, storage: LakeStorage, policy: RetentionPolicy, today: date, dry_run: bool
+    ) -> RetentionReport:
+        report = RetentionReport(dry_run=dry_run, today=today.isoformat())
+        batches = {dataset: storage.batches(dataset) for dataset in LAKE_DATASETS}
+        retired: list[str] = []
+        written = False
+
+        def size(group: list[BatchRef]) -> int:
+            return sum(storage.file_size(b.uri) for b in group)
+
+        drop_before = policy.cutoff(policy.drop_after_days, today)
+        if drop_before is not None:
+            for dataset, refs in batches.items():
+                for dt, group in _partitions(refs, drop_before):
+                    report.actions.append(
+                        RetentionAction("drop", dataset, dt, len(group), size(group))
+                    )
+                    retired += [b.uri for b in group]
+                batches[dataset] = [b for b in refs if b.dt >= drop_before]
+            if settings.graph_enabled:
+                report.graph_days_dropped = actor_graph.drop_days(drop_before, dry_run)
+
+        rollup_before = policy.cutoff(policy.rollup_after_days, today)
+        if rollup_before is not None:
+            grids = {(b.dt, b.ts) for b in batches[GEO_GRID]}
+            names = {(b.dt, b.ts): b.uri for b in batches[ACTOR_NAMES]}
+            for dt, group in _partitions(batches[EVENTS], rollup_before):
+                action = RetentionAction("rollup", EVENTS, dt, len(group), size(group))
+                if not dry_run:
+                    action.bytes_after = self._rollup(storage, policy, dt, group, grids)
+                    written = True
+                report.actions.append(action)
+                # The actor names side tables only serve the raw batches.
+                retired += [b.uri for b in group]
+                retired += [names[(b.dt, b.ts)] for b in group if (b.dt, b.ts) in names]
+            retired_set = set(retired)
+            for dataset in (EVENTS, ACTOR_NAMES):
+                batches[dataset] = [b for b in batches[dataset] if b.uri not in retired_set]
+
+        recompress_before = policy.cutoff(policy.recompress_after_days, today)
+        if recompress_before is not None:
+            tag = policy.tag()
+            for dataset, refs in batches.items():
+                for dt, group in _partitions(refs, recompress_before):
+                    todo = [b for b in group if not self._tagged(storage, b.uri, tag)]
+                    if not todo:
+                        continue
+                    action = RetentionAction("recompress", dataset, dt, len(todo), size(todo))
+                    if not dry_run:
+                        action.bytes_after = sum(
+                            self._recompress(storage, policy, dataset, b) for b in todo
+                        )
+                        written = True
+                    report.actions.append(action)
+
+        if not dry_run:
+            if retired:
+                storage.retire(retired)
+            if retired or written:
+                storage.bump_version()
+            report.purged_files = len(storage.purge_retired(settings.retention_grace_seconds))
+            RETENTION_FILES.labels("purge").inc(report.purged_files)
+        return report
+
+    # -- tiers -----------------------------------------------------------------
+
+    @staticmethod
+    def _tagged(storage: LakeStorage, uri: str, tag: bytes) -> bool:
+        metadata = storage.read_metadata(uri).metadata or {}
+        return metadata.get(RETENTION_TAG) == tag
+
+    @staticmethod
+    def _put(
+        storage: LakeStorage,
+        policy: RetentionPolicy,
+        dataset: str,
+        dt: str,
+        ts: str,
+        table: pa.Table,
+    ) -> int:
+        """Write `table` as batch (dataset, dt, ts) with the policy's settings; return its size."""
+        metadata = {**(table.schema.metadata or {}), RETENTION_TAG: policy.tag()}
+        table = table.replace_schema_metadata(metadata)
+
+        def write(t: pa.Table, out: Path) -> int:
+            pq.write_table(
+                t,
+                str(out),
+                compression="zstd",
+                compression_level=policy.zstd_level,
+                row_group_size=policy.row_group_rows,
+            )
+            return out.stat().st_size
+
+        return storage.write_batch(dt, ts, table, write, dataset)[1]
+
+    def _recompress(
+        self, storage: LakeStorage, policy: RetentionPolicy, dataset: str, batch: BatchRef
+    ) -> int:
+        # Same URI, same rows: readers see either file, never a partial one (fs: rename;
+        # S3: each reader pins one object version, a read the rewrite interrupted is retryable).
+        return self._put(
+            storage, policy, dataset, batch.dt, batch.ts, storage.read_table(batch.uri)
+        )
+
+    def _rollup(
+        self,
+        storage: LakeStorage,
+        policy: RetentionPolicy,
+        dt: str,
+        group: list[BatchRef],
+        grids: set[tuple[str, str]],
+    ) -> int:
+        """Write the rollup of events batches `group` (and missing geo grids); return bytes."""
+        written = 0
+        for b in group:
+            if (b.dt, b.ts) in grids:
+                continue
+            grid = grid_cells_table(storage.read_table(b.uri))
+            if grid is not None:
+                written += self._put(storage, policy, GEO_GRID, b.dt, b.ts, grid)
+
+        con = connect(query_class_for("retention"))
+        source = storage.scan(con, "", [b.uri for b in group])
+        cols = {row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        columns = [c for c in ROLLUP_COLUMNS if c in cols]
+        table = con.execute(rollup_sql(source, columns, "AvgTone" in cols)).fetch_arrow_table()
+        # Named after the partition's newest batch: a late batch rolled up later adds a file.
+        written += self._put(storage, policy, EVENTS_ROLLUP, dt, group[-1].ts, table)
+        return written
+
+
+retention = RetentionManager()
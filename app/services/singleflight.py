@@ -0,0 +1,80 @@
+"""app.services.singleflight
+
+Single-flight coalescing of identical concurrent queries.
+
+When a dashboard loads, many clients ask for the same aggregation at the same
+moment. `SingleFlight.do(kind, key, fn)` lets the first caller (the leader) run
+`fn` while every identical concurrent caller waits for the leader's result
+instead of starting its own DuckDB scan.
+
+- Keys are the normalized query (what the query actually reads: Parquet glob,
+  column candidates, limit...) plus the lake version, so a call issued after new
+  data landed never joins a scan of the older lake.
+- Only in-flight work is shared: nothing is kept once the leader finishes. A
+  result cache, if any, sits in front of this layer and is unaffected by it.
+- The leader's exception is raised in every waiter.
+- Results are shared objects: callers must treat them as read-only.
+
+Sync API endpoints run in the threadpool, so coalescing is thread-based.
+
+Metrics:
+- duckdb_query_executions_total{kind}  leader executions
+- duckdb_query_coalesced_total{kind}   callers served by another caller's execution
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import QUERY_COALESCED, QUERY_EXECUTIONS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one execution among identical concurrent calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future[Any]] = {}
+
+    def do(self, kind: str, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn` once for all concurrent callers with the same (kind, key)."""
+        if not settings.query_singleflight_enabled:
+            return fn()
+
+        full_key = (kind, key)
+        with self._lock:
+            fut = self._inflight.get(full_key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[full_key] = Future()
+
+        if not leader:
+            QUERY_COALESCED.labels(kind).inc()
+            return fut.result()
+
+        QUERY_EXECUTIONS.labels(kind).inc()
+        try:
+            result = fn()
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[full_key]
+
+    def in_flight(self) -> int:
+        """Number of distinct executions currently running."""
+        with self._lock:
+            return len(self._inflight)
+
+
+singleflight = SingleFlight()
@@ -0,0 +1,266 @@
+"""app.services.subscriptions
+
+Push feed of newly ingested events matching live subscriptions.
+
+Clients that polled `/api/v1/events/search` every minute for the same terms
+re-scanned the lake each time. Instead they open one stream
+(`GET /api/v1/events/stream`, server-sent events) with a filter (terms,
+country, event root code) and receive only the new rows matching it.
+
+- Matching: each new events batch is matched against every active
+  subscription of this worker in one DuckDB pass (batch rows joined to a
+  table of (subscription, term) rows), instead of one scan per subscriber.
+  Terms use the search endpoint's semantics (case-insensitive substring of
+  any column); a row matches when it contains any of the subscription's terms.
+- Fan-out across API workers: every worker follows the lake version (like the
+  hot tier) and matches new batches for its own subscribers, whichever
+  process ingested them. Batches ingested by this process are handed over by
+  the ingestion batch listener, so they are not read back from the lake.
+- Backpressure: each subscriber has a bounded queue
+  (`SUBSCRIPTIONS_QUEUE_SIZE`). When a slow consumer's queue is full, new
+  messages for it are dropped and counted; the stream then sends a `lagged`
+  event with the number of messages lost, so the client can backfill with the
+  search endpoint. Memory per subscriber stays bounded; other subscribers and
+  ingestion are never slowed down.
+
+Only batches newer than the newest one seen at start are pushed (live feed,
+no replay).
+
+Metrics: subscriptions_active, subscription_messages_total{outcome},
+subscription_match_seconds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import pyarrow as pa
+
+from app.core.admission import AdmissionRejected
+from app.core.config import settings
+from app.core.metrics import SUBSCRIPTION_MATCH_SECONDS, SUBSCRIPTION_MESSAGES, SUBSCRIPTIONS_ACTIVE
+from app.infra.duckdb_engine import connect, query_class_for
+from app.infra.lake_storage import get_lake_storage, lake_version, latest_batch_ts
+
+logger = logging.getLogger(__name__)
+
+_ROW = "__row"
+
+
+@dataclass(frozen=True)
+class SubscriptionFilter:
+    """What a subscriber wants: any of `terms`, in `country`, with `root_code` (all optional)."""
+
+    terms: tuple[str, ...] = ()
+    country: str | None = None
+    root_code: str | None = None
+
+
+@dataclass(eq=False)
+class Subscription:
+    """One open stream: its filter and bounded message queue."""
+
+    id: str
+    filter: SubscriptionFilter
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[dict[str, Any]]
+    dropped: int = field(default=0)
+
+    def offer(self, message: dict[str, Any]) -> None:
+        """Enqueue a message, or drop it when the subscriber is too slow (loop thread only)."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            SUBSCRIPTION_MESSAGES.labels("dropped").inc()
+            return
+        SUBSCRIPTION_MESSAGES.labels("sent").inc()
+
+    def take_dropped(self) -> int:
+        """Messages dropped since the last call (loop thread only)."""
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class SubscriptionHub:
+    """Active subscriptions of this worker and the batches still to push to them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subs: dict[str, Subscription] = {}
+        self._ids = itertools.count(1)
+        # Batches written by this process, handed over by the ingestion listener.
+        self._pending: dict[str, pa.Table] = {}
+        self._last_ts: str | None = None
+        self._seen_version: str | None = None
+
+    # -- subscribers -----------------------------------------------------------
+
+    def subscribe(self, flt: SubscriptionFilter) -> Subscription:
+        """Register a subscriber (call from the event loop that will consume it).
+
+        Raises:
+            AdmissionRejected: `SUBSCRIPTIONS_MAX_ACTIVE` streams are already open.
+        """
+        with self._lock:
+            if len(self._subs) >= settings.subscriptions_max_active:
+                raise AdmissionRejected("subscriptions", "max_active", retry_after=30)
+            sub = Subscription(
+                id=f"sub-{next(self._ids)}",
+                filter=flt,
+                loop=asyncio.get_running_loop(),
+                queue=asyncio.Queue(maxsize=settings.subscriptions_queue_size),
+            )
+            self._subs[sub.id] = sub
+            SUBSCRIPTIONS_ACTIVE.set(len(self._subs))
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """Forget a subscriber (no-op if already gone)."""
+        with self._lock:
+            self._subs.pop(sub.id, None)
+            if not self._subs:
+                self._pending.clear()
+            SUBSCRIPTIONS_ACTIVE.set(len(self._subs))
+
+    # -- matching --------------------------------------------------------------
+
+    def match(self, table: pa.Table, subs: list[Subscription]) -> dict[str, list[int]]:
+        """Row indices of `table` matched by each subscription, in one DuckDB pass."""
+        if not subs or table.num_rows == 0:
+            return {}
+        sub_ids: list[str] = []
+        terms: list[str | None] = []
+        countries: list[str | None] = []
+        roots: list[str | None] = []
+        for sub in subs:
+            for term in sub.filter.terms or (None,):
+                sub_ids.append(sub.id)
+                terms.append(term.lower() if term else None)
+                countries.append(sub.filter.country)
+                roots.append(sub.filter.root_code)
+        wanted = pa.table(
+            {
+                "sub_id": pa.array(sub_ids, pa.string()),
+                "term": pa.array(terms, pa.string()),
+                "country": pa.array(countries, pa.string()),
+                "root": pa.array(roots, pa.string()),
+            }
+        )
+        batch = table.append_column(_ROW, pa.array(range(table.num_rows), pa.int64()))
+        names = set(table.column_names)
+        country = "CAST(ActionGeo_CountryCode AS VARCHAR)" if "ActionGeo_CountryCode" in names else "NULL"
+        root = "CAST(EventRootCode AS VARCHAR)" if "EventRootCode" in names else "NULL"
+
+        con = connect(query_class_for("subscriptions"))
+        con.register("new_batch", batch)
+        con.register("subscriptions", wanted)
+        sql = f"""
+        WITH e AS (
+          SELECT {_ROW},
+                 lower(concat_ws(' ', *COLUMNS(* EXCLUDE ({_ROW})))) AS txt,
+                 {country} AS country,
+                 {root} AS root
+          FROM new_batch
+        )
+        SELECT DISTINCT s.sub_id, e.{_ROW}
+        FROM e JOIN subscriptions s
+          ON (s.country IS NULL OR e.country = s.country)
+         AND (s.root IS NULL OR e.root = s.root)
+         AND (s.term IS NULL OR contains(e.txt, s.term))
+        ORDER BY 1, 2
+        """
+        start = time.perf_counter()
+        matches: dict[str, list[int]] = {}
+        for sub_id, row in con.execute(sql).fetchall():
+            matches.setdefault(sub_id, []).append(row)
+        SUBSCRIPTION_MATCH_SECONDS.observe(time.perf_counter() - start)
+        return matches
+
+    def publish(self, dt: str, ts: str, table: pa.Table) -> int:
+        """Match a new batch and push each subscriber its rows; return subscribers notified."""
+        with self._lock:
+            subs = list(self._subs.values())
+        matches = self.match(table, subs)
+        by_id = {sub.id: sub for sub in subs}
+        for sub_id, rows in matches.items():
+            sent = rows[: settings.subscriptions_max_rows]
+            message = {
+                "dt": dt,
+                "ts": ts,
+                "count": len(rows),
+                "rows": table.take(pa.array(sent, pa.int64())).to_pylist(),
+            }
+            sub = by_id[sub_id]
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, message)
+            except RuntimeError:
+                # The subscriber's event loop is closed: the stream is gone.
+                self.unsubscribe(sub)
+        return len(matches)
+
+    # -- batch sources ---------------------------------------------------------
+
+    def on_batch(self, dt: str, ts: str, uri: str, table: pa.Table) -> None:
+        """Ingestion batch listener: keep the table for the next `poll_lake` (no lake read)."""
+        with self._lock:
+            if self._subs:
+                self._pending[uri] = table
+
+    def poll_lake(self) -> int:
+        """Push every events batch newer than the last one pushed; return batches published."""
+        batches = sorted(
+            (b for b in get_lake_storage().batches() if self._last_ts is None or b.ts > self._last_ts),
+            key=lambda b: b.ts,
+        )
+        published = 0
+        for b in batches:
+            with self._lock:
+                table = self._pending.pop(b.uri, None)
+                active = bool(self._subs)
+            if active:
+                if table is None:
+                    table = get_lake_storage().read_table(b.uri)
+                self.publish(b.dt, b.ts, table)
+                published += 1
+            self._last_ts = b.ts
+        with self._lock:
+            self._pending.clear()
+        return published
+
+    def attach(self) -> None:
+        """Receive batches written by this process; start from the newest batch of the lake."""
+        from app.services.ingest import add_batch_listener
+
+        add_batch_listener(self.on_batch)
+        self._seen_version = lake_version()
+        self._last_ts = latest_batch_ts()
+
+    def detach(self) -> None:
+        """Stop receiving batches."""
+        from app.services.ingest import remove_batch_listener
+
+        remove_batch_listener(self.on_batch)
+        with self._lock:
+            self._pending.clear()
+
+    async def tail_loop(self) -> None:
+        """Follow the lake version and push new batches (any ingesting process)."""
+        while True:
+            try:
+                version = lake_version()
+                if version != self._seen_version:
+                    await asyncio.to_thread(self.poll_lake)
+                    self._seen_version = version
+            except Exception:
+                logger.exception("Subscription feed failed")
+            await asyncio.sleep(settings.subscriptions_poll_interval_seconds)
+
+
+hub = SubscriptionHub()
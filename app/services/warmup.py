@@ -0,0 +1,157 @@
+"""app.services.warmup
+
+Explicit warm-up phase of an API worker, and its readiness.
+
+A freshly started worker used to pay for DuckDB instance creation, the lake
+listing and the first Parquet footer reads on its first real request. The
+lifespan now starts `warm_up()` in the background; it runs, in order:
+
+- `duckdb`: create the budgeted DuckDB instance of every query class
+  (`app.infra.duckdb_engine`) and run `SELECT 1` on each;
+- `lake`: list the batches of every dataset and the events partition dates
+  (fills the object-storage listing cache, see `app.infra.lake_storage`);
+- `queries`: one tiny query per query endpoint (search, top values, tone,
+  mentions, actor search, heatmap, actor graph) restricted to the newest partition, which reads its
+  Parquet metadata (OS page cache, or the local block cache for S3) and builds
+  the actor name index.
+
+Each step is timed; a failing step is logged and recorded, never fatal: the
+worker is still usable, only colder. Liveness (`GET /health`) answers as soon
+as the process serves HTTP; readiness (`GET /ready`) answers 503 until the
+warm-up has finished, so a load balancer only routes traffic to warm workers.
+With `WARMUP_ENABLED=false` the worker is ready as soon as it starts.
+
+Metrics: app_ready, app_warmup_seconds{step}.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import APP_READY, WARMUP_SECONDS
+from app.domain.datasets import EVENTS, GKG_TABLES, MENTIONS
+from app.infra.duckdb_engine import QUERY_CLASSES, connect
+from app.infra.lake_storage import get_lake_storage, partition_dates
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Warm-up progress of this worker: per-step timings and errors, ready flag."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.ready = False
+        self.steps: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.seconds: float | None = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.ready = False
+            self.steps.clear()
+            self.errors.clear()
+            self.seconds = None
+        APP_READY.set(0)
+
+    def record(self, step: str, seconds: float, error: str | None = None) -> None:
+        with self._lock:
+            self.steps[step] = round(seconds, 4)
+            if error is not None:
+                self.errors[step] = error
+        WARMUP_SECONDS.labels(step).set(seconds)
+
+    def mark_ready(self, seconds: float | None = None) -> None:
+        with self._lock:
+            self.ready = True
+            self.seconds = round(seconds, 4) if seconds is not None else None
+        APP_READY.set(1)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ready" if self.ready else "warming_up",
+                "warmup_seconds": self.seconds,
+                "steps": dict(self.steps),
+                "errors": dict(self.errors),
+            }
+
+
+readiness = Readiness()
+
+
+def _open_duckdb() -> None:
+    for query_class in sorted({*QUERY_CLASSES.values(), "default"}):
+        connect(query_class).execute("SELECT 1").fetchall()
+
+
+def _load_lake_metadata() -> None:
+    storage = get_lake_storage()
+    for dataset in (EVENTS, MENTIONS, *GKG_TABLES):
+        storage.batches(dataset)
+    partition_dates()
+
+
+def _run_queries() -> None:
+    # Imported here: the query layer is what this step warms up.
+    from app.services.actor_graph import actor_graph
+    from app.services.duckdb_queries import (
+        event_mentions,
+        heatmap_tile,
+        search_actors,
+        search_fulltext,
+        tone_stats,
+        top_values,
+    )
+
+    dates = partition_dates()
+    if not dates:
+        return  # empty lake: nothing to read yet
+    day = dates[-1]
+    search_fulltext("", day, day, 1)  # matches the first row: stops early
+    top_values(["EventCode", "EventBaseCode", "EventRootCode"], "c27", day, day, 1)
+    tone_stats(day, day)
+    event_mentions(0, day, day, 1)
+    search_actors("warmup", "all", day, day, 1)
+    heatmap_tile(0, 0, 0, day, day)
+    actor_graph.top_edges("country", day, day, 1)  # also adds batches missing from the graph
+
+
+STEPS: list[tuple[str, Callable[[], None]]] = [
+    ("duckdb", _open_duckdb),
+    ("lake", _load_lake_metadata),
+    ("queries", _run_queries),
+]
+
+
+def run_warmup() -> dict[str, Any]:
+    """Run every warm-up step (blocking) and mark the worker ready."""
+    start = time.perf_counter()
+    for step, fn in STEPS:
+        step_start = time.perf_counter()
+        error = None
+        try:
+            fn()
+        except Exception as exc:
+            logger.exception("Warm-up step %s failed", step)
+            error = f"{type(exc).__name__}: {exc}"
+        readiness.record(step, time.perf_counter() - step_start, error)
+    total = time.perf_counter() - start
+    readiness.mark_ready(total)
+    logger.info("Warm-up finished in %.3fs: %s", total, readiness.steps)
+    return readiness.snapshot()
+
+
+async def warm_up() -> None:
+    """Run the warm-up off the event loop (`/health` keeps answering meanwhile)."""
+    readiness.reset()
+    if not settings.warmup_enabled:
+        readiness.mark_ready()
+        return
+    await asyncio.to_thread(run_warmup)
@@ -2,22 +2,25 @@ from __future__ import annotations
 
 """app.tasks
 
-High-level task orchestration for ingestion.
+High-level task orchestration for ingestion (and bulk export jobs).
 
 This module sits above low-level services:
 - app.services.gdelt: discovers available batches
 - app.services.ingest: downloads + writes Parquet to filesystem lake
 
 Design goals:
-- Keep API requests non-blocking (BackgroundTasks in local mode).
+- Keep ingestion out of the API process: in local mode, triggers become jobs
+  run by a separate runner process (see `app.services.ingest_jobs`).
 - Keep a stable outward contract (`queued` count) across modes.
 - Provide structured results to make debugging and observability easier.
 """
 
 import logging
+from collections.abc import Callable
 from typing import Any
 
-from app.services.gdelt import fetch_lastupdate, pick_recent
+from app.services.exports import exports
+from app.services.gdelt import GdeltFile, fetch_lastupdate, pick_recent
 from app.services.ingest import ingest_one
 
 logger = logging.getLogger(__name__)
@@ -41,7 +44,6 @@ async def run_ingestion_now(n_batches: int) -> dict[str, Any]:
     Notes:
         - Errors are captured per batch so one failure doesn't stop others.
         - This function is shared by:
-          * API background tasks
           * scheduler (periodic)
           * one-shot CLI runner
     """
@@ -49,7 +51,23 @@ async def run_ingestion_now(n_batches: int) -> dict[str, Any]:
 
     files = await fetch_lastupdate()
     picked = pick_recent(files, n_batches)
+    return await run_ingestion_for(picked)
 
+
+async def run_ingestion_for(
+    picked: list[GdeltFile],
+    on_result: Callable[[dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    """Ingest an explicit list of batches (already discovered by the caller).
+
+    Used by the cadence-aware scheduler, which already holds a fresh
+    `lastupdate.txt` listing and must not download it a second time, and by
+    the local ingestion job runner, which reports progress through
+    `on_result` (called with each batch's result as soon as it is known).
+
+    Returns:
+        Same structure as `run_ingestion_now`.
+    """
     results: list[dict[str, Any]] = []
     for gf in picked:
         try:
@@ -59,6 +77,8 @@ async def run_ingestion_now(n_batches: int) -> dict[str, Any]:
         except Exception as exc:
             logger.exception("Ingestion failed for url=%s", gf.url)
             results.append({"status": "failed", "url": gf.url, "error": str(exc)})
+        if on_result is not None:
+            on_result(results[-1])
 
     ok = sum(1 for r in results if r.get("status") == "ok")
     logger.info("Ingestion finished (ok=%s/%s)", ok, len(results))
@@ -66,16 +86,14 @@ async def run_ingestion_now(n_batches: int) -> dict[str, Any]:
     return {"ingested": results}
 
 
-async def enqueue_ingestion(n_batches: int) -> int:
-    """Queue ingestion.
+async def run_export_now(job_id: str) -> dict[str, Any]:
+    """Run a queued export job (see app.services.exports) off the event loop.
 
-    Local mode implementation:
-    - No external queue/worker is used.
-    - FastAPI BackgroundTasks starts `run_ingestion_now` in-process.
-    - We return 1 to keep the API contract stable.
+    Used by API background tasks in local mode; the Arq worker runs the same
+    job through `export_events`.
 
-    Industrial mode (future):
-    - Enqueue a job to Redis/Arq/Celery and return the queued count.
+    Returns:
+        The job state once finished (`status` is `done` or `failed`).
     """
-    _ = n_batches  # kept for interface stability
-    return 1
+    job = await exports.run_async(job_id)
+    return job.to_json()
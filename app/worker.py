@@ -13,8 +13,13 @@ Run:
 Notes:
 - Uses Redis as a job queue backend.
 - Job functions must be listed in WorkerSettings.functions.
+- The worker has no HTTP server: metrics are pushed / written to a textfile
+  after each job (see `app.core.metrics.export_process_metrics`).
+- `kill -USR2 <pid>` writes a sampling profile of the running worker
+  (see `app.core.profiling`).
 """
 
+import asyncio
 import logging
 from typing import Any
 
@@ -23,6 +28,9 @@ from arq.connections import RedisSettings
 
 from app.core.config import settings
 from app.core.logging import configure_logging
+from app.core.metrics import export_process_metrics
+from app.core.profiling import install_signal_handler
+from app.services.exports import exports
 from app.services.gdelt import fetch_lastupdate, pick_recent
 from app.services.ingest import ingest_one
 
@@ -54,16 +62,35 @@ async def ingest_recent_gdelt(ctx: dict[str, Any], n_batches: int = 2) -> dict[s
     return {"ingested": results}
 
 
+async def export_events(ctx: dict[str, Any], job_id: str) -> dict[str, Any]:
+    """Arq job: run a queued bulk export (see app.services.exports).
+
+    Returns:
+        The job state once finished (same structure as local run_export_now).
+    """
+    _ = ctx
+    job = await exports.run_async(job_id)
+    return job.to_json()
+
+
+async def after_job_end(ctx: dict[str, Any]) -> None:
+    """Arq hook: export this worker's metrics once a job has finished."""
+    _ = ctx
+    await asyncio.to_thread(export_process_metrics, "worker")
+
+
 class WorkerSettings:
     """Arq settings used by the Worker runtime."""
 
-    functions = [ingest_recent_gdelt]
+    functions = [ingest_recent_gdelt, export_events]
     redis_settings = RedisSettings(host=settings.redis_host, port=settings.redis_port)
+    after_job_end = after_job_end
 
 
 def main() -> None:
     """Start the Arq worker process."""
     configure_logging()
+    install_signal_handler("worker")
     logger.info("Starting Arq worker (redis=%s:%s)", settings.redis_host, settings.redis_port)
     worker = Worker(WorkerSettings)
     worker.run()
@@ -0,0 +1,160 @@
+"""bench/gdelt_stub.py
+
+Local GDELT stub server (offline benchmarks and demos).
+
+Serves, from a directory of `{ts}.export.CSV.zip` files:
+- GET /gdeltv2/lastupdate.txt      `<size> <md5> <url>` for the published batch(es)
+- GET /gdeltv2/{file}              the zip itself
+
+`lastupdate.txt` honors `If-None-Match` / `If-Modified-Since` (304), like the
+real endpoint behind its CDN, so the cadence-aware scheduler can be exercised.
+
+Usage (standalone):
+  python -m bench.gdelt_stub --dir bench/.cache/seed0_rows1000 --port 8765
+  GDELT_LASTUPDATE_URL=http://127.0.0.1:8765/gdeltv2/lastupdate.txt python run_ingest_once.py --n 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class GdeltStub:
+    """Serve a directory of GDELT zips over HTTP in a background thread."""
+
+    def __init__(self, data_dir: Path, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.data_dir = Path(data_dir)
+        self._published: list[str] = []
+        self._published_at = 0.0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 (http.server API)
+                stub._handle(self)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                return
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the stub, e.g. http://127.0.0.1:8765/gdeltv2."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/gdeltv2"
+
+    @property
+    def lastupdate_url(self) -> str:
+        """URL to use as GDELT_LASTUPDATE_URL."""
+        return f"{self.base_url}/lastupdate.txt"
+
+    def available(self) -> list[str]:
+        """Return all zip file names present in the data dir (sorted)."""
+        return sorted(p.name for p in self.data_dir.glob("*.zip"))
+
+    def publish(self, *names: str) -> None:
+        """Make `names` the content of lastupdate.txt (newest batch first)."""
+        with self._lock:
+            self._published = list(names)
+            self._published_at = time.time()
+
+    def lastupdate_text(self) -> str:
+        """Render lastupdate.txt for the published files."""
+        lines = []
+        for name in self._published:
+            data = (self.data_dir / name).read_bytes()
+            lines.append(f"{len(data)} {hashlib.md5(data).hexdigest()} {self.base_url}/{name}")
+        return "\n".join(lines) + "\n"
+
+    def _handle(self, req: BaseHTTPRequestHandler) -> None:
+        path = req.path.split("?", 1)[0]
+        if path == "/gdeltv2/lastupdate.txt":
+            with self._lock:
+                body = self.lastupdate_text().encode()
+                published_at = self._published_at
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            last_modified = formatdate(published_at, usegmt=True)
+            if req.headers.get("If-None-Match") == etag or self._not_modified_since(
+                req.headers.get("If-Modified-Since"), published_at
+            ):
+                req.send_response(HTTPStatus.NOT_MODIFIED)
+                req.send_header("ETag", etag)
+                req.end_headers()
+                return
+            self._send(req, body, "text/plain", {"ETag": etag, "Last-Modified": last_modified})
+            return
+
+        name = path.rsplit("/", 1)[-1]
+        file = self.data_dir / name
+        if not path.startswith("/gdeltv2/") or not name.endswith(".zip") or not file.is_file():
+            req.send_error(HTTPStatus.NOT_FOUND)
+            return
+        self._send(req, file.read_bytes(), "application/zip", {})
+
+    @staticmethod
+    def _not_modified_since(header: str | None, published_at: float) -> bool:
+        if not header:
+            return False
+        try:
+            return parsedate_to_datetime(header).timestamp() >= int(published_at)
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def _send(
+        req: BaseHTTPRequestHandler, body: bytes, content_type: str, headers: dict[str, str]
+    ) -> None:
+        req.send_response(HTTPStatus.OK)
+        req.send_header("Content-Type", content_type)
+        req.send_header("Content-Length", str(len(body)))
+        for k, v in headers.items():
+            req.send_header(k, v)
+        req.end_headers()
+        req.wfile.write(body)
+
+    def start(self) -> GdeltStub:
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and its thread."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> GdeltStub:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def main() -> None:
+    """Serve a directory until interrupted; the newest zip is published."""
+    ap = argparse.ArgumentParser(description="Local GDELT lastupdate.txt + zip stub server.")
+    ap.add_argument("--dir", type=Path, required=True, help="Directory of *.export.CSV.zip files.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    stub = GdeltStub(args.dir, host=args.host, port=args.port)
+    files = stub.available()
+    if files:
+        stub.publish(files[-1])
+    print(f"[gdelt_stub] serving {len(files)} files | GDELT_LASTUPDATE_URL={stub.lastupdate_url}")
+    stub._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,3 +10,11 @@ class ApiUser(HttpUser):
     @task(1)
     def search(self):
         self.client.get("/api/v1/events/search", params={"query": "protest", "limit": 20})
+
+    @task(2)
+    def top_event_codes(self):
+        self.client.get("/api/v1/analytics/top-event-codes", params={"limit": 10})
+
+    @task(2)
+    def tone(self):
+        self.client.get("/api/v1/analytics/tone")
@@ -0,0 +1,292 @@
+"""bench/run_bench.py
+
+Offline, reproducible benchmark harness (no network, no running server).
+
+For each scale (1 day = 96 batches, 1 week = 672, 1 month = 2880):
+1. generate deterministic synthetic GDELT exports (`bench.synthetic`, cached on disk)
+2. serve them from the local stub (`bench.gdelt_stub`) and ingest them batch by
+   batch through the real pipeline (`run_ingestion_now` -> lastupdate.txt -> zip
+   -> Parquet) into a fresh temporary lake
+3. measure ingest throughput: rows/s, MB/s (zip and CSV), peak RSS
+4. measure latency percentiles (p50/p90/p95/p99) for every endpoint in-process
+
+Results are written as JSON so runs can be compared across commits.
+
+Usage:
+  poetry run python -m bench.run_bench --scales day,week --rows-per-batch 1000
+  poetry run python -m bench.run_bench --scales day --compare bench/results/<old>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import psutil
+
+from app.core.config import settings
+from bench.gdelt_stub import GdeltStub
+from bench.synthetic import batch_timestamps, write_batch_zip
+
+SCALES: dict[str, int] = {"day": 96, "week": 672, "month": 2880}
+END = datetime(2026, 2, 10, tzinfo=UTC)
+RESULTS_DIR = Path(__file__).parent / "results"
+CACHE_DIR = Path(__file__).parent / ".cache"
+
+
+class PeakRss:
+    """Sample this process' RSS in a background thread and keep the peak."""
+
+    def __init__(self, interval: float = 0.05) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._proc = psutil.Process()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._proc.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> PeakRss:
+        self.peak = self._proc.memory_info().rss
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def percentiles(samples_ms: list[float]) -> dict[str, float]:
+    """Nearest-rank percentiles + mean (milliseconds)."""
+    if not samples_ms:
+        return {}
+    s = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        idx = min(len(s) - 1, max(0, round(p / 100 * len(s) + 0.5) - 1))
+        return round(s[idx], 3)
+
+    return {
+        "n": len(s),
+        "mean_ms": round(sum(s) / len(s), 3),
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(s[-1], 3),
+    }
+
+
+def endpoints(latest_day: str) -> dict[str, tuple[str, dict[str, Any]]]:
+    """Endpoint matrix: recent-window and full-lake variants of every route."""
+    return {
+        "health": ("/health", {}),
+        "search_day": (
+            "/api/v1/events/search",
+            {"query": "RAJOELINA", "since": latest_day, "limit": 50},
+        ),
+        "search_all": ("/api/v1/events/search", {"query": "POLICE", "limit": 50}),
+        "top_event_codes_day": (
+            "/api/v1/analytics/top-event-codes",
+            {"since": latest_day, "limit": 10},
+        ),
+        "top_event_codes_all": ("/api/v1/analytics/top-event-codes", {"limit": 10}),
+        "top_countries_day": ("/api/v1/analytics/top-countries", {"since": latest_day}),
+        "top_countries_all": ("/api/v1/analytics/top-countries", {"limit": 10}),
+        "tone_day": ("/api/v1/analytics/tone", {"since": latest_day}),
+        "tone_all": ("/api/v1/analytics/tone", {}),
+    }
+
+
+def ingest_scale(stub: GdeltStub, names: list[str]) -> dict[str, Any]:
+    """Publish and ingest every batch through lastupdate.txt; return throughput figures."""
+    from app.tasks import run_ingestion_now
+
+    zip_bytes = 0
+    csv_bytes = 0
+    for name in names:
+        path = stub.data_dir / name
+        zip_bytes += path.stat().st_size
+        with zipfile.ZipFile(path) as zf:
+            csv_bytes += sum(i.file_size for i in zf.infolist())
+
+    async def run_all() -> tuple[int, int]:
+        rows = failed = 0
+        for name in names:
+            stub.publish(name)
+            res = await run_ingestion_now(1)
+            for item in res["ingested"]:
+                if item["status"] == "ok":
+                    rows += item.get("rows", 0)
+                else:
+                    failed += 1
+        return rows, failed
+
+    with PeakRss() as rss:
+        start = time.perf_counter()
+        rows, failed = asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+
+    return {
+        "batches": len(names),
+        "failed": failed,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(rows / elapsed, 1) if elapsed else None,
+        "zip_mb_per_s": round(zip_bytes / 1e6 / elapsed, 3) if elapsed else None,
+        "csv_mb_per_s": round(csv_bytes / 1e6 / elapsed, 3) if elapsed else None,
+        "zip_bytes": zip_bytes,
+        "csv_bytes": csv_bytes,
+        "peak_rss_mb": round(rss.peak / 1e6, 1),
+    }
+
+
+def query_scale(latest_day: str, requests: int, warmup: int) -> dict[str, Any]:
+    """Measure in-process latency percentiles for every endpoint."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    out: dict[str, Any] = {}
+    with TestClient(app) as client:
+        for name, (path, params) in endpoints(latest_day).items():
+            for _ in range(warmup):
+                client.get(path, params=params)
+            samples: list[float] = []
+            errors = 0
+            for _ in range(requests):
+                start = time.perf_counter()
+                resp = client.get(path, params=params)
+                samples.append((time.perf_counter() - start) * 1000)
+                errors += resp.status_code >= 400
+            out[name] = {**percentiles(samples), "errors": errors}
+    return out
+
+
+def git_commit() -> str:
+    """Short commit hash of the working tree (or 'unknown')."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(scales: list[str], rows_per_batch: int, seed: int, requests: int, warmup: int) -> dict:
+    """Run the full matrix and return the results document."""
+    import duckdb
+    import pyarrow
+
+    cache = CACHE_DIR / f"seed{seed}_rows{rows_per_batch}"
+    results: dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": psutil.cpu_count(),
+            "duckdb": duckdb.__version__,
+            "pyarrow": pyarrow.__version__,
+            "rows_per_batch": rows_per_batch,
+            "seed": seed,
+            "requests_per_endpoint": requests,
+        },
+        "scales": {},
+    }
+
+    for scale in scales:
+        stamps = batch_timestamps(END, SCALES[scale])
+        print(f"[bench] {scale}: generating {len(stamps)} batches x {rows_per_batch} rows")
+        names = [write_batch_zip(cache, ts, rows_per_batch, seed).name for ts in stamps]
+
+        work = Path(tempfile.mkdtemp(prefix=f"gdelt_bench_{scale}_"))
+        settings.data_lake_path = str(work / "lake")
+        settings.duckdb_db_path = str(work / "analytics.duckdb")
+        try:
+            with GdeltStub(cache) as stub:
+                settings.gdelt_lastupdate_url = stub.lastupdate_url
+                print(f"[bench] {scale}: ingesting via {stub.lastupdate_url}")
+                ingest = ingest_scale(stub, names)
+
+            latest_day = datetime.strptime(stamps[-1][:8], "%Y%m%d").date().isoformat()
+            print(f"[bench] {scale}: querying ({requests} requests per endpoint)")
+            results["scales"][scale] = {
+                "ingest": ingest,
+                "endpoints": query_scale(latest_day, requests, warmup),
+            }
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
+
+    return results
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """Render a p95 / throughput comparison between two result documents."""
+    lines = [f"baseline={baseline['meta']['commit']} current={current['meta']['commit']}"]
+    for scale, cur in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        b, c = base["ingest"]["rows_per_s"], cur["ingest"]["rows_per_s"]
+        if b and c:
+            lines.append(f"{scale:6} ingest rows/s {b:>12} -> {c:>12} ({(c - b) / b:+.1%})")
+        for name, stats in cur["endpoints"].items():
+            old = base["endpoints"].get(name, {}).get("p95_ms")
+            new = stats.get("p95_ms")
+            if old and new:
+                lines.append(f"{scale:6} {name:22} p95 {old:>9} -> {new:>9} ms ({(new - old) / old:+.1%})")
+    return lines
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    ap = argparse.ArgumentParser(description="Offline GDELT ingestion + query benchmark.")
+    ap.add_argument("--scales", default="day", help="Comma list of: day, week, month.")
+    ap.add_argument("--rows-per-batch", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--requests", type=int, default=50, help="Timed requests per endpoint.")
+    ap.add_argument("--warmup", type=int, default=3, help="Untimed requests per endpoint.")
+    ap.add_argument("--out", type=Path, default=None, help="Output JSON (default: results/<commit>.json).")
+    ap.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against.")
+    return ap.parse_args()
+
+
+def main() -> int:
+    """CLI main returning an exit code."""
+    args = parse_args()
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        print(f"[bench] unknown scale(s): {unknown}; expected {list(SCALES)}")
+        return 2
+
+    results = run(scales, args.rows_per_batch, args.seed, args.requests, args.warmup)
+
+    out = args.out or RESULTS_DIR / f"{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"[bench] results written to {out}")
+
+    if args.compare:
+        for line in compare(results, json.loads(args.compare.read_text())):
+            print(f"[bench] {line}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,147 @@
+"""bench/serialization_bench.py
+
+Microbenchmark: cost of turning DuckDB results into an HTTP JSON body.
+
+Compares, per 1k rows, on synthetic GDELT events (61 named columns):
+- before: DuckDB -> pandas `fetch_df()` -> `to_dict(orient="records")`
+          -> Pydantic validation of the `response_model` -> `model_dump(mode="json")`
+          -> `json.dumps` (what FastAPI does for a returned dict + response_model)
+- after:  DuckDB tuples -> dicts -> orjson (`FastJSONResponse`, returned directly)
+
+Both search (wide rows) and top-values (narrow rows) payloads are measured.
+Timings are split into "fetch" (DuckDB result -> Python rows) and "encode"
+(Python rows -> JSON bytes); each figure is the median of `--repeat` runs.
+
+Usage:
+  poetry run python -m bench.serialization_bench --rows 1000,10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import duckdb
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.responses import FastJSONResponse
+from app.schemas import EventSearchResponse, TopValuesResponse
+from app.services.duckdb_queries import _records
+from app.services.ingest import _read_events_csv, _write_events_parquet
+from bench.synthetic import batch_csv_bytes
+
+TS = "20260210000000"
+
+
+def build_parquet(work: Path, n_rows: int, seed: int) -> str:
+    """Write one synthetic batch through the real CSV -> Parquet path."""
+    csv = work / f"{TS}.export.CSV"
+    csv.write_bytes(batch_csv_bytes(TS, n_rows, seed))
+    out = work / "events.parquet"
+    _write_events_parquet(_read_events_csv(csv), out)
+    return str(out).replace("\\", "/")
+
+
+def median_ms(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median wall time of `fn` in milliseconds (and its last result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def measure(
+    con: duckdb.DuckDBPyConnection,
+    sql: str,
+    wrap: Callable[[list[dict]], dict],
+    model: type,
+    repeat: int,
+) -> dict[str, dict[str, float]]:
+    """Time fetch + encode for the old (pandas + Pydantic) and new (tuples + orjson) paths."""
+    adapter = TypeAdapter(model)
+
+    def old_fetch() -> list[dict]:
+        return con.execute(sql).fetch_df().to_dict(orient="records")
+
+    def old_encode(rows: list[dict]) -> bytes:
+        validated = adapter.validate_python(wrap(rows))
+        return JSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def new_fetch() -> list[dict]:
+        return _records(con.execute(sql))
+
+    def new_encode(rows: list[dict]) -> bytes:
+        return FastJSONResponse(wrap(rows)).body
+
+    out: dict[str, dict[str, float]] = {}
+    for name, fetch, encode in (("before", old_fetch, old_encode), ("after", new_fetch, new_encode)):
+        fetch_ms, rows = median_ms(fetch, repeat)
+        encode_ms, body = median_ms(lambda encode=encode, rows=rows: encode(rows), repeat)
+        out[name] = {
+            "rows": len(rows),
+            "fetch_ms": round(fetch_ms, 3),
+            "encode_ms": round(encode_ms, 3),
+            "total_ms": round(fetch_ms + encode_ms, 3),
+            "bytes": len(body),
+        }
+    return out
+
+
+def run(rows_list: list[int], seed: int, repeat: int) -> None:
+    """Print a per-1k-rows comparison table for each payload and size."""
+    with tempfile.TemporaryDirectory(prefix="gdelt_ser_") as tmp:
+        glob = build_parquet(Path(tmp), max(rows_list), seed)
+        con = duckdb.connect()
+        print(
+            f"{'payload':11} {'rows':>6} {'path':6} {'fetch ms':>9} {'encode ms':>9} {'total ms':>9} "
+            f"{'total/1k rows':>13}  speedup"
+        )
+        for n in rows_list:
+            cases = {
+                "search": (
+                    f"SELECT * FROM read_parquet('{glob}') LIMIT {n}",
+                    lambda rows: {"count": len(rows), "rows": rows},
+                    EventSearchResponse,
+                ),
+                "top_values": (
+                    (
+                        "SELECT CAST(Actor1Name AS VARCHAR) AS key, COUNT(*) AS n "
+                        f"FROM (SELECT * FROM read_parquet('{glob}') LIMIT {n}) GROUP BY 1 ORDER BY n DESC"
+                    ),
+                    lambda rows: {"field": "Actor1Name", "rows": rows},
+                    TopValuesResponse,
+                ),
+            }
+            for payload, (sql, wrap, model) in cases.items():
+                res = measure(con, sql, wrap, model, repeat)
+                speedup = res["before"]["total_ms"] / res["after"]["total_ms"]
+                for path in ("before", "after"):
+                    r = res[path]
+                    per_k = r["total_ms"] * 1000 / max(r["rows"], 1)
+                    print(
+                        f"{payload:11} {r['rows']:>6} {path:6} {r['fetch_ms']:>9.3f} {r['encode_ms']:>9.3f} "
+                        f"{r['total_ms']:>9.3f} {per_k:>13.3f}" + (f"  x{speedup:.1f}" if path == "after" else "")
+                    )
+
+
+def main() -> None:
+    """CLI entrypoint."""
+    ap = argparse.ArgumentParser(description="JSON serialization path microbenchmark.")
+    ap.add_argument("--rows", default="1000,10000", help="Comma list of result sizes.")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=7)
+    args = ap.parse_args()
+    run([int(x) for x in args.rows.split(",") if x.strip()], args.seed, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
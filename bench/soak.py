@@ -0,0 +1,435 @@
+"""bench/soak.py
+
+Mixed read/write soak test: dashboard traffic while ingestion runs.
+
+Our worst p99s showed up when `POST /api/v1/ingest/trigger` ran ingestion as a
+`BackgroundTasks` job inside the API process while analytics were being queried;
+triggers now queue jobs for the local runner process (`app.services.ingest_jobs`),
+and "active" latencies should match "idle" ones. This scenario checks that for
+minutes to hours:
+
+- N virtual users send a weighted mix of analytics + search requests
+  (recent-window and full-lake variants, like a dashboard refresh)
+- a writer publishes a new batch on the stub every `--ingest-interval` seconds
+  and calls `/api/v1/ingest/trigger` (`--host` mode: trigger only)
+- a sampler scrapes `/metrics` for `gdelt_ingest_in_progress` (ingestion in
+  the API process) and `process_resident_memory_bytes`, and polls the last
+  triggered job (`/api/v1/ingest/jobs/{id}`, ingestion in the runner process)
+
+Every request is tagged "active" if ingestion was running when it started or
+finished, "idle" otherwise. The report (JSON) contains:
+- latency percentiles per endpoint and overall, split active vs idle
+- error rates by type (HTTP status + DuckDB exception class from the `error`
+  field of 5xx bodies, client-side timeouts/connection errors)
+- memory: RSS start/end/peak and the growth slope (MB/h, least squares)
+
+`--compare` diffs against a previous report and exits 1 when a p99, error
+rate or memory slope regresses beyond `--tolerance`.
+
+Usage:
+  # self-contained: temp lake pre-seeded with 1 day, stub + uvicorn spawned
+  poetry run python -m bench.soak --spawn --duration 3600 --users 16
+  # against a running API (ingestion from its configured GDELT_LASTUPDATE_URL)
+  poetry run python -m bench.soak --host http://localhost:8000 --duration 600
+  poetry run python -m bench.soak --spawn --duration 600 --compare bench/results/soak-<old>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from bench.gdelt_stub import GdeltStub
+from bench.run_bench import CACHE_DIR, END, RESULTS_DIR, git_commit, ingest_scale, percentiles
+from bench.synthetic import BATCH_MINUTES, batch_timestamps, write_batch_zip
+
+# name -> (weight, path, params). Weights follow a dashboard: analytics dominate.
+TRAFFIC_MIX: dict[str, tuple[int, str, dict[str, Any]]] = {
+    "top_event_codes_day": (4, "/api/v1/analytics/top-event-codes", {"limit": 10, "since": "{day}"}),
+    "top_countries_day": (4, "/api/v1/analytics/top-countries", {"limit": 10, "since": "{day}"}),
+    "tone_day": (4, "/api/v1/analytics/tone", {"since": "{day}"}),
+    "top_event_codes_all": (1, "/api/v1/analytics/top-event-codes", {"limit": 10}),
+    "tone_all": (1, "/api/v1/analytics/tone", {}),
+    "search_day": (2, "/api/v1/events/search", {"query": "POLICE", "since": "{day}", "limit": 50}),
+    "search_all": (1, "/api/v1/events/search", {"query": "RAJOELINA", "limit": 50}),
+}
+
+
+@dataclass
+class Sample:
+    """One completed request."""
+
+    endpoint: str
+    started: float
+    latency_ms: float
+    active: bool
+    error: str | None
+
+
+@dataclass
+class SoakState:
+    """Shared state between users, the writer and the sampler."""
+
+    ingest_active: bool = False
+    samples: list[Sample] = field(default_factory=list)
+    rss: list[tuple[float, float]] = field(default_factory=list)  # (elapsed s, bytes)
+    triggers: int = 0
+    trigger_errors: int = 0
+    job_id: str | None = None  # last ingestion job triggered
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+def parse_metric(text: str, name: str) -> float | None:
+    """Sum all series of an (unlabelled or labelled) metric in Prometheus text format."""
+    total = None
+    for line in text.splitlines():
+        if line.startswith(name) and line[len(name) : len(name) + 1] in (" ", "{"):
+            total = (total or 0.0) + float(line.rsplit(" ", 1)[-1])
+    return total
+
+
+def slope_per_hour(points: list[tuple[float, float]]) -> float | None:
+    """Least-squares slope of (seconds, value) points, scaled to value/hour."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mx = sum(p[0] for p in points) / n
+    my = sum(p[1] for p in points) / n
+    den = sum((p[0] - mx) ** 2 for p in points)
+    if not den:
+        return None
+    return sum((p[0] - mx) * (p[1] - my) for p in points) / den * 3600
+
+
+def classify_error(resp: httpx.Response) -> str | None:
+    """`None` for success, else `http_<status>[:<DuckDB error class>]`."""
+    if resp.status_code < 400:
+        return None
+    kind = f"http_{resp.status_code}"
+    try:
+        body = resp.json()
+    except ValueError:
+        return kind
+    if isinstance(body, dict) and body.get("error"):
+        kind = f"{kind}:{body['error']}"
+    return kind
+
+
+async def user(client: httpx.AsyncClient, state: SoakState, rng: random.Random, day: str, think: float) -> None:
+    """One virtual user: weighted random requests with think time."""
+    names = list(TRAFFIC_MIX)
+    weights = [TRAFFIC_MIX[n][0] for n in names]
+    t0 = time.perf_counter()
+    while not state.stop.is_set():
+        name = rng.choices(names, weights)[0]
+        _, path, params = TRAFFIC_MIX[name]
+        params = {k: (v.format(day=day) if isinstance(v, str) else v) for k, v in params.items()}
+
+        active = state.ingest_active
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path, params=params)
+            error = classify_error(resp)
+        except httpx.HTTPError as exc:
+            error = f"client:{type(exc).__name__}"
+        latency = (time.perf_counter() - start) * 1000
+        active = active or state.ingest_active
+        state.samples.append(Sample(name, start - t0, latency, active, error))
+
+        await asyncio.sleep(rng.uniform(0, 2 * think))
+
+
+async def writer(
+    client: httpx.AsyncClient, state: SoakState, stub: GdeltStub | None, interval: float, next_batch: Any
+) -> None:
+    """Publish a new batch (spawn mode) and trigger ingestion every `interval` seconds."""
+    while not state.stop.is_set():
+        if stub is not None:
+            stub.publish(await asyncio.to_thread(next_batch))
+        try:
+            resp = await client.post("/api/v1/ingest/trigger", params={"n_batches": 1})
+            state.triggers += 1
+            state.trigger_errors += resp.status_code >= 400
+            if resp.status_code < 400:
+                state.job_id = resp.json().get("job_id")
+        except httpx.HTTPError:
+            state.trigger_errors += 1
+        try:
+            await asyncio.wait_for(state.stop.wait(), timeout=interval)
+        except TimeoutError:
+            pass
+
+
+async def sampler(client: httpx.AsyncClient, state: SoakState, interval: float, rss_every: float) -> None:
+    """Scrape /metrics and the last job: ingestion state at `interval`, RSS every `rss_every` s."""
+    t0 = time.perf_counter()
+    last_rss = -rss_every
+    while not state.stop.is_set():
+        try:
+            text = (await client.get("/metrics")).text
+            active = bool(parse_metric(text, "gdelt_ingest_in_progress"))
+            if not active and state.job_id:
+                job = await client.get(f"/api/v1/ingest/jobs/{state.job_id}")
+                active = job.status_code == 200 and job.json()["status"] == "running"
+            state.ingest_active = active
+            elapsed = time.perf_counter() - t0
+            rss = parse_metric(text, "process_resident_memory_bytes")
+            if rss is not None and elapsed - last_rss >= rss_every:
+                state.rss.append((round(elapsed, 1), rss))
+                last_rss = elapsed
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+
+
+def summarize(state: SoakState) -> dict[str, Any]:
+    """Aggregate samples into the report's `phases`, `endpoints`, `errors` and `memory`."""
+
+    def block(samples: list[Sample]) -> dict[str, Any]:
+        errors = sum(s.error is not None for s in samples)
+        return {
+            **percentiles([s.latency_ms for s in samples if s.error is None]),
+            "requests": len(samples),
+            "error_rate": round(errors / len(samples), 5) if samples else 0.0,
+        }
+
+    by_phase = {
+        "active": [s for s in state.samples if s.active],
+        "idle": [s for s in state.samples if not s.active],
+    }
+    endpoints = {
+        name: {phase: block([s for s in samples if s.endpoint == name]) for phase, samples in by_phase.items()}
+        for name in TRAFFIC_MIX
+    }
+    errors: dict[str, dict[str, int]] = {}
+    for phase, samples in by_phase.items():
+        errors[phase] = dict(Counter(s.error for s in samples if s.error).most_common())
+
+    rss_mb = [(t, b / 1e6) for t, b in state.rss]
+    slope = slope_per_hour(rss_mb)
+    return {
+        "phases": {phase: block(samples) for phase, samples in by_phase.items()},
+        "endpoints": endpoints,
+        "errors": errors,
+        "ingest": {"triggers": state.triggers, "trigger_errors": state.trigger_errors},
+        "memory": {
+            "rss_start_mb": round(rss_mb[0][1], 1) if rss_mb else None,
+            "rss_end_mb": round(rss_mb[-1][1], 1) if rss_mb else None,
+            "rss_peak_mb": round(max(v for _, v in rss_mb), 1) if rss_mb else None,
+            "growth_mb_per_hour": round(slope, 2) if slope is not None else None,
+            "series_mb": [(t, round(v, 1)) for t, v in rss_mb],
+        },
+    }
+
+
+async def soak(
+    base_url: str,
+    stub: GdeltStub | None,
+    next_batch: Any,
+    day: str,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    """Run users, writer and sampler for `args.duration` seconds."""
+    state = SoakState()
+    limits = httpx.Limits(max_connections=args.users + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        rng = random.Random(args.seed)
+        tasks = [
+            asyncio.create_task(user(client, state, random.Random(rng.random()), day, args.think))
+            for _ in range(args.users)
+        ]
+        tasks.append(asyncio.create_task(sampler(client, state, args.sample_interval, args.rss_interval)))
+        if args.ingest_interval > 0:
+            tasks.append(asyncio.create_task(writer(client, state, stub, args.ingest_interval, next_batch)))
+
+        try:
+            await asyncio.wait_for(state.stop.wait(), timeout=args.duration)
+        except TimeoutError:
+            pass
+        state.stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return summarize(state)
+
+
+def wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    """Poll /health until the spawned API answers."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API process exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API did not become ready at {base_url}")
+
+
+def run_spawned(args: argparse.Namespace) -> dict[str, Any]:
+    """Seed a temp lake in-process, then soak a uvicorn subprocess fed by the stub."""
+    from app.core.config import settings
+
+    cache = CACHE_DIR / f"seed{args.seed}_rows{args.rows_per_batch}"
+    stamps = batch_timestamps(END, args.seed_batches)
+    print(f"[soak] seeding {len(stamps)} batches x {args.rows_per_batch} rows")
+    names = [write_batch_zip(cache, ts, args.rows_per_batch, args.seed).name for ts in stamps]
+
+    future = iter(range(1, 10**6))
+
+    def next_batch() -> str:
+        ts = (END + timedelta(minutes=BATCH_MINUTES * next(future))).strftime("%Y%m%d%H%M%S")
+        return write_batch_zip(cache, ts, args.rows_per_batch, args.seed).name
+
+    work = Path(tempfile.mkdtemp(prefix="gdelt_soak_"))
+    env = {
+        **os.environ,
+        "DATA_LAKE_PATH": str(work / "lake"),
+        "DUCKDB_DB_PATH": str(work / "analytics.duckdb"),
+        "LOG_LEVEL": "WARNING",
+    }
+    settings.data_lake_path = env["DATA_LAKE_PATH"]
+    settings.duckdb_db_path = env["DUCKDB_DB_PATH"]
+    base_url = f"http://127.0.0.1:{args.port}"
+    proc: subprocess.Popen | None = None
+    try:
+        with GdeltStub(cache) as stub:
+            settings.gdelt_lastupdate_url = stub.lastupdate_url
+            env["GDELT_LASTUPDATE_URL"] = stub.lastupdate_url
+            ingest_scale(stub, names)
+
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+                env=env,
+            )
+            wait_ready(base_url, proc)
+            day = datetime.strptime(stamps[-1][:8], "%Y%m%d").date().isoformat()
+            print(f"[soak] {args.users} users for {args.duration}s, ingest every {args.ingest_interval}s")
+            return asyncio.run(soak(base_url, stub, next_batch, day, args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> tuple[list[str], list[str]]:
+    """Diff two soak reports; return (lines, regressions)."""
+    lines = [f"baseline={baseline['meta']['commit']} current={current['meta']['commit']}"]
+    regressions: list[str] = []
+
+    def check(label: str, old: float | None, new: float | None, slack: float = 0.0) -> None:
+        if old is None or new is None:
+            return
+        delta = f"({(new - old) / old:+.1%})" if old else ""
+        lines.append(f"{label:38} {old:>10} -> {new:>10} {delta}")
+        if new > old * (1 + tolerance) + slack:
+            regressions.append(label)
+
+    for phase in ("active", "idle"):
+        cur, base = current["phases"].get(phase, {}), baseline["phases"].get(phase, {})
+        check(f"{phase} p99_ms", base.get("p99_ms"), cur.get("p99_ms"))
+        check(f"{phase} p50_ms", base.get("p50_ms"), cur.get("p50_ms"))
+        check(f"{phase} error_rate", base.get("error_rate"), cur.get("error_rate"), slack=0.001)
+    for name, phases in current["endpoints"].items():
+        old = baseline["endpoints"].get(name, {}).get("active", {}).get("p99_ms")
+        check(f"{name} active p99_ms", old, phases["active"].get("p99_ms"))
+    # Memory slope is noisy on short runs: allow 5 MB/h of absolute slack.
+    check(
+        "rss growth_mb_per_hour",
+        baseline["memory"].get("growth_mb_per_hour"),
+        current["memory"].get("growth_mb_per_hour"),
+        slack=5.0,
+    )
+    return lines, regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    ap = argparse.ArgumentParser(description="Mixed analytics/search + ingestion soak test.")
+    target = ap.add_mutually_exclusive_group(required=True)
+    target.add_argument("--host", help="Base URL of a running API, e.g. http://localhost:8000.")
+    target.add_argument("--spawn", action="store_true", help="Seed a temp lake and spawn stub + uvicorn.")
+    ap.add_argument("--port", type=int, default=8001, help="Port of the spawned API (--spawn).")
+    ap.add_argument("--duration", type=float, default=300, help="Soak duration in seconds.")
+    ap.add_argument("--users", type=int, default=8, help="Concurrent virtual users.")
+    ap.add_argument("--think", type=float, default=0.2, help="Mean think time between requests (s).")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Client timeout per request (s).")
+    ap.add_argument("--ingest-interval", type=float, default=20, help="Seconds between triggers (0 = none).")
+    ap.add_argument("--sample-interval", type=float, default=0.25, help="/metrics scrape period (s).")
+    ap.add_argument("--rss-interval", type=float, default=10, help="RSS sampling period (s).")
+    ap.add_argument("--seed-batches", type=int, default=96, help="Batches pre-ingested (--spawn).")
+    ap.add_argument("--rows-per-batch", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--day", default=None, help="'since' day for recent-window queries (--host).")
+    ap.add_argument("--out", type=Path, default=None, help="Output JSON (default: results/soak-<commit>.json).")
+    ap.add_argument("--compare", type=Path, default=None, help="Baseline soak report to compare against.")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%).")
+    return ap.parse_args()
+
+
+def main() -> int:
+    """CLI main returning an exit code (1 on regression when --compare is set)."""
+    args = parse_args()
+    started = datetime.now(UTC)
+    if args.spawn:
+        report = run_spawned(args)
+    else:
+        day = args.day or started.date().isoformat()
+        report = asyncio.run(soak(args.host.rstrip("/"), None, None, day, args))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": started.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": "spawn" if args.spawn else args.host,
+            "duration_s": args.duration,
+            "users": args.users,
+            "think_s": args.think,
+            "ingest_interval_s": args.ingest_interval,
+            "rows_per_batch": args.rows_per_batch,
+            "seed": args.seed,
+        },
+        **report,
+    }
+    out = args.out or RESULTS_DIR / f"soak-{report['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"[soak] report written to {out}")
+    for phase, stats in report["phases"].items():
+        print(
+            f"[soak] {phase:6} n={stats['requests']:<7} p50={stats.get('p50_ms')} "
+            f"p99={stats.get('p99_ms')} ms errors={stats['error_rate']:.2%}"
+        )
+    print(f"[soak] rss growth: {report['memory']['growth_mb_per_hour']} MB/h")
+
+    if args.compare:
+        lines, regressions = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for line in lines:
+            print(f"[soak] {line}")
+        if regressions:
+            print(f"[soak] REGRESSIONS: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+"""bench/startup_bench.py
+
+Startup benchmark: import time of `app.main` and time to first query.
+
+Each sample runs in a fresh interpreter (nothing cached in-process; the OS
+page cache is shared, as it is between real worker restarts):
+- import: wall time of `import app.main`, plus the heavy modules it loaded
+  (pandas, httpx, ... must stay out of the import path, see `app.main`);
+- cold: first search + top-values query right after import, no warm-up
+  (what the first request of a worker paid before the warm-up phase);
+- warm: `app.services.warmup.run_warmup()` then the same first queries
+  (what the first request pays once `/ready` answers 200).
+
+The lake is a temporary filesystem lake of `--batches` synthetic batches
+(`bench/synthetic.py`) written through the real CSV -> Parquet path. Figures
+are medians of `--repeat` samples.
+
+Usage:
+  poetry run python -m bench.startup_bench --batches 96 --repeat 5
+  # -> bench/results/startup-<commit>.json
+
+  # regression check (exit code 1 if a median grows beyond the tolerance)
+  poetry run python -m bench.startup_bench --compare bench/results/startup-<old>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from bench.run_bench import RESULTS_DIR, git_commit
+
+HEAVY_MODULES = ["pandas", "httpx", "tenacity", "pyarrow.dataset", "pyarrow.compute", "boto3"]
+
+# Runs in the child interpreter; prints one JSON document.
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+import_ms = (time.perf_counter() - t0) * 1000
+heavy = [m for m in {heavy!r} if m in sys.modules]
+
+from app.infra.lake_storage import partition_dates
+from app.services.duckdb_queries import search_fulltext, top_values
+
+warmup_ms = None
+if {warm!r}:
+    from app.services.warmup import run_warmup
+    t = time.perf_counter()
+    run_warmup()
+    warmup_ms = (time.perf_counter() - t) * 1000
+
+day = partition_dates()[-1]
+t = time.perf_counter()
+search_fulltext("PROTEST", day, day, 50)
+top_values(["EventCode", "EventBaseCode", "EventRootCode"], "c27", day, day, 10)
+first_query_ms = (time.perf_counter() - t) * 1000
+print(json.dumps({{"import_ms": import_ms, "heavy": heavy, "warmup_ms": warmup_ms,
+                  "first_query_ms": first_query_ms}}))
+"""
+
+
+def build_lake(lake: Path, n_batches: int, rows_per_batch: int, seed: int) -> None:
+    """Write `n_batches` synthetic events batches to a filesystem lake."""
+    from app.core.config import settings
+    from app.infra.lake_storage import get_lake_storage
+    from app.services.ingest import _read_events_csv, _write_events_parquet
+    from bench.synthetic import batch_csv_bytes, batch_timestamps
+
+    settings.data_lake_path = str(lake)
+    storage = get_lake_storage()
+    csv = lake.parent / "batch.CSV"
+    for ts in batch_timestamps(datetime(2026, 2, 10, 23, 45, tzinfo=UTC), n_batches):
+        csv.write_bytes(batch_csv_bytes(ts, rows_per_batch, seed))
+        dt = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"
+        storage.write_batch(dt, ts, _read_events_csv(csv), _write_events_parquet)
+    storage.bump_version()
+
+
+def sample(lake: Path, warm: bool) -> dict[str, Any]:
+    """One fresh-interpreter measurement."""
+    env = {
+        **os.environ,
+        "DATA_LAKE_PATH": str(lake),
+        "LAKE_BACKEND": "fs",
+        "DUCKDB_TEMP_DIRECTORY": str(lake.parent / "duckdb_tmp"),
+    }
+    code = _CHILD.format(heavy=HEAVY_MODULES, warm=warm)
+    out = subprocess.check_output([sys.executable, "-c", code], env=env, text=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(n_batches: int, rows_per_batch: int, seed: int, repeat: int) -> dict[str, Any]:
+    """Median import / warm-up / first-query times, cold and warm."""
+    with tempfile.TemporaryDirectory(prefix="gdelt_startup_") as tmp:
+        lake = Path(tmp) / "lake"
+        build_lake(lake, n_batches, rows_per_batch, seed)
+        results: dict[str, Any] = {
+            "meta": {
+                "commit": git_commit(),
+                "batches": n_batches,
+                "rows_per_batch": rows_per_batch,
+                "repeat": repeat,
+                "python": sys.version.split()[0],
+            }
+        }
+        for mode in ("cold", "warm"):
+            samples = [sample(lake, warm=mode == "warm") for _ in range(repeat)]
+            summary = {
+                key: round(statistics.median(s[key] for s in samples), 1)
+                for key in ("import_ms", "first_query_ms")
+            }
+            if mode == "warm":
+                summary["warmup_ms"] = round(statistics.median(s["warmup_ms"] for s in samples), 1)
+            summary["heavy_modules"] = samples[0]["heavy"]
+            results[mode] = summary
+    return results
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> tuple[list[str], list[str]]:
+    """(report lines, regressions) of the medians against a baseline document."""
+    lines = [f"baseline={baseline['meta']['commit']} current={current['meta']['commit']}"]
+    regressions: list[str] = []
+    for mode in ("cold", "warm"):
+        for key in ("import_ms", "first_query_ms"):
+            old = baseline.get(mode, {}).get(key)
+            new = current[mode][key]
+            if not old:
+                continue
+            change = (new - old) / old
+            lines.append(f"{mode:4} {key:15} {old:>9} -> {new:>9} ms ({change:+.1%})")
+            if change > tolerance:
+                regressions.append(f"{mode} {key} +{change:.1%}")
+    added = set(current["cold"]["heavy_modules"]) - set(baseline.get("cold", {}).get("heavy_modules", []))
+    if added:
+        regressions.append(f"heavy modules now imported by app.main: {sorted(added)}")
+    return lines, regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    ap = argparse.ArgumentParser(description="Import time and time-to-first-query benchmark.")
+    ap.add_argument("--batches", type=int, default=96, help="Synthetic batches in the lake.")
+    ap.add_argument("--rows-per-batch", type=int, default=1000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per mode.")
+    ap.add_argument("--out", type=Path, default=None, help="Output JSON (default: results/startup-<commit>.json).")
+    ap.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against.")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression.")
+    return ap.parse_args()
+
+
+def main() -> int:
+    """CLI main returning an exit code."""
+    args = parse_args()
+    results = run(args.batches, args.rows_per_batch, args.seed, args.repeat)
+    for mode in ("cold", "warm"):
+        print(f"[startup] {mode}: {results[mode]}")
+
+    out = args.out or RESULTS_DIR / f"startup-{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"[startup] results written to {out}")
+
+    if args.compare:
+        lines, regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for line in lines:
+            print(f"[startup] {line}")
+        for r in regressions:
+            print(f"[startup] REGRESSION {r}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,190 @@
+"""bench/workers_bench.py
+
+Throughput vs. number of API worker processes (multi-process serving mode).
+
+For each worker count, the API is started on a temporary synthetic lake
+(gunicorn + `gunicorn.conf.py` when gunicorn is installed, else
+`uvicorn --workers N`, same in-memory-DuckDB-per-process model), then
+`--clients` concurrent clients send a dashboard mix (top values, tone, search
+on the newest day) for `--duration` seconds. Limits vary per request so that
+single-flight never coalesces the load away.
+
+Reported per worker count: requests/s, p50 / p99 latency, error count and the
+scaling efficiency `rps(N) / (N * rps(1))` (1.0 = linear). Only meaningful on
+a host with at least as many free cores as the largest worker count.
+
+Usage:
+  poetry run python -m bench.workers_bench --workers 1,2,4 --clients 32 --duration 20
+  # -> bench/results/workers-<commit>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from bench.run_bench import RESULTS_DIR, git_commit, percentiles
+from bench.startup_bench import build_lake
+
+# (weight, path, params); "{day}" is the newest partition, limits are randomized.
+MIX: list[tuple[int, str, dict[str, Any]]] = [
+    (3, "/api/v1/analytics/top-event-codes", {"since": "{day}"}),
+    (3, "/api/v1/analytics/top-countries", {"since": "{day}"}),
+    (2, "/api/v1/analytics/tone", {"since": "{day}"}),
+    (1, "/api/v1/events/search", {"query": "POLICE", "since": "{day}"}),
+]
+
+
+def spawn_api(workers: int, port: int, env: dict[str, str]) -> subprocess.Popen:
+    """Start the API with `workers` processes."""
+    env = {**env, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"}
+    if importlib.util.find_spec("gunicorn") is not None:
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+    else:
+        cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+    return subprocess.Popen(cmd, env=env, cwd=Path(__file__).resolve().parent.parent)
+
+
+def wait_ready(base_url: str, proc: subprocess.Popen, timeout: float = 60.0) -> None:
+    """Poll /ready until a worker reports its warm-up done."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API process exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"API did not become ready at {base_url}")
+
+
+async def load(base_url: str, day: str, clients: int, duration: float) -> dict[str, Any]:
+    """Closed-loop load: `clients` concurrent request loops for `duration` seconds."""
+    weights = [w for w, _, _ in MIX]
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(http: httpx.AsyncClient, rng: random.Random) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            _, path, params = rng.choices(MIX, weights)[0]
+            query = {k: v.format(day=day) if isinstance(v, str) else v for k, v in params.items()}
+            query["limit"] = rng.randint(1, 50)
+            start = time.perf_counter()
+            try:
+                resp = await http.get(path, params=query)
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http, random.Random(i)) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+def run(worker_counts: list[int], clients: int, duration: float, batches: int, port: int) -> dict:
+    """Measure each worker count on the same lake."""
+    results: dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "cpu_count": os.cpu_count(),
+            "clients": clients,
+            "duration_s": duration,
+            "batches": batches,
+        },
+        "workers": {},
+    }
+    work = Path(tempfile.mkdtemp(prefix="gdelt_workers_"))
+    try:
+        lake = work / "lake"
+        build_lake(lake, batches, 1000, seed=0)
+        day = sorted(p.name.split("=", 1)[1] for p in (lake / "events").glob("dt=*"))[-1]
+        env = {
+            **os.environ,
+            "DATA_LAKE_PATH": str(lake),
+            "LAKE_BACKEND": "fs",
+            "DUCKDB_TEMP_DIRECTORY": str(work / "duckdb_tmp"),
+            "LOG_LEVEL": "WARNING",
+        }
+        base_url = f"http://127.0.0.1:{port}"
+        for n in worker_counts:
+            proc = spawn_api(n, port, env)
+            try:
+                wait_ready(base_url, proc)
+                asyncio.run(load(base_url, day, clients, min(3.0, duration)))  # warm every worker
+                stats = asyncio.run(load(base_url, day, clients, duration))
+            finally:
+                proc.terminate()
+                proc.wait(timeout=30)
+            results["workers"][str(n)] = stats
+            print(f"[workers] {n} worker(s): {stats}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    base = results["workers"].get("1", {}).get("rps")
+    if base:
+        for n, stats in results["workers"].items():
+            stats["scaling_efficiency"] = round(stats["rps"] / (int(n) * base), 2)
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    ap = argparse.ArgumentParser(description="API throughput vs. worker processes.")
+    ap.add_argument("--workers", default="1,2,4", help="Comma list of worker counts.")
+    ap.add_argument("--clients", type=int, default=32, help="Concurrent client loops.")
+    ap.add_argument("--duration", type=float, default=20.0, help="Seconds of load per worker count.")
+    ap.add_argument("--batches", type=int, default=96, help="Synthetic batches in the lake.")
+    ap.add_argument("--port", type=int, default=8011)
+    ap.add_argument("--out", type=Path, default=None, help="Output JSON (default: results/workers-<commit>.json).")
+    return ap.parse_args()
+
+
+def main() -> int:
+    """CLI main returning an exit code."""
+    args = parse_args()
+    counts = [int(x) for x in args.workers.split(",") if x.strip()]
+    results = run(counts, args.clients, args.duration, args.batches, args.port)
+    for n, stats in results["workers"].items():
+        print(
+            f"[workers] {n:>2} worker(s) {stats['rps']:>8} req/s  p99 {stats['p99_ms']:>8} ms  "
+            f"efficiency {stats.get('scaling_efficiency', '-')}"
+        )
+    out = args.out or RESULTS_DIR / f"workers-{results['meta']['commit']}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"[workers] results written to {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
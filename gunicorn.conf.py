@@ -0,0 +1,41 @@
+"""gunicorn.conf.py
+
+Multi-process serving: gunicorn master + `WEB_CONCURRENCY` Uvicorn workers.
+
+Usage:
+  WEB_CONCURRENCY=4 poetry run gunicorn -c gunicorn.conf.py app.main:app
+
+Why it scales with the worker count:
+- each worker has its own in-memory DuckDB instances reading Parquet directly
+  (no shared database file, no lock), with `cpu_count // WEB_CONCURRENCY`
+  threads each unless `DUCKDB_THREADS` is set (`app.infra.duckdb_engine`);
+- shared lake state (version, batch catalog) is published by the ingesting
+  process as atomically renamed files and read once per version by every
+  worker (`app.infra.fs_lake`);
+- the app is NOT preloaded in the master: DuckDB instances and threads must
+  not be inherited across fork(), and a lazy `import app.main` keeps worker
+  boot short (warm-up runs per worker, see `GET /ready`).
+
+Size `DUCKDB_MEMORY_LIMIT` / `DUCKDB_CLASS_BUDGETS` per worker: memory limits
+apply to each worker's instances.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = False
+
+# Workers read their share of the DuckDB threads from WEB_CONCURRENCY.
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+# Long-lived SSE streams (GET /api/v1/events/stream) are async: the worker
+# heartbeat is not blocked by them, only shutdown waits up to graceful_timeout.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+accesslog = None  # request metrics are on /metrics; JSON app logs on stdout
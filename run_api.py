@@ -9,7 +9,7 @@ Notes:
 - `reload=True` is for development only.
 - For production, prefer:
   uvicorn app.main:app --host 0.0.0.0 --port 8000
-  or gunicorn with UvicornWorker.
+  or several workers: gunicorn -c gunicorn.conf.py app.main:app (see gunicorn.conf.py).
 """
 
 import uvicorn
@@ -16,6 +16,7 @@ import json
 import sys
 from typing import Any
 
+from app.core.metrics import export_process_metrics
 from app.tasks import run_ingestion_now
 
 
@@ -37,6 +38,7 @@ def main() -> int:
     try:
         res = asyncio.run(main_async(args.n))
         print(json.dumps(res, ensure_ascii=False, indent=2))
+        export_process_metrics("ingest_once")
         return 0
     except Exception as exc:
         print(f"[ingest_once] fatal error: {exc}", file=sys.stderr)
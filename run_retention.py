@@ -0,0 +1,55 @@
+"""run_retention.py
+
+One-shot lake retention run (recompress / roll up / drop old partitions).
+
+Usage:
+  poetry run python run_retention.py --dry-run   # report only
+  poetry run python run_retention.py
+
+Policies come from RETENTION_* settings (see app.services.retention);
+run it daily (cron, Kubernetes CronJob), from one place per lake.
+
+Exit codes:
+- 0: finished (the report is printed as JSON)
+- 1: fatal error (invalid policy, run already in progress, storage failure)
+"""
+
+import argparse
+import json
+import sys
+from datetime import date
+
+from app.core.metrics import export_process_metrics
+from app.services.retention import retention
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse CLI arguments."""
+    ap = argparse.ArgumentParser(description="Apply the lake retention policies once.")
+    ap.add_argument(
+        "--dry-run", action="store_true", help="Report what would change, change nothing."
+    )
+    ap.add_argument(
+        "--today",
+        type=date.fromisoformat,
+        default=None,
+        help="Reference day for partition ages, YYYY-MM-DD (default: today, UTC).",
+    )
+    return ap.parse_args()
+
+
+def main() -> int:
+    """CLI main returning an exit code."""
+    args = parse_args()
+    try:
+        report = retention.run(dry_run=args.dry_run, today=args.today)
+        print(json.dumps(report.to_json(), indent=2))
+        export_process_metrics("retention")
+        return 0
+    except Exception as exc:
+        print(f"[retention] fatal error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,31 +1,37 @@
 """run_scheduler.py
 
-Periodic ingestion runner (no Docker).
+Periodic ingestion runner (no Docker), aligned on the GDELT publication grid.
 
 Default behavior:
-- every 15 minutes
-- ingest 1 batch
+- wake up shortly after every 15-minute GDELT slot (UTC)
+- poll lastupdate.txt with conditional requests until the new batch is listed
+- ingest 1 batch as soon as it appears (runs never overlap)
 
 Config via env:
-- INGEST_INTERVAL_MINUTES (default 15)
+- INGEST_INTERVAL_MINUTES (default 15, the publication cadence)
 - INGEST_N_BATCHES (default 1)
+- GDELT_PUBLISH_DELAY_SECONDS / GDELT_POLL_INTERVAL_SECONDS / GDELT_POLL_WINDOW_SECONDS
+  (see app.core.config)
 
 Usage:
   poetry run python run_scheduler.py
 
 Notes:
-- This is intentionally simple (while-loop + sleep).
+- See `app.scheduler.CadenceScheduler` for the polling strategy.
 - In production you might use APScheduler, Celery beat, Airflow, or Kubernetes CronJobs.
+- `kill -USR2 <pid>` writes a sampling profile of the running scheduler
+  (see `app.core.profiling`).
 """
 
 import asyncio
 import os
-from datetime import datetime
 from typing import Final
 
-from app.tasks import run_ingestion_now
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.core.profiling import install_signal_handler
+from app.scheduler import CadenceScheduler
 
-DEFAULT_INTERVAL_MIN: Final[int] = 15
 DEFAULT_N_BATCHES: Final[int] = 1
 
 
@@ -42,26 +48,20 @@ def _int_env(name: str, default: int) -> int:
 
 async def main() -> None:
     """Main scheduler loop."""
-    interval = _int_env("INGEST_INTERVAL_MINUTES", DEFAULT_INTERVAL_MIN)
+    interval = _int_env("INGEST_INTERVAL_MINUTES", settings.gdelt_publish_interval_minutes)
     n = _int_env("INGEST_N_BATCHES", DEFAULT_N_BATCHES)
 
-    print(f"[scheduler] start | every {interval} min | n_batches={n}")
+    print(
+        f"[scheduler] start | cadence {interval} min | n_batches={n} "
+        f"| poll every {settings.gdelt_poll_interval_seconds}s "
+        f"from +{settings.gdelt_publish_delay_seconds}s after each slot"
+    )
 
-    while True:
-        started = datetime.utcnow()
-        print(f"[scheduler] ingest start: {started.isoformat()}Z")
-
-        try:
-            res = await run_ingestion_now(n)
-            ok = sum(1 for x in res.get("ingested", []) if x.get("status") == "ok")
-            total = len(res.get("ingested", []))
-            print(f"[scheduler] ingest done: ok={ok}/{total}")
-        except Exception as exc:
-            # Never stop the loop on a transient failure.
-            print(f"[scheduler] ingest failed: {exc}")
-
-        await asyncio.sleep(interval * 60)
+    scheduler = CadenceScheduler(n_batches=n, interval_minutes=interval)
+    await scheduler.run_forever()
 
 
 if __name__ == "__main__":
+    configure_logging()
+    install_signal_handler("scheduler")
     asyncio.run(main())
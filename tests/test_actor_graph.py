@@ -0,0 +1,179 @@
+"""
+tests/test_actor_graph.py
+
+Tests for the actor interaction graph (app.services.actor_graph, /api/v1/graph).
+
+Why:
+- Merging per-day CSR graphs must give exactly the GROUP BY of the raw events
+  (counts and average Goldstein per Actor1 -> Actor2 pair).
+- Batches ingested by `ingest_one` and batches only found in the lake must
+  both be applied, each exactly once.
+- A day replaced by a writer must stay loadable by other processes still
+  reading the previous manifest, until the retention grace period is over.
+- Neighbor, top-edge and k-hop queries rank and expand as documented.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.lake_storage import get_lake_storage
+from app.main import app
+from app.services import ingest
+from app.services.actor_graph import ActorGraph, Csr, actor_graph, graph_dir
+from app.services.gdelt import GdeltFile
+
+# (Actor1CountryCode, Actor2CountryCode, GoldsteinScale)
+DAY1 = [("USA", "CHN", -2.0), ("USA", "CHN", 4.0), ("FRA", "USA", 1.0)]
+DAY2 = [("USA", "CHN", 3.0), ("USA", "RUS", -5.0), ("CHN", "RUS", 2.0), ("RUS", "IRN", 1.0)]
+DAY2_LATE = [("USA", "RUS", -1.0), ("USA", "GBR", None)]
+
+
+def _row(**values: str) -> str:
+    row = [""] * len(EVENTS_COLUMNS)
+    for name, value in values.items():
+        row[EVENTS_COLUMNS.index(name)] = value
+    return "\t".join(row)
+
+
+def _ingest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, ts: str, events: list[tuple]) -> None:
+    lines = [
+        _row(
+            GlobalEventID=str(i + 1),
+            Actor1CountryCode=a1,
+            Actor2CountryCode=a2,
+            Actor1Code=a1 + "GOV",
+            Actor2Code=a2 + "GOV",
+            GoldsteinScale="" if g is None else str(g),
+        )
+        for i, (a1, a2, g) in enumerate(events)
+    ]
+    zipped = tmp_path / f"{ts}.zip"
+    with zipfile.ZipFile(zipped, "w") as zf:
+        zf.writestr(f"{ts}.export.CSV", "\n".join(lines) + "\n")
+
+    async def fake_download(url: str, dest: Path) -> int:
+        dest.write_bytes(zipped.read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    asyncio.run(ingest.ingest_one(GdeltFile(1, "x", f"http://x/{ts}.export.CSV.zip", ts)))
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Day 1 written straight to the lake (graph catches up by sync), day 2 ingested."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    storage = get_lake_storage()
+    legacy = pa.table(
+        {
+            "GlobalEventID": pa.array(range(1, len(DAY1) + 1), pa.int64()),
+            "Actor1CountryCode": [a1 for a1, _, _ in DAY1],
+            "Actor2CountryCode": [a2 for _, a2, _ in DAY1],
+            "GoldsteinScale": [g for _, _, g in DAY1],
+        }
+    )
+    storage.write_batch("2026-02-10", "20260210000000", legacy, ingest._write_events_parquet)
+    storage.bump_version()
+    _ingest(tmp_path, monkeypatch, "20260211000000", DAY2)
+    _ingest(tmp_path, monkeypatch, "20260211001500", DAY2_LATE)
+    return tmp_path / "lake"
+
+
+def test_merged_csr_equals_summed_edges() -> None:
+    rng = np.random.default_rng(0)
+    nodes = 50
+    days = []
+    expected: dict[tuple[int, int], int] = {}
+    for _ in range(3):
+        src, dst = rng.integers(0, nodes, 400), rng.integers(0, nodes, 400)
+        n = rng.integers(1, 5, 400)
+        for s, d, c in zip(src.tolist(), dst.tolist(), n.tolist()):
+            expected[(s, d)] = expected.get((s, d), 0) + c
+        days.append(Csr.from_edges(src, dst, n, n * 0.5, n, nodes))
+
+    merged = Csr.merge(days, nodes)
+    got = dict(zip(zip(merged.sources().tolist(), merged.indices.tolist()), merged.n.tolist()))
+    assert got == expected
+    assert np.allclose(merged.gsum, merged.n * 0.5)
+    assert all(np.all(np.diff(merged.indices[merged.row(i)]) > 0) for i in range(nodes))
+
+
+def test_ingested_and_lake_batches_are_applied_once(lake: Path) -> None:
+    graph = ActorGraph()
+    assert graph.sync() == 1  # the day-1 batch; day 2 was added by ingest_one
+    assert graph.sync(force=True) == 0
+    assert {p.name for p in (graph_dir() / "country").iterdir()} >= {"manifest.json", "nodes.json"}
+
+    out = graph.neighbors("country", "usa", None, None)["edges"]
+    assert [(e["target"], e["n"]) for e in out] == [("CHN", 3), ("RUS", 2), ("GBR", 1)]
+    assert out[0]["avg_goldstein"] == pytest.approx(5 / 3)
+    assert out[1]["avg_goldstein"] == pytest.approx(-3.0)
+    assert out[2]["avg_goldstein"] is None
+
+    day1 = graph.neighbors("country", "USA", "2026-02-10", "2026-02-10")["edges"]
+    assert [(e["target"], e["n"]) for e in day1] == [("CHN", 2)]
+    partners = graph.neighbors("country", "RUS", "2026-02-11", None, direction="in")["edges"]
+    assert [(e["source"], e["n"]) for e in partners] == [("USA", 2), ("CHN", 1)]
+    codes = graph.neighbors("code", "USAGOV", None, None)["edges"]  # day 1 has no codes
+    assert [(e["target"], e["n"]) for e in codes] == [("RUSGOV", 2), ("CHNGOV", 1), ("GBRGOV", 1)]
+
+
+def test_replaced_day_stays_readable_until_the_grace_period_is_over(
+    lake: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    reader, writer = ActorGraph(), ActorGraph()  # two processes
+    reader.sync()
+    old = reader._state("country").days["2026-02-11"]["dir"]
+    late = pa.table({"Actor1CountryCode": ["USA"], "Actor2CountryCode": ["CHN"]})
+    writer.add_batch("2026-02-11", "late-1", late)
+
+    # The reader read the manifest before the rewrite: the old day is still there.
+    assert reader._day("country", old).n.sum() == len(DAY2) + len(DAY2_LATE)
+    assert (graph_dir() / "country" / old).exists()
+
+    monkeypatch.setattr(settings, "retention_grace_seconds", 0.0)
+    writer.add_batch("2026-02-11", "late-2", late)
+    assert not (graph_dir() / "country" / old).exists()
+    out = reader.neighbors("country", "USA", "2026-02-11", None)["edges"]
+    assert [(e["target"], e["n"]) for e in out] == [("CHN", 3), ("RUS", 2), ("GBR", 1)]
+
+
+def test_graph_endpoints(lake: Path) -> None:
+    client = TestClient(app)
+
+    top = client.get("/api/v1/graph/country/top-edges", params={"limit": 2}).json()
+    assert [(e["source"], e["target"], e["n"]) for e in top["edges"]] == [
+        ("USA", "CHN", 3),
+        ("USA", "RUS", 2),
+    ]
+
+    hop = client.get("/api/v1/graph/country/k-hop", params={"actor": "FRA", "k": 3}).json()
+    assert [(n["actor"], n["hop"]) for n in hop["nodes"]] == [
+        ("USA", 1),
+        ("CHN", 2),
+        ("RUS", 2),
+        ("GBR", 2),
+        ("IRN", 3),
+    ]
+    one = client.get(
+        "/api/v1/graph/country/k-hop", params={"actor": "FRA", "k": 2, "fanout": 1}
+    ).json()
+    assert [n["actor"] for n in one["nodes"]] == ["USA", "CHN"]
+
+    missing = client.get("/api/v1/graph/country/neighbors", params={"actor": "XXX"})
+    assert missing.status_code == 404
+    assert actor_graph.sync() == 0
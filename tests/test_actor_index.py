@@ -0,0 +1,113 @@
+"""
+tests/test_actor_index.py
+
+Tests for the fuzzy actor / location search (app.services.actor_index).
+
+Why:
+- Misspelled or partial names ("Rajoelna", "Madagasc") must match the indexed
+  names, best RapidFuzz score first, restricted to actor or location columns.
+- Ingestion must write the per-batch name dictionary; batches ingested before
+  it existed must still be indexed (from their events file).
+- Events must be mapped back from the matched names, reading only the
+  partitions where those names occur.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.domain.datasets import ACTOR_NAMES
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.lake_storage import get_lake_storage
+from app.main import app
+from app.services import ingest
+from app.services.actor_index import ActorIndex
+from app.services.gdelt import GdeltFile
+
+TS = "20260211000000"
+
+
+def _row(**values: str) -> str:
+    row = [""] * len(EVENTS_COLUMNS)
+    for name, value in values.items():
+        row[EVENTS_COLUMNS.index(name)] = value
+    return "\t".join(row)
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """One legacy batch (no name dictionary) on 02-10, one ingested batch on 02-11."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    storage = get_lake_storage()
+    legacy = pa.table(
+        {
+            "GlobalEventID": pa.array([1, 2], pa.int64()),
+            "Actor1Name": ["ANDRY RAJOELINA", "POLICE"],
+            "Actor2Name": [None, "PROTESTER"],
+            "ActionGeo_FullName": ["Antananarivo, Madagascar, Madagascar", "Paris, France, France"],
+        }
+    )
+    storage.write_batch("2026-02-10", "20260210000000", legacy, ingest._write_events_parquet)
+    storage.bump_version()
+
+    lines = [
+        _row(GlobalEventID="10", Actor1Name="RAJOELINA", ActionGeo_FullName="Toamasina, Madagascar, Madagascar"),
+        _row(GlobalEventID="11", Actor1Name="GOVERNMENT", Actor2Name="MADAGASCAR"),
+        _row(GlobalEventID="12", Actor1Name="ARMY", ActionGeo_FullName="Lyon, France, France"),
+    ]
+    zipped = tmp_path / "e.zip"
+    with zipfile.ZipFile(zipped, "w") as zf:
+        zf.writestr(f"{TS}.export.CSV", "\n".join(lines) + "\n")
+
+    async def fake_download(url: str, dest: Path) -> int:
+        dest.write_bytes(zipped.read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    result = asyncio.run(ingest.ingest_one(GdeltFile(1, "x", f"http://x/{TS}.export.CSV.zip", TS)))
+    assert result["tables"][ACTOR_NAMES] == 6
+    return tmp_path / "lake"
+
+
+def test_misspelled_and_partial_names_are_ranked(lake: Path) -> None:
+    index = ActorIndex()
+    assert index.sync() == 2
+    assert index.sync() == 0  # same lake version: nothing to do
+
+    actors = index.lookup("Rajoelna", "actor", limit=5)
+    assert [m.name for m in actors] == ["RAJOELINA", "ANDRY RAJOELINA"]
+    assert actors[0].score > actors[1].score >= 70
+
+    places = index.lookup("madagasc", "location", limit=5)
+    assert {m.name for m in places} == {
+        "Antananarivo, Madagascar, Madagascar",
+        "Toamasina, Madagascar, Madagascar",
+    }
+    assert [m.name for m in index.lookup("Madagasc", "actor")] == ["MADAGASCAR"]
+    assert index.lookup("zzzzzz") == []
+
+
+def test_actor_search_endpoint_maps_names_back_to_events(lake: Path) -> None:
+    client = TestClient(app)
+
+    body = client.get("/api/v1/events/actors/search", params={"q": "Rajoelna", "kind": "actor"}).json()
+    assert [m["name"] for m in body["matches"]] == ["RAJOELINA", "ANDRY RAJOELINA"]
+    assert [r["GlobalEventID"] for r in body["rows"]] == [10, 1]
+
+    body = client.get(
+        "/api/v1/events/actors/search", params={"q": "Rajoelna", "kind": "actor", "since": "2026-02-11"}
+    ).json()
+    assert [r["GlobalEventID"] for r in body["rows"]] == [10]
+
+    assert client.get("/api/v1/events/actors/search", params={"q": "ab"}).status_code == 422
@@ -0,0 +1,102 @@
+"""
+tests/test_admission.py
+
+Tests for admission control on query endpoints.
+
+Why:
+- Cost must follow the partitions a query will actually scan.
+- Saturated lanes must shed fast (503 + Retry-After) and never block the
+  reserved cheap lane.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import admission
+from app.core.admission import AdmissionController, AdmissionRejected, LaneLimits
+from app.core.config import settings
+from app.main import app
+from app.services.duckdb_queries import estimate_cost
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Three one-file partitions with a tiny named-schema table."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "duckdb_db_path", str(tmp_path / "analytics.duckdb"))
+    for day in ("2026-02-08", "2026-02-09", "2026-02-10"):
+        part = tmp_path / "lake" / "events" / f"dt={day}"
+        part.mkdir(parents=True)
+        pq.write_table(pa.table({"AvgTone": ["-1.5", "2.0"]}), str(part / "batch_ts=1.parquet"))
+    return tmp_path / "lake"
+
+
+def _controller(concurrency: int, max_queue: int, timeout_s: float) -> AdmissionController:
+    limits = {lane: LaneLimits(concurrency, max_queue, timeout_s) for lane in admission.LANES}
+    return AdmissionController(limits, cheap_max_cost=2, heavy_min_cost=10)
+
+
+def test_cost_follows_partition_pruning(lake: Path) -> None:
+    """One partition when `since` alone is given, the whole lake otherwise."""
+    assert estimate_cost("tone", "2026-02-10", None) == 1
+    assert estimate_cost("tone", None, None) == 3
+    assert estimate_cost("search", None, None) == 12
+
+    ctl = _controller(1, 0, 0.01)
+    assert [ctl.lane_for(c) for c in (1, 3, 12)] == ["cheap", "standard", "heavy"]
+
+
+def test_saturated_lane_sheds_without_blocking_cheap_lane() -> None:
+    """Heavy lane full: queue_full at once, queue_timeout after waiting; cheap still admitted."""
+
+    async def scenario() -> list[str]:
+        ctl = _controller(concurrency=1, max_queue=1, timeout_s=0.05)
+        reasons = []
+        async with ctl.admit(50):
+            waiter = asyncio.create_task(ctl.admit(50).__aenter__())
+            await asyncio.sleep(0)
+            try:
+                async with ctl.admit(50):
+                    pass
+            except AdmissionRejected as exc:
+                reasons.append(exc.reason)
+            try:
+                await waiter
+            except AdmissionRejected as exc:
+                reasons.append(exc.reason)
+            async with ctl.admit(1) as lane:
+                reasons.append(lane)
+        return reasons
+
+    assert asyncio.run(scenario()) == ["queue_full", "queue_timeout", "cheap"]
+
+
+def test_overloaded_endpoint_returns_503_retry_after(lake: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A request in a lane with no capacity is shed with 503; the cheap lane still answers."""
+    monkeypatch.setattr(settings, "admission_heavy_min_cost", 3)
+    monkeypatch.setattr(settings, "admission_heavy_concurrency", 0)
+    monkeypatch.setattr(settings, "admission_heavy_max_queue", 0)
+    admission.reset_controller()
+    try:
+        client = TestClient(app)
+        shed = client.get("/api/v1/analytics/tone")
+        ok = client.get("/api/v1/analytics/tone", params={"since": "2026-02-10"})
+    finally:
+        admission.reset_controller()
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == str(settings.admission_retry_after_seconds)
+    assert shed.json()["error"] == "overloaded"
+    assert shed.json()["lane"] == "heavy"
+    assert ok.status_code == 200
+    assert ok.json()["n"] == 2
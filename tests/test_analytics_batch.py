@@ -0,0 +1,106 @@
+"""
+tests/test_analytics_batch.py
+
+Tests for batched analytics (POST /api/v1/analytics/batch).
+
+Why:
+- Each aggregate of a batch must equal the result of its standalone query
+  (top_values / tone_stats), hot and cold tiers mixed.
+- The batch must read the date range once: a single DuckDB query.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.infra.fs_lake import parquet_path
+from app.main import app
+from app.services.duckdb_queries import tone_stats, top_values
+from app.services.hot_tier import hot_tier
+
+BATCHES = ["20260209230000", "20260210000000", "20260210001500"]
+
+
+def _batch(i: int) -> pa.Table:
+    n = 40 * (i + 1)
+    return pa.table(
+        {
+            "GlobalEventID": pa.array(range(i * 1000, i * 1000 + n), pa.int64()),
+            "EventCode": [f"0{(j + i) % 5 + 1}0" for j in range(n)],
+            "ActionGeo_CountryCode": [["FR", "US", "", None][j % 4] for j in range(n)],
+            "Actor1Name": [f"ACTOR{j % (i + 2)}" for j in range(n)],
+            "AvgTone": [None if j % 9 == 0 else (j % 13) - 6.0 for j in range(n)],
+        }
+    )
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """3 batches over 2 partitions, the newest one in the hot tier."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", True)
+    monkeypatch.setattr(settings, "hot_tier_hours", 0)
+    for i, ts in enumerate(BATCHES):
+        dt = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"
+        pq.write_table(_batch(i), str(parquet_path(dt, ts)))
+    hot_tier.clear()
+    hot_tier.refresh_from_lake()
+    yield tmp_path / "lake"
+    hot_tier.clear()
+
+
+def _queries_run() -> float:
+    sample = REGISTRY.get_sample_value("duckdb_query_duration_seconds_count", {"kind": "batch"})
+    return sample or 0.0
+
+
+@pytest.mark.parametrize("since", [None, "2026-02-10"])
+def test_batch_matches_standalone_queries_in_one_scan(lake: Path, since: str | None) -> None:
+    queries = [
+        {"name": "codes", "op": "top_values", "field": "EventCode", "limit": 3},
+        {"name": "countries", "op": "top_values", "field": "ActionGeo_CountryCode"},
+        {"name": "actors", "op": "top_values", "field": "Actor1Name", "limit": 2},
+        {"name": "tone", "op": "tone"},
+        {"name": "codes_all", "op": "top_values", "field": "EventCode", "limit": 50},
+    ]
+    before = _queries_run()
+    response = TestClient(app).post(
+        "/api/v1/analytics/batch", params={"since": since}, json={"queries": queries}
+    )
+    assert response.status_code == 200
+    assert _queries_run() == before + 1
+
+    got = {r["name"]: r for r in response.json()["results"]}
+    assert list(got) == [q["name"] for q in queries]
+    expected = {
+        "codes": top_values(["EventCode"], "c27", since, None, 3),
+        "countries": top_values(["ActionGeo_CountryCode"], "c55", since, None, 10),
+        "actors": top_values(["Actor1Name"], "c7", since, None, 2),
+        "codes_all": top_values(["EventCode"], "c27", since, None, 50),
+    }
+    for name, rows in expected.items():
+        assert got[name]["rows"] == rows
+    tone = {k: v for k, v in got["tone"].items() if k not in ("name", "op")}
+    assert tone == pytest.approx(tone_stats(since, None))
+
+
+def test_batch_rejects_invalid_specs(lake: Path) -> None:
+    client = TestClient(app)
+    url = "/api/v1/analytics/batch"
+    bad_field = {"queries": [{"name": "x", "op": "top_values", "field": "Nope"}]}
+    assert client.post(url, json=bad_field).status_code == 422
+    assert client.post(url, json={"queries": [{"name": "x", "op": "median"}]}).status_code == 422
+    twice = {"queries": [{"name": "t", "op": "tone"}, {"name": "t", "op": "tone"}]}
+    assert client.post(url, json=twice).status_code == 422
+    assert client.post(url, json={"queries": []}).status_code == 422
@@ -0,0 +1,139 @@
+"""
+tests/test_continuous_views.py
+
+Tests for continuous views (app.services.continuous_views).
+
+Why:
+- A view must match a full recomputation after batches are applied one by
+  one (ingestion listener or lake sync) and after a partition ages out of the
+  window (retraction).
+- View state must survive a restart.
+- `check()` must recompute from the lake, so a batch the view missed is
+  detected, and must not read batches retention removed from the lake.
+- The API must create, list, read, check and drop views.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infra.lake_storage import get_lake_storage, lake_version
+from app.main import app
+from app.services.continuous_views import ViewManager, ViewSpec
+from app.services.ingest import _write_events_parquet
+
+
+def _batch(i: int) -> pa.Table:
+    n = 200 + 50 * i
+    return pa.table(
+        {
+            "GlobalEventID": pa.array(range(i * 1000, i * 1000 + n), pa.int64()),
+            "EventRootCode": [f"{(j + i) % 4 + 1:02d}" for j in range(n)],
+            "ActionGeo_CountryCode": [["MA", "FR", "US", ""][(j * (i + 1)) % 4] for j in range(n)],
+            "AvgTone": [None if j % 11 == 0 else (j % 13) - 6.5 for j in range(n)],
+        }
+    )
+
+
+def _write(ts: str, i: int) -> tuple[str, str, str, pa.Table]:
+    """Write batch `i` at `ts`; return the listener arguments."""
+    dt = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"
+    storage = get_lake_storage()
+    table = _batch(i)
+    uri, _ = storage.write_batch(dt, ts, table, _write_events_parquet)
+    storage.bump_version()
+    return dt, ts, uri, table
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    return tmp_path / "lake"
+
+
+def test_view_is_maintained_per_batch_and_retracts_expired_partitions(lake: Path) -> None:
+    _write("20260208000000", 0)
+    _write("20260209000000", 1)
+    manager = ViewManager()
+    manager.create(ViewSpec("top-countries", "ActionGeo_CountryCode", window_days=2))
+    manager.create(ViewSpec("tone-by-root", "EventRootCode", "avg", "AvgTone", window_days=2))
+
+    # In-process ingestion: the listener applies the in-memory batch.
+    manager.on_batch(*_write("20260209001500", 2))
+    # Another process ingested: the next read syncs from the lake.
+    _write("20260210000000", 3)  # new day: 2026-02-08 leaves the 2-day window
+    manager.sync()
+
+    for name in ("top-countries", "tone-by-root"):
+        view = manager.get(name)
+        assert view.window() == ("2026-02-09", "2026-02-10")
+        assert sum(len(u) for u in view.applied.values()) == 3
+        report = manager.check(name)
+        assert report["consistent"], report["mismatches"]
+        assert report["batches"] == 3
+
+    rows = manager.get("top-countries").rows()
+    assert {r["key"] for r in rows} == {"MA", "FR", "US"}  # empty keys are skipped
+    assert sum(r["n"] for r in rows) == sum(
+        sum(1 for c in _batch(i).column("ActionGeo_CountryCode").to_pylist() if c) for i in (1, 2, 3)
+    )
+
+    # Restart: state comes back from disk, nothing is re-applied.
+    restarted = ViewManager()
+    assert restarted.get("tone-by-root").rows() == manager.get("tone-by-root").rows()
+    assert restarted.check("tone-by-root")["consistent"]
+
+
+def test_check_reports_missed_and_retired_batches(lake: Path) -> None:
+    _, _, first, _ = _write("20260210000000", 0)
+    manager = ViewManager()
+    manager.create(ViewSpec("roots", "EventRootCode", window_days=1))
+    assert manager.check("roots")["consistent"]
+
+    # A batch the view never applied (e.g. a lost update) while it looks synced.
+    _, _, missed, _ = _write("20260210001500", 1)
+    manager._synced_version = lake_version()
+    report = manager.check("roots")
+    assert not report["consistent"]
+    assert report["unapplied"] == [missed] and report["retired"] == []
+    assert report["batches"] == 2 and report["mismatches"]
+
+    # Retention retired then purged an applied batch: reported, not read.
+    storage = get_lake_storage()
+    storage.retire([first])
+    storage.bump_version()
+    storage.purge_retired(0)
+    manager._synced_version = lake_version()
+    report = manager.check("roots")
+    assert report["retired"] == [first] and report["unapplied"] == [missed]
+    assert report["batches"] == 1
+
+
+def test_views_api(lake: Path) -> None:
+    _write("20260210000000", 0)
+    client = TestClient(app)
+
+    body = {"name": "roots-today", "group_by": "EventRootCode", "window_days": 1}
+    created = client.post("/api/v1/views", json=body)
+    assert created.status_code == 201
+    assert created.json()["batches"] == 1
+    assert client.post("/api/v1/views", json=body).status_code == 409
+    bad = {"name": "x", "group_by": "NotAColumn"}
+    assert client.post("/api/v1/views", json=bad).status_code == 422
+
+    assert [v["name"] for v in client.get("/api/v1/views").json()["views"]] == ["roots-today"]
+    read = client.get("/api/v1/views/roots-today", params={"limit": 2}).json()
+    assert [r["n"] for r in read["rows"]] == [50, 50]
+    assert client.get("/api/v1/views/roots-today/check").json()["consistent"] is True
+
+    assert client.delete("/api/v1/views/roots-today").status_code == 204
+    assert client.get("/api/v1/views/roots-today").status_code == 404
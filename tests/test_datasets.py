@@ -0,0 +1,137 @@
+"""
+tests/test_datasets.py
+
+Tests for mentions and GKG ingestion.
+
+Why:
+- `pick_recent` must keep the mentions and GKG files of a batch, not only the
+  events export.
+- GKG nested lists must land exploded in their side tables (no string split
+  at query time), with malformed rows skipped rather than failing the batch.
+- Mentions must be reachable from their event (GlobalEventID join endpoint).
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from pathlib import Path
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.domain.gdelt_gkg_schema import GKG_COLUMNS
+from app.domain.gdelt_mentions_schema import MENTIONS_COLUMNS
+from app.main import app
+from app.services import ingest
+from app.services.duckdb_queries import top_values
+from app.services.gdelt import GdeltFile, pick_recent
+
+TS = "20260210001500"
+BASE = "http://data.gdeltproject.org/gdeltv2"
+
+
+def _row(columns: list[str], **values: str) -> str:
+    row = [""] * len(columns)
+    for name, value in values.items():
+        row[columns.index(name)] = value
+    return "\t".join(row)
+
+
+def _zip(path: Path, member: str, lines: list[str]) -> Path:
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(member, "\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture()
+def sources(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Path]:
+    """Temp lake; downloads served from local zips keyed by file name."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    monkeypatch.setattr(settings, "gkg_read_block_mb", 1)
+    events = [_row(EVENTS_COLUMNS, GlobalEventID=str(1000 + i), EventCode="014") for i in range(2)]
+    mentions = [
+        _row(MENTIONS_COLUMNS, GlobalEventID="1001", MentionTimeDate=TS, MentionType="1",
+             MentionSourceName=f"source{i}.com", MentionIdentifier=f"http://source{i}.com/a",
+             Confidence="50", MentionDocTone="-2.5")
+        for i in range(3)
+    ] + [_row(MENTIONS_COLUMNS, GlobalEventID="1000", MentionTimeDate=TS, MentionType="1")]
+    gkg = [
+        _row(GKG_COLUMNS, GKGRecordID=f"{TS}-{i}", Date=TS, SourceCollectionIdentifier="1",
+             DocumentIdentifier=f"http://doc/{i}", Themes="PROTEST;TAX_FNCACT;" if i % 2 else "PROTEST",
+             Persons="jane doe", Tone="-1.5,2,3.5,5.5,20,0.5,200",
+             Locations="1#Madagascar#MA#MA#-20#47#MA;4#Antananarivo#MA#MA05#-18.9#47.5#-1")
+        for i in range(5_000)
+    ] + ["only\ttwo fields"]
+    files = {
+        f"{TS}.export.CSV.zip": _zip(tmp_path / "e.zip", f"{TS}.export.CSV", events),
+        f"{TS}.mentions.CSV.zip": _zip(tmp_path / "m.zip", f"{TS}.mentions.CSV", mentions),
+        f"{TS}.gkg.csv.zip": _zip(tmp_path / "g.zip", f"{TS}.gkg.csv", gkg),
+    }
+
+    async def fake_download(url: str, dest: Path) -> int:
+        dest.write_bytes(files[url.rsplit("/", 1)[-1]].read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    return files
+
+
+def test_pick_recent_keeps_every_enabled_dataset() -> None:
+    files = [
+        GdeltFile(1, "x", f"{BASE}/{ts}.{suffix}", ts)
+        for ts in ("20260210003000", "20260210001500")
+        for suffix in ("gkg.csv.zip", "mentions.CSV.zip", "export.CSV.zip")
+    ]
+
+    picked = pick_recent(files, 1, datasets=["events", "mentions", "gkg"])
+    assert [f.dataset for f in picked] == ["events", "mentions", "gkg"]
+    assert {f.ts for f in picked} == {"20260210003000"}
+
+    assert [f.dataset for f in pick_recent(files, 2, datasets=["events"])] == ["events", "events"]
+
+
+def test_gkg_lists_are_exploded_into_side_tables(sources: dict[str, Path]) -> None:
+    gf = GdeltFile(1, "x", f"{BASE}/{TS}.gkg.csv.zip", TS)
+    res = asyncio.run(ingest.ingest_one(gf))
+
+    assert res["dataset"] == "gkg"
+    assert res["rows"] == 5_000  # the malformed row is skipped
+    assert res["tables"] == {
+        "gkg": 5_000,
+        "gkg_themes": 7_500,
+        "gkg_persons": 5_000,
+        "gkg_organizations": 0,
+        "gkg_locations": 10_000,
+    }
+    schema = pq.read_schema(res["path"])
+    assert "Themes" not in schema.names and schema.field("Tone").type == "double"
+
+    top = top_values(["Theme"], "Theme", since="2026-02-10", until=None, limit=5, dataset="gkg_themes")
+    assert top == [{"key": "PROTEST", "n": 5_000}, {"key": "TAX_FNCACT", "n": 2_500}]
+    countries = top_values(["CountryCode"], "CountryCode", "2026-02-10", None, 5, dataset="gkg_locations")
+    assert countries == [{"key": "MA", "n": 10_000}]
+
+
+def test_event_mentions_endpoint_joins_on_global_event_id(sources: dict[str, Path]) -> None:
+    for name in (f"{TS}.export.CSV.zip", f"{TS}.mentions.CSV.zip"):
+        asyncio.run(ingest.ingest_one(GdeltFile(1, "x", f"{BASE}/{name}", TS)))
+
+    client = TestClient(app)
+    resp = client.get("/api/v1/events/1001/mentions", params={"since": "2026-02-10"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["event"]["EventCode"] == "014"
+    assert body["count"] == 3
+    assert [m["MentionSourceName"] for m in body["mentions"]] == ["source0.com", "source1.com", "source2.com"]
+    assert body["mentions"][0]["MentionDocTone"] == -2.5
+
+    missing = client.get("/api/v1/events/42/mentions", params={"since": "2026-02-10"}).json()
+    assert missing == {"event_id": 42, "event": None, "count": 0, "mentions": []}
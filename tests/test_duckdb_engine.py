@@ -0,0 +1,96 @@
+"""
+tests/test_duckdb_engine.py
+
+Tests for the DuckDB resource governor.
+
+Why:
+- Each query class must run on its own instance with its own budget
+  (search smaller than analytics).
+- Spills and memory-limit violations must show up in metrics.
+- Under several API workers, instances share the cores out and spill to a
+  directory of their own process.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import duckdb
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.infra import duckdb_engine
+from app.infra.duckdb_engine import DuckDBEngine, budget_for
+from app.services.query_profiler import run_query
+
+
+@pytest.fixture()
+def engine(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[DuckDBEngine]:
+    """A fresh engine with a small analytics budget and a temp spill directory."""
+    monkeypatch.setattr(settings, "duckdb_memory_limit", "32MB")
+    monkeypatch.setattr(settings, "duckdb_threads", 1)
+    monkeypatch.setattr(settings, "duckdb_temp_directory", str(tmp_path / "spill"))
+    monkeypatch.setattr(settings, "duckdb_class_budgets", {"search": {"memory_limit": "16MB"}})
+    eng = DuckDBEngine()
+    yield eng
+    eng.close()
+
+
+def _sample(name: str, query_class: str) -> float:
+    return REGISTRY.get_sample_value(name, {"query_class": query_class}) or 0.0
+
+
+def test_each_class_gets_its_own_budget(engine: DuckDBEngine, tmp_path: Path) -> None:
+    assert budget_for("search").memory_limit == "16MB"
+    assert budget_for("search").threads == 1
+    assert budget_for("analytics").temp_directory == str(tmp_path / "spill" / "analytics")
+
+    def limit(query_class: str) -> str:
+        return engine.connect(query_class).execute("SELECT current_setting('memory_limit')").fetchone()[0]
+
+    assert limit("search") != limit("analytics")
+    assert (tmp_path / "spill" / "analytics").is_dir()
+
+
+def test_workers_share_cores_and_spill_per_process(
+    engine: DuckDBEngine, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "duckdb_threads", None)
+    monkeypatch.setattr(settings, "web_concurrency", 4)
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+
+    budget = budget_for("analytics")
+    assert budget.threads == 2
+    assert budget.temp_directory == str(tmp_path / "spill" / f"pid{os.getpid()}" / "analytics")
+
+
+@pytest.mark.skipif(
+    not hasattr(duckdb.DuckDBPyConnection, "get_profiling_information"),
+    reason="per-query resource profiling needs DuckDB >= 1.5",
+)
+def test_spill_is_recorded(engine: DuckDBEngine) -> None:
+    """A sort larger than the 32MB budget spills and is counted."""
+    before = _sample("duckdb_query_spills_total", "analytics")
+    sql = "SELECT repeat('x', 64) || i::VARCHAR AS s FROM range(800000) t(i) ORDER BY s DESC OFFSET 799990"
+
+    run_query(engine.connect("analytics"), "top_values", sql, None, lambda c: c.fetchall())
+
+    assert _sample("duckdb_query_spills_total", "analytics") == before + 1
+
+
+def test_memory_limit_violation_is_counted(engine: DuckDBEngine, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A non-spillable aggregate over the budget fails with OOM and is counted."""
+    monkeypatch.setattr(duckdb_engine, "engine", engine)
+    before = _sample("duckdb_memory_limit_exceeded_total", "search")
+    sql = "SELECT list(repeat('x', 100) || i::VARCHAR) FROM range(2000000) t(i)"
+
+    with pytest.raises(duckdb.OutOfMemoryException):
+        run_query(engine.connect("search"), "search", sql, None, lambda c: c.fetchall())
+
+    assert _sample("duckdb_memory_limit_exceeded_total", "search") == before + 1
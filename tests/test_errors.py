@@ -0,0 +1,76 @@
+"""
+tests/test_errors.py
+
+Tests for the shared DuckDB exception handlers.
+
+Why:
+- File contention during in-process ingestion must surface as a retryable
+  503 with the DuckDB error class, not an opaque 500.
+- Deterministic failures of the same classes (no file in range, unreadable
+  path) must not be retried forever.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import duckdb
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.errors import register_error_handlers
+from app.core.metrics import DUCKDB_ERRORS
+
+
+def _app(exc: Exception) -> FastAPI:
+    app = FastAPI()
+    register_error_handlers(app)
+
+    @app.get("/boom")
+    def boom() -> None:
+        raise exc
+
+    return app
+
+
+def test_transient_duckdb_error_is_503_with_retry_after() -> None:
+    """A truncated Parquet file (InvalidInputException) is retryable."""
+    before = DUCKDB_ERRORS.labels("InvalidInputException")._value.get()
+    resp = TestClient(_app(duckdb.InvalidInputException("No magic bytes found"))).get("/boom")
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert resp.json()["error"] == "InvalidInputException"
+    assert DUCKDB_ERRORS.labels("InvalidInputException")._value.get() == before + 1
+
+
+def test_lock_conflict_is_503() -> None:
+    exc = duckdb.IOException('Could not set lock on file "lake.duckdb": Conflicting lock is held')
+    assert TestClient(_app(exc)).get("/boom").status_code == 503
+
+
+def test_no_files_found_is_404_without_retry_after() -> None:
+    """A pattern matching no file fails the same way on every retry."""
+    exc = duckdb.IOException('No files found that match the pattern "lake/events/dt=2020-01-01/*"')
+    resp = TestClient(_app(exc)).get("/boom")
+
+    assert resp.status_code == 404
+    assert "Retry-After" not in resp.headers
+    assert resp.json()["error"] == "IOException"
+
+
+def test_other_io_error_is_not_transient() -> None:
+    exc = duckdb.IOException("Cannot open file: Permission denied")
+    resp = TestClient(_app(exc)).get("/boom")
+
+    assert resp.status_code == 500
+    assert "Retry-After" not in resp.headers
+
+
+def test_other_duckdb_error_stays_500() -> None:
+    """Binder/parser errors are bugs, not contention."""
+    resp = TestClient(_app(duckdb.BinderException("column not found"))).get("/boom")
+
+    assert resp.status_code == 500
+    assert resp.json()["error"] == "BinderException"
@@ -0,0 +1,159 @@
+"""
+tests/test_exports.py
+
+Tests for bulk export jobs (app.services.exports, /api/v1/exports).
+
+Why:
+- An export must write exactly the rows matching its filter and date range,
+  in the requested format, and be downloadable (including by byte ranges).
+- Submissions beyond the pending limit must be shed, finished jobs must be
+  deleted with their file once the retention period is over.
+- A queued job whose background task was lost (its submitting process died,
+  or it waited past the queue timeout) must fail and free its pending slot,
+  or the slots leak until every submission is shed.
+- Exports waiting for a slot must not hold threads of the event loop's
+  default executor (every `asyncio.to_thread` of the API worker shares it).
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infra.lake_storage import get_lake_storage
+from app.main import app
+from app.services import ingest
+from app.services.exports import ExportSpec, exports
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Three days of events, two per day (FR / US)."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    storage = get_lake_storage()
+    for day in (10, 11, 12):
+        table = pa.table(
+            {
+                "GlobalEventID": pa.array([day * 10 + 1, day * 10 + 2], pa.int64()),
+                "Actor1Name": ["PARIS POLICE", "WASHINGTON"],
+                "EventRootCode": ["14", "01"],
+                "ActionGeo_CountryCode": ["FR", "US"],
+            }
+        )
+        storage.write_batch(
+            f"2026-02-{day}", f"202602{day}000000", table, ingest._write_events_parquet
+        )
+    storage.bump_version()
+    return tmp_path / "lake"
+
+
+def test_export_job_lifecycle_and_range_download(lake: Path) -> None:
+    client = TestClient(app)
+
+    body = {"country": "FR", "since": "2026-02-11", "format": "csv", "columns": ["GlobalEventID"]}
+    submitted = client.post("/api/v1/exports", json=body)
+    assert submitted.status_code == 202
+    job_id = submitted.json()["id"]
+
+    # TestClient runs the background task before returning.
+    job = client.get(f"/api/v1/exports/{job_id}").json()
+    assert job["status"] == "done" and job["rows"] == 2
+    content = client.get(job["download_url"]).content
+    assert list(csv.reader(io.StringIO(content.decode()))) == [["GlobalEventID"], ["111"], ["121"]]
+
+    partial = client.get(job["download_url"], headers={"Range": "bytes=0-12"})
+    assert partial.status_code == 206 and partial.content == content[:13]
+
+    job = exports.run(exports.submit(ExportSpec(terms=("police", "washington"), max_rows=5)).id)
+    assert job.status == "done" and job.rows == 5
+    table = pq.read_table(exports.file_path(job))
+    assert table.num_rows == 5 and "Actor1Name" in table.column_names
+
+    empty = exports.run(exports.submit(ExportSpec(since="2027-01-01", format="parquet")).id)
+    assert empty.status == "done" and empty.rows == 0
+
+    assert client.post("/api/v1/exports", json={"format": "xlsx"}).status_code == 422
+    assert client.get("/api/v1/exports/nope").status_code == 404
+
+
+def test_pending_limit_and_retention(lake: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "export_max_pending", 1)
+    queued = exports.submit(ExportSpec())
+    shed = client.post("/api/v1/exports", json={})
+    assert shed.status_code == 503 and "Retry-After" in shed.headers
+    assert client.get(f"/api/v1/exports/{queued.id}/download").status_code == 409
+
+    done = exports.run(queued.id)
+    assert done.status == "done" and exports.file_path(done).exists()
+    assert [j["id"] for j in client.get("/api/v1/exports").json()["jobs"]] == [done.id]
+
+    monkeypatch.setattr(settings, "export_retention_hours", 0.0)
+    time.sleep(0.01)
+    assert exports.purge_expired() == 1
+    assert not exports.file_path(done).exists()
+    assert client.get(f"/api/v1/exports/{done.id}").status_code == 404
+
+
+def test_orphaned_queued_jobs_free_their_pending_slot(
+    lake: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "export_max_pending", 2)
+    orphan = exports.submit(ExportSpec())
+    orphan.pid = 2**22 + 12345  # the submitting process died before running it
+    exports._save(orphan)
+    stale = exports.submit(ExportSpec())
+    stale.host, stale.created_at = "other-host", time.time() - 7 * 3600
+    exports._save(stale)
+
+    accepted = client.post("/api/v1/exports", json={})
+    assert accepted.status_code == 202, accepted.text
+    assert exports.get(orphan.id).status == "failed"
+    assert exports.get(orphan.id).error == "interrupted"
+    assert exports.get(stale.id).status == "failed"
+    assert exports.get(stale.id).error == "timed out in queue"
+    assert exports.get(accepted.json()["id"]).status != "failed"
+
+
+def test_queued_exports_do_not_hold_default_executor_threads(
+    lake: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "export_max_concurrent", 1)
+    monkeypatch.setattr(exports, "_executor", None)
+    monkeypatch.setattr(exports, "_slots", None)
+    release = threading.Event()
+    copy = exports._copy
+
+    def slow_copy(job):  # type: ignore[no-untyped-def]
+        release.wait(5)
+        return copy(job)
+
+    monkeypatch.setattr(exports, "_copy", slow_copy)
+    jobs = [exports.submit(ExportSpec()) for _ in range(4)]
+
+    async def scenario() -> list[str]:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=2))
+        runs = [asyncio.create_task(exports.run_async(job.id)) for job in jobs]
+        await asyncio.sleep(0.05)
+        # An unrelated to_thread call still gets a thread while 4 exports wait or run.
+        assert await asyncio.wait_for(asyncio.to_thread(lambda: "free"), 1) == "free"
+        release.set()
+        return [job.status for job in await asyncio.gather(*runs)]
+
+    assert asyncio.run(scenario()) == ["done"] * 4
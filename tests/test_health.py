@@ -6,6 +6,7 @@ Basic smoke test for the service health endpoint.
 Why:
 - Ensures the FastAPI app boots correctly.
 - Validates the `/health` contract used by monitoring/CI pipelines.
+- `/ready` (readiness) stays 503 until the lifespan warm-up has run.
 
 Run:
   pytest -q
@@ -13,6 +14,9 @@ Run:
 
 from __future__ import annotations
 
+import time
+
+import pyarrow as pa
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -41,3 +45,32 @@ def test_health_returns_ok() -> None:
     assert payload["status"] == "ok"
     # Optional: keep this if you want to ensure environment is returned.
     assert "env" in payload
+
+
+def test_ready_reports_503_until_warmup_finished(tmp_path, monkeypatch) -> None:
+    """`GET /ready` is 503 before the lifespan warm-up, 200 with step timings after."""
+    from app.core.config import settings
+    from app.infra.lake_storage import get_lake_storage
+    from app.services.ingest import _write_events_parquet
+    from app.services.warmup import readiness
+
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    table = pa.table({"GlobalEventID": pa.array([1, 2], pa.int64()), "EventRootCode": ["14", "01"]})
+    get_lake_storage().write_batch("2026-02-10", "20260210000000", table, _write_events_parquet)
+
+    readiness.reset()
+    assert client().get("/ready").status_code == 503
+    assert client().get("/health").status_code == 200  # liveness does not wait for warm-up
+
+    with TestClient(app) as c:
+        deadline = time.monotonic() + 10
+        resp = c.get("/ready")
+        while resp.status_code == 503 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            resp = c.get("/ready")
+
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["status"] == "ready"
+    assert set(payload["steps"]) == {"duckdb", "lake", "queries"}
+    assert payload["errors"] == {}
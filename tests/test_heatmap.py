@@ -0,0 +1,151 @@
+"""
+tests/test_heatmap.py
+
+Tests for the heatmap tiles (app.services.heatmap, /api/v1/analytics/heatmap).
+
+Why:
+- Tile cells must land where a Web Mercator tile renderer expects them, at
+  any zoom (rolled up from the stored levels, or one cell when over-zoomed).
+- Ingestion must write the per-batch grid aggregates; batches ingested before
+  them must still be counted (binned from their events file).
+- Filters apply; rendered tiles are reused until the lake version changes.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import zipfile
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.domain.datasets import GEO_GRID
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.lake_storage import get_lake_storage
+from app.main import app
+from app.services import ingest
+from app.services.gdelt import GdeltFile
+from app.services.heatmap import tile_cache, tile_geometry
+
+TANA = (-18.91, 47.54)  # Antananarivo
+PARIS = (48.86, 2.35)
+
+
+def _tile(lat: float, lon: float, zoom: int) -> tuple[int, int]:
+    n = 2**zoom
+    x = int((lon + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return x, y
+
+
+def _row(**values: str) -> str:
+    row = [""] * len(EVENTS_COLUMNS)
+    for name, value in values.items():
+        row[EVENTS_COLUMNS.index(name)] = value
+    return "\t".join(row)
+
+
+def _ingest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, ts: str, lines: list[str]) -> dict:
+    zipped = tmp_path / f"{ts}.zip"
+    with zipfile.ZipFile(zipped, "w") as zf:
+        zf.writestr(f"{ts}.export.CSV", "\n".join(lines) + "\n")
+
+    async def fake_download(url: str, dest: Path) -> int:
+        dest.write_bytes(zipped.read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    return asyncio.run(ingest.ingest_one(GdeltFile(1, "x", f"http://x/{ts}.export.CSV.zip", ts)))
+
+
+def _event(event_id: int, lat_lon: tuple[float, float], root: str, quad: int) -> str:
+    lat, lon = lat_lon
+    return _row(
+        GlobalEventID=str(event_id),
+        EventRootCode=root,
+        QuadClass=str(quad),
+        ActionGeo_Lat=str(lat),
+        ActionGeo_Long=str(lon),
+    )
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A legacy batch (no grid table) on 02-10 and an ingested batch on 02-11."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    tile_cache.clear()
+    storage = get_lake_storage()
+    legacy = pa.table(
+        {
+            "GlobalEventID": pa.array([1, 2], pa.int64()),
+            "EventRootCode": ["14", "14"],
+            "QuadClass": pa.array([4, 4], pa.int64()),
+            "ActionGeo_Lat": [TANA[0], None],
+            "ActionGeo_Long": [TANA[1], None],
+        }
+    )
+    storage.write_batch("2026-02-10", "20260210000000", legacy, ingest._write_events_parquet)
+    storage.bump_version()
+
+    result = _ingest(
+        tmp_path,
+        monkeypatch,
+        "20260211000000",
+        [_event(10, TANA, "14", 4), _event(11, TANA, "01", 1), _event(12, PARIS, "14", 3)],
+    )
+    assert result["tables"][GEO_GRID] == 3 * len(settings.heatmap_levels)
+    return tmp_path / "lake"
+
+
+def test_tile_geometry_rolls_up_from_stored_levels() -> None:
+    geo = tile_geometry(0, 0, 0)
+    assert (geo.cell_zoom, geo.per_side, geo.level, geo.shift) == (6, 64, 8, 2)
+    assert geo.x_range == (0, 255) and geo.origin == (0, 0)
+
+    geo = tile_geometry(12, 2000, 1000)
+    assert (geo.cell_zoom, geo.per_side, geo.level, geo.shift) == (16, 16, 16, 0)
+    assert geo.x_range == (2000 * 16, 2001 * 16 - 1)
+
+    geo = tile_geometry(18, 1000, 2000)  # over-zoomed past the finest level (16)
+    assert (geo.cell_zoom, geo.per_side, geo.level) == (16, 1, 16)
+    assert geo.x_range == (250, 250) and geo.origin == (250, 500)
+
+
+def test_heatmap_tiles_merge_batches_filter_and_cache(
+    lake: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = TestClient(app)
+    url = "/api/v1/analytics/heatmap"
+
+    world = client.get(f"{url}/0/0/0").json()
+    tana, paris = _tile(*TANA, 6), _tile(*PARIS, 6)
+    assert world["cells_per_side"] == 64 and world["total"] == 4
+    assert world["cells"] == sorted([[*tana, 3], [*paris, 1]], key=lambda c: (c[1], c[0]))
+
+    # Zoom 10 tile around Antananarivo: 64 x 64 cells of zoom 16.
+    tx, ty = _tile(*TANA, 10)
+    cx, cy = _tile(*TANA, 16)
+    tile = client.get(f"{url}/10/{tx}/{ty}").json()
+    assert tile["cells"] == [[cx - tx * 64, cy - ty * 64, 3]]
+
+    assert client.get(f"{url}/0/0/0", params={"root_code": "14"}).json()["total"] == 3
+    assert client.get(f"{url}/0/0/0", params={"quad_class": 4}).json()["total"] == 2
+    assert client.get(f"{url}/0/0/0", params={"since": "2026-02-11"}).json()["total"] == 3
+    assert client.get(f"{url}/1/2/0").status_code == 422
+
+    cached = len(tile_cache)
+    assert client.get(f"{url}/0/0/0").json() == world
+    assert len(tile_cache) == cached
+
+    # A new batch bumps the lake version: tiles are re-rendered with it.
+    _ingest(tmp_path, monkeypatch, "20260211001500", [_event(20, PARIS, "14", 3)])
+    assert client.get(f"{url}/0/0/0").json()["total"] == 5
+    assert len(tile_cache) == 1
@@ -0,0 +1,108 @@
+"""
+tests/test_hot_tier.py
+
+Tests for the in-memory hot tier of recent batches.
+
+Why:
+- Queries mixing hot (Arrow) and cold (Parquet) batches must return exactly
+  what a pure-Parquet scan returns.
+- The tier must stay within its age window and byte budget, oldest first.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.infra.fs_lake import parquet_path
+from app.services.duckdb_queries import search_fulltext, tone_stats, top_values
+from app.services.hot_tier import hot_tier
+
+BATCHES = ["20260209230000", "20260210000000", "20260210001500", "20260210003000"]
+
+
+def _batch(i: int) -> pa.Table:
+    n = 50 * (i + 1)
+    return pa.table(
+        {
+            "GlobalEventID": pa.array(range(i * 1000, i * 1000 + n), pa.int64()),
+            "EventCode": pa.array([f"0{(j + i) % 4 + 1}0" for j in range(n)], pa.string()),
+            "Actor1Name": pa.array([None if j % 7 == 0 else f"ACTOR{j % 3}" for j in range(n)], pa.string()),
+            "AvgTone": pa.array([(j % 11) - 5.0 for j in range(n)], pa.float64()),
+        }
+    )
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """A lake of 4 batches over 2 partitions, hot tier empty."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", True)
+    for i, ts in enumerate(BATCHES):
+        dt = f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}"
+        pq.write_table(_batch(i), str(parquet_path(dt, ts)), compression="zstd")
+    hot_tier.clear()
+    yield tmp_path / "lake"
+    hot_tier.clear()
+
+
+def _all_queries() -> dict:
+    return {
+        "top_all": top_values(["EventCode"], "c27", since=None, until=None, limit=10),
+        "top_day": top_values(["Actor1Name"], "c7", since="2026-02-10", until=None, limit=10),
+        "tone": tone_stats(since=None, until=None),
+        "search": search_fulltext(query="actor1", since=None, until=None, limit=10_000)[0],
+    }
+
+
+def _hot_files() -> float:
+    return REGISTRY.get_sample_value("duckdb_query_files_total", {"tier": "hot"}) or 0.0
+
+
+def test_hot_and_cold_tiers_return_identical_results(
+    lake: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cold = _all_queries()
+
+    # A zero-hour window keeps only the newest batch: mixed hot + cold scans.
+    monkeypatch.setattr(settings, "hot_tier_hours", 0)
+    hot_tier.refresh_from_lake()
+    assert hot_tier.stats()["batches"] == 1
+    before = _hot_files()
+    assert _all_queries() == cold
+    assert _hot_files() > before
+
+    monkeypatch.setattr(settings, "hot_tier_hours", 24)
+    hot_tier.refresh_from_lake()
+    assert hot_tier.stats()["batches"] == len(BATCHES)
+    assert _all_queries() == cold
+
+
+def test_eviction_by_age_and_bytes(lake: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    files = sorted(lake.glob("events/dt=*/*.parquet"))
+    tables = {f.stem.split("=", 1)[1]: pq.read_table(f) for f in files}
+
+    monkeypatch.setattr(settings, "hot_tier_hours", 1)
+    for f in files:
+        ts = f.stem.split("=", 1)[1]
+        hot_tier.add(f, f.parent.name[3:], ts, tables[ts])
+    # 23:00 is more than one hour before 00:30.
+    assert hot_tier.stats()["batches"] == 3
+
+    budget = tables[BATCHES[-1]].nbytes + tables[BATCHES[-2]].nbytes
+    monkeypatch.setattr(settings, "hot_tier_max_mb", budget / (1024 * 1024))
+    hot_tier.add(files[-1], "2026-02-10", BATCHES[-1], tables[BATCHES[-1]])
+    assert hot_tier.stats() == {"batches": 2, "bytes": budget}
+
+    hot, cold = hot_tier.split([str(f) for f in files])
+    assert hot is not None and hot.num_rows == tables[BATCHES[-1]].num_rows + tables[BATCHES[-2]].num_rows
+    assert cold == [str(f) for f in files[:2]]
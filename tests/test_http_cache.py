@@ -0,0 +1,122 @@
+"""
+tests/test_http_cache.py
+
+Tests for HTTP validators and compression (app.core.http_cache).
+
+Why:
+- A current `If-None-Match` must get a 304 without running DuckDB; the ETag
+  must change when (and only when) the partitions read change.
+- Closed-day responses are immutable, open-ended ones must be revalidated.
+- Bodies are compressed with the encoding the client prefers, and each
+  encoding has its own strong ETag.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.core.http_cache import negotiate
+from app.infra.lake_storage import get_lake_storage
+from app.main import app
+from app.services import ingest
+
+URL = "/api/v1/analytics/top-countries"
+
+
+def _write(dt: str, ts: str, countries: list[str]) -> None:
+    storage = get_lake_storage()
+    table = pa.table(
+        {
+            "GlobalEventID": pa.array(range(len(countries)), pa.int64()),
+            "ActionGeo_CountryCode": countries,
+        }
+    )
+    storage.write_batch(dt, ts, table, ingest._write_events_parquet)
+    storage.bump_version()
+
+
+def _runs() -> float:
+    labels = {"kind": "top_values"}
+    return REGISTRY.get_sample_value("duckdb_query_duration_seconds_count", labels) or 0.0
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    _write("2026-02-10", "20260210000000", ["FR", "FR", "US"])
+    _write("2026-02-11", "20260211000000", ["MG"])
+    return tmp_path / "lake"
+
+
+def test_negotiate_prefers_client_weights_then_server_order() -> None:
+    assert negotiate("gzip, deflate, br, zstd") == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate("zstd, gzip;q=0.8") == "zstd"
+    assert negotiate("*;q=0.1") == "br"
+    assert negotiate("identity") is None and negotiate("") is None
+    assert negotiate("br;q=0") is None
+
+
+def test_if_none_match_skips_the_query_until_its_partitions_change(lake: Path) -> None:
+    client = TestClient(app)
+    closed = client.get(URL, params={"since": "2026-02-10"})
+    etag = closed.headers["etag"]
+    assert closed.json()["rows"][0] == {"key": "FR", "n": 2}
+    assert "immutable" in closed.headers["cache-control"]
+
+    before = _runs()
+    again = client.get(URL, params={"since": "2026-02-10"}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag and "immutable" in again.headers["cache-control"]
+    assert _runs() == before
+
+    everything = client.get(URL)
+    assert everything.headers["cache-control"] == "no-cache"
+
+    # A batch of another day leaves the 02-10 ETag valid, not the whole-lake one.
+    _write("2026-02-11", "20260211001500", ["MG", "MG"])
+    kept = client.get(URL, params={"since": "2026-02-10"}, headers={"If-None-Match": etag})
+    assert kept.status_code == 304
+    changed = client.get(URL, headers={"If-None-Match": everything.headers["etag"]})
+    assert changed.status_code == 200 and changed.json()["rows"][0] == {"key": "MG", "n": 3}
+    assert _runs() == before + 2  # the two whole-lake queries
+
+    # Same partitions, other parameters: another representation.
+    other = client.get(URL, params={"since": "2026-02-10", "limit": 1})
+    assert other.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd", "gzip"])
+def test_compressed_responses_have_their_own_etag(
+    lake: Path, monkeypatch: pytest.MonkeyPatch, encoding: str
+) -> None:
+    monkeypatch.setattr(settings, "http_compression_min_bytes", 0)
+    client = TestClient(app)
+    plain = client.get(URL, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    packed = client.get(URL, headers={"Accept-Encoding": encoding})
+    assert packed.headers["content-encoding"] == encoding
+    assert packed.json() == plain.json()  # decoded by the client
+    assert packed.headers["etag"] == plain.headers["etag"][:-1] + f'-{encoding}"'
+
+    revalidated = client.get(
+        URL, headers={"Accept-Encoding": encoding, "If-None-Match": packed.headers["etag"]}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == packed.headers["etag"]
+
+    # Small bodies are sent as is.
+    monkeypatch.setattr(settings, "http_compression_min_bytes", 1 << 20)
+    assert "content-encoding" not in client.get(URL, headers={"Accept-Encoding": encoding}).headers
@@ -0,0 +1,143 @@
+"""
+tests/test_ingest.py
+
+Integration test for the single-batch ingestion pipeline (small sample).
+
+Why:
+- `ingest_one` must write a named-schema Parquet file into the lake.
+- Every stage (download, extract, parse, write) must be reported in metrics,
+  and the registry must be exportable as a textfile for processes without /metrics.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+import zipfile
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.core.metrics import export_process_metrics
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.infra.fs_lake import lake_version
+from app.main import app
+from app.services import ingest
+from app.services.duckdb_queries import search_fulltext, top_values
+from app.services.gdelt import GdeltFile
+
+TS = "20260210001500"
+
+
+def _sample_zip(path: Path, n_rows: int = 3) -> Path:
+    """Write a tiny GDELT-like export zip (tab-delimited, no header)."""
+    lines = []
+    for i in range(n_rows):
+        row = [""] * len(EVENTS_COLUMNS)
+        row[EVENTS_COLUMNS.index("GlobalEventID")] = str(1000 + i)
+        row[EVENTS_COLUMNS.index("EventCode")] = "014"
+        row[EVENTS_COLUMNS.index("ActionGeo_CountryCode")] = "MA"
+        row[EVENTS_COLUMNS.index("AvgTone")] = "-1.5"
+        lines.append("\t".join(row))
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{TS}.export.CSV", "\n".join(lines) + "\n")
+    return path
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the Data Lake to a temp dir and serve downloads from a local zip."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "duckdb_db_path", str(tmp_path / "analytics.duckdb"))
+    src = _sample_zip(tmp_path / "src.zip")
+
+    async def fake_download(url: str, dest: Path) -> int:
+        dest.write_bytes(src.read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    return tmp_path / "lake"
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels or None) or 0.0
+
+
+def test_ingest_one_writes_parquet_and_reports_stages(lake: Path) -> None:
+    """One batch lands in dt=YYYY-MM-DD and each stage is counted as ok."""
+    stages = ("download", "extract", "parse", "write")
+    before = {s: _sample("gdelt_ingest_stage_total", stage=s, outcome="ok") for s in stages}
+    rows_before = _sample("gdelt_ingest_rows_total")
+
+    gf = GdeltFile(size=1, md5="x", url=f"http://stub/{TS}.export.CSV.zip", ts=TS)
+    version_before = lake_version()
+    res = asyncio.run(ingest.ingest_one(gf))
+
+    out = Path(res["path"])
+    assert out == lake.resolve() / "events" / "dt=2026-02-10" / f"batch_ts={TS}.parquet"
+    assert res["rows"] == 3
+    assert pq.read_schema(out).names == EVENTS_COLUMNS
+    assert pq.read_schema(out).field("EventCode").type == pa.string()
+    assert lake_version() != version_before
+
+    for stage, n in before.items():
+        assert _sample("gdelt_ingest_stage_total", stage=stage, outcome="ok") == n + 1
+    assert _sample("gdelt_ingest_rows_total") == rows_before + 3
+    assert _sample("gdelt_ingest_batch_bytes_count", kind="parquet_written") >= 1
+
+
+def test_queries_over_ingested_batch(lake: Path) -> None:
+    """Search and top-values work on the named schema; codes keep leading zeros."""
+    gf = GdeltFile(size=1, md5="x", url=f"http://stub/{TS}.export.CSV.zip", ts=TS)
+    asyncio.run(ingest.ingest_one(gf))
+
+    count, rows = search_fulltext(query="1001", since="2026-02-10", until=None, limit=10)
+    assert count == 1
+    assert rows[0]["GlobalEventID"] == 1001
+
+    top = top_values(["EventCode"], "c27", since="2026-02-10", until=None, limit=5)
+    assert top == [{"key": "014", "n": 3}]
+
+    # Fast JSON path: strict JSON (empty numeric cells are null, not NaN).
+    resp = TestClient(app).get("/api/v1/events/search", params={"query": "1002", "since": "2026-02-10"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 1
+    assert body["rows"][0]["GlobalEventID"] == 1002
+    assert body["rows"][0]["GoldsteinScale"] is None
+
+
+def test_queries_over_a_range_without_partitions_are_empty(lake: Path) -> None:
+    """A range with no partition is an empty result, not a retryable 503."""
+    gf = GdeltFile(size=1, md5="x", url=f"http://stub/{TS}.export.CSV.zip", ts=TS)
+    asyncio.run(ingest.ingest_one(gf))
+    client = TestClient(app)
+
+    resp = client.get("/api/v1/events/search", params={"query": "ab", "since": "2020-01-01"})
+    assert resp.status_code == 200
+    assert (resp.json()["count"], resp.json()["rows"]) == (0, [])
+    for path in ("top-event-codes", "top-countries", "gkg/top-themes"):
+        resp = client.get(f"/api/v1/analytics/{path}", params={"since": "2020-01-01"})
+        assert resp.status_code == 200, path
+        assert resp.json()["rows"] == []
+    resp = client.get("/api/v1/analytics/tone", params={"since": "2020-01-01"})
+    assert resp.json() == {"available": False}
+
+
+def test_export_process_metrics_writes_textfile(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Processes without an HTTP server expose metrics via a textfile."""
+    monkeypatch.setattr(settings, "metrics_textfile_dir", str(tmp_path / "prom"))
+
+    export_process_metrics("scheduler")
+
+    payload = (tmp_path / "prom" / "scheduler.prom").read_text()
+    assert "gdelt_ingest_stage_duration_seconds" in payload
@@ -0,0 +1,136 @@
+"""
+tests/test_ingest_jobs.py
+
+Tests for local ingestion jobs (app.services.ingest_jobs).
+
+Why:
+- Triggers must be recorded as jobs (not run in the API process), identical
+  pending triggers must share one job, and the queue must stay bounded.
+- The runner must run queued jobs in order, report per-batch progress and
+  exit once idle.
+- A running job whose process died must not stay `running` forever.
+- The runner must feed continuous views as it writes batches, so API reads
+  do not have to catch up from the lake.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import zipfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import ingest_runner
+from app.core.config import settings
+from app.domain.gdelt_events_schema import EVENTS_COLUMNS
+from app.main import app
+from app.services import continuous_views, gdelt, ingest
+from app.services.continuous_views import ViewManager, ViewSpec, views
+from app.services.gdelt import GdeltFile
+from app.services.ingest_jobs import ingest_jobs
+
+TS = "20260210001500"
+
+
+@pytest.fixture()
+def jobs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Temp lake and jobs dir, runner not auto-started, downloads served from a local zip."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "ingest_runner_autostart", False)
+    monkeypatch.setattr(settings, "ingest_runner_idle_seconds", 0.05)
+    monkeypatch.setattr(settings, "ingest_runner_poll_seconds", 0.01)
+    monkeypatch.setattr(settings, "gdelt_datasets", ["events"])
+
+    src = tmp_path / "src.zip"
+    row = [""] * len(EVENTS_COLUMNS)
+    row[EVENTS_COLUMNS.index("GlobalEventID")] = "1000"
+    row[EVENTS_COLUMNS.index("EventCode")] = "014"
+    with zipfile.ZipFile(src, "w") as zf:
+        zf.writestr(f"{TS}.export.CSV", "\t".join(row) + "\n")
+
+    async def fake_lastupdate() -> list[GdeltFile]:
+        return [
+            GdeltFile(1, "md5", f"http://gdelt.test/{TS}.export.CSV.zip", TS),
+            GdeltFile(1, "md5", f"http://gdelt.test/{TS}.broken.export.CSV.zip", TS),
+        ]
+
+    async def fake_download(url: str, dest: Path) -> int:
+        if "broken" in url:
+            raise OSError("connection reset")
+        dest.write_bytes(src.read_bytes())
+        return dest.stat().st_size
+
+    monkeypatch.setattr(gdelt, "fetch_lastupdate", fake_lastupdate)
+    monkeypatch.setattr(ingest, "_download_to_file", fake_download)
+    return ingest_jobs.directory()
+
+
+def test_identical_triggers_share_a_job_and_the_queue_is_bounded(
+    jobs: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = TestClient(app)
+    first = client.post("/api/v1/ingest/trigger", params={"n_batches": 1}).json()
+    second = client.post("/api/v1/ingest/trigger", params={"n_batches": 1}).json()
+    assert first["queued"] == 1 and first["status"] == "queued"
+    assert second["job_id"] == first["job_id"] and second["triggers"] == 2
+
+    state = client.get(first["status_url"]).json()
+    assert state["status"] == "queued" and state["triggers"] == 2 and state["total"] is None
+    assert client.get("/api/v1/ingest/jobs/unknown").status_code == 404
+
+    monkeypatch.setattr(settings, "ingest_max_pending", 2)
+    assert client.post("/api/v1/ingest/trigger", params={"n_batches": 2}).status_code == 200
+    resp = client.post("/api/v1/ingest/trigger", params={"n_batches": 3})
+    assert resp.status_code == 503 and "Retry-After" in resp.headers
+    # An identical trigger is still absorbed by its queued job.
+    assert client.post("/api/v1/ingest/trigger", params={"n_batches": 1}).status_code == 200
+
+
+def test_runner_runs_queued_jobs_and_reports_progress(jobs: Path) -> None:
+    client = TestClient(app)
+    first = client.post("/api/v1/ingest/trigger", params={"n_batches": 1}).json()
+    second = client.post("/api/v1/ingest/trigger", params={"n_batches": 2}).json()
+
+    assert ingest_jobs.serve() == 2
+    assert not ingest_jobs.runner_alive()
+
+    state = client.get(first["status_url"]).json()
+    assert state["status"] == "done"
+    assert (state["total"], state["done"], state["failed"]) == (2, 1, 1)
+    ok, failed = state["results"]
+    assert ok["status"] == "ok" and ok["rows"] == 1 and ok["dt"] == "2026-02-10"
+    assert failed["status"] == "failed" and "connection reset" in failed["error"]
+    assert state["started_at"] <= state["finished_at"]
+    assert client.get(second["status_url"]).json()["status"] == "done"
+
+    # A new trigger after the run is a new job.
+    third = client.post("/api/v1/ingest/trigger", params={"n_batches": 1}).json()
+    assert third["job_id"] != first["job_id"]
+
+
+def test_running_job_of_a_dead_process_is_failed(jobs: Path) -> None:
+    job = ingest_jobs.submit(1)
+    claimed = ingest_jobs.claim()
+    assert claimed is not None and claimed.id == job.id and claimed.status == "running"
+    claimed.pid = 2**22 + 12345  # above pid_max: no such process
+    ingest_jobs._save(claimed)
+
+    state = ingest_jobs.get(job.id)
+    assert state.status == "failed" and state.error == "interrupted"
+
+
+def test_runner_feeds_continuous_views(jobs: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "ingest_runner_nice", 0)
+    api = ViewManager()  # the API process's views
+    api.create(ViewSpec("codes", "EventCode"))
+    ingest_jobs.submit(1)
+
+    assert ingest_runner.main() == 0
+    assert views.on_batch not in ingest._batch_listeners  # detached on exit
+    # The view file already has the batch: no catch-up from the lake on read.
+    monkeypatch.setattr(continuous_views, "connect", lambda *a: pytest.fail("lake catch-up"))
+    assert [(r["key"], r["n"]) for r in api.get("codes").rows()] == [("014", 1)]
@@ -0,0 +1,126 @@
+"""
+tests/test_profiling.py
+
+Tests for the on-demand sampling profiler (app.core.profiling).
+
+Why:
+- /debug/profile must be disabled without a token and reject a wrong one.
+- Profiles must show what the other threads are running, as folded stacks
+  or speedscope JSON, while the process keeps serving.
+- The signal hook (scheduler / worker) must write both formats to disk.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling
+from app.core.config import settings
+from app.main import app
+
+TOKEN = "s3cret"
+
+
+def _spin_in_profiled_function(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture()
+def busy_thread() -> Iterator[None]:
+    stop = threading.Event()
+    thread = threading.Thread(target=_spin_in_profiled_function, args=(stop,), name="busy")
+    thread.start()
+    yield
+    stop.set()
+    thread.join()
+
+
+def test_profile_endpoint_requires_a_configured_token(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "debug_profile_token", None)
+    assert client.get("/debug/profile", params={"seconds": 0.05}).status_code == 404
+
+    monkeypatch.setattr(settings, "debug_profile_token", TOKEN)
+    assert client.get("/debug/profile", params={"seconds": 0.05}).status_code == 403
+    resp = client.get(
+        "/debug/profile",
+        params={"seconds": 0.05},
+        headers={"Authorization": "Bearer wrong"},
+    )
+    assert resp.status_code == 403
+    resp = client.get(
+        "/debug/profile",
+        params={"seconds": settings.debug_profile_max_seconds + 1},
+        headers={"Authorization": f"Bearer {TOKEN}"},
+    )
+    assert resp.status_code == 422
+
+
+def test_profile_endpoint_returns_collapsed_and_speedscope(
+    busy_thread: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "debug_profile_token", TOKEN)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+
+    resp = client.get("/debug/profile", params={"seconds": 0.2}, headers=headers)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    lines = [line for line in resp.text.splitlines() if line.startswith("busy;")]
+    assert any("_spin_in_profiled_function (tests/test_profiling.py:" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    resp = client.get(
+        "/debug/profile", params={"seconds": 0.2, "format": "speedscope"}, headers=headers
+    )
+    doc = resp.json()
+    names = [frame["name"] for frame in doc["shared"]["frames"]]
+    assert "_spin_in_profiled_function" in names
+    busy = next(p for p in doc["profiles"] if p["name"] == "busy")
+    assert busy["type"] == "sampled" and len(busy["samples"]) == len(busy["weights"])
+
+
+def test_one_profile_at_a_time() -> None:
+    sampler = profiling.StackSampler()
+    thread = threading.Thread(target=sampler.sample, args=(0.3,))
+    thread.start()
+    time.sleep(0.05)
+    with pytest.raises(profiling.ProfileError):
+        sampler.sample(0.01)
+    thread.join()
+    assert sampler.sample(0.01).ticks >= 1
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR2"), reason="no SIGUSR2 on this platform")
+def test_signal_writes_profile_files(
+    busy_thread: None, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "debug_profile_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "debug_profile_signal_seconds", 0.1)
+    previous = signal.getsignal(signal.SIGUSR2)
+    try:
+        assert profiling.install_signal_handler("test")
+        os.kill(os.getpid(), signal.SIGUSR2)
+        deadline = time.monotonic() + 5
+        while len(list(tmp_path.iterdir())) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+    (collapsed,) = tmp_path.glob(f"test-{os.getpid()}-*.collapsed.txt")
+    assert "_spin_in_profiled_function" in collapsed.read_text()
+    (speedscope,) = tmp_path.glob(f"test-{os.getpid()}-*.speedscope.json")
+    assert orjson.loads(speedscope.read_bytes())["profiles"]
@@ -0,0 +1,141 @@
+"""
+tests/test_query_profiler.py
+
+Tests for the opt-in DuckDB profiling and the slow-query log.
+
+Why:
+- Profiled queries must report rows/bytes scanned, files read and operator timings.
+- The ring buffer must stay bounded and be exposed on /debug/slow-queries,
+  behind the debug token (it holds raw SQL and parameters).
+- A failed profiled query must not leave profiling on for the cursor.
+- Profiling a query on a governor cursor must report the full profile and
+  leave the cursor's resource tracking as it was, even when the query fails.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infra.duckdb_engine import connect
+from app.main import app
+from app.services.query_profiler import SlowQueryLog, SlowQueryRecord, run_query, slow_query_log
+
+
+@pytest.fixture()
+def parquet_glob(tmp_path: Path) -> str:
+    """Two small Parquet files in one partition."""
+    part = tmp_path / "events" / "dt=2026-02-10"
+    part.mkdir(parents=True)
+    for i in range(2):
+        table = pa.table({"EventCode": ["145", "010", "145"], "n": [i, i, i]})
+        pq.write_table(table, str(part / f"batch_ts={i}.parquet"))
+    return str(part / "*.parquet").replace("\\", "/")
+
+
+def test_profiled_slow_query_is_logged_with_scan_details(
+    parquet_glob: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With profiling always on and a 0 ms threshold, every query is recorded."""
+    monkeypatch.setattr(settings, "duckdb_profiling", "always")
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    slow_query_log.clear()
+
+    sql = f"""
+    SELECT EventCode AS key, COUNT(*) AS n
+    FROM read_parquet('{parquet_glob}')
+    GROUP BY 1 ORDER BY n DESC LIMIT ?
+    """
+    rows = run_query(duckdb.connect(), "top_values", sql, [5], lambda c: c.fetchall())
+
+    assert rows[0] == ("145", 4)
+    (record,) = slow_query_log.snapshot()
+    assert record.kind == "top_values"
+    assert record.params == [5]
+    assert record.profile is not None
+    assert record.profile.files_scanned == 2
+    assert record.profile.rows_scanned >= 6
+    assert record.profile.operators
+
+    client = TestClient(app)
+    monkeypatch.setattr(settings, "debug_profile_token", None)
+    assert client.get("/debug/slow-queries").status_code == 404
+    monkeypatch.setattr(settings, "debug_profile_token", "s3cret")
+    assert client.get("/debug/slow-queries").status_code == 403
+    resp = client.get(
+        "/debug/slow-queries",
+        params={"kind": "top_values"},
+        headers={"Authorization": "Bearer s3cret"},
+    )
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["count"] == 1
+    assert payload["queries"][0]["profile"]["files_scanned"] == 2
+
+
+def _profiling_settings(con: duckdb.DuckDBPyConnection) -> tuple:
+    return con.execute(
+        "SELECT current_setting('enable_profiling'), current_setting('custom_profiling_settings')"
+    ).fetchone()
+
+
+def test_profiling_a_governor_cursor_restores_resource_tracking(
+    parquet_glob: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "duckdb_profiling", "always")
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 0)
+    slow_query_log.clear()
+    con = connect("default")
+    baseline = _profiling_settings(con)
+
+    sql = f"SELECT count(*) FROM read_parquet('{parquet_glob}') WHERE EventCode = ?"
+    assert run_query(con, "top_values", sql, ["145"], lambda c: c.fetchone()) == (4,)
+    (record,) = slow_query_log.snapshot()
+    assert record.profile is not None
+    assert record.profile.rows_returned == 1
+    assert record.profile.files_scanned == 2
+    assert record.profile.rows_scanned >= 6
+    assert record.profile.bytes_read
+    assert _profiling_settings(con) == baseline
+
+    with pytest.raises(duckdb.Error):
+        run_query(con, "top_values", "SELECT * FROM missing_table", None, lambda c: c.fetchall())
+    assert _profiling_settings(con) == baseline
+
+
+def test_failed_profiled_query_switches_profiling_off(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "duckdb_profiling", "always")
+    con = duckdb.connect()
+
+    with pytest.raises(duckdb.Error):
+        run_query(con, "top_values", "SELECT * FROM missing_table", None, lambda c: c.fetchall())
+    assert con.execute("SELECT current_setting('enable_profiling')").fetchone() == (None,)
+
+
+def test_unprofiled_fast_query_is_not_logged(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Profiling off + high threshold: nothing is recorded."""
+    monkeypatch.setattr(settings, "duckdb_profiling", "off")
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 60_000)
+    slow_query_log.clear()
+
+    run_query(duckdb.connect(), "tone", "SELECT 1", None, lambda c: c.fetchone())
+
+    assert slow_query_log.snapshot() == []
+
+
+def test_slow_query_log_is_bounded() -> None:
+    """Oldest entries are evicted once capacity is reached (newest first)."""
+    log = SlowQueryLog(maxlen=2)
+    for i in range(3):
+        log.add(SlowQueryRecord(kind="k", sql=f"q{i}", params=[], started_at="", duration_ms=1.0))
+
+    assert [r.sql for r in log.snapshot()] == ["q2", "q1"]
@@ -0,0 +1,181 @@
+"""
+tests/test_retention.py
+
+Tests for lake retention tiers (app.services.retention).
+
+Why:
+- Rolling up old events partitions must not change top-values, tone,
+  batched aggregates or heatmap results, and a dry run must report exactly
+  what the run then does, without changing anything.
+- Retired files must stay readable for in-flight queries until the grace
+  period is over; recompression must be applied once.
+- Dropped partitions leave every dataset and the actor graph.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app.core.config import settings
+from app.domain.datasets import EVENTS, EVENTS_ROLLUP, MENTIONS
+from app.infra.lake_storage import get_lake_storage
+from app.services import ingest
+from app.services.actor_graph import actor_graph
+from app.services.duckdb_queries import (
+    AggregateSpec,
+    batch_aggregates,
+    heatmap_tile,
+    tone_stats,
+    top_values,
+)
+from app.services.retention import (
+    RETENTION_TAG,
+    RetentionError,
+    RetentionPolicy,
+    retention,
+)
+
+TODAY = date(2026, 1, 6)
+DAYS = [f"2026-01-0{d}" for d in range(1, 6)]
+SPECS = [
+    AggregateSpec("codes", "top_values", "EventCode", 50),
+    AggregateSpec("countries", "top_values", "ActionGeo_CountryCode", 50),
+    AggregateSpec("tone", "tone"),
+]
+
+
+def _events(seed: int, n: int) -> pa.Table:
+    return pa.table(
+        {
+            "GlobalEventID": pa.array(range(seed * 1000, seed * 1000 + n), pa.int64()),
+            "EventCode": [f"0{(j + seed) % 4 + 1}0" for j in range(n)],
+            "EventRootCode": [f"0{(j + seed) % 4 + 1}" for j in range(n)],
+            "QuadClass": pa.array([j % 4 + 1 for j in range(n)], pa.int64()),
+            "ActionGeo_CountryCode": [
+                ["FR", "US", "", None, "MG"][(j + seed) % 5] for j in range(n)
+            ],
+            "Actor1CountryCode": [["FRA", "USA"][j % 2] for j in range(n)],
+            "Actor2CountryCode": [["USA", "MDG", "FRA"][j % 3] for j in range(n)],
+            "ActionGeo_Lat": [48.8 - j for j in range(n)],
+            "ActionGeo_Long": [2.3 + j for j in range(n)],
+            "AvgTone": [None if j % 7 == 0 else (j * seed % 11) - 5.0 for j in range(n)],
+        }
+    )
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Five days of events (two batches a day) and mentions (one a day)."""
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    monkeypatch.setattr(settings, "hot_tier_enabled", False)
+    storage = get_lake_storage()
+    for d, dt in enumerate(DAYS):
+        stamp = dt.replace("-", "")
+        for b in range(2):
+            ts = f"{stamp}{b:02d}0000"
+            storage.write_batch(dt, ts, _events(d * 2 + b, 30 + d), ingest._write_events_parquet)
+        mentions = pa.table({"GlobalEventID": pa.array([d * 2000], pa.int64())})
+        storage.write_batch(dt, f"{stamp}000000", mentions, ingest._write_events_parquet, MENTIONS)
+    storage.bump_version()
+    yield tmp_path / "lake"
+
+
+def _results() -> dict:
+    return {
+        "codes": top_values(["EventCode"], "c27", None, None, 50),
+        "countries": top_values(["ActionGeo_CountryCode"], "c55", None, None, 50),
+        "one_day": top_values(["EventCode"], "c27", "2026-01-01", None, 50),
+        "tone": tone_stats(None, None),
+        "batch": batch_aggregates(SPECS, None, None),
+        "heatmap": heatmap_tile(0, 0, 0, None, None)["total"],
+    }
+
+
+def test_rollup_keeps_results_and_dry_run_reports_the_run(lake: Path) -> None:
+    storage = get_lake_storage()
+    policy = RetentionPolicy(recompress_after_days=2, rollup_after_days=3)
+    before = _results()
+    version = storage.version()
+
+    dry = retention.run(dry_run=True, today=TODAY, policy=policy)
+    assert storage.version() == version
+    assert [(a.action, a.dataset, a.dt, a.files) for a in dry.actions] == [
+        ("rollup", EVENTS, "2026-01-01", 2),
+        ("rollup", EVENTS, "2026-01-02", 2),
+        ("recompress", EVENTS, "2026-01-03", 2),
+        ("recompress", MENTIONS, "2026-01-01", 1),
+        ("recompress", MENTIONS, "2026-01-02", 1),
+        ("recompress", MENTIONS, "2026-01-03", 1),
+    ]
+    assert all(a.bytes > 0 and a.bytes_after is None for a in dry.actions)
+    raw = [b.uri for b in storage.batches(EVENTS) if b.dt <= "2026-01-02"]
+    assert len(raw) == 4
+
+    done = retention.run(today=TODAY, policy=policy)
+    assert [(a.action, a.dt, a.files, a.bytes) for a in done.actions] == [
+        (a.action, a.dt, a.files, a.bytes) for a in dry.actions
+    ]
+    assert storage.version() != version
+    assert [b.dt for b in storage.batches(EVENTS_ROLLUP)] == ["2026-01-01", "2026-01-02"]
+    assert {b.dt for b in storage.batches(EVENTS)} == set(DAYS[2:])
+
+    after = _results()
+    tone = after.pop("tone")
+    batch_tone = after["batch"].pop()
+    expected_batch_tone = before["batch"].pop()
+    assert tone == pytest.approx(before.pop("tone"))
+    assert batch_tone == pytest.approx(expected_batch_tone)
+    assert after == before
+
+    # Retired files stay readable for queries listed before the run.
+    assert all(os.path.exists(uri) for uri in raw)
+    recompressed = [b.uri for b in storage.batches(EVENTS) if b.dt == "2026-01-03"]
+    assert pq.read_metadata(recompressed[0]).metadata[RETENTION_TAG] == policy.tag()
+
+    again = retention.run(today=TODAY, policy=policy)
+    assert again.actions == [] and again.purged_files == 0
+
+    settings_grace = settings.retention_grace_seconds
+    try:
+        settings.retention_grace_seconds = 0
+        assert retention.run(today=TODAY, policy=policy).purged_files == 4
+    finally:
+        settings.retention_grace_seconds = settings_grace
+    assert not any(os.path.exists(uri) for uri in raw)
+
+
+def test_drop_removes_partitions_and_graph_days(lake: Path) -> None:
+    storage = get_lake_storage()
+    actor_graph.sync(force=True)
+    assert "2026-01-01" in actor_graph._state("country", fresh=True).days
+
+    report = retention.run(today=TODAY, policy=RetentionPolicy(drop_after_days=4))
+    assert {(a.dataset, a.dt) for a in report.actions} == {
+        (EVENTS, "2026-01-01"),
+        (MENTIONS, "2026-01-01"),
+    }
+    assert report.graph_days_dropped == ["2026-01-01"]
+    assert min(b.dt for b in storage.batches(EVENTS)) == "2026-01-02"
+    assert min(b.dt for b in storage.batches(MENTIONS)) == "2026-01-02"
+    assert "2026-01-01" not in actor_graph._state("country", fresh=True).days
+    # The graph does not re-add the dropped day from the retired batches.
+    actor_graph.sync(force=True)
+    assert "2026-01-01" not in actor_graph._state("country", fresh=True).days
+
+
+def test_policy_tiers_must_be_ordered() -> None:
+    with pytest.raises(RetentionError):
+        RetentionPolicy(rollup_after_days=30, drop_after_days=7).validate()
+    with pytest.raises(RetentionError):
+        RetentionPolicy(recompress_after_days=-1).validate()
+    RetentionPolicy(recompress_after_days=7, rollup_after_days=7, drop_after_days=30).validate()
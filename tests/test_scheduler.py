@@ -0,0 +1,187 @@
+"""
+tests/test_scheduler.py
+
+Unit tests for the GDELT-cadence aware scheduler.
+
+Why:
+- Slot alignment must follow the 15-minute UTC publication grid.
+- A batch listed while an ingestion is still running must be queued,
+  never ingested concurrently.
+- A failed lastupdate.txt poll (httpx errors wrapped in tenacity.RetryError
+  once retries are exhausted) must not stop the scheduler.
+- A failed batch file is no longer listed by lastupdate.txt: it must be
+  retried with the next batches, a bounded number of times.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+from tenacity import retry, stop_after_attempt
+
+from app.core.config import settings
+from app.scheduler import CadenceScheduler, freshness_lag_seconds, next_poll_start, slot_floor
+from app.services.gdelt import GdeltFile, LastUpdateValidators
+
+
+def _export(ts: str) -> GdeltFile:
+    url = f"http://data.gdeltproject.org/gdeltv2/{ts}.export.CSV.zip"
+    return GdeltFile(size=1, md5="x", url=url, ts=ts)
+
+
+def test_slot_alignment_follows_publication_grid() -> None:
+    """Polling starts `delay` seconds after the next 15-minute slot."""
+    now = datetime(2026, 2, 10, 0, 16, 30, tzinfo=UTC)
+
+    assert slot_floor(now, 15) == datetime(2026, 2, 10, 0, 15, tzinfo=UTC)
+    assert next_poll_start(now, 15, 60) == datetime(2026, 2, 10, 0, 31, tzinfo=UTC)
+    # Still before slot + delay: poll the current slot.
+    early = datetime(2026, 2, 10, 0, 15, 20, tzinfo=UTC)
+    assert next_poll_start(early, 15, 60) == datetime(2026, 2, 10, 0, 16, tzinfo=UTC)
+
+
+def test_freshness_lag_seconds() -> None:
+    """Lag is measured from the batch timestamp, never negative."""
+    now = datetime(2026, 2, 10, 0, 20, tzinfo=UTC)
+
+    assert freshness_lag_seconds("20260210001500", now) == 300.0
+    assert freshness_lag_seconds(None, now) == 0.0
+
+
+def test_validators_build_conditional_headers() -> None:
+    """ETag and Last-Modified map to If-None-Match / If-Modified-Since."""
+    v = LastUpdateValidators(etag='"abc"', last_modified="Tue, 10 Feb 2026 00:15:00 GMT")
+
+    assert v.as_headers() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Tue, 10 Feb 2026 00:15:00 GMT",
+    }
+
+
+def test_new_batch_during_running_ingest_is_queued_not_overlapped() -> None:
+    """Only one ingestion runs at a time; batches discovered meanwhile all run next."""
+    listings = [
+        [_export("20260210001500")],
+        None,
+        [_export("20260210003000")],
+        [_export("20260210004500")],
+        [_export("20260210003000")],
+    ]
+    active = 0
+    max_active = 0
+    ingested: list[str] = []
+    release = asyncio.Event()
+
+    async def fake_fetch(validators, client) -> tuple:
+        return listings.pop(0), LastUpdateValidators(etag='"v"')
+
+    async def fake_ingest(picked: list[GdeltFile]) -> dict:
+        nonlocal active, max_active
+        active += 1
+        max_active = max(max_active, active)
+        await release.wait()
+        active -= 1
+        ingested.extend(f.ts for f in picked)
+        return {"ingested": [{"status": "ok", "ts": f.ts} for f in picked]}
+
+    async def scenario() -> CadenceScheduler:
+        sched = CadenceScheduler(n_batches=1, fetch=fake_fetch, ingest=fake_ingest)
+        sched.last_seen_ts = sched.last_ingested_ts = None
+
+        assert await sched.poll_once() is True
+        await asyncio.sleep(0)
+        assert await sched.poll_once() is False  # 304 Not Modified
+        assert await sched.poll_once() is True  # queued behind the running ingest
+        assert await sched.poll_once() is True  # merged with the queued batch
+        sched.last_seen_ts = "20260210001500"
+        assert await sched.poll_once() is True  # already queued: merged once
+        assert sched.ingest_running
+
+        release.set()
+        while sched.ingest_running:
+            await asyncio.sleep(0)
+        return sched
+
+    sched = asyncio.run(scenario())
+
+    assert max_active == 1
+    assert ingested == ["20260210001500", "20260210003000", "20260210004500"]
+    assert sched.last_ingested_ts == "20260210004500"
+
+
+def test_failed_files_are_retried_with_the_next_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Failed files ride along with the next discovered batch until the attempt limit."""
+    monkeypatch.setattr(settings, "gdelt_ingest_max_attempts", 2)
+    listings = [[_export(f"2026021000{m}00")] for m in ("15", "30", "45")]
+    broken = {"20260210001500": 1, "20260210003000": 99}  # failures before succeeding
+    runs: list[list[str]] = []
+
+    async def fake_fetch(validators, client) -> tuple:
+        return listings.pop(0), LastUpdateValidators(etag='"v"')
+
+    async def fake_ingest(picked: list[GdeltFile]) -> dict:
+        runs.append([f.ts for f in picked])
+        results = []
+        for f in picked:
+            if broken.get(f.ts, 0) > 0:
+                broken[f.ts] -= 1
+                results.append({"status": "failed", "url": f.url, "error": "reset"})
+            else:
+                results.append({"status": "ok", "url": f.url, "ts": f.ts})
+        return {"ingested": results}
+
+    async def scenario() -> CadenceScheduler:
+        sched = CadenceScheduler(n_batches=1, fetch=fake_fetch, ingest=fake_ingest)
+        sched.last_seen_ts = sched.last_ingested_ts = None
+        for _ in listings[:]:
+            assert await sched.poll_once() is True
+            while sched.ingest_running:
+                await asyncio.sleep(0)
+        return sched
+
+    sched = asyncio.run(scenario())
+
+    assert runs == [
+        ["20260210001500"],
+        ["20260210003000", "20260210001500"],  # 00:15 retried and ingested
+        ["20260210004500", "20260210003000"],  # 00:30 fails its 2nd attempt: given up
+    ]
+    assert sched._retry == {}
+    assert sched.last_ingested_ts == "20260210004500"
+
+
+def test_failed_poll_does_not_stop_the_poll_window(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Exhausted fetch retries raise RetryError, not httpx.HTTPError: keep polling."""
+    monkeypatch.setattr(settings, "gdelt_poll_interval_seconds", 0)
+    calls = 0
+
+    @retry(stop=stop_after_attempt(2))
+    async def unreachable() -> None:
+        raise httpx.ConnectError("connection refused")
+
+    async def fake_fetch(validators, client) -> tuple:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await unreachable()
+        return [_export("20260210001500")], LastUpdateValidators(etag='"v"')
+
+    async def fake_ingest(picked: list[GdeltFile]) -> dict:
+        return {"ingested": [{"status": "ok", "url": f.url, "ts": f.ts} for f in picked]}
+
+    async def scenario() -> bool:
+        sched = CadenceScheduler(n_batches=1, fetch=fake_fetch, ingest=fake_ingest)
+        sched.last_seen_ts = sched.last_ingested_ts = None
+        found = await sched.poll_window()
+        while sched.ingest_running:
+            await asyncio.sleep(0)
+        return found
+
+    assert asyncio.run(scenario()) is True
+    assert calls == 2
@@ -0,0 +1,90 @@
+"""
+tests/test_singleflight.py
+
+Tests for single-flight coalescing of identical concurrent queries.
+
+Why:
+- N identical concurrent calls must run one execution and all get its result.
+- The leader's failure must reach every waiter.
+- The lake version (part of every key) must change when data is written.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.infra.fs_lake import bump_lake_version, lake_version
+from app.services.singleflight import SingleFlight
+
+
+def _coalesced(kind: str) -> float:
+    return REGISTRY.get_sample_value("duckdb_query_coalesced_total", {"kind": kind}) or 0.0
+
+
+def _run_concurrently(sf: SingleFlight, kind: str, fn, n: int = 8) -> list:
+    """Start `n` identical calls; the leader blocks until all others are waiting."""
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        futures = [pool.submit(sf.do, kind, ("same",), fn) for _ in range(n)]
+        return [f.exception() or f.result() for f in futures]
+
+
+def test_identical_concurrent_calls_share_one_execution() -> None:
+    sf = SingleFlight()
+    calls = 0
+    release = threading.Event()
+    before = _coalesced("test_ok")
+
+    def fn() -> list[dict]:
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return [{"key": "145", "n": 3}]
+
+    def unblock() -> None:
+        # Let every caller reach `do` before the leader returns.
+        deadline = time.monotonic() + 5
+        while _coalesced("test_ok") - before < 7 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        release.set()
+
+    threading.Thread(target=unblock).start()
+    results = _run_concurrently(sf, "test_ok", fn)
+
+    assert calls == 1
+    assert all(r == [{"key": "145", "n": 3}] for r in results)
+    assert _coalesced("test_ok") - before == 7
+    assert sf.in_flight() == 0
+
+
+def test_leader_failure_reaches_every_waiter() -> None:
+    sf = SingleFlight()
+    release = threading.Event()
+
+    def fn() -> None:
+        release.wait(5)
+        raise RuntimeError("scan failed")
+
+    threading.Timer(0.2, release.set).start()
+    results = _run_concurrently(sf, "test_err", fn, n=4)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert sf.in_flight() == 0
+
+
+def test_lake_version_changes_on_bump(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+
+    assert lake_version() == "0"
+    v1 = bump_lake_version()
+    assert lake_version() == v1
+    assert bump_lake_version() != v1
@@ -0,0 +1,105 @@
+"""
+tests/test_subscriptions.py
+
+Tests for the push feed of new events (app.services.subscriptions).
+
+Why:
+- A new batch must be matched against all subscriptions in one pass, each
+  subscriber receiving only its rows (terms, country, root code).
+- Batches written by any process are picked up by following the lake.
+- A slow consumer must not buffer without bound: overflowing messages are
+  dropped and reported as lagged.
+
+Run:
+  pytest -q
+"""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from app.core.config import settings
+from app.infra.lake_storage import get_lake_storage
+from app.services.ingest import _write_events_parquet
+from app.services.subscriptions import SubscriptionFilter, SubscriptionHub
+
+
+def _batch(offset: int = 0) -> pa.Table:
+    return pa.table(
+        {
+            "GlobalEventID": pa.array([offset + i for i in range(6)], pa.int64()),
+            "EventRootCode": ["14", "14", "01", "14", "19", "01"],
+            "ActionGeo_CountryCode": ["MA", "FR", "MA", "MA", "US", None],
+            "Actor1Name": ["PROTESTER", "POLICE", "GOVERNMENT", "Protesters", "ARMY", "ELECTION BOARD"],
+        }
+    )
+
+
+def _write(ts: str, table: pa.Table) -> None:
+    storage = get_lake_storage()
+    storage.write_batch(f"{ts[:4]}-{ts[4:6]}-{ts[6:8]}", ts, table, _write_events_parquet)
+    storage.bump_version()
+
+
+def _drain(queue: asyncio.Queue) -> list[dict]:
+    out = []
+    while not queue.empty():
+        out.append(queue.get_nowait())
+    return out
+
+
+@pytest.fixture()
+def lake(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "data_lake_path", str(tmp_path / "lake"))
+    return tmp_path / "lake"
+
+
+def test_new_batches_are_matched_and_pushed_per_subscription(lake: Path) -> None:
+    _write("20260210000000", _batch())  # already there before subscribing: not replayed
+
+    async def scenario() -> dict[str, list[dict]]:
+        hub = SubscriptionHub()
+        hub.attach()
+        try:
+            protest_ma = hub.subscribe(SubscriptionFilter(terms=("protest",), country="MA"))
+            root_01 = hub.subscribe(SubscriptionFilter(terms=("government", "election"), root_code="01"))
+            nothing = hub.subscribe(SubscriptionFilter(country="ZZ"))
+
+            _write("20260210001500", _batch(100))
+            assert await asyncio.to_thread(hub.poll_lake) == 1
+            await asyncio.sleep(0)  # deliveries are scheduled on the loop
+            return {s.id: _drain(s.queue) for s in (protest_ma, root_01, nothing)}
+        finally:
+            hub.detach()
+
+    got = asyncio.run(scenario())
+    protest_ma, root_01, nothing = got.values()
+    assert [m["ts"] for m in protest_ma] == ["20260210001500"]
+    assert [r["GlobalEventID"] for r in protest_ma[0]["rows"]] == [100, 103]
+    assert [r["GlobalEventID"] for r in root_01[0]["rows"]] == [102, 105]
+    assert root_01[0]["count"] == 2
+    assert nothing == []
+
+
+def test_slow_consumer_messages_are_dropped_and_reported(
+    lake: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "subscriptions_queue_size", 1)
+    monkeypatch.setattr(settings, "subscriptions_max_rows", 1)
+
+    async def scenario() -> tuple[list[dict], int]:
+        hub = SubscriptionHub()
+        sub = hub.subscribe(SubscriptionFilter(terms=("14",)))
+        for ts in ("20260210000000", "20260210001500", "20260210003000"):
+            await asyncio.to_thread(hub.publish, "2026-02-10", ts, _batch())
+        await asyncio.sleep(0)
+        return _drain(sub.queue), sub.take_dropped()
+
+    messages, dropped = asyncio.run(scenario())
+    assert [m["ts"] for m in messages] == ["20260210000000"]
+    assert messages[0]["count"] == 3 and len(messages[0]["rows"]) == 1
+    assert dropped == 2